@@ -3,47 +3,52 @@
 Combined Wrapped 2025 - Your texting habits across iMessage AND WhatsApp, exposed.
 Usage: python3 combined_wrapped.py
 """
-import sqlite3, os, sys, re, subprocess, argparse, glob, threading, time
-from datetime import datetime, timedelta
+import sqlite3, os, sys, atexit, re, subprocess, argparse, glob, threading, time, tempfile, urllib.parse, heapq, base64, json, contextlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta
 # Database paths
-IMESSAGE_DB = os.path.expanduser("~/Library/Messages/chat.db")
-ADDRESSBOOK_DIR = os.path.expanduser("~/Library/Application Support/AddressBook")
+IMESSAGE_DB = os.environ.get("WRAP2025_IMESSAGE_DB") or os.path.expanduser("~/Library/Messages/chat.db")
+ADDRESSBOOK_DIR = os.environ.get("WRAP2025_ADDRESSBOOK_DIR") or os.path.expanduser("~/Library/Application Support/AddressBook")
 WHATSAPP_PATHS = [
-os.path.expanduser("~/Library/Group Containers/group.net.whatsapp.WhatsApp.shared/ChatStorage.sqlite"),
-os.path.expanduser("~/Library/Containers/com.whatsapp/Data/Library/Application Support/WhatsApp/ChatStorage.sqlite"),
-os.path.expanduser("~/Library/Containers/desktop.WhatsApp/Data/Library/Application Support/WhatsApp/ChatStorage.sqlite"),
+    os.path.expanduser("~/Library/Group Containers/group.net.whatsapp.WhatsApp.shared/ChatStorage.sqlite"),
+    os.path.expanduser("~/Library/Containers/com.whatsapp/Data/Library/Application Support/WhatsApp/ChatStorage.sqlite"),
+    os.path.expanduser("~/Library/Containers/desktop.WhatsApp/Data/Library/Application Support/WhatsApp/ChatStorage.sqlite"),
 ]
-WHATSAPP_DB = None
+WHATSAPP_DB = os.environ.get("WRAP2025_WHATSAPP_DB")  # None: first of WHATSAPP_PATHS that exists (--whatsapp-db)
 COCOA_OFFSET = 978307200 # WhatsApp/iMessage Cocoa Core Data Time offset
 
 class Spinner:
-"""Animated terminal spinner for long operations"""
-def __init__(self, message=""):
-self.message = message
-self.spinning = False
-self.thread = None
-self.frames = ['⣾', '⣽', '⣻', '⢿', '⡿', '⣟', '⣯', '⣷']
-def spin(self):
-i = 0
-while self.spinning:
-frame = self.frames[i % len(self.frames)]
-print(f"\r {frame} {self.message}", end='', flush=True)
-time.sleep(0.1)
-i += 1
-def start(self, message=None):
-if message:
-self.message = message
-self.spinning = True
-self.thread = threading.Thread(target=self.spin)
-self.thread.start()
-def stop(self, final_message=None):
-self.spinning = False
-if self.thread:
-self.thread.join()
-if final_message:
-print(f"\r ✓ {final_message}".ljust(60))
-else:
-print()
+    """Animated terminal spinner for long operations"""
+    def __init__(self, message=""):
+        self.message = message
+        self.spinning = False
+        self.thread = None
+        self.frames = ['⣾', '⣽', '⣻', '⢿', '⡿', '⣟', '⣯', '⣷']
+
+    def spin(self):
+        i = 0
+        while self.spinning:
+            frame = self.frames[i % len(self.frames)]
+            print(f"\r    {frame} {self.message}", end='', flush=True)
+            time.sleep(0.1)
+            i += 1
+
+    def start(self, message=None):
+        if message:
+            self.message = message
+        self.spinning = True
+        self.thread = threading.Thread(target=self.spin, daemon=True)
+        self.thread.start()
+
+    def stop(self, final_message=None):
+        self.spinning = False
+        if self.thread:
+            self.thread.join()
+        if final_message:
+            print(f"\r    ✓ {final_message}".ljust(60))
+        else:
+            print()
 
 # Timestamps
 # iMessage: Unix timestamp in nanoseconds since 2001 (Needs +978307200 in SQL query for seconds since Unix epoch)
@@ -57,782 +62,1547 @@ TS_JUN_2025_WHATSAPP = 770428800
 TS_2024_WHATSAPP = 725846400
 TS_JUN_2024_WHATSAPP = 738892800
 
+SCAN_BATCH_SIZE = 5000  # rows per fetchmany() batch when streaming
+
+# Emoji graphemes. Pictographs with default emoji presentation count on their own; text-default
+# symbols (❤ ☀ ✌ ...) only with VS16 or a skin tone. Flags, keycaps, tag sequences and ZWJ chains
+# (👩‍❤️‍👨, 👍🏽) are matched whole, so each grapheme is counted once.
+EMOJI_PRESENTATION = (
+    '\U0001F004\U0001F0CF\U0001F18E\U0001F191-\U0001F19A\U0001F201\U0001F21A\U0001F22F\U0001F232-\U0001F236'
+    '\U0001F238-\U0001F23A\U0001F250\U0001F251\U0001F300-\U0001F64F\U0001F680-\U0001F6FF\U0001F7E0-\U0001F7FF'
+    '\U0001F90C-\U0001F9FF\U0001FA70-\U0001FAFF\u231A\u231B\u23E9-\u23EC\u23F0\u23F3\u25FD\u25FE\u2614\u2615'
+    '\u2648-\u2653\u267F\u2693\u26A1\u26AA\u26AB\u26BD\u26BE\u26C4\u26C5\u26CE\u26D4\u26EA\u26F2\u26F3\u26F5'
+    '\u26FA\u26FD\u2705\u270A\u270B\u2728\u274C\u274E\u2753-\u2755\u2757\u2795-\u2797\u27B0\u27BF\u2B1B\u2B1C'
+    '\u2B50\u2B55'
+)
+EMOJI_TEXT = (
+    '\u00A9\u00AE\u203C\u2049\u2122\u2139\u2194-\u2199\u21A9\u21AA\u2328\u23CF\u23ED-\u23EF\u23F1\u23F2'
+    '\u23F8-\u23FA\u24C2\u25AA\u25AB\u25B6\u25C0\u25FB\u25FC\u2600-\u27BF\u2934\u2935\u2B05-\u2B07\u3030\u303D'
+    '\u3297\u3299\U0001F170\U0001F171\U0001F17E\U0001F17F\U0001F202\U0001F237'
+)
+EMOJI_SKIN = '\U0001F3FB-\U0001F3FF'
+EMOJI_RE = re.compile(
+    '[\U0001F1E6-\U0001F1FF]{2}'
+    '|\U0001F3F4[\U000E0020-\U000E007E]+\U000E007F'
+    '|[0-9#*]\uFE0F?\u20E3'
+    f'|(?:[{EMOJI_PRESENTATION}]|[{EMOJI_TEXT}](?=[\uFE0F{EMOJI_SKIN}]))[{EMOJI_SKIN}]?\uFE0F?'
+    f'(?:\u200D[{EMOJI_PRESENTATION}{EMOJI_TEXT}][{EMOJI_SKIN}]?\uFE0F?)*'
+)
+EMOJI_TOP_K = 5
+
+def count_emoji(texts, counts=None):
+    """Add every emoji grapheme in texts to a Counter (one regex pass, repeats included)."""
+    counts = Counter() if counts is None else counts
+    # Newlines can't be part of a grapheme, so a whole batch is scanned in one findall()
+    counts.update(EMOJI_RE.findall('\n'.join(texts)))
+    return counts
+
+# Newer macOS leaves message.text NULL and keeps the text only in attributedBody, a typedstream
+# archive of an NSAttributedString. Its first C-string field ('+') is the NSString's UTF-8 bytes.
+TYPEDSTREAM_TEXT = b'\x84\x01+'
+
+def attributed_text(blob):
+    """The text of an attributedBody blob, sliced out without decoding the rest of the archive; None if absent."""
+    i = blob.find(TYPEDSTREAM_TEXT) + 3 if blob else 0
+    if i < 3 or i >= len(blob):
+        return None
+    buf = memoryview(blob)
+    n = buf[i]
+    # Lengths under 0x80 are one byte; 0x81 / 0x82 prefix a little-endian 16 / 32-bit length
+    if n == 0x81:
+        if i + 3 > len(buf):
+            return None  # truncated blob: the length prefix itself is cut off
+        n, i = buf[i + 1] | buf[i + 2] << 8, i + 3
+    elif n == 0x82:
+        if i + 5 > len(buf):
+            return None
+        n, i = int.from_bytes(buf[i + 1:i + 5], 'little'), i + 5
+    else:
+        i += 1
+    return str(buf[i:i + n], 'utf-8', 'replace')
+
+def top_contacts(halves, k=20):
+    """The (handle, total, sent, received) rows of the k busiest contacts in a {handle: (sent, received) before
+    the mid-year split + (sent, received) from it on} map."""
+    rows = [(h, s1 + r1 + s2 + r2, s1 + s2, r1 + r2) for h, (s1, r1, s2, r2) in halves.items()]
+    return sorted(rows, key=lambda x: (-x[1], x[0]))[:k]
+
+def top_emoji(counts, k=EMOJI_TOP_K):
+    return heapq.nsmallest(k, counts.items(), key=lambda x: (-x[1], x[0]))
+
+def apple_ns(ts):
+    """Unix timestamp -> raw message.date value (nanoseconds since 2001-01-01)."""
+    return (ts - 978307200) * 1000000000
+
+# Bounds are compared against the bare `date` column so SQLite can range-scan its index
+# instead of evaluating (date/1000000000+978307200) on every row.
+def date_after(ts, col='date'):
+    """Same rows as (col/1000000000+978307200)>ts: integer division only passes once a whole second past ts."""
+    return f"{col}>={apple_ns(ts + 1)}"
+
+def date_before(ts, col='date'):
+    return f"{col}<{apple_ns(ts)}"
+
+def date_from(ts, col='date'):
+    return f"{col}>={apple_ns(ts)}"
+
+def date_window(ts_start, ts_end=None, col='date'):
+    """Open window: date_after(ts_start), the fixed-year bound. Closed (--since/--until, --years): the half-open [ts_start, ts_end)."""
+    if ts_end is None:
+        return date_after(ts_start, col)
+    return f"{date_from(ts_start, col)} AND {date_before(ts_end, col)}"
+
+def cocoa_window(ts_start, ts_end=None, col='ZMESSAGEDATE'):
+    """Open window: col>ts_start, the fixed-year bound. Closed (--since/--until): the half-open [ts_start, ts_end).
+
+    Bounds are Cocoa seconds so the date index serves the range.
+    """
+    if ts_end is None:
+        return f"{col}>{ts_start}"
+    return f"{col}>={ts_start} AND {col}<{ts_end}"
+
+def local_ts(year, month=1, day=1):
+    """Unix timestamp of local midnight on year-month-day."""
+    return int(time.mktime((year, month, day, 0, 0, 0, 0, 0, -1)))
+
+class DigitsOnly(dict):
+    """str.translate() table that keeps decimal digits (the characters a regex digit class matches) and drops everything else."""
+    def __missing__(self, c):
+        keep = self[c] = c if chr(c).isdecimal() else None
+        return keep
+
+DIGITS_ONLY = DigitsOnly()
+
 def normalize_phone(phone):
-if not phone: return None
-digits = re.sub(r'\D', '', str(phone))
-if len(digits) == 11 and digits.startswith('1'):
-digits = digits[1:]
-elif len(digits) > 10:
-return digits
-return digits[-10:] if len(digits) >= 10 else (digits if len(digits) >= 7 else None)
+    if not phone: return None
+    digits = str(phone).translate(DIGITS_ONLY)
+    if len(digits) == 11 and digits.startswith('1'):
+        digits = digits[1:]
+    elif len(digits) > 10:
+        return digits
+    return digits[-10:] if len(digits) >= 10 else (digits if len(digits) >= 7 else None)
+
+class IdentityIndex:
+    """Union-find linking AddressBook records to their phone numbers and emails.
+
+    iMessage handles and WhatsApp JIDs resolve through their normalized number or email, so one
+    person's handles on both platforms share a root; find() is near O(1) (path halving, union by size).
+    """
+    WHATSAPP_DOMAINS = ('s.whatsapp.net', 'c.us')
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+        self.names = {}  # root -> AddressBook name of the person
+
+    @classmethod
+    def key(cls, handle):
+        """Node of an iMessage handle or WhatsApp JID: tel:<normalized number>, mailto:<email>, else the handle itself."""
+        user, _, domain = handle.partition('@')
+        if domain and domain not in cls.WHATSAPP_DOMAINS:
+            return 'mailto:' + handle.lower().strip()
+        phone = normalize_phone(user)
+        return 'tel:' + phone if phone else handle
+
+    def find(self, node):
+        parent = self.parent
+        if node not in parent:
+            return node
+        while parent[node] != node:
+            parent[node] = node = parent[parent[node]]
+        return node
+
+    def union(self, a, b):
+        for node in (a, b):
+            if node not in self.parent:
+                self.parent[node], self.size[node] = node, 1
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size.pop(b)
+        if b in self.names:
+            self.names.setdefault(a, self.names.pop(b))
+
+    def resolve(self, handle):
+        return self.find(self.key(handle))
+
+def build_identity_index():
+    """One IdentityIndex over every AddressBook source: each named record joined to its numbers and emails."""
+    index = IdentityIndex()
+    db_paths = glob.glob(os.path.join(ADDRESSBOOK_DIR, "Sources", "*", "AddressBook-v22.abcddb"))
+    main_db = os.path.join(ADDRESSBOOK_DIR, "AddressBook-v22.abcddb")
+    if os.path.exists(main_db): db_paths.append(main_db)
+    for i, db_path in enumerate(db_paths):
+        try:
+            conn = sqlite3.connect(db_path)
+            people = {}
+            for rowid, first, last in conn.execute("SELECT ROWID, ZFIRSTNAME, ZLASTNAME FROM ZABCDRECORD WHERE ZFIRSTNAME IS NOT NULL OR ZLASTNAME IS NOT NULL"):
+                name = f"{first or ''} {last or ''}".strip()
+                if name:
+                    people[rowid] = node = f"ab:{i}:{rowid}"
+                    index.union(node, node)
+                    index.names[node] = name
+            for owner, phone in conn.execute("SELECT ZOWNER, ZFULLNUMBER FROM ZABCDPHONENUMBER WHERE ZFULLNUMBER IS NOT NULL"):
+                digits = normalize_phone(phone)
+                if owner in people and digits:
+                    index.union(people[owner], 'tel:' + digits)
+            for owner, email in conn.execute("SELECT ZOWNER, ZADDRESS FROM ZABCDEMAILADDRESS WHERE ZADDRESS IS NOT NULL"):
+                if owner in people:
+                    index.union(people[owner], 'mailto:' + email.lower().strip())
+            conn.close()
+        except: pass
+    return index
+
+class ContactIndex(dict):
+    """extract_imessage_contacts() lookup keys -> names, plus a memo of handles already resolved by get_name_imessage()."""
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.names = {}
+
+    def name(self, handle):
+        try:
+            return self.names[handle]
+        except KeyError:
+            name = self.names[handle] = get_name_imessage(handle, self)
+            return name
 
 def extract_imessage_contacts():
-"""Extract contacts from macOS AddressBook."""
-contacts = {}
-db_paths = glob.glob(os.path.join(ADDRESSBOOK_DIR, "Sources", "*", "AddressBook-v22.abcddb"))
-main_db = os.path.join(ADDRESSBOOK_DIR, "AddressBook-v22.abcddb")
-if os.path.exists(main_db): db_paths.append(main_db)
-for db_path in db_paths:
-try:
-conn = sqlite3.connect(db_path)
-people = {}
-for row in conn.execute("SELECT ROWID, ZFIRSTNAME, ZLASTNAME FROM ZABCDRECORD WHERE ZFIRSTNAME IS NOT NULL OR ZLASTNAME IS NOT NULL"):
-name = f"{row[1] or ''} {row[2] or ''}".strip()
-if name: people[row[0]] = name
-for owner, phone in conn.execute("SELECT ZOWNER, ZFULLNUMBER FROM ZABCDPHONENUMBER WHERE ZFULLNUMBER IS NOT NULL"):
-if owner in people:
-name = people[owner]
-digits = re.sub(r'\D', '', str(phone))
-if digits:
-contacts[digits] = name
-if len(digits) >= 10:
-contacts[digits[-10:]] = name
-if len(digits) >= 7:
-contacts[digits[-7:]] = name
-if len(digits) == 11 and digits.startswith('1'):
-contacts[digits[1:]] = name
-for owner, email in conn.execute("SELECT ZOWNER, ZADDRESS FROM ZABCDEMAILADDRESS WHERE ZADDRESS IS NOT NULL"):
-if owner in people: contacts[email.lower().strip()] = people[owner]
-conn.close()
-except: pass
-return contacts
+    """Extract contacts from macOS AddressBook."""
+    contacts = {}
+    db_paths = glob.glob(os.path.join(ADDRESSBOOK_DIR, "Sources", "*", "AddressBook-v22.abcddb"))
+    main_db = os.path.join(ADDRESSBOOK_DIR, "AddressBook-v22.abcddb")
+    if os.path.exists(main_db): db_paths.append(main_db)
+    for db_path in db_paths:
+        try:
+            conn = sqlite3.connect(db_path)
+            people = {}
+            for row in conn.execute("SELECT ROWID, ZFIRSTNAME, ZLASTNAME FROM ZABCDRECORD WHERE ZFIRSTNAME IS NOT NULL OR ZLASTNAME IS NOT NULL"):
+                name = f"{row[1] or ''} {row[2] or ''}".strip()
+                if name: people[row[0]] = name
+            for owner, phone in conn.execute("SELECT ZOWNER, ZFULLNUMBER FROM ZABCDPHONENUMBER WHERE ZFULLNUMBER IS NOT NULL"):
+                if owner in people:
+                    name = people[owner]
+                    digits = str(phone).translate(DIGITS_ONLY)
+                    if digits:
+                        contacts[digits] = name
+                        if len(digits) >= 10:
+                            contacts[digits[-10:]] = name
+                        if len(digits) >= 7:
+                            contacts[digits[-7:]] = name
+                        if len(digits) == 11 and digits.startswith('1'):
+                            contacts[digits[1:]] = name
+            for owner, email in conn.execute("SELECT ZOWNER, ZADDRESS FROM ZABCDEMAILADDRESS WHERE ZADDRESS IS NOT NULL"):
+                if owner in people: contacts[email.lower().strip()] = people[owner]
+            conn.close()
+        except: pass
+    return ContactIndex(contacts)
 
 def extract_whatsapp_contacts():
-"""Extract contact names from WhatsApp's ZWAPROFILEPUSHNAME table."""
-contacts = {}
-if not WHATSAPP_DB:
-return contacts
-try:
-conn = sqlite3.connect(WHATSAPP_DB)
-for row in conn.execute("SELECT ZJID, ZPUSHNAME FROM ZWAPROFILEPUSHNAME WHERE ZPUSHNAME IS NOT NULL"):
-jid, name = row
-if jid and name:
-contacts[jid] = name
-conn.close()
-except:
-pass
-return contacts
+    """Extract contact names from WhatsApp's ZWAPROFILEPUSHNAME table."""
+    contacts = {}
+    if not WHATSAPP_DB:
+        return contacts
+    try:
+        conn = sqlite3.connect(WHATSAPP_DB)
+        for row in conn.execute("SELECT ZJID, ZPUSHNAME FROM ZWAPROFILEPUSHNAME WHERE ZPUSHNAME IS NOT NULL"):
+            jid, name = row
+            if jid and name:
+                contacts[jid] = name
+        conn.close()
+    except:
+        pass
+    return contacts
 
 def get_name_imessage(handle, contacts):
-"""Resolve handle ID (phone/email) to contact name for iMessage."""
-if handle == 'You': return 'You'
-if '@' in handle:
-lookup = handle.lower().strip()
-if lookup in contacts: return contacts[lookup]
-return handle.split('@')[0]
-digits = re.sub(r'\D', '', str(handle))
-if digits in contacts: return contacts[digits]
-if len(digits) == 11 and digits.startswith('1'):
-if digits[1:] in contacts: return contacts[digits[1:]]
-if len(digits) >= 10 and digits[-10:] in contacts:
-return contacts[digits[-10:]]
-if len(digits) >= 7 and digits[-7:] in contacts:
-return contacts[digits[-7:]]
-return handle
+    """Resolve handle ID (phone/email) to contact name for iMessage."""
+    if handle == 'You': return 'You'
+    if '@' in handle:
+        lookup = handle.lower().strip()
+        if lookup in contacts: return contacts[lookup]
+        return handle.split('@')[0]
+    digits = str(handle).translate(DIGITS_ONLY)
+    if digits in contacts: return contacts[digits]
+    if len(digits) == 11 and digits.startswith('1'):
+        if digits[1:] in contacts: return contacts[digits[1:]]
+    if len(digits) >= 10 and digits[-10:] in contacts:
+        return contacts[digits[-10:]]
+    if len(digits) >= 7 and digits[-7:] in contacts:
+        return contacts[digits[-7:]]
+    return handle
 
 def get_name_whatsapp(jid, contacts):
-"""Get display name for a WhatsApp JID."""
-if jid == 'You':
-return 'You'
-if not jid:
-return "Unknown"
-if jid in contacts:
-return contacts[jid]
-if '@' in jid:
-phone = jid.split('@')[0]
-if len(phone) == 10:
-return f"({phone[:3]}) {phone[3:6]}-{phone[6:]}"
-elif len(phone) == 11 and phone.startswith('1'):
-return f"+1 ({phone[1:4]}) {phone[4:7]}-{phone[7:]}"
-return f"+{phone}"
-return jid
+    """Get display name for a WhatsApp JID."""
+    if jid == 'You':
+        return 'You'
+    if not jid:
+        return "Unknown"
+    if jid in contacts:
+        return contacts[jid]
+    if '@' in jid:
+        phone = jid.split('@')[0]
+        if len(phone) == 10:
+            return f"({phone[:3]}) {phone[3:6]}-{phone[6:]}"
+        elif len(phone) == 11 and phone.startswith('1'):
+            return f"+1 ({phone[1:4]}) {phone[4:7]}-{phone[7:]}"
+        return f"+{phone}"
+    return jid
 
 def find_whatsapp_database():
-"""Find the WhatsApp database path."""
-for path in WHATSAPP_PATHS:
-if os.path.exists(path):
-return path
-return None
+    """Find the WhatsApp database path."""
+    for path in WHATSAPP_PATHS:
+        if os.path.exists(path):
+            return path
+    return None
+
+def open_in_macos(target):
+    """Hand a file or settings URL to macOS `open`; elsewhere (e.g. Linux CI on synthetic databases) there is nothing to hand it to."""
+    if sys.platform == 'darwin':
+        subprocess.run(['open', target])
 
 def check_access():
-"""Check access to both databases. Returns (has_imessage, has_whatsapp)."""
-global WHATSAPP_DB
-has_imessage = False
-has_whatsapp = False
-# Check iMessage
-if os.path.exists(IMESSAGE_DB):
-try:
-conn = sqlite3.connect(IMESSAGE_DB)
-conn.execute("SELECT 1 FROM message LIMIT 1")
-conn.close()
-has_imessage = True
-except:
-pass
-# Check WhatsApp
-WHATSAPP_DB = find_whatsapp_database()
-if WHATSAPP_DB:
-try:
-conn = sqlite3.connect(WHATSAPP_DB)
-conn.execute("SELECT 1 FROM ZWAMESSAGE LIMIT 1")
-conn.close()
-has_whatsapp = True
-except:
-pass
-if not has_imessage and not has_whatsapp:
-print("\n[!] ACCESS DENIED - Neither iMessage nor WhatsApp accessible")
-print(" System Settings -> Privacy & Security -> Full Disk Access -> Add Terminal")
-subprocess.run(['open', 'x-apple.systempreferences:com.apple.preference.security?Privacy_AllFiles'])
-sys.exit(1)
-return has_imessage, has_whatsapp
-
-def q_imessage(sql):
-conn = sqlite3.connect(IMESSAGE_DB)
-r = conn.execute(sql).fetchall()
-conn.close()
-return r
-
-def q_whatsapp(sql):
-conn = sqlite3.connect(WHATSAPP_DB)
-r = conn.execute(sql).fetchall()
-conn.close()
-return r
-
-def analyze_imessage(ts_start, ts_jun):
-"""Analyze iMessage data and return stats dict."""
-d = {}
-one_on_one_cte = """
-WITH chat_participants AS (
-SELECT chat_id, COUNT(*) as participant_count
-FROM chat_handle_join
-GROUP BY chat_id
-),
-one_on_one_messages AS (
-SELECT m.ROWID as msg_id
-FROM message m
-JOIN chat_message_join cmj ON m.ROWID = cmj.message_id
-JOIN chat_participants cp ON cmj.chat_id = cp.chat_id
-WHERE cp.participant_count = 1
-)
-"""
-# --- 1:1 STATS (Omitting for brevity, assume original logic here) ---
-# Stats
-raw_stats = q_imessage(f"""{one_on_one_cte}
-SELECT COUNT(*), SUM(CASE WHEN is_from_me=1 THEN 1 ELSE 0 END), SUM(CASE WHEN is_from_me=0 THEN 1 ELSE 0 END), COUNT(DISTINCT handle_id)
-FROM message m
-WHERE (date/1000000000+978307200)>{ts_start}
-AND m.ROWID IN (SELECT msg_id FROM one_on_one_messages)
-""")[0]
-d['stats'] = (raw_stats[0] or 0, raw_stats[1] or 0, raw_stats[2] or 0, raw_stats[3] or 0)
-# Top contacts
-d['top'] = q_imessage(f"""{one_on_one_cte}
-SELECT h.id, COUNT(*) t, SUM(CASE WHEN m.is_from_me=1 THEN 1 ELSE 0 END), SUM(CASE WHEN m.is_from_me=0 THEN 1 ELSE 0 END)
-FROM message m JOIN handle h ON m.handle_id=h.ROWID
-WHERE (m.date/1000000000+978307200)>{ts_start}
-AND m.ROWID IN (SELECT msg_id FROM one_on_one_messages)
-AND NOT (LENGTH(REPLACE(REPLACE(h.id, '+', ''), '-', '')) BETWEEN 5 AND 6 AND REPLACE(REPLACE(h.id, '+', ''), '-', '') GLOB '[0-9]*')
-GROUP BY h.id ORDER BY t DESC LIMIT 20
-""")
-# Late night, Peak hour/day, Ghosted, Heating up, Fan, Simp, Response time, Emojis, Words, Busiest day, Starter %... (Assume these queries are present as per the original structure)
-# For brevity, let's just ensure the Group Stats and Leaderboard are here, as they are needed for the MVP feature below.
-
-# --- GROUP CHAT STATS ---
-group_chat_cte = """
-WITH chat_participants AS (
-SELECT chat_id, COUNT(*) as participant_count FROM chat_handle_join GROUP BY chat_id
-),
-group_chats AS (
-SELECT chat_id FROM chat_participants WHERE participant_count >= 2
-),
-group_messages AS (
-SELECT m.ROWID as msg_id, cmj.chat_id FROM message m
-JOIN chat_message_join cmj ON m.ROWID = cmj.message_id
-WHERE cmj.chat_id IN (SELECT chat_id FROM group_chats)
-)
-"""
-r = q_imessage(f"""{group_chat_cte}
-SELECT
-(SELECT COUNT(DISTINCT chat_id) FROM group_messages gm
-JOIN message m ON gm.msg_id = m.ROWID WHERE (m.date/1000000000+978307200)>{ts_start}),
-COUNT(*), SUM(CASE WHEN m.is_from_me=1 THEN 1 ELSE 0 END)
-FROM message m WHERE (m.date/1000000000+978307200)>{ts_start}
-AND m.ROWID IN (SELECT msg_id FROM group_messages)
-""")
-d['group_stats'] = {'count': r[0][0] or 0, 'total': r[0][1] or 0, 'sent': r[0][2] or 0} if r else {'count': 0, 'total': 0, 'sent': 0}
-# Group leaderboard
-r = q_imessage(f"""
-WITH chat_participants AS (
-SELECT chat_id, COUNT(*) as participant_count FROM chat_handle_join GROUP BY chat_id
-),
-group_chats AS (
-SELECT chat_id FROM chat_participants WHERE participant_count >= 2
-),
-group_messages AS (
-SELECT m.ROWID as msg_id, cmj.chat_id FROM message m
-JOIN chat_message_join cmj ON m.ROWID = cmj.message_id
-WHERE cmj.chat_id IN (SELECT chat_id FROM group_chats)
-AND (m.date/1000000000+978307200)>{ts_start}
-)
-SELECT c.ROWID, c.display_name, COUNT(*),
-(SELECT COUNT(*) FROM chat_handle_join WHERE chat_id = c.ROWID)
-FROM chat c JOIN group_messages gm ON c.ROWID = gm.chat_id
-GROUP BY c.ROWID ORDER BY 3 DESC LIMIT 10
-""")
-d['group_leaderboard'] = []
-for row in r:
-chat_id, display_name, msg_count, participant_count = row
-name = display_name if display_name else f"Group ({participant_count} people)"
-d['group_leaderboard'].append({'chat_id': chat_id, 'name': name, 'msg_count': msg_count, 'participant_count': participant_count, 'source': 'imessage'})
-
-
-# ==========================================================
-# --- MODIFIED: MVP SENDER IN TOP GROUP ---
-# ==========================================================
-d['top_group_senders'] = []
-if d['group_leaderboard']:
-    top_group_id = d['group_leaderboard'][0]['chat_id']
-    
-    # Query: Get message count per sender (handle_id) in the top group
-    # Use CASE to map m.is_from_me = 1 directly to 'You' for simple name resolution later
-    r_senders = q_imessage(f"""
-        SELECT 
-            CASE WHEN m.is_from_me = 1 THEN 'You' ELSE h.id END AS sender_id, 
-            COUNT(*) AS msg_count
-        FROM message m 
-        JOIN handle h ON m.handle_id = h.ROWID
-        JOIN chat_message_join cmj ON m.ROWID = cmj.message_id
-        WHERE cmj.chat_id = {top_group_id}
-        AND (m.date/1000000000+978307200) > {ts_start}
-        GROUP BY sender_id
-        ORDER BY msg_count DESC 
-        LIMIT 5
-    """)
-    
-    # Format the results
-    for sender_id, msg_count in r_senders:
-        d['top_group_senders'].append({'id': sender_id, 'msg_count': msg_count, 'source': 'imessage'})
-
-# Placeholder for other stats (needed for merge to work)
-d['late'] = []
-d['hour'] = 12
-d['day'] = '???'
-d['ghosted'] = []
-d['heating'] = []
-d['fan'] = []
-d['simp'] = []
-d['resp'] = 30
-d['emoji'] = {}
-d['words'] = 0
-d['busiest_day'] = None
-d['starter_pct'] = 50
-d['daily_counts'] = {}
-
-
-return d
-
-def analyze_whatsapp(ts_start, ts_jun):
-"""Analyze WhatsApp data and return stats dict."""
-d = {}
-one_on_one_cte = """
-WITH dm_sessions AS (
-SELECT Z_PK, ZCONTACTJID FROM ZWACHATSESSION WHERE ZSESSIONTYPE = 0
-),
-dm_messages AS (
-SELECT m.Z_PK as msg_id, m.ZCHATSESSION, s.ZCONTACTJID
-FROM ZWAMESSAGE m JOIN dm_sessions s ON m.ZCHATSESSION = s.Z_PK
-)
-"""
-# --- 1:1 STATS (Omitting for brevity, assume original logic here) ---
-# Stats
-raw_stats = q_whatsapp(f"""{one_on_one_cte}
-SELECT COUNT(*), SUM(CASE WHEN m.ZISFROMME=1 THEN 1 ELSE 0 END), SUM(CASE WHEN m.ZISFROMME=0 THEN 1 ELSE 0 END), COUNT(DISTINCT dm.ZCONTACTJID)
-FROM ZWAMESSAGE m JOIN dm_messages dm ON m.Z_PK = dm.msg_id
-WHERE m.ZMESSAGEDATE>{ts_start}
-""")[0]
-d['stats'] = (raw_stats[0] or 0, raw_stats[1] or 0, raw_stats[2] or 0, raw_stats[3] or 0)
-# Top contacts
-d['top'] = q_whatsapp(f"""{one_on_one_cte}
-SELECT dm.ZCONTACTJID, COUNT(*) t, SUM(CASE WHEN m.ZISFROMME=1 THEN 1 ELSE 0 END), SUM(CASE WHEN m.ZISFROMME=0 THEN 1 ELSE 0 END)
-FROM ZWAMESSAGE m JOIN dm_messages dm ON m.Z_PK = dm.msg_id
-WHERE m.ZMESSAGEDATE>{ts_start} GROUP BY dm.ZCONTACTJID ORDER BY t DESC LIMIT 20
-""")
-
-# --- GROUP CHAT STATS ---
-group_chat_cte = """
-WITH group_sessions AS (
-SELECT Z_PK FROM ZWACHATSESSION WHERE ZSESSIONTYPE = 1
-),
-group_messages AS (
-SELECT m.Z_PK as msg_id, m.ZCHATSESSION FROM ZWAMESSAGE m
-JOIN group_sessions s ON m.ZCHATSESSION = s.Z_PK
-)
-"""
-r = q_whatsapp(f"""{group_chat_cte}
-SELECT
-(SELECT COUNT(DISTINCT gm.ZCHATSESSION) FROM group_messages gm
-JOIN ZWAMESSAGE m ON m.Z_PK = gm.msg_id WHERE m.ZMESSAGEDATE>{ts_start}),
-COUNT(*), SUM(CASE WHEN m.ZISFROMME=1 THEN 1 ELSE 0 END)
-FROM ZWAMESSAGE m WHERE m.ZMESSAGEDATE>{ts_start}
-AND m.Z_PK IN (SELECT msg_id FROM group_messages)
-""")
-d['group_stats'] = {'count': r[0][0] or 0, 'total': r[0][1] or 0, 'sent': r[0][2] or 0} if r else {'count': 0, 'total': 0, 'sent': 0}
-# Group leaderboard
-r = q_whatsapp(f"""
-WITH group_sessions AS (
-SELECT Z_PK, ZPARTNERNAME FROM ZWACHATSESSION WHERE ZSESSIONTYPE = 1
-)
-SELECT s.Z_PK, s.ZPARTNERNAME, COUNT(*)
-FROM ZWAMESSAGE m JOIN group_sessions s ON m.ZCHATSESSION = s.Z_PK
-WHERE m.ZMESSAGEDATE>{ts_start} GROUP BY s.Z_PK ORDER BY 3 DESC LIMIT 10
-""")
-d['group_leaderboard'] = []
-for row in r:
-chat_id, name, msg_count = row
-d['group_leaderboard'].append({'chat_id': chat_id, 'name': name or "Unnamed Group", 'msg_count': msg_count, 'participant_count': 0, 'source': 'whatsapp'}) # No easy participant count
-
-# ==========================================================
-# --- MODIFIED: MVP SENDER IN TOP GROUP ---
-# ==========================================================
-d['top_group_senders'] = []
-if d['group_leaderboard']:
-    top_group_id = d['group_leaderboard'][0]['chat_id']
-    
-    # Query: Get message count per sender (ZFROMJID) in the top group
-    # Use CASE to map ZISFROMME = 1 directly to 'You'
-    r_senders = q_whatsapp(f"""
-        SELECT 
-            CASE WHEN m.ZISFROMME = 1 THEN 'You' ELSE m.ZFROMJID END AS sender_id, 
-            COUNT(*) AS msg_count
-        FROM ZWAMESSAGE m
-        WHERE m.ZCHATSESSION = {top_group_id}
-        AND m.ZMESSAGEDATE > {ts_start}
-        AND sender_id IS NOT NULL
-        GROUP BY sender_id
-        ORDER BY msg_count DESC 
-        LIMIT 5
+    """Check access to both databases. Returns (has_imessage, has_whatsapp)."""
+    global WHATSAPP_DB
+    has_imessage = False
+    has_whatsapp = False
+    # Check iMessage
+    if os.path.exists(IMESSAGE_DB):
+        try:
+            conn = sqlite3.connect(IMESSAGE_DB)
+            conn.execute("SELECT 1 FROM message LIMIT 1")
+            conn.close()
+            has_imessage = True
+        except:
+            pass
+    # Check WhatsApp
+    WHATSAPP_DB = WHATSAPP_DB or find_whatsapp_database()
+    if WHATSAPP_DB:
+        try:
+            conn = sqlite3.connect(WHATSAPP_DB)
+            conn.execute("SELECT 1 FROM ZWAMESSAGE LIMIT 1")
+            conn.close()
+            has_whatsapp = True
+        except:
+            pass
+    if not has_imessage and not has_whatsapp:
+        print("\n[!] ACCESS DENIED - Neither iMessage nor WhatsApp accessible")
+        print("   System Settings -> Privacy & Security -> Full Disk Access -> Add Terminal")
+        open_in_macos('x-apple.systempreferences:com.apple.preference.security?Privacy_AllFiles')
+        sys.exit(1)
+    return has_imessage, has_whatsapp
+
+# Page cache / mmap budget for the read-only analysis connections
+CACHE_SIZE_KB = 262144  # 256 MB
+MMAP_SIZE = 2147418112  # SQLite's default compile-time ceiling (~2 GB)
+
+class ReadOnlyDB:
+    """Opens a database once per thread in read-only URI mode and reuses it for every query."""
+    PRAGMAS = (
+        "PRAGMA query_only = ON",
+        f"PRAGMA cache_size = -{CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size = {MMAP_SIZE}",
+        "PRAGMA temp_store = MEMORY",
+    )
+
+    def __init__(self, path, snapshot=None):
+        self.source = path
+        self.path = path
+        self.uri = f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro"
+        self.keeper = None
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.conns = []
+        self.stats = []
+        self.scratch = None  # side database holding prepare()'s tables, attached to every connection as `scratch`
+        if snapshot:
+            self.take_snapshot(snapshot)
+
+    def take_snapshot(self, mode):
+        """Copy the live database, WAL included, with the backup API so every query sees one point in time."""
+        src = sqlite3.connect(self.uri, uri=True)
+        if mode == 'memory':
+            # Named shared-cache memory DB: worker connections see it for as long as the keeper stays open
+            self.path = ':memory:'
+            self.uri = f"file:wrapped-snapshot-{id(self)}?mode=memory&cache=shared"
+            self.keeper = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+            dst = self.keeper
+        else:
+            fd, self.path = tempfile.mkstemp(prefix='wrapped-snapshot-', suffix='.sqlite')
+            os.close(fd)
+            self.uri = f"file:{urllib.parse.quote(self.path)}?mode=ro"
+            dst = sqlite3.connect(self.path)
+        try:
+            src.backup(dst)
+            if dst is not self.keeper:
+                # The copy inherits a WAL source's journal mode, and read-only connections would then leave -wal/-shm files behind
+                dst.execute("PRAGMA journal_mode = DELETE")
+        except BaseException:
+            # A half-written copy of the chat database must not outlive a failed backup
+            dst.close()
+            self.close()
+            raise
+        finally:
+            src.close()
+            if dst is not self.keeper:
+                dst.close()
+
+    def connect(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+            for pragma in self.PRAGMAS:
+                conn.execute(pragma)
+            stats = {'thread': threading.current_thread().name, 'queries': 0, 'rows': 0, 'seconds': 0.0}
+            with self.lock:
+                self.conns.append(conn)
+                self.stats.append(stats)
+            self.local.conn, self.local.stats, self.local.attached = conn, stats, False
+        if self.scratch and not self.local.attached:
+            conn.execute("ATTACH DATABASE ? AS scratch", (self.scratch,))
+            self.local.attached = True
+        return conn
+
+    def prepare(self, name, script):
+        """Run setup SQL once, on the calling thread, building its tables in the `scratch` schema.
+
+        scratch is a temp database file every connection attaches, so --jobs workers read one shared copy
+        instead of each rebuilding it. Call it before the queries that read the tables, not while they run.
+        """
+        with self.lock:
+            if self.scratch is None:
+                fd, self.scratch = tempfile.mkstemp(prefix='wrapped-scratch-', suffix='.sqlite')
+                os.close(fd)
+        conn = self.connect()
+        stats = self.local.stats
+        t0 = time.perf_counter()
+        # query_only refuses writes to attached databases too, so lift it just for the setup script
+        conn.execute("PRAGMA query_only = OFF")
+        try:
+            with stage(f'setup {name}'):
+                # Throwaway tables: no rollback journal or fsyncs
+                conn.execute("PRAGMA scratch.journal_mode = OFF")
+                conn.execute("PRAGMA scratch.synchronous = OFF")
+                conn.executescript(script)
+        finally:
+            conn.execute("PRAGMA query_only = ON")
+        stats['queries'] += 1
+        stats['seconds'] += time.perf_counter() - t0
+
+    def q(self, sql, params=()):
+        conn = self.connect()
+        t0 = time.perf_counter()
+        r = conn.execute(sql, params).fetchall()
+        stats = self.local.stats
+        stats['queries'] += 1
+        stats['rows'] += len(r)
+        stats['seconds'] += time.perf_counter() - t0
+        return r
+
+    def stream(self, sql, batch_size, params=()):
+        """Yield result rows in fetchmany() batches instead of materializing them all."""
+        cur = self.connect().cursor()
+        stats = self.local.stats
+        t0 = time.perf_counter()
+        cur.execute(sql, params)
+        stats['queries'] += 1
+        try:
+            while True:
+                rows = cur.fetchmany(batch_size)
+                stats['seconds'] += time.perf_counter() - t0
+                if not rows:
+                    break
+                stats['rows'] += len(rows)
+                yield rows
+                t0 = time.perf_counter()
+        finally:
+            cur.close()
+
+    def close(self):
+        with self.lock:
+            for conn in self.conns:
+                conn.close()
+            self.conns = []
+        self.local = threading.local()
+        if self.keeper:
+            self.keeper.close()
+            self.keeper = None
+        elif self.path != self.source and os.path.exists(self.path):
+            os.remove(self.path)
+        if self.scratch and os.path.exists(self.scratch):
+            os.remove(self.scratch)
+        self.scratch = None
+
+DBS = {}
+DBS_LOCK = threading.Lock()
+SNAPSHOT = None  # None, 'file' or 'memory' (--snapshot)
+
+def get_db(path):
+    """Shared read-only connection manager for a database path."""
+    with DBS_LOCK:
+        if path not in DBS:
+            DBS[path] = ReadOnlyDB(path, snapshot=SNAPSHOT)
+        return DBS[path]
+
+def close_dbs():
+    with DBS_LOCK:
+        for db in DBS.values():
+            db.close()
+        DBS.clear()
+
+# Snapshot and scratch files are temp files: remove them even when the scripts are imported and close_dbs() is never called
+atexit.register(close_dbs)
+
+PROFILE = None  # {'queries': {...}, 'stages': {...}} while --profile is collecting, else None
+PROFILE_STEP = 1000  # SQLite VM instructions between progress-handler ticks
+PROFILE_LOCK = threading.Lock()
+
+@contextlib.contextmanager
+def stage(name):
+    """Add the wall time of the with-block to PROFILE['stages'][name] (a no-op without --profile)."""
+    if PROFILE is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        secs = time.perf_counter() - t0
+        with PROFILE_LOCK:
+            PROFILE['stages'][name] = PROFILE['stages'].get(name, 0.0) + secs
+
+def query_plan(conn, sql):
+    """EXPLAIN QUERY PLAN of sql as detail lines indented by their depth in the plan tree."""
+    depth, lines = {0: -1}, []
+    for node, parent, _, detail in conn.execute(f"EXPLAIN QUERY PLAN {sql}"):
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node] + detail)
+    return lines
+
+def profile_query(db, name, job):
+    """Run one named query (SQL or callable(db)), recording wall time, rows, VM steps and the plan of every statement it ran."""
+    conn = db.connect()
+    stats = db.local.stats
+    steps, statements = [0], []
+    def tick():
+        steps[0] += PROFILE_STEP
+        return 0
+    conn.set_progress_handler(tick, PROFILE_STEP)
+    conn.set_trace_callback(statements.append)
+    rows, t0 = stats['rows'], time.perf_counter()
+    try:
+        result = job(db) if callable(job) else db.q(job)
+    finally:
+        secs = time.perf_counter() - t0
+        conn.set_progress_handler(None, PROFILE_STEP)
+        conn.set_trace_callback(None)
+    plan = [line for sql in statements if re.match(r'\s*(SELECT|WITH)\b', sql, re.I) for line in query_plan(conn, sql)]
+    with PROFILE_LOCK:
+        PROFILE['queries'][name] = {'seconds': secs, 'rows': stats['rows'] - rows, 'vm_steps': steps[0], 'plan': plan}
+    return result
+
+def write_profile(path):
+    """Save PROFILE (slowest first) plus per-connection totals as JSON, and print it as two tables."""
+    stages = dict(sorted(PROFILE['stages'].items(), key=lambda x: -x[1]))
+    queries = dict(sorted(PROFILE['queries'].items(), key=lambda x: -x[1]['seconds']))
+    connections = [dict(stats, db=db.source) for db in DBS.values() for stats in db.stats]
+    with open(path, 'w') as f:
+        json.dump({'stages': stages, 'queries': queries, 'connections': connections}, f, indent=2)
+    print(f"      {'stage':<28} {'ms':>9}")
+    for name, secs in stages.items():
+        print(f"      {name:<28} {secs * 1000:9.1f}")
+    print(f"      {'query':<28} {'ms':>9} {'rows':>9} {'vm steps':>12}  plan")
+    for name, p in queries.items():
+        print(f"      {name:<28} {p['seconds'] * 1000:9.1f} {p['rows']:9,} {p['vm_steps']:12,}  {p['plan'][0].strip() if p['plan'] else '-'}")
+
+def profiled(db, name, job):
+    """Run a named query (SQL or a callable that streams its own rows from db), through profile_query() under --profile."""
+    if PROFILE is not None:
+        return profile_query(db, name, job)
+    return job(db) if callable(job) else db.q(job)
+
+def staged(name, fn, *args):
+    """fn(*args) inside stage(name), for work handed to the pipeline pool."""
+    with stage(name):
+        return fn(*args)
+
+def q_imessage(sql, name):
+    return profiled(get_db(IMESSAGE_DB), f'imessage {name}', sql)
+
+def q_whatsapp(sql, name):
+    return profiled(get_db(WHATSAPP_DB), f'whatsapp {name}', sql)
+
+def emoji_histogram(db, sql, batch_size=SCAN_BATCH_SIZE, decode=None):
+    """Stream the (text,) rows of sql once and count their emoji; decode turns each value into text first."""
+    counts = Counter()
+    for rows in db.stream(sql, batch_size):
+        texts = [text for text, in rows] if decode is None else [text for text in (decode(v) for v, in rows) if text]
+        count_emoji(texts, counts)
+    return counts
+
+def prepare_imessage_window(ts_start, ts_end=None):
+    """Classify chats, handles and the window's messages once, as indexed scratch tables every analysis connection joins."""
+    get_db(IMESSAGE_DB).prepare('window', f"""
+        DROP TABLE IF EXISTS scratch.chat_kind;
+        CREATE TABLE scratch.chat_kind (chat_id INTEGER PRIMARY KEY, participant_count INTEGER);
+        INSERT INTO chat_kind SELECT chat_id, COUNT(*) FROM chat_handle_join GROUP BY chat_id;
+
+        -- kind 1: one-on-one chat, kind 2: group chat (a message joined to several chats gets a row per chat)
+        DROP TABLE IF EXISTS scratch.message_kind;
+        CREATE TABLE scratch.message_kind (msg_id INTEGER, chat_id INTEGER, kind INTEGER);
+        INSERT INTO message_kind
+            SELECT m.ROWID, cmj.chat_id, CASE WHEN ck.participant_count=1 THEN 1 ELSE 2 END
+            FROM message m
+            JOIN chat_message_join cmj ON m.ROWID = cmj.message_id
+            JOIN chat_kind ck ON cmj.chat_id = ck.chat_id
+            WHERE {date_window(ts_start, ts_end, 'm.date')};
+        CREATE INDEX scratch.message_kind_kind ON message_kind(kind, msg_id);
+        CREATE INDEX scratch.message_kind_chat ON message_kind(chat_id);
+
+        DROP TABLE IF EXISTS scratch.handle_kind;
+        CREATE TABLE scratch.handle_kind (handle_id INTEGER PRIMARY KEY, id TEXT, is_shortcode INTEGER);
+        INSERT INTO handle_kind
+            SELECT ROWID, id, LENGTH(REPLACE(REPLACE(id, '+', ''), '-', '')) BETWEEN 5 AND 6 AND REPLACE(REPLACE(id, '+', ''), '-', '') GLOB '[0-9]*'
+            FROM handle;
     """)
-    
-    # Format the results
-    for sender_id, msg_count in r_senders:
-        d['top_group_senders'].append({'id': sender_id, 'msg_count': msg_count, 'source': 'whatsapp'})
-
-# Placeholder for other stats (needed for merge to work)
-d['late'] = []
-d['hour'] = 12
-d['day'] = '???'
-d['ghosted'] = []
-d['heating'] = []
-d['fan'] = []
-d['simp'] = []
-d['resp'] = 30
-d['emoji'] = {}
-d['words'] = 0
-d['busiest_day'] = None
-d['starter_pct'] = 50
-d['daily_counts'] = {}
-
-# Re-run missing basic queries for completeness
-# (These should be restored from the original file if possible, placeholders here)
-r = q_whatsapp(f"SELECT CAST(strftime('%H',datetime(ZMESSAGEDATE+{COCOA_OFFSET},'unixepoch','localtime')) AS INT) h, COUNT(*) c FROM ZWAMESSAGE WHERE ZMESSAGEDATE>{ts_start} GROUP BY h ORDER BY c DESC LIMIT 1")
-d['hour'] = r[0][0] if r else 12
-days = ['Sunday','Monday','Tuesday','Wednesday','Thursday','Friday','Saturday']
-r = q_whatsapp(f"SELECT CAST(strftime('%w',datetime(ZMESSAGEDATE+{COCOA_OFFSET},'unixepoch','localtime')) AS INT) d, COUNT(*) FROM ZWAMESSAGE WHERE ZMESSAGEDATE>{ts_start} GROUP BY d ORDER BY 2 DESC LIMIT 1")
-d['day'] = days[r[0][0]] if r else '???'
-
-return d
-
-def merge_data(imessage_data, whatsapp_data, imessage_contacts, whatsapp_contacts, has_imessage, has_whatsapp):
-"""Merge iMessage and WhatsApp data into combined stats."""
-d = {}
-# Helper to create unified contact lookup
-def get_name(handle, source='imessage'):
-    if source == 'imessage':
-        return get_name_imessage(handle, imessage_contacts)
-    else:
-        return get_name_whatsapp(handle, whatsapp_contacts)
-
-# --- STATS MERGE --- (Assume this is correct)
-im_stats = imessage_data.get('stats', (0, 0, 0, 0)) if has_imessage else (0, 0, 0, 0)
-wa_stats = whatsapp_data.get('stats', (0, 0, 0, 0)) if has_whatsapp else (0, 0, 0, 0)
-d['stats'] = (
-    im_stats[0] + wa_stats[0], # total
-    im_stats[1] + wa_stats[1], # sent
-    im_stats[2] + wa_stats[2], # received
-    im_stats[3] + wa_stats[3], # unique contacts
-)
-d['imessage_stats'] = im_stats
-d['whatsapp_stats'] = wa_stats
-
-# --- TOP CONTACTS MERGE --- (Assume this is correct)
-top_combined = []
-if has_imessage:
-    for h, t, s, r in imessage_data.get('top', []):
-        name = get_name(h, 'imessage')
-        top_combined.append({'name': name, 'total': t, 'sent': s, 'received': r, 'source': 'imessage', 'handle': h})
-if has_whatsapp:
-    for h, t, s, r in whatsapp_data.get('top', []):
-        name = get_name(h, 'whatsapp')
-        top_combined.append({'name': name, 'total': t, 'sent': s, 'received': r, 'source': 'whatsapp', 'handle': h})
-name_counts = {}
-for entry in top_combined:
-    name = entry['name']
-    if name not in name_counts or entry['total'] > name_counts[name]['total']:
-        name_counts[name] = entry
-d['top'] = sorted(name_counts.values(), key=lambda x: -x['total'])[:10]
-
-# --- GROUP STATS MERGE --- (Assume this is correct)
-im_groups = imessage_data.get('group_stats', {'count': 0, 'total': 0, 'sent': 0}) if has_imessage else {'count': 0, 'total': 0, 'sent': 0}
-wa_groups = whatsapp_data.get('group_stats', {'count': 0, 'total': 0, 'sent': 0}) if has_whatsapp else {'count': 0, 'total': 0, 'sent': 0}
-d['group_stats'] = {
-    'count': im_groups['count'] + wa_groups['count'],
-    'total': im_groups['total'] + wa_groups['total'],
-    'sent': im_groups['sent'] + wa_groups['sent']
-}
 
-# --- GROUP LEADERBOARD MERGE (Keep top 5 overall) --- (Assume this is correct)
-group_lb = []
-if has_imessage:
-    for g in imessage_data.get('group_leaderboard', []):
-        # We need to preserve the group name logic from analyze_imessage here, 
-        # or simplify it for the combined report. Let's simplify and use the stored name.
-        name = g['name'] # This name could be "Group (X people)" or the display_name
-        group_lb.append({'name': name, 'msg_count': g['msg_count'], 'source': 'imessage', 'chat_id': g['chat_id']})
-if has_whatsapp:
-    for g in whatsapp_data.get('group_leaderboard', []):
-        group_lb.append({'name': g['name'], 'msg_count': g['msg_count'], 'source': 'whatsapp', 'chat_id': g['chat_id']})
-d['group_leaderboard'] = sorted(group_lb, key=lambda x: -x['msg_count'])[:5]
-
-
-# ==========================================================
-# --- MODIFIED: MVP SENDER MERGE ---
-# ==========================================================
-d['top_group_senders'] = []
-if d['group_leaderboard']:
-    top_group = d['group_leaderboard'][0]
-    source = top_group['source']
-    chat_id = top_group['chat_id']
-    
-    # Select the correct data based on the source of the OVERALL busiest group
-    if source == 'imessage' and has_imessage:
-        d['top_group_senders'] = imessage_data.get('top_group_senders', [])
-        d['mvp_group_name'] = top_group['name']
-        d['mvp_source'] = 'imessage'
-    elif source == 'whatsapp' and has_whatsapp:
-        d['top_group_senders'] = whatsapp_data.get('top_group_senders', [])
-        d['mvp_group_name'] = top_group['name']
-        d['mvp_source'] = 'whatsapp'
-
-    # Resolve IDs in the merged list to display names using the correct contact list
-    if d['top_group_senders']:
-        resolved_senders = []
-        contacts_to_use = imessage_contacts if d['mvp_source'] == 'imessage' else whatsapp_contacts
-        name_resolver = get_name_imessage if d['mvp_source'] == 'imessage' else get_name_whatsapp
-        
-        for sender in d['top_group_senders']:
-            resolved_senders.append({
-                'name': name_resolver(sender['id'], contacts_to_use),
-                'msg_count': sender['msg_count']
-            })
-        d['top_group_senders'] = resolved_senders
-    else:
-        d['mvp_group_name'] = 'N/A' # Reset if there were no messages for some reason
-
-# --- OTHER STATS MERGE --- (Keep original logic)
-# Use dominant platform for hour/day (whichever has more messages)
-# (Original logic for hours, days, response time, etc. assumed here)
-if im_stats[0] >= wa_stats[0] and has_imessage:
-    d['hour'] = imessage_data.get('hour', 12)
-    d['day'] = imessage_data.get('day', '???')
-elif has_whatsapp:
-    d['hour'] = whatsapp_data.get('hour', 12)
-    d['day'] = whatsapp_data.get('day', '???')
-else:
+def analyze_imessage(ts_start, ts_jun, ts_end=None):
+    """Analyze iMessage data and return stats dict."""
+    d = {}
+    prepare_imessage_window(ts_start, ts_end)
+    # --- 1:1 STATS (Omitting for brevity, assume original logic here) ---
+    # Stats
+    raw_stats = q_imessage(f"""
+        SELECT COUNT(*), SUM(CASE WHEN is_from_me=1 THEN 1 ELSE 0 END), SUM(CASE WHEN is_from_me=0 THEN 1 ELSE 0 END), COUNT(DISTINCT handle_id)
+        FROM message m
+        WHERE {date_window(ts_start, ts_end)}
+        AND m.ROWID IN (SELECT msg_id FROM message_kind WHERE kind=1)
+    """, 'stats')[0]
+    d['stats'] = (raw_stats[0] or 0, raw_stats[1] or 0, raw_stats[2] or 0, raw_stats[3] or 0)
+    # Per-contact (sent, received) before ts_jun + from ts_jun: top contacts here, and merge_data() sums them per person across platforms
+    d['contacts'] = {h: tuple(v) for h, *v in q_imessage(f"""
+        SELECT h.id,
+            SUM(CASE WHEN m.is_from_me=1 AND {date_before(ts_jun, 'm.date')} THEN 1 ELSE 0 END),
+            SUM(CASE WHEN m.is_from_me=0 AND {date_before(ts_jun, 'm.date')} THEN 1 ELSE 0 END),
+            SUM(CASE WHEN m.is_from_me=1 AND {date_from(ts_jun, 'm.date')} THEN 1 ELSE 0 END),
+            SUM(CASE WHEN m.is_from_me=0 AND {date_from(ts_jun, 'm.date')} THEN 1 ELSE 0 END)
+        FROM message m JOIN handle_kind h ON m.handle_id=h.handle_id
+        WHERE {date_window(ts_start, ts_end, 'm.date')}
+        AND m.ROWID IN (SELECT msg_id FROM message_kind WHERE kind=1)
+        AND NOT h.is_shortcode
+        GROUP BY h.id
+    """, 'contacts')}
+    d['top'] = top_contacts(d['contacts'])
+    # Late night, Peak hour/day, Ghosted, Heating up, Fan, Simp, Response time, Emojis, Words, Busiest day, Starter %... (Assume these queries are present as per the original structure)
+    # For brevity, let's just ensure the Group Stats and Leaderboard are here, as they are needed for the MVP feature below.
+
+    # --- GROUP CHAT STATS ---
+    r = q_imessage(f"""
+        SELECT
+            (SELECT COUNT(DISTINCT chat_id) FROM message_kind WHERE kind=2),
+            COUNT(*), SUM(CASE WHEN m.is_from_me=1 THEN 1 ELSE 0 END)
+        FROM message m WHERE {date_window(ts_start, ts_end, 'm.date')}
+        AND m.ROWID IN (SELECT msg_id FROM message_kind WHERE kind=2)
+    """, 'group_stats')
+    d['group_stats'] = {'count': r[0][0] or 0, 'total': r[0][1] or 0, 'sent': r[0][2] or 0} if r else {'count': 0, 'total': 0, 'sent': 0}
+    # Group leaderboard
+    r = q_imessage("""
+        SELECT c.ROWID, c.display_name, COUNT(*), ck.participant_count
+        FROM chat c
+        JOIN message_kind mk ON c.ROWID = mk.chat_id
+        JOIN chat_kind ck ON c.ROWID = ck.chat_id
+        WHERE mk.kind=2
+        GROUP BY c.ROWID ORDER BY 3 DESC, c.ROWID LIMIT 10
+    """, 'group_leaderboard')
+    d['group_leaderboard'] = []
+    for row in r:
+        chat_id, display_name, msg_count, participant_count = row
+        name = display_name if display_name else f"Group ({participant_count} people)"
+        d['group_leaderboard'].append({'chat_id': chat_id, 'name': name, 'msg_count': msg_count, 'participant_count': participant_count, 'source': 'imessage'})
+
+
+    # ==========================================================
+    # --- MODIFIED: MVP SENDER IN TOP GROUP ---
+    # ==========================================================
+    d['top_group_senders'] = []
+    if d['group_leaderboard']:
+        top_group_id = d['group_leaderboard'][0]['chat_id']
+
+        # Query: Get message count per sender (handle_id) in the top group
+        # Use CASE to map m.is_from_me = 1 directly to 'You' for simple name resolution later
+        r_senders = q_imessage(f"""
+            SELECT
+                CASE WHEN m.is_from_me = 1 THEN 'You' ELSE h.id END AS sender_id,
+                COUNT(*) AS msg_count
+            FROM message_kind mk
+            JOIN message m ON m.ROWID = mk.msg_id
+            JOIN handle h ON m.handle_id = h.ROWID
+            WHERE mk.chat_id = {top_group_id}
+            GROUP BY sender_id
+            ORDER BY msg_count DESC
+            LIMIT 5
+        """, 'group_senders')
+
+        # Format the results
+        for sender_id, msg_count in r_senders:
+            d['top_group_senders'].append({'id': sender_id, 'msg_count': msg_count, 'source': 'imessage'})
+
+    # Emoji histogram over sent texts (only non-ASCII texts can hold an emoji)
+    d['emoji'] = profiled(get_db(IMESSAGE_DB), 'imessage emoji', lambda db: emoji_histogram(db, f"SELECT text FROM message WHERE {date_window(ts_start, ts_end)} AND is_from_me=1 AND text GLOB '*[^ -~]*'"))
+    # plus sent messages whose text only survives in attributedBody
+    d['emoji'] += profiled(get_db(IMESSAGE_DB), 'imessage emoji bodies', lambda db: emoji_histogram(db, f"SELECT attributedBody FROM message WHERE {date_window(ts_start, ts_end)} AND is_from_me=1 AND text IS NULL AND attributedBody IS NOT NULL", decode=attributed_text))
+
+    # Placeholder for other stats (needed for merge to work)
+    d['late'] = []
     d['hour'] = 12
     d['day'] = '???'
-
-# Weighted average response time
-im_resp = imessage_data.get('resp', 30) if has_imessage else 30
-wa_resp = whatsapp_data.get('resp', 30) if has_whatsapp else 30
-im_weight = im_stats[0]
-wa_weight = wa_stats[0]
-total_weight = im_weight + wa_weight
-if total_weight > 0:
-    d['resp'] = int((im_resp * im_weight + wa_resp * wa_weight) / total_weight)
-else:
     d['resp'] = 30
+    d['words'] = 0
+    d['busiest_day'] = None
+    d['starter_pct'] = 50
+    d['daily_counts'] = {}
+
+
+    return d
+
+def analyze_whatsapp(ts_start, ts_jun, ts_end=None):
+    """Analyze WhatsApp data and return stats dict."""
+    d = {}
+    one_on_one_cte = """
+        WITH dm_sessions AS (
+            SELECT Z_PK, ZCONTACTJID FROM ZWACHATSESSION WHERE ZSESSIONTYPE = 0
+        ),
+        dm_messages AS (
+            SELECT m.Z_PK as msg_id, m.ZCHATSESSION, s.ZCONTACTJID
+            FROM ZWAMESSAGE m JOIN dm_sessions s ON m.ZCHATSESSION = s.Z_PK
+        )
+    """
+    # --- 1:1 STATS (Omitting for brevity, assume original logic here) ---
+    # Stats
+    raw_stats = q_whatsapp(f"""{one_on_one_cte}
+        SELECT COUNT(*), SUM(CASE WHEN m.ZISFROMME=1 THEN 1 ELSE 0 END), SUM(CASE WHEN m.ZISFROMME=0 THEN 1 ELSE 0 END), COUNT(DISTINCT dm.ZCONTACTJID)
+        FROM ZWAMESSAGE m JOIN dm_messages dm ON m.Z_PK = dm.msg_id
+        WHERE {cocoa_window(ts_start, ts_end, 'm.ZMESSAGEDATE')}
+    """, 'stats')[0]
+    d['stats'] = (raw_stats[0] or 0, raw_stats[1] or 0, raw_stats[2] or 0, raw_stats[3] or 0)
+    # Per-contact (sent, received) before ts_jun + from ts_jun: top contacts here, and merge_data() sums them per person across platforms
+    d['contacts'] = {jid: tuple(v) for jid, *v in q_whatsapp(f"""{one_on_one_cte}
+        SELECT dm.ZCONTACTJID,
+            SUM(CASE WHEN m.ZISFROMME=1 AND m.ZMESSAGEDATE<{ts_jun} THEN 1 ELSE 0 END),
+            SUM(CASE WHEN m.ZISFROMME=0 AND m.ZMESSAGEDATE<{ts_jun} THEN 1 ELSE 0 END),
+            SUM(CASE WHEN m.ZISFROMME=1 AND m.ZMESSAGEDATE>={ts_jun} THEN 1 ELSE 0 END),
+            SUM(CASE WHEN m.ZISFROMME=0 AND m.ZMESSAGEDATE>={ts_jun} THEN 1 ELSE 0 END)
+        FROM ZWAMESSAGE m JOIN dm_messages dm ON m.Z_PK = dm.msg_id
+        WHERE {cocoa_window(ts_start, ts_end, 'm.ZMESSAGEDATE')} AND dm.ZCONTACTJID IS NOT NULL GROUP BY dm.ZCONTACTJID
+    """, 'contacts')}
+    d['top'] = top_contacts(d['contacts'])
+
+    # --- GROUP CHAT STATS ---
+    group_chat_cte = """
+        WITH group_sessions AS (
+            SELECT Z_PK FROM ZWACHATSESSION WHERE ZSESSIONTYPE = 1
+        ),
+        group_messages AS (
+            SELECT m.Z_PK as msg_id, m.ZCHATSESSION FROM ZWAMESSAGE m
+            JOIN group_sessions s ON m.ZCHATSESSION = s.Z_PK
+        )
+    """
+    r = q_whatsapp(f"""{group_chat_cte}
+        SELECT
+            (SELECT COUNT(DISTINCT gm.ZCHATSESSION) FROM group_messages gm
+             JOIN ZWAMESSAGE m ON m.Z_PK = gm.msg_id WHERE {cocoa_window(ts_start, ts_end, 'm.ZMESSAGEDATE')}),
+            COUNT(*), SUM(CASE WHEN m.ZISFROMME=1 THEN 1 ELSE 0 END)
+        FROM ZWAMESSAGE m WHERE {cocoa_window(ts_start, ts_end, 'm.ZMESSAGEDATE')}
+        AND m.Z_PK IN (SELECT msg_id FROM group_messages)
+    """, 'group_stats')
+    d['group_stats'] = {'count': r[0][0] or 0, 'total': r[0][1] or 0, 'sent': r[0][2] or 0} if r else {'count': 0, 'total': 0, 'sent': 0}
+    # Group leaderboard
+    r = q_whatsapp(f"""
+        WITH group_sessions AS (
+            SELECT Z_PK, ZPARTNERNAME FROM ZWACHATSESSION WHERE ZSESSIONTYPE = 1
+        )
+        SELECT s.Z_PK, s.ZPARTNERNAME, COUNT(*)
+        FROM ZWAMESSAGE m JOIN group_sessions s ON m.ZCHATSESSION = s.Z_PK
+        WHERE {cocoa_window(ts_start, ts_end, 'm.ZMESSAGEDATE')} GROUP BY s.Z_PK ORDER BY 3 DESC LIMIT 10
+    """, 'group_leaderboard')
+    d['group_leaderboard'] = []
+    for row in r:
+        chat_id, name, msg_count = row
+        d['group_leaderboard'].append({'chat_id': chat_id, 'name': name or "Unnamed Group", 'msg_count': msg_count, 'participant_count': 0, 'source': 'whatsapp'}) # No easy participant count
+
+    # ==========================================================
+    # --- MODIFIED: MVP SENDER IN TOP GROUP ---
+    # ==========================================================
+    d['top_group_senders'] = []
+    if d['group_leaderboard']:
+        top_group_id = d['group_leaderboard'][0]['chat_id']
+
+        # Query: Get message count per sender (ZFROMJID) in the top group
+        # Use CASE to map ZISFROMME = 1 directly to 'You'
+        r_senders = q_whatsapp(f"""
+            SELECT
+                CASE WHEN m.ZISFROMME = 1 THEN 'You' ELSE m.ZFROMJID END AS sender_id,
+                COUNT(*) AS msg_count
+            FROM ZWAMESSAGE m
+            WHERE m.ZCHATSESSION = {top_group_id}
+            AND {cocoa_window(ts_start, ts_end, 'm.ZMESSAGEDATE')}
+            AND sender_id IS NOT NULL
+            GROUP BY sender_id
+            ORDER BY msg_count DESC
+            LIMIT 5
+        """, 'group_senders')
+
+        # Format the results
+        for sender_id, msg_count in r_senders:
+            d['top_group_senders'].append({'id': sender_id, 'msg_count': msg_count, 'source': 'whatsapp'})
 
-# Merge words
-im_words = imessage_data.get('words', 0) if has_imessage else 0
-wa_words = whatsapp_data.get('words', 0) if has_whatsapp else 0
-d['words'] = im_words + wa_words
-
-# Weighted starter %
-im_starter = imessage_data.get('starter_pct', 50) if has_imessage else 50
-wa_starter = whatsapp_data.get('starter_pct', 50) if has_whatsapp else 50
-if total_weight > 0:
-    d['starter_pct'] = int((im_starter * im_weight + wa_starter * wa_weight) / total_weight)
-else:
+    # Emoji histogram over sent texts (only non-ASCII texts can hold an emoji)
+    d['emoji'] = profiled(get_db(WHATSAPP_DB), 'whatsapp emoji', lambda db: emoji_histogram(db, f"SELECT ZTEXT FROM ZWAMESSAGE WHERE {cocoa_window(ts_start, ts_end)} AND ZISFROMME=1 AND ZTEXT GLOB '*[^ -~]*'"))
+
+    # Placeholder for other stats (needed for merge to work)
+    d['late'] = []
+    d['hour'] = 12
+    d['day'] = '???'
+    d['resp'] = 30
+    d['words'] = 0
+    d['busiest_day'] = None
     d['starter_pct'] = 50
+    d['daily_counts'] = {}
+
+    # Re-run missing basic queries for completeness
+    # (These should be restored from the original file if possible, placeholders here)
+    r = q_whatsapp(f"SELECT CAST(strftime('%H',datetime(ZMESSAGEDATE+{COCOA_OFFSET},'unixepoch','localtime')) AS INT) h, COUNT(*) c FROM ZWAMESSAGE WHERE {cocoa_window(ts_start, ts_end)} GROUP BY h ORDER BY c DESC LIMIT 1", 'hour')
+    d['hour'] = r[0][0] if r else 12
+    days = ['Sunday','Monday','Tuesday','Wednesday','Thursday','Friday','Saturday']
+    r = q_whatsapp(f"SELECT CAST(strftime('%w',datetime(ZMESSAGEDATE+{COCOA_OFFSET},'unixepoch','localtime')) AS INT) d, COUNT(*) FROM ZWAMESSAGE WHERE {cocoa_window(ts_start, ts_end)} GROUP BY d ORDER BY 2 DESC LIMIT 1", 'day')
+    d['day'] = days[r[0][0]] if r else '???'
+
+    return d
+
+def merge_data(imessage_data, whatsapp_data, imessage_contacts, whatsapp_contacts, has_imessage, has_whatsapp, identities=None):
+    """Merge iMessage and WhatsApp data into combined stats.
+
+    identities (build_identity_index()) decides which handles are one person; without it, handles
+    still link across platforms by phone number.
+    """
+    identities = identities or IdentityIndex()
+    if not isinstance(imessage_contacts, ContactIndex):
+        imessage_contacts = ContactIndex(imessage_contacts)
+    d = {}
+    # Helper to create unified contact lookup
+    def get_name(handle, source='imessage'):
+        if source == 'imessage':
+            return imessage_contacts.name(handle)
+        else:
+            return get_name_whatsapp(handle, whatsapp_contacts)
+
+    # --- STATS MERGE --- (Assume this is correct)
+    im_stats = imessage_data.get('stats', (0, 0, 0, 0)) if has_imessage else (0, 0, 0, 0)
+    wa_stats = whatsapp_data.get('stats', (0, 0, 0, 0)) if has_whatsapp else (0, 0, 0, 0)
+    d['imessage_stats'] = im_stats
+    d['whatsapp_stats'] = wa_stats
+
+    # --- PER-PERSON MERGE ---
+    # Each person's half-year vector is summed over every handle that resolves to their identity root
+    people, named = {}, set()
+    for source, data, has in (('imessage', imessage_data, has_imessage), ('whatsapp', whatsapp_data, has_whatsapp)):
+        for h, halves in (data.get('contacts', {}) if has else {}).items():
+            root = identities.resolve(h)
+            entry = people.get(root)
+            if entry is None:
+                entry = people[root] = {'name': None, 'handle': h, 'source': source, 'sources': {}, 'halves': [0, 0, 0, 0]}
+            entry['halves'] = [a + b for a, b in zip(entry['halves'], halves)]
+            entry['sources'][source] = entry['sources'].get(source, 0) + sum(halves)
+            # The platform (and handle) with the most messages represents the person
+            if entry['sources'][source] > entry['sources'].get(entry['source'], 0):
+                entry['source'], entry['handle'] = source, h
+            # An AddressBook name wins, then a platform's own contact name, then a formatted handle
+            if root in identities.names:
+                entry['name'] = identities.names[root]
+            elif root not in named:
+                name = get_name(h, source)
+                if h in whatsapp_contacts or name not in (h, h.split('@')[0]):
+                    named.add(root)
+                if entry['name'] is None or root in named or source == 'whatsapp':
+                    entry['name'] = name
+    people = list(people.values())
+    d['stats'] = (
+        im_stats[0] + wa_stats[0], # total
+        im_stats[1] + wa_stats[1], # sent
+        im_stats[2] + wa_stats[2], # received
+        len(people), # unique contacts: someone on both platforms is one person
+    )
+    for p in people:
+        s1, r1, s2, r2 = p['halves']
+        p['total'], p['sent'], p['received'], p['h1'], p['h2'] = s1 + r1 + s2 + r2, s1 + s2, r1 + r2, s1 + r1, s2 + r2
+    row = lambda p, **counts: {'name': p['name'], 'handle': p['handle'], 'source': p['source'], **counts}
+    d['top'] = [{k: p[k] for k in ('name', 'total', 'sent', 'received', 'source', 'handle', 'sources')}
+                for p in sorted(people, key=lambda x: (-x['total'], x['handle']))[:10]]
+    # The platform reports' HAVING thresholds and ORDER BY, applied to the summed vectors; ties go to the lower handle, as to the lower id there
+    d['ghosted'] = [row(p, before=p['halves'][1], after=p['halves'][3])
+                    for p in sorted(people, key=lambda x: (-x['halves'][1], x['handle'])) if p['halves'][1] > 10 and p['halves'][3] < 3][:5]
+    d['heating'] = [row(p, h1=p['h1'], h2=p['h2'])
+                    for p in sorted(people, key=lambda x: (x['h1'] - x['h2'], x['handle'])) if p['h1'] > 20 and p['h2'] > p['h1'] * 1.5][:5]
+    # Highest ratio first; a zero denominator (an infinite ratio) sorts last, like ORDER BY a NULL ratio DESC
+    by_ratio = lambda a, b, p: (b == 0, -a / b if b else 0, p['handle'])
+    d['fan'] = [row(p, them=p['received'], you=p['sent'])
+                for p in sorted(people, key=lambda x: by_ratio(x['received'], x['sent'], x)) if p['received'] > p['sent'] * 2 and p['total'] > 100][:5]
+    d['simp'] = [row(p, you=p['sent'], them=p['received'])
+                 for p in sorted(people, key=lambda x: by_ratio(x['sent'], x['received'], x)) if p['sent'] > p['received'] * 2 and p['total'] > 100][:5]
+
+    # --- GROUP STATS MERGE --- (Assume this is correct)
+    im_groups = imessage_data.get('group_stats', {'count': 0, 'total': 0, 'sent': 0}) if has_imessage else {'count': 0, 'total': 0, 'sent': 0}
+    wa_groups = whatsapp_data.get('group_stats', {'count': 0, 'total': 0, 'sent': 0}) if has_whatsapp else {'count': 0, 'total': 0, 'sent': 0}
+    d['group_stats'] = {
+        'count': im_groups['count'] + wa_groups['count'],
+        'total': im_groups['total'] + wa_groups['total'],
+        'sent': im_groups['sent'] + wa_groups['sent']
+    }
+
+    # --- GROUP LEADERBOARD MERGE (Keep top 5 overall) --- (Assume this is correct)
+    group_lb = []
+    if has_imessage:
+        for g in imessage_data.get('group_leaderboard', []):
+            # We need to preserve the group name logic from analyze_imessage here, 
+            # or simplify it for the combined report. Let's simplify and use the stored name.
+            name = g['name'] # This name could be "Group (X people)" or the display_name
+            group_lb.append({'name': name, 'msg_count': g['msg_count'], 'source': 'imessage', 'chat_id': g['chat_id']})
+    if has_whatsapp:
+        for g in whatsapp_data.get('group_leaderboard', []):
+            group_lb.append({'name': g['name'], 'msg_count': g['msg_count'], 'source': 'whatsapp', 'chat_id': g['chat_id']})
+    d['group_leaderboard'] = sorted(group_lb, key=lambda x: -x['msg_count'])[:5]
+
+
+    # ==========================================================
+    # --- MODIFIED: MVP SENDER MERGE ---
+    # ==========================================================
+    d['top_group_senders'] = []
+    if d['group_leaderboard']:
+        top_group = d['group_leaderboard'][0]
+        source = top_group['source']
+    
+        # Select the correct data based on the source of the OVERALL busiest group
+        if source == 'imessage' and has_imessage:
+            d['top_group_senders'] = imessage_data.get('top_group_senders', [])
+            d['mvp_group_name'] = top_group['name']
+            d['mvp_source'] = 'imessage'
+        elif source == 'whatsapp' and has_whatsapp:
+            d['top_group_senders'] = whatsapp_data.get('top_group_senders', [])
+            d['mvp_group_name'] = top_group['name']
+            d['mvp_source'] = 'whatsapp'
+
+        # Resolve IDs in the merged list to display names using the correct contact list
+        if d['top_group_senders']:
+            resolved_senders = []
+            for sender in d['top_group_senders']:
+                resolved_senders.append({
+                    'name': get_name(sender['id'], d['mvp_source']),
+                    'msg_count': sender['msg_count']
+                })
+            d['top_group_senders'] = resolved_senders
+        else:
+            d['mvp_group_name'] = 'N/A' # Reset if there were no messages for some reason
 
-# Merge emoji counts
-emoji_counts = {}
-if has_imessage:
-    for e, c in imessage_data.get('emoji', {}).items():
-        emoji_counts[e] = emoji_counts.get(e, 0) + c
-if has_whatsapp:
-    for e, c in whatsapp_data.get('emoji', {}).items():
-        emoji_counts[e] = emoji_counts.get(e, 0) + c
-d['emoji'] = sorted(emoji_counts.items(), key=lambda x: -x[1])[:5]
-
-# Merge daily counts and derive related stats (assumed original logic)
-daily_counts = {}
-if has_imessage:
-    for date, count in imessage_data.get('daily_counts', {}).items():
-        daily_counts[date] = daily_counts.get(date, 0) + count
-if has_whatsapp:
-    for date, count in whatsapp_data.get('daily_counts', {}).items():
-        daily_counts[date] = daily_counts.get(date, 0) + count
-d['daily_counts'] = daily_counts
-
-# Calculate merged daily stats
-if daily_counts:
-    all_counts = list(daily_counts.values())
-    d['max_daily'] = max(all_counts)
-    d['active_days'] = len([c for c in all_counts if c > 0])
-    d['avg_daily'] = round(sum(all_counts) / max(len(all_counts), 1))
-    monthly_counts = {}
-    for date_str, count in daily_counts.items():
-        month_key = date_str[:7]
-        monthly_counts[month_key] = monthly_counts.get(month_key, 0) + count
-    if monthly_counts:
-        busiest_month_key = max(monthly_counts, key=monthly_counts.get)
-        d['busiest_month'] = datetime.strptime(busiest_month_key, '%Y-%m').strftime('%b')
+    # --- OTHER STATS MERGE --- (Keep original logic)
+    # Use dominant platform for hour/day (whichever has more messages)
+    # (Original logic for hours, days, response time, etc. assumed here)
+    if im_stats[0] >= wa_stats[0] and has_imessage:
+        d['hour'] = imessage_data.get('hour', 12)
+        d['day'] = imessage_data.get('day', '???')
+    elif has_whatsapp:
+        d['hour'] = whatsapp_data.get('hour', 12)
+        d['day'] = whatsapp_data.get('day', '???')
     else:
+        d['hour'] = 12
+        d['day'] = '???'
+
+    # Weighted average response time
+    im_resp = imessage_data.get('resp', 30) if has_imessage else 30
+    wa_resp = whatsapp_data.get('resp', 30) if has_whatsapp else 30
+    im_weight = im_stats[0]
+    wa_weight = wa_stats[0]
+    total_weight = im_weight + wa_weight
+    if total_weight > 0:
+        d['resp'] = int((im_resp * im_weight + wa_resp * wa_weight) / total_weight)
+    else:
+        d['resp'] = 30
+
+    # Merge words
+    im_words = imessage_data.get('words', 0) if has_imessage else 0
+    wa_words = whatsapp_data.get('words', 0) if has_whatsapp else 0
+    d['words'] = im_words + wa_words
+
+    # Weighted starter %
+    im_starter = imessage_data.get('starter_pct', 50) if has_imessage else 50
+    wa_starter = whatsapp_data.get('starter_pct', 50) if has_whatsapp else 50
+    if total_weight > 0:
+        d['starter_pct'] = int((im_starter * im_weight + wa_starter * wa_weight) / total_weight)
+    else:
+        d['starter_pct'] = 50
+
+    # Merge emoji counts
+    emoji_counts = {}
+    if has_imessage:
+        for e, c in imessage_data.get('emoji', {}).items():
+            emoji_counts[e] = emoji_counts.get(e, 0) + c
+    if has_whatsapp:
+        for e, c in whatsapp_data.get('emoji', {}).items():
+            emoji_counts[e] = emoji_counts.get(e, 0) + c
+    d['emoji'] = top_emoji(emoji_counts)
+
+    # Merge daily counts and derive related stats (assumed original logic)
+    daily_counts = {}
+    if has_imessage:
+        for day, count in imessage_data.get('daily_counts', {}).items():
+            daily_counts[day] = daily_counts.get(day, 0) + count
+    if has_whatsapp:
+        for day, count in whatsapp_data.get('daily_counts', {}).items():
+            daily_counts[day] = daily_counts.get(day, 0) + count
+    d['daily_counts'] = daily_counts
+    d['busiest_day'] = max(daily_counts.items(), key=lambda x: x[1]) if daily_counts else None
+
+    # Calculate merged daily stats
+    if daily_counts:
+        all_counts = list(daily_counts.values())
+        d['max_daily'] = max(all_counts)
+        d['active_days'] = len([c for c in all_counts if c > 0])
+        d['avg_daily'] = round(sum(all_counts) / max(len(all_counts), 1))
+        monthly_counts = {}
+        for date_str, count in daily_counts.items():
+            month_key = date_str[:7]
+            monthly_counts[month_key] = monthly_counts.get(month_key, 0) + count
+        if monthly_counts:
+            busiest_month_key = max(monthly_counts, key=monthly_counts.get)
+            d['busiest_month'] = datetime.strptime(busiest_month_key, '%Y-%m').strftime('%b')
+        else:
+            d['busiest_month'] = 'N/A'
+        first_dt = datetime.strptime(min(daily_counts.keys()), '%Y-%m-%d').date()
+        last_dt = datetime.strptime(max(daily_counts.keys()), '%Y-%m-%d').date()
+        total_days = (last_dt - first_dt).days + 1
+        d['quiet_days'] = total_days - d['active_days']
+    else:
+        d['max_daily'] = 0
+        d['active_days'] = 0
+        d['avg_daily'] = 0
         d['busiest_month'] = 'N/A'
-    first_dt = datetime.strptime(min(daily_counts.keys()), '%Y-%m-%d').date()
-    last_dt = datetime.strptime(max(daily_counts.keys()), '%Y-%m-%d').date()
-    total_days = (last_dt - first_dt).days + 1
-    d['quiet_days'] = total_days - d['active_days']
-else:
-    d['max_daily'] = 0
-    d['active_days'] = 0
-    d['avg_daily'] = 0
-    d['busiest_month'] = 'N/A'
-    d['quiet_days'] = 0
-
-
-# Personality (based on combined stats) - Assumed original logic here
-s = d['stats']
-ratio = s[1] / (s[2] + 1)
-if d['hour'] < 5 or d['hour'] > 22:
-    d['personality'] = ("NOCTURNAL MENACE", "terrorizes people at ungodly hours")
-elif d['resp'] < 5:
-    d['personality'] = ("TERMINALLY ONLINE", "has never touched grass")
-elif d['resp'] > 120:
-    d['personality'] = ("TOO COOL TO REPLY", "leaves everyone on read")
-elif ratio < 0.5:
-    d['personality'] = ("POPULAR (ALLEGEDLY)", "everyone wants a piece")
-elif ratio > 2:
-    d['personality'] = ("THE YAPPER", "carries every conversation alone")
-elif d['starter_pct'] > 65:
-    d['personality'] = ("CONVERSATION STARTER", "always making the first move")
-elif d['starter_pct'] < 35:
-    d['personality'] = ("THE WAITER", "never texts first, ever")
-else:
-    d['personality'] = ("SUSPICIOUSLY NORMAL", "no notes. boring but stable.")
-
-# Placeholder for Ghosted/Heating Up/Fan/Simp (Assume merged)
-d['ghosted'] = []
-d['heating'] = []
-d['fan'] = []
-d['simp'] = []
-
-return d
+        d['quiet_days'] = 0
 
-def gen_html(d, path, year, has_imessage, has_whatsapp):
-"""Generate the combined wrapped HTML report."""
-s = d['stats']
-top = d['top']
-ptype, proast = d['personality']
-hr = d['hour']
-# Format hour
-if hr == 0:
-    hr_str = "12AM"
-elif hr < 12:
-    hr_str = f"{hr}AM"
-elif hr == 12:
-    hr_str = "12PM"
-else:
-    hr_str = f"{hr-12}PM"
-# Format busiest day
-if d['busiest_day']:
-    bd = datetime.strptime(d['busiest_day'][0], '%Y-%m-%d')
-    busiest_str = bd.strftime('%b %d')
-    busiest_count = d['busiest_day'][1]
-else:
-    busiest_str = "N/A"
-    busiest_count = 0
-# Calculate days elapsed
-now = datetime.now()
-year_start = datetime(int(year), 1, 1)
-days_elapsed = max(1, (now - year_start).days)
-msgs_per_day = s[0] // days_elapsed
-words = d['words']
-words_display = f"{words // 1000:,}K" if words >= 1000 else f"{words:,}"
-# Platform breakdown
-im_stats = d.get('imessage_stats', (0, 0, 0, 0))
-wa_stats = d.get('whatsapp_stats', (0, 0, 0, 0))
-slides = []
-# Slide 1: Intro (Assume original logic)
-platforms_text = []
-if has_imessage: platforms_text.append("iMessage")
-if has_whatsapp: platforms_text.append("WhatsApp")
-platform_str = " + ".join(platforms_text)
-slides.append(f'''
-<div class="slide intro">
-<div class="slide-icon">📱💬</div>
-<h1>TEXTS<br>WRAPPED</h1>
-<p class="subtitle">{platform_str}</p>
-<p class="subtitle2">your {year} texting habits, exposed</p>
-<div class="tap-hint">click anywhere to start →</div>
-</div>''')
-# Slide 2: Total messages (Assume original logic)
-slides.append(f'''
-<div class="slide">
-<div class="slide-label">// TOTAL DAMAGE</div>
-<div class="big-number gradient">{s[0]:,}</div>
-<div class="slide-text">messages across all platforms</div>
-<div class="stat-grid">
-<div class="stat-item"><span class="stat-num">{msgs_per_day}</span><span class="stat-lbl">/day</span></div>
-<div class="stat-item"><span class="stat-num">{s[1]:,}</span><span class="stat-lbl">sent</span></div>
-<div class="stat-item"><span class="stat-num">{s[2]:,}</span><span class="stat-lbl">received</span></div>
-</div>
-<button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_total_messages.png', this)">📸 Save</button>
-<div class="slide-watermark">wrap2025.com</div>
-</div>''')
-# Slide 3: Platform breakdown (Assume original logic)
-if has_imessage and has_whatsapp:
-im_pct = round(im_stats[0] / max(s[0], 1) * 100)
-wa_pct = 100 - im_pct
-slides.append(f'''
-<div class="slide platform-breakdown">
-<div class="slide-label">// PLATFORM SPLIT</div>
-<div class="slide-text">where you text the most</div>
-<div class="platform-bars">
-<div class="platform-bar imessage" style="width:{max(im_pct, 15)}%">
-<span class="platform-icon">📱</span>
-<span class="platform-name">iMessage</span>
-<span class="platform-pct">{im_pct}%</span>
-<span class="platform-count">{im_stats[0]:,}</span>
-</div>
-<div class="platform-bar whatsapp" style="width:{max(wa_pct, 15)}%">
-<span class="platform-icon">💬</span>
-<span class="platform-name">WhatsApp</span>
-<span class="platform-pct">{wa_pct}%</span>
-<span class="platform-count">{wa_stats[0]:,}</span>
-</div>
-</div>
-<button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_platform_split.png', this)">📸 Save</button>
-<div class="slide-watermark">wrap2025.com</div>
-</div>''')
-# Slide 4: Words sent (Assume original logic)
-pages = max(1, words // 250)
-slides.append(f'''
-<div class="slide">
-<div class="slide-label">// WORD COUNT</div>
-<div class="big-number cyan">{words_display}</div>
-<div class="slide-text">words you typed</div>
-<div class="roast">that's about {pages:,} pages of a novel</div>
-<button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_word_count.png', this)">📸 Save</button>
-<div class="slide-watermark">wrap2025.com</div>
-</div>''')
-
-# --- Slides 5 to 7: Activity, Your #1, Top 5 (Assumed original logic) ---
-
-# --- Group chat slides (Assumed original logic) ---
-gs = d['group_stats']
-if gs['count'] > 0:
-    lurker_pct = round((1 - gs['sent'] / max(gs['total'], 1)) * 100)
-    lurker_label = "LURKER" if lurker_pct > 60 else "CONTRIBUTOR" if lurker_pct < 40 else "BALANCED"
-    lurker_class = "yellow" if lurker_pct > 60 else "green" if lurker_pct < 40 else "cyan"
-    slides.append(f'''
+
+    # Personality (based on combined stats) - Assumed original logic here
+    s = d['stats']
+    ratio = s[1] / (s[2] + 1)
+    if d['hour'] < 5 or d['hour'] > 22:
+        d['personality'] = ("NOCTURNAL MENACE", "terrorizes people at ungodly hours")
+    elif d['resp'] < 5:
+        d['personality'] = ("TERMINALLY ONLINE", "has never touched grass")
+    elif d['resp'] > 120:
+        d['personality'] = ("TOO COOL TO REPLY", "leaves everyone on read")
+    elif ratio < 0.5:
+        d['personality'] = ("POPULAR (ALLEGEDLY)", "everyone wants a piece")
+    elif ratio > 2:
+        d['personality'] = ("THE YAPPER", "carries every conversation alone")
+    elif d['starter_pct'] > 65:
+        d['personality'] = ("CONVERSATION STARTER", "always making the first move")
+    elif d['starter_pct'] < 35:
+        d['personality'] = ("THE WAITER", "never texts first, ever")
+    else:
+        d['personality'] = ("SUSPICIOUSLY NORMAL", "no notes. boring but stable.")
+
+    return d
+
+OFFLINE = None  # None: load html2canvas and fonts from CDNs; else a directory ('' for none) of files to inline (--offline)
+
+CDN_ASSETS = '''<script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>
+<link rel="preconnect" href="https://fonts.googleapis.com">
+<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+<link href="https://fonts.googleapis.com/css2?family=Silkscreen&family=Azeret+Mono:wght@400;500;600;700&family=Space+Grotesk:wght@400;500;700&display=swap" rel="stylesheet">'''
+
+# Font families the stylesheet uses, and the file stem --offline looks for in its directory
+REPORT_FONTS = (('Silkscreen', 'Silkscreen'), ('Azeret Mono', 'AzeretMono'), ('Space Grotesk', 'SpaceGrotesk'))
+FONT_TYPES = {'.woff2': 'font/woff2', '.woff': 'font/woff', '.ttf': 'font/ttf', '.otf': 'font/otf'}
+
+# Stand-in for html2canvas when --offline has no vendored copy: clone the node with its computed styles
+# into an SVG foreignObject (with the page's @font-face rules) and draw that onto a canvas
+RASTERIZE_JS = r"""
+window.html2canvas = async (node, opts = {}) => {
+    const scale = opts.scale || 1;
+    const width = opts.width || node.offsetWidth, height = opts.height || node.offsetHeight;
+    const inline = (src, dst) => {
+        const cs = getComputedStyle(src);
+        dst.style.cssText = Array.from(cs, p => `${p}:${cs.getPropertyValue(p)}`).join(';');
+        for (let i = 0; i < src.children.length; i++) inline(src.children[i], dst.children[i]);
+    };
+    const clone = node.cloneNode(true);
+    inline(node, clone);
+    clone.style.transform = 'none';
+    const fonts = Array.from(document.querySelectorAll('style'), s => (s.textContent.match(/@font-face\s*{[^}]*}/g) || []).join('')).join('');
+    const svg = `<svg xmlns="http://www.w3.org/2000/svg" width="${width}" height="${height}"><style>${fonts}</style>`
+        + `<foreignObject width="100%" height="100%">${new XMLSerializer().serializeToString(clone)}</foreignObject></svg>`;
+    const img = new Image();
+    img.src = 'data:image/svg+xml;charset=utf-8,' + encodeURIComponent(svg);
+    await img.decode();
+    const canvas = document.createElement('canvas');
+    canvas.width = width * scale;
+    canvas.height = height * scale;
+    const ctx = canvas.getContext('2d');
+    if (opts.backgroundColor) {
+        ctx.fillStyle = opts.backgroundColor;
+        ctx.fillRect(0, 0, canvas.width, canvas.height);
+    }
+    ctx.scale(scale, scale);
+    ctx.drawImage(img, 0, 0);
+    return canvas;
+};
+"""
+
+def report_assets():
+    """<head> tags for html2canvas and the fonts: CDN links, or with --offline everything inlined so opening the report makes no requests."""
+    if OFFLINE is None:
+        return CDN_ASSETS
+    vendored = os.path.join(OFFLINE, 'html2canvas.min.js')
+    if OFFLINE and os.path.isfile(vendored):
+        with open(vendored, encoding='utf-8') as f:
+            script = f.read().replace('</script', '<\\/script')
+    else:
+        script = RASTERIZE_JS
+    faces = []
+    for family, stem in REPORT_FONTS:
+        # An installed copy wins, then a file from the --offline directory; with neither the stylesheet's generic family is used
+        src = [f"local('{family}')"]
+        for ext, mime in FONT_TYPES.items():
+            path = os.path.join(OFFLINE, stem + ext)
+            if OFFLINE and os.path.isfile(path):
+                with open(path, 'rb') as f:
+                    src.append(f"url(data:{mime};base64,{base64.b64encode(f.read()).decode()})")
+                break
+        faces.append(f"@font-face {{ font-family:'{family}'; src:{', '.join(src)}; font-weight:100 900; font-display:block; }}")
+    return f"<script>{script}</script>\n<style>\n{chr(10).join(faces)}\n</style>"
+
+class HtmlReport:
+    """Streams the report through a buffered temp file beside path, moved into place only once it is complete."""
+    def __init__(self, path, buffering=1 << 16):
+        self.path = path
+        self.slides = 0
+        fd, self.tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix='.' + os.path.basename(path), suffix='.tmp')
+        self.f = os.fdopen(fd, 'w', encoding='utf-8', buffering=buffering)
+
+    def write(self, html):
+        self.f.write(html)
+
+    def slide(self, html):
+        self.slides += 1
+        self.f.write(html)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *_):
+        self.f.close()
+        if exc_type is None:
+            os.chmod(self.tmp, 0o644)
+            os.replace(self.tmp, self.path)
+        else:
+            os.unlink(self.tmp)
+
+def write_report(out, d, year, has_imessage, has_whatsapp):
+    """Generate the combined wrapped HTML report."""
+    s = d['stats']
+    top = d['top']
+    ptype, proast = d['personality']
+    hr = d['hour']
+    # Format hour
+    if hr == 0:
+        hr_str = "12AM"
+    elif hr < 12:
+        hr_str = f"{hr}AM"
+    elif hr == 12:
+        hr_str = "12PM"
+    else:
+        hr_str = f"{hr-12}PM"
+    # Format busiest day
+    if d['busiest_day']:
+        bd = datetime.strptime(d['busiest_day'][0], '%Y-%m-%d')
+        busiest_str = bd.strftime('%b %d')
+        busiest_count = d['busiest_day'][1]
+    else:
+        busiest_str = "N/A"
+        busiest_count = 0
+    # Calculate days elapsed
+    now = datetime.now()
+    year_start = datetime(int(year), 1, 1)
+    days_elapsed = max(1, (now - year_start).days)
+    if d.get('range'):
+        # --since/--until: the range's own length, both ends included
+        days_elapsed = (date.fromisoformat(d['range'][1]) - date.fromisoformat(d['range'][0])).days + 1
+    msgs_per_day = s[0] // days_elapsed
+    words = d['words']
+    words_display = f"{words // 1000:,}K" if words >= 1000 else f"{words:,}"
+    # Platform breakdown
+    im_stats = d.get('imessage_stats', (0, 0, 0, 0))
+    wa_stats = d.get('whatsapp_stats', (0, 0, 0, 0))
+    favicon = "data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>🌯</text></svg>"
+    out.write(f'''<!DOCTYPE html>
+<html><head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width,initial-scale=1">
+<title>Texts Wrapped {year}</title>
+<link rel="icon" href="{favicon}">
+{report_assets()}
+<style>
+''')
+    out.write(REPORT_CSS)
+    out.write('''
+</style>
+</head>
+<body>
+<div class="gallery" id="gallery">''')
+    # Slide 1: Intro (Assume original logic)
+    platforms_text = []
+    if has_imessage: platforms_text.append("iMessage")
+    if has_whatsapp: platforms_text.append("WhatsApp")
+    platform_str = " + ".join(platforms_text)
+    out.slide(f'''
+    <div class="slide intro">
+    <div class="slide-icon">📱💬</div>
+    <h1>TEXTS<br>WRAPPED</h1>
+    <p class="subtitle">{platform_str}</p>
+    <p class="subtitle2">your {year} texting habits, exposed</p>
+    <div class="tap-hint">click anywhere to start →</div>
+    </div>''')
+    # Slide 2: Total messages (Assume original logic)
+    out.slide(f'''
     <div class="slide">
-    <div class="slide-label">// GROUP CHATS</div>
-    <div class="slide-icon">👥</div>
-    <div class="big-number gradient">{gs['count']}</div>
-    <div class="slide-text">active group chats</div>
+    <div class="slide-label">// TOTAL DAMAGE</div>
+    <div class="big-number gradient">{s[0]:,}</div>
+    <div class="slide-text">messages across all platforms</div>
     <div class="stat-grid">
-    <div class="stat-item"><span class="stat-num">{gs['total']:,}</span><span class="stat-lbl">total msgs</span></div>
-    <div class="stat-item"><span class="stat-num">{gs['sent']:,}</span><span class="stat-lbl">sent</span></div>
-    <div class="stat-item"><span class="stat-num">{round(gs['sent']/max(gs['total'],1)*100)}%</span><span class="stat-lbl">yours</span></div>
+    <div class="stat-item"><span class="stat-num">{msgs_per_day}</span><span class="stat-lbl">/day</span></div>
+    <div class="stat-item"><span class="stat-num">{s[1]:,}</span><span class="stat-lbl">sent</span></div>
+    <div class="stat-item"><span class="stat-num">{s[2]:,}</span><span class="stat-lbl">received</span></div>
     </div>
-    <div class="badge {lurker_class}">{lurker_label}</div>
-    <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_group_chats.png', this)">📸 Save</button>
+    <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_total_messages.png', this)">📸 Save</button>
     <div class="slide-watermark">wrap2025.com</div>
     </div>''')
-    if d['group_leaderboard']:
-        # Helper to get the correct platform icon
-        def get_source_icon(source):
-            return "📱" if source == 'imessage' else "💬"
-        
-        gc_html = ''.join([
-            f'<div class="rank-item"><span class="rank-num">{i}</span><span class="rank-name">{gc["name"]}</span><span class="rank-count">{gc["msg_count"]:,}</span><span class="source-icon">{get_source_icon(gc.get("source", "imessage"))}</span></div>'
-            for i, gc in enumerate(d['group_leaderboard'][:5], 1)
-        ])
-        slides.append(f'''
-        <div class="slide orange-bg">
-        <div class="slide-label">// TOP GROUP CHATS</div>
-        <div class="slide-text">your most active groups</div>
-        <div class="rank-list">{gc_html}</div>
-        <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_top_groups.png', this)">📸 Save</button>
+    # Slide 3: Platform breakdown (Assume original logic)
+    if has_imessage and has_whatsapp:
+        im_pct = round(im_stats[0] / max(s[0], 1) * 100)
+        wa_pct = 100 - im_pct
+        out.slide(f'''
+        <div class="slide platform-breakdown">
+        <div class="slide-label">// PLATFORM SPLIT</div>
+        <div class="slide-text">where you text the most</div>
+        <div class="platform-bars">
+        <div class="platform-bar imessage" style="width:{max(im_pct, 15)}%">
+        <span class="platform-icon">📱</span>
+        <span class="platform-name">iMessage</span>
+        <span class="platform-pct">{im_pct}%</span>
+        <span class="platform-count">{im_stats[0]:,}</span>
+        </div>
+        <div class="platform-bar whatsapp" style="width:{max(wa_pct, 15)}%">
+        <span class="platform-icon">💬</span>
+        <span class="platform-name">WhatsApp</span>
+        <span class="platform-pct">{wa_pct}%</span>
+        <span class="platform-count">{wa_stats[0]:,}</span>
+        </div>
+        </div>
+        <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_platform_split.png', this)">📸 Save</button>
+        <div class="slide-watermark">wrap2025.com</div>
+        </div>''')
+    # Slide 4: Words sent (Assume original logic)
+    pages = max(1, words // 250)
+    out.slide(f'''
+    <div class="slide">
+    <div class="slide-label">// WORD COUNT</div>
+    <div class="big-number cyan">{words_display}</div>
+    <div class="slide-text">words you typed</div>
+    <div class="roast">that's about {pages:,} pages of a novel</div>
+    <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_word_count.png', this)">📸 Save</button>
+    <div class="slide-watermark">wrap2025.com</div>
+    </div>''')
+
+    # --- Slides 5 to 7: Activity, Your #1, Top 5 (Assumed original logic) ---
+
+    # --- Group chat slides (Assumed original logic) ---
+    gs = d['group_stats']
+    if gs['count'] > 0:
+        lurker_pct = round((1 - gs['sent'] / max(gs['total'], 1)) * 100)
+        lurker_label = "LURKER" if lurker_pct > 60 else "CONTRIBUTOR" if lurker_pct < 40 else "BALANCED"
+        lurker_class = "yellow" if lurker_pct > 60 else "green" if lurker_pct < 40 else "cyan"
+        out.slide(f'''
+        <div class="slide">
+        <div class="slide-label">// GROUP CHATS</div>
+        <div class="slide-icon">👥</div>
+        <div class="big-number gradient">{gs['count']}</div>
+        <div class="slide-text">active group chats</div>
+        <div class="stat-grid">
+        <div class="stat-item"><span class="stat-num">{gs['total']:,}</span><span class="stat-lbl">total msgs</span></div>
+        <div class="stat-item"><span class="stat-num">{gs['sent']:,}</span><span class="stat-lbl">sent</span></div>
+        <div class="stat-item"><span class="stat-num">{round(gs['sent']/max(gs['total'],1)*100)}%</span><span class="stat-lbl">yours</span></div>
+        </div>
+        <div class="badge {lurker_class}">{lurker_label}</div>
+        <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_group_chats.png', this)">📸 Save</button>
         <div class="slide-watermark">wrap2025.com</div>
         </div>''')
+        if d['group_leaderboard']:
+            # Helper to get the correct platform icon
+            def get_source_icon(source):
+                return "📱" if source == 'imessage' else "💬"
+        
+            gc_html = ''.join([
+                f'<div class="rank-item"><span class="rank-num">{i}</span><span class="rank-name">{gc["name"]}</span><span class="rank-count">{gc["msg_count"]:,}</span><span class="source-icon">{get_source_icon(gc.get("source", "imessage"))}</span></div>'
+                for i, gc in enumerate(d['group_leaderboard'][:5], 1)
+            ])
+            out.slide(f'''
+            <div class="slide orange-bg">
+            <div class="slide-label">// TOP GROUP CHATS</div>
+            <div class="slide-text">your most active groups</div>
+            <div class="rank-list">{gc_html}</div>
+            <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_top_groups.png', this)">📸 Save</button>
+            <div class="slide-watermark">wrap2025.com</div>
+            </div>''')
 
-# ==========================================================
-# --- MODIFIED: MVP SENDER SLIDE ---
-# ==========================================================
-if d['top_group_senders']:
-    # Use the source of the MVP group to set the background color
-    mvp_group_name = d.get('mvp_group_name', 'Your Top Chat')
-    mvp_source = d.get('mvp_source', 'imessage')
+    # ==========================================================
+    # --- MODIFIED: MVP SENDER SLIDE ---
+    # ==========================================================
+    if d['top_group_senders']:
+        # Use the source of the MVP group to set the background color
+        mvp_group_name = d.get('mvp_group_name', 'Your Top Chat')
+        mvp_source = d.get('mvp_source', 'imessage')
     
-    # Set classes based on source (iMessage uses green background, WhatsApp uses darker green)
-    slide_bg_class = "whatsapp-bg" if mvp_source == 'whatsapp' else "imessage-bg"
-    slide_label_color = "var(--whatsapp)" if mvp_source == 'whatsapp' else "var(--green)"
+        # Set classes based on source (iMessage uses green background, WhatsApp uses darker green)
+        slide_bg_class = "whatsapp-bg" if mvp_source == 'whatsapp' else "imessage-bg"
+        slide_label_color = "var(--whatsapp)" if mvp_source == 'whatsapp' else "var(--green)"
     
-    sender_html = ''.join([
-        f'<div class="rank-item"><span class="rank-num">🗣️</span><span class="rank-name">{s["name"]}</span><span class="rank-count green">{s["msg_count"]:,}</span></div>'
-        for s in d['top_group_senders']
-    ])
+        sender_html = ''.join([
+            f'<div class="rank-item"><span class="rank-num">🗣️</span><span class="rank-name">{s["name"]}</span><span class="rank-count green">{s["msg_count"]:,}</span></div>'
+            for s in d['top_group_senders']
+        ])
     
-    slides.append(f'''
-    <div class="slide {slide_bg_class}">
-        <div class="slide-label" style="color:{slide_label_color}">// MVP OF THE GROUP</div>
-        <div class="slide-text">most talkative in "{mvp_group_name}"</div>
-        <div class="rank-list" style="max-width:480px;">{sender_html}</div>
-        <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_group_mvp.png', this)">📸 Save</button>
-        <div class="slide-watermark">wrap2025.com</div>
-    </div>''')
+        out.slide(f'''
+        <div class="slide {slide_bg_class}">
+            <div class="slide-label" style="color:{slide_label_color}">// MVP OF THE GROUP</div>
+            <div class="slide-text">most talkative in "{mvp_group_name}"</div>
+            <div class="rank-list" style="max-width:480px;">{sender_html}</div>
+            <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_group_mvp.png', this)">📸 Save</button>
+            <div class="slide-watermark">wrap2025.com</div>
+        </div>''')
     
-# --- Remaining slides (Personality, Starter, Response Time, etc. - Assumed original logic) ---
+    if d.get('fan'):
+        f = d['fan'][0]
+        ratio = round(f['them']/(f['you']+1), 1)
+        out.slide(f'''
+        <div class="slide">
+            <div class="slide-label">// BIGGEST FAN</div>
+            <div class="slide-text">texts you most</div>
+            <div class="huge-name orange">{f['name']}</div>
+            <div class="slide-text"><span class="big-number yellow" style="font-size:56px">{ratio}x</span> more than you</div>
+            <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_biggest_fan.png', this)">📸 Save</button>
+            <div class="slide-watermark">wrap2025.com</div>
+        </div>''')
 
+    if d.get('simp'):
+        si = d['simp'][0]
+        ratio = round(si['you']/(si['them']+1), 1)
+        out.slide(f'''
+        <div class="slide red-bg">
+            <div class="slide-label">// DOWN BAD</div>
+            <div class="slide-text">you simp for</div>
+            <div class="huge-name">{si['name']}</div>
+            <div class="slide-text">you text <span class="big-number yellow" style="font-size:56px">{ratio}x</span> more</div>
+            <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_down_bad.png', this)">📸 Save</button>
+            <div class="slide-watermark">wrap2025.com</div>
+        </div>''')
 
-slides_html = ''.join(slides)
-num_slides = len(slides)
+    # A --since/--until range is split at d['split'], the fixed year at June 1
+    split = date.fromisoformat(d['split']) if d.get('split') else None
+    heat_since = f"since {split:%b} {split.day}" if split else "in H2"
+    ghost_before = f"before {split:%b} {split.day}" if split else "before June"
 
-# ... (rest of gen_html function: boilerplate HTML, CSS, JavaScript) ...
-favicon = "data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>🌯</text></svg>"
-html = f'''<!DOCTYPE html>
-<html><head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width,initial-scale=1">
-<title>Texts Wrapped {year}</title>
-<link rel="icon" href="{favicon}">
-<script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>
-<link rel="preconnect" href="https://fonts.googleapis.com">
-<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-<link href="https://fonts.googleapis.com/css2?family=Silkscreen&family=Azeret+Mono:wght@400;500;600;700&family=Space+Grotesk:wght@400;500;700&display=swap" rel="stylesheet">
-<style>
-:root {{
+    if d.get('heating'):
+        heat_html = ''.join([f'<div class="rank-item"><span class="rank-num">🔥</span><span class="rank-name">{h["name"]}</span><span class="rank-count green">+{h["h2"]-h["h1"]}</span></div>' for h in d['heating'][:5]])
+        out.slide(f'''
+        <div class="slide orange-bg">
+            <div class="slide-label">// HEATING UP</div>
+            <div class="slide-text">getting stronger {heat_since}</div>
+            <div class="rank-list">{heat_html}</div>
+            <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_heating_up.png', this)">📸 Save</button>
+            <div class="slide-watermark">wrap2025.com</div>
+        </div>''')
+
+    if d.get('ghosted'):
+        ghost_html = ''.join([f'<div class="rank-item"><span class="rank-num">👻</span><span class="rank-name">{g["name"]}</span><span class="rank-count"><span class="green">{g["before"]}</span> → <span class="red">{g["after"]}</span></span></div>' for g in d['ghosted'][:5]])
+        out.slide(f'''
+        <div class="slide">
+            <div class="slide-label">// GHOSTED</div>
+            <div class="slide-text">they chose peace</div>
+            <div class="rank-list">{ghost_html}</div>
+            <div class="roast" style="margin-top:16px;">{ghost_before} → after</div>
+            <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_ghosted.png', this)">📸 Save</button>
+            <div class="slide-watermark">wrap2025.com</div>
+        </div>''')
+
+    # --- Remaining slides (Personality, Starter, Response Time, etc. - Assumed original logic) ---
+
+    top3_names = ', '.join([t['name'] for t in top[:3]]) if top else "No contacts"
+    platform_html = ''
+    if has_imessage:
+        platform_html += f'<span class="summary-platform imessage">📱 {im_stats[0]:,}</span>'
+    if has_whatsapp:
+        platform_html += f'<span class="summary-platform whatsapp">💬 {wa_stats[0]:,}</span>'
+    out.slide(f'''
+    <div class="slide summary-slide">
+        <div class="summary-card" id="summaryCard">
+            <div class="summary-header">
+                <span class="summary-logo">📱💬</span>
+                <span class="summary-title">TEXTS WRAPPED {year}</span>
+            </div>
+            <div class="summary-hero">
+                <div class="summary-big-stat">
+                    <span class="summary-big-num">{s[0]:,}</span>
+                    <span class="summary-big-label">messages</span>
+                </div>
+            </div>
+            <div class="summary-platform-split">{platform_html}</div>
+            <div class="summary-stats">
+                <div class="summary-stat">
+                    <span class="summary-stat-val">{s[3]:,}</span>
+                    <span class="summary-stat-lbl">people</span>
+                </div>
+                <div class="summary-stat">
+                    <span class="summary-stat-val">{words_display}</span>
+                    <span class="summary-stat-lbl">words</span>
+                </div>
+                <div class="summary-stat">
+                    <span class="summary-stat-val">{d['starter_pct']}%</span>
+                    <span class="summary-stat-lbl">starter</span>
+                </div>
+                <div class="summary-stat">
+                    <span class="summary-stat-val">{d['resp']}m</span>
+                    <span class="summary-stat-lbl">response</span>
+                </div>
+            </div>
+            <div class="summary-personality">
+                <span class="summary-personality-type">{ptype}</span>
+            </div>
+            <div class="summary-top3">
+                <span class="summary-top3-label">TOP 3:</span>
+                <span class="summary-top3-names">{top3_names}</span>
+            </div>
+            <div class="summary-footer">
+                <span>wrap2025.com</span>
+            </div>
+        </div>
+        <button class="screenshot-btn" onclick="takeScreenshot()">
+            <span class="btn-icon">📸</span>
+            <span>Save Screenshot</span>
+        </button>
+        <button class="screenshot-btn export-btn" onclick="exportAll(this)">
+            <span class="btn-icon">📦</span>
+            <span>Export All Slides</span>
+        </button>
+        <div class="share-hint">share your damage</div>
+    </div>''')
+
+
+    out.write(f'''</div>
+<div class="progress" id="progress"></div>
+<div class="nav prev" id="prev">‹</div>
+<div class="nav next" id="next">›</div>
+<script>
+const gallery = document.getElementById('gallery');
+const progressEl = document.getElementById('progress');
+const prevBtn = document.getElementById('prev');
+const nextBtn = document.getElementById('next');
+const total = {out.slides};
+const year = '{year}';
+''')
+    out.write(REPORT_JS)
+    out.write('''</script>
+</body></html>''')
+
+def gen_html(d, path, year, has_imessage, has_whatsapp):
+    with HtmlReport(path) as out:
+        write_report(out, d, year, has_imessage, has_whatsapp)
+    return path
+
+EXPORT_FORMAT = 'wrap2025-stats'
+EXPORT_VERSION = 1
+# Sections with a row per contact, group or day; NDJSON gives each row its own record
+EXPORT_ROWS = ('top', 'late', 'ghosted', 'heating', 'fan', 'simp', 'group_leaderboard', 'top_group_senders', 'daily_counts')
+
+def export_stats(d, path, year, has_imessage, has_whatsapp, ndjson=False):
+    """Write every merged metric in d, with the handle -> name pairs merge_data() settled on, as versioned JSON or NDJSON.
+
+    The file carries everything write_report() reads, so --from-json can render it without the databases.
+    """
+    names = {row['handle']: row['name'] for k in ('top', 'late', 'ghosted', 'heating', 'fan', 'simp') for row in d.get(k) or ()
+             if isinstance(row, dict) and row.get('handle') is not None}
+    header = {'format': EXPORT_FORMAT, 'version': EXPORT_VERSION, 'source': 'combined', 'generated': datetime.now().isoformat(timespec='seconds'),
+              'year': year, 'has_imessage': has_imessage, 'has_whatsapp': has_whatsapp}
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            if not ndjson:
+                json.dump({**header, 'names': names, 'data': d}, f, ensure_ascii=False)
+            else:
+                line = lambda record: f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                line({'kind': 'header', **header})
+                for h, name in names.items():
+                    line({'kind': 'name', 'handle': h, 'name': name})
+                for key, value in d.items():
+                    if key not in EXPORT_ROWS:
+                        line({'kind': 'metric', 'key': key, 'value': value})
+                    elif isinstance(value, dict):
+                        line({'kind': 'metric', 'key': key, 'value': {}})
+                        for name, v in value.items():
+                            line({'kind': 'row', 'key': key, 'name': name, 'value': v})
+                    else:
+                        line({'kind': 'metric', 'key': key, 'value': []})
+                        for row in value:
+                            line({'kind': 'row', 'key': key, 'value': row})
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return path
+
+def load_stats(path, source='combined'):
+    """Read an export_stats() file of either layout back into (header, names, d)."""
+    with open(path, encoding='utf-8') as f:
+        try:
+            first = json.loads(f.readline())
+        except ValueError:
+            first = None
+        if isinstance(first, dict) and first.get('kind') == 'header':
+            header, names, d = first, {}, {}
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record['kind'] == 'name':
+                    names[record['handle']] = record['name']
+                elif record['kind'] == 'metric':
+                    d[record['key']] = record['value']
+                elif 'name' in record:
+                    d[record['key']][record['name']] = record['value']
+                else:
+                    d[record['key']].append(record['value'])
+        else:
+            if not isinstance(first, dict):
+                # Not a one-line document (indented by hand or another tool), so parse the whole file
+                f.seek(0)
+                first = json.load(f)
+            header = first
+            names, d = header.pop('names', {}), header.pop('data', {})
+    if header.get('format') != EXPORT_FORMAT or header.get('source') != source:
+        raise ValueError(f"not a {source} stats export")
+    if header.get('version', 0) > EXPORT_VERSION:
+        raise ValueError(f"written by a newer version (format {header['version']}, this script reads {EXPORT_VERSION})")
+    return header, names, d
+
+# Stylesheet and script shared by every report, kept out of the per-run formatting
+REPORT_CSS = ''':root {
 --bg: #0a0a12;
 --text: #f0f0f0;
 --muted: #8892a0;
@@ -848,16 +1618,16 @@ html = f'''<!DOCTYPE html>
 --font-pixel: 'Silkscreen', cursive;
 --font-mono: 'Azeret Mono', monospace;
 --font-body: 'Space Grotesk', sans-serif;
-}}
-* {{ margin:0; padding:0; box-sizing:border-box; -webkit-tap-highlight-color:transparent; }}
-html, body {{ height:100%; overflow:hidden; }}
-body {{ font-family:'Space Grotesk',sans-serif; background:var(--bg); color:var(--text); }}
-.gallery {{
+}
+* { margin:0; padding:0; box-sizing:border-box; -webkit-tap-highlight-color:transparent; }
+html, body { height:100%; overflow:hidden; }
+body { font-family:'Space Grotesk',sans-serif; background:var(--bg); color:var(--text); }
+.gallery {
 display:flex;
 height:100%;
 transition:transform 0.4s cubic-bezier(0.4,0,0.2,1);
-}}
-.slide {{
+}
+.slide {
 position:relative;
 min-width:100vw;
 height:100vh;
@@ -868,99 +1638,99 @@ align-items:center;
 padding:40px 32px 80px;
 text-align:center;
 background:var(--bg);
-}}
-.slide.intro {{ background:linear-gradient(145deg,#12121f 0%,#1a2f1a 50%,#0f2847 100%); }}
-.slide.gradient-bg {{ background:linear-gradient(145deg,#12121f 0%,#1a2f1a 50%,#0d2f2f 100%); }}
-.slide.purple-bg {{ background:linear-gradient(145deg,#12121f 0%,#1f1a3d 100%); }}
-.slide.orange-bg {{ background:linear-gradient(145deg,#12121f 0%,#2d1f1a 100%); }}
-.slide.red-bg {{ background:linear-gradient(145deg,#12121f 0%,#2d1a1a 100%); }}
-.slide.summary-slide {{ background:linear-gradient(145deg,#1a2f1a 0%,#12121f 50%,#1a1a2e 100%); }}
-.slide.contrib-slide {{ background:linear-gradient(145deg,#12121f 0%,#0d1f1a 100%); padding:24px 16px 80px; }}
-.slide.platform-breakdown {{ background:linear-gradient(145deg,#12121f 0%,#1a2a1a 50%,#0d2f2f 100%); }}
-.slide.imessage-bg {{ background:linear-gradient(145deg,#12121f 0%,#1a2f1a 100%); }} /* New: iMessage MVP background */
-.slide.whatsapp-bg {{ background:linear-gradient(145deg,#12121f 0%,#0d2f1a 100%); }} /* New: WhatsApp MVP background */
+}
+.slide.intro { background:linear-gradient(145deg,#12121f 0%,#1a2f1a 50%,#0f2847 100%); }
+.slide.gradient-bg { background:linear-gradient(145deg,#12121f 0%,#1a2f1a 50%,#0d2f2f 100%); }
+.slide.purple-bg { background:linear-gradient(145deg,#12121f 0%,#1f1a3d 100%); }
+.slide.orange-bg { background:linear-gradient(145deg,#12121f 0%,#2d1f1a 100%); }
+.slide.red-bg { background:linear-gradient(145deg,#12121f 0%,#2d1a1a 100%); }
+.slide.summary-slide { background:linear-gradient(145deg,#1a2f1a 0%,#12121f 50%,#1a1a2e 100%); }
+.slide.contrib-slide { background:linear-gradient(145deg,#12121f 0%,#0d1f1a 100%); padding:24px 16px 80px; }
+.slide.platform-breakdown { background:linear-gradient(145deg,#12121f 0%,#1a2a1a 50%,#0d2f2f 100%); }
+.slide.imessage-bg { background:linear-gradient(145deg,#12121f 0%,#1a2f1a 100%); } /* New: iMessage MVP background */
+.slide.whatsapp-bg { background:linear-gradient(145deg,#12121f 0%,#0d2f1a 100%); } /* New: WhatsApp MVP background */
 /* === CONTRIBUTION GRAPH STYLES === */
-.contrib-graph {{ display:flex; flex-direction:column; align-items:center; margin:20px auto; padding:0 8px; }}
-.contrib-container {{ display:flex; gap:4px; }}
-.contrib-days {{ display:flex; flex-direction:column; gap:2px; font-size:9px; color:var(--muted); padding-top:20px; min-width:28px; text-align:right; padding-right:4px; }}
-.contrib-days span {{ height:10px; line-height:10px; }}
-.contrib-main {{ display:flex; flex-direction:column; }}
-.contrib-months {{ position:relative; height:16px; margin-bottom:4px; font-size:10px; color:var(--muted); }}
-.contrib-months span {{ position:absolute; white-space:nowrap; }}
-.contrib-grid {{ display:flex; gap:2px; }}
-.contrib-week {{ display:flex; flex-direction:column; gap:2px; }}
-.contrib-cell {{ width:10px; height:10px; border-radius:2px; background:rgba(255,255,255,0.05); }}
-.contrib-cell.empty {{ background:transparent; }}
-.contrib-cell.level-0 {{ background:rgba(255,255,255,0.12); }}
-.contrib-cell.level-1 {{ background:rgba(74,222,128,0.25); }}
-.contrib-cell.level-2 {{ background:rgba(74,222,128,0.45); }}
-.contrib-cell.level-3 {{ background:rgba(74,222,128,0.70); }}
-.contrib-cell.level-4 {{ background:var(--green); }}
-.contrib-cell:not(.empty) {{ cursor:pointer; position:relative; }}
-.contrib-tooltip {{ position:fixed; background:rgba(20,20,30,0.95); color:var(--text); padding:8px 12px; border-radius:6px; font-size:12px; pointer-events:none; z-index:1000; white-space:nowrap; border:1px solid rgba(255,255,255,0.1); box-shadow:0 4px 12px rgba(0,0,0,0.3); }}
-.contrib-tooltip .tooltip-count {{ font-family:var(--font-mono); color:var(--green); font-weight:600; }}
-.contrib-tooltip .tooltip-date {{ color:var(--muted); font-size:11px; margin-top:2px; }}
-.contrib-legend {{ display:flex; align-items:center; justify-content:center; gap:4px; margin-top:12px; font-size:10px; color:var(--muted); }}
-.contrib-legend .contrib-cell {{ cursor:default; }}
-.contrib-stats {{ display:flex; gap:32px; margin-top:24px; justify-content:center; }}
-.contrib-stat {{ display:flex; flex-direction:column; align-items:center; }}
-.contrib-stat-num {{ font-family:var(--font-mono); font-size:28px; font-weight:600; color:var(--cyan); }}
-.contrib-stat-lbl {{ font-size:11px; color:var(--muted); margin-top:4px; text-transform:uppercase; letter-spacing:0.5px; }}
+.contrib-graph { display:flex; flex-direction:column; align-items:center; margin:20px auto; padding:0 8px; }
+.contrib-container { display:flex; gap:4px; }
+.contrib-days { display:flex; flex-direction:column; gap:2px; font-size:9px; color:var(--muted); padding-top:20px; min-width:28px; text-align:right; padding-right:4px; }
+.contrib-days span { height:10px; line-height:10px; }
+.contrib-main { display:flex; flex-direction:column; }
+.contrib-months { position:relative; height:16px; margin-bottom:4px; font-size:10px; color:var(--muted); }
+.contrib-months span { position:absolute; white-space:nowrap; }
+.contrib-grid { display:flex; gap:2px; }
+.contrib-week { display:flex; flex-direction:column; gap:2px; }
+.contrib-cell { width:10px; height:10px; border-radius:2px; background:rgba(255,255,255,0.05); }
+.contrib-cell.empty { background:transparent; }
+.contrib-cell.level-0 { background:rgba(255,255,255,0.12); }
+.contrib-cell.level-1 { background:rgba(74,222,128,0.25); }
+.contrib-cell.level-2 { background:rgba(74,222,128,0.45); }
+.contrib-cell.level-3 { background:rgba(74,222,128,0.70); }
+.contrib-cell.level-4 { background:var(--green); }
+.contrib-cell:not(.empty) { cursor:pointer; position:relative; }
+.contrib-tooltip { position:fixed; background:rgba(20,20,30,0.95); color:var(--text); padding:8px 12px; border-radius:6px; font-size:12px; pointer-events:none; z-index:1000; white-space:nowrap; border:1px solid rgba(255,255,255,0.1); box-shadow:0 4px 12px rgba(0,0,0,0.3); }
+.contrib-tooltip .tooltip-count { font-family:var(--font-mono); color:var(--green); font-weight:600; }
+.contrib-tooltip .tooltip-date { color:var(--muted); font-size:11px; margin-top:2px; }
+.contrib-legend { display:flex; align-items:center; justify-content:center; gap:4px; margin-top:12px; font-size:10px; color:var(--muted); }
+.contrib-legend .contrib-cell { cursor:default; }
+.contrib-stats { display:flex; gap:32px; margin-top:24px; justify-content:center; }
+.contrib-stat { display:flex; flex-direction:column; align-items:center; }
+.contrib-stat-num { font-family:var(--font-mono); font-size:28px; font-weight:600; color:var(--cyan); }
+.contrib-stat-lbl { font-size:11px; color:var(--muted); margin-top:4px; text-transform:uppercase; letter-spacing:0.5px; }
 /* Platform breakdown slide */
-.platform-bars {{ display:flex; flex-direction:column; gap:16px; width:100%; max-width:500px; margin:32px 0; }}
-.platform-bar {{ display:flex; align-items:center; gap:12px; padding:20px 24px; border-radius:16px; min-width:120px; transition:all 0.3s; }}
-.platform-bar.imessage {{ background:linear-gradient(90deg, rgba(74,222,128,0.25), rgba(74,222,128,0.1)); border:2px solid rgba(74,222,128,0.4); }}
-.platform-bar.whatsapp {{ background:linear-gradient(90deg, rgba(37,211,102,0.25), rgba(37,211,102,0.1)); border:2px solid rgba(37,211,102,0.4); }}
-.platform-icon {{ font-size:28px; flex-shrink:0; }}
-.platform-name {{ font-size:16px; text-align:left; flex-shrink:0; min-width:80px; }}
-.platform-pct {{ font-family:var(--font-mono); font-size:28px; font-weight:700; flex:1; text-align:center; }}
-.platform-bar.imessage .platform-pct {{ color:var(--imessage); }}
-.platform-bar.whatsapp .platform-pct {{ color:var(--whatsapp); }}
-.platform-count {{ font-family:var(--font-mono); font-size:16px; font-weight:500; opacity:0.8; flex-shrink:0; }}
-.platform-bar.imessage .platform-count {{ color:var(--imessage); }}
-.platform-bar.whatsapp .platform-count {{ color:var(--whatsapp); }}
-.slide h1 {{ font-family:var(--font-pixel); font-size:36px; font-weight:400; line-height:1.2; margin:20px 0; }}
-.slide-label {{ font-family:var(--font-pixel); font-size:12px; font-weight:400; color:var(--green); letter-spacing:0.5px; margin-bottom:16px; }}
-.slide-icon {{ font-size:80px; margin-bottom:16px; }}
-.slide-text {{ font-size:18px; color:var(--muted); margin:8px 0; }}
-.subtitle {{ font-size:18px; color:var(--muted); margin-top:8px; }}
-.subtitle2 {{ font-size:16px; color:var(--muted); margin-top:4px; opacity:0.7; }}
-.big-number {{ font-family:var(--font-mono); font-size:80px; font-weight:500; line-height:1; letter-spacing:-2px; }}
-.big-number.gradient {{ background:linear-gradient(90deg, var(--imessage), var(--whatsapp)); -webkit-background-clip:text; -webkit-text-fill-color:transparent; background-clip:text; }}
-.pct {{ font-family:var(--font-body); font-size:48px; }}
-.huge-name {{ font-family:var(--font-body); font-size:32px; font-weight:600; line-height:1.25; word-break:break-word; max-width:90%; margin:16px 0; }}
-.personality-type {{ font-family:var(--font-pixel); font-size:18px; font-weight:400; line-height:1.25; color:var(--purple); margin:24px 0; text-transform:uppercase; letter-spacing:0.5px; }}
-.roast {{ font-style:italic; color:var(--muted); font-size:18px; margin-top:16px; max-width:400px; }}
-.green {{ color:var(--green); }}
-.yellow {{ color:var(--yellow); }}
-.red {{ color:var(--red); }}
-.cyan {{ color:var(--cyan); }}
-.pink {{ color:var(--pink); }}
-.orange {{ color:var(--orange); }}
-.purple {{ color:var(--purple); }}
-.source-badge {{ font-size:16px; margin-left:4px; }}
-.source-icon {{ font-size:14px; opacity:0.7; }}
-.stat-grid {{ display:flex; gap:40px; margin-top:28px; }}
-.stat-item {{ display:flex; flex-direction:column; align-items:center; }}
-.stat-num {{ font-family:var(--font-mono); font-size:24px; font-weight:600; color:var(--cyan); }}
-.stat-lbl {{ font-size:11px; color:var(--muted); margin-top:6px; text-transform:uppercase; letter-spacing:0.5px; }}
-.rank-list {{ width:100%; max-width:420px; margin-top:20px; padding:0 16px 16px; }}
-.rank-item {{ display:flex; align-items:center; padding:14px 0; border-bottom:1px solid rgba(255,255,255,0.1); gap:16px; }}
-.rank-item:last-child {{ border-bottom:none; }}
-.rank-item:first-child {{ background:linear-gradient(90deg, rgba(74,222,128,0.15) 0%, transparent 100%); padding:14px 12px; margin:0 -12px; border-radius:8px; border-bottom:none; }}
-.rank-item:first-child .rank-name {{ font-weight:600; color:var(--green); }}
-.rank-item:first-child .rank-count {{ font-size:20px; }}
-.rank-num {{ font-family:var(--font-mono); font-size:20px; font-weight:600; color:var(--green); width:36px; text-align:center; }}
-.rank-name {{ flex:1; font-size:16px; text-align:left; white-space:nowrap; overflow:hidden; text-overflow:ellipsis; }}
-.rank-count {{ font-family:var(--font-mono); font-size:18px; font-weight:600; color:var(--yellow); }}
-.badge {{ display:inline-block; padding:8px 18px; border-radius:24px; font-family:var(--font-pixel); font-size:9px; font-weight:400; text-transform:uppercase; letter-spacing:0.3px; margin-top:20px; border:2px solid; }}
-.badge.green {{ border-color:var(--green); color:var(--green); background:rgba(74,222,128,0.1); }}
-.badge.yellow {{ border-color:var(--yellow); color:var(--yellow); background:rgba(251,191,36,0.1); }}
-.badge.red {{ border-color:var(--red); color:var(--red); background:rgba(248,113,113,0.1); }}
-.badge.cyan {{ border-color:var(--cyan); color:var(--cyan); background:rgba(34,211,238,0.1); }}
-.emoji-row {{ font-size:64px; letter-spacing:20px; margin:28px 0; }}
-.tap-hint {{ position:absolute; bottom:60px; font-size:16px; color:var(--muted); animation:pulse 2s infinite; }}
-@keyframes pulse {{ 0%,100%{{opacity:0.4}} 50%{{opacity:1}} }}
+.platform-bars { display:flex; flex-direction:column; gap:16px; width:100%; max-width:500px; margin:32px 0; }
+.platform-bar { display:flex; align-items:center; gap:12px; padding:20px 24px; border-radius:16px; min-width:120px; transition:all 0.3s; }
+.platform-bar.imessage { background:linear-gradient(90deg, rgba(74,222,128,0.25), rgba(74,222,128,0.1)); border:2px solid rgba(74,222,128,0.4); }
+.platform-bar.whatsapp { background:linear-gradient(90deg, rgba(37,211,102,0.25), rgba(37,211,102,0.1)); border:2px solid rgba(37,211,102,0.4); }
+.platform-icon { font-size:28px; flex-shrink:0; }
+.platform-name { font-size:16px; text-align:left; flex-shrink:0; min-width:80px; }
+.platform-pct { font-family:var(--font-mono); font-size:28px; font-weight:700; flex:1; text-align:center; }
+.platform-bar.imessage .platform-pct { color:var(--imessage); }
+.platform-bar.whatsapp .platform-pct { color:var(--whatsapp); }
+.platform-count { font-family:var(--font-mono); font-size:16px; font-weight:500; opacity:0.8; flex-shrink:0; }
+.platform-bar.imessage .platform-count { color:var(--imessage); }
+.platform-bar.whatsapp .platform-count { color:var(--whatsapp); }
+.slide h1 { font-family:var(--font-pixel); font-size:36px; font-weight:400; line-height:1.2; margin:20px 0; }
+.slide-label { font-family:var(--font-pixel); font-size:12px; font-weight:400; color:var(--green); letter-spacing:0.5px; margin-bottom:16px; }
+.slide-icon { font-size:80px; margin-bottom:16px; }
+.slide-text { font-size:18px; color:var(--muted); margin:8px 0; }
+.subtitle { font-size:18px; color:var(--muted); margin-top:8px; }
+.subtitle2 { font-size:16px; color:var(--muted); margin-top:4px; opacity:0.7; }
+.big-number { font-family:var(--font-mono); font-size:80px; font-weight:500; line-height:1; letter-spacing:-2px; }
+.big-number.gradient { background:linear-gradient(90deg, var(--imessage), var(--whatsapp)); -webkit-background-clip:text; -webkit-text-fill-color:transparent; background-clip:text; }
+.pct { font-family:var(--font-body); font-size:48px; }
+.huge-name { font-family:var(--font-body); font-size:32px; font-weight:600; line-height:1.25; word-break:break-word; max-width:90%; margin:16px 0; }
+.personality-type { font-family:var(--font-pixel); font-size:18px; font-weight:400; line-height:1.25; color:var(--purple); margin:24px 0; text-transform:uppercase; letter-spacing:0.5px; }
+.roast { font-style:italic; color:var(--muted); font-size:18px; margin-top:16px; max-width:400px; }
+.green { color:var(--green); }
+.yellow { color:var(--yellow); }
+.red { color:var(--red); }
+.cyan { color:var(--cyan); }
+.pink { color:var(--pink); }
+.orange { color:var(--orange); }
+.purple { color:var(--purple); }
+.source-badge { font-size:16px; margin-left:4px; }
+.source-icon { font-size:14px; opacity:0.7; }
+.stat-grid { display:flex; gap:40px; margin-top:28px; }
+.stat-item { display:flex; flex-direction:column; align-items:center; }
+.stat-num { font-family:var(--font-mono); font-size:24px; font-weight:600; color:var(--cyan); }
+.stat-lbl { font-size:11px; color:var(--muted); margin-top:6px; text-transform:uppercase; letter-spacing:0.5px; }
+.rank-list { width:100%; max-width:420px; margin-top:20px; padding:0 16px 16px; }
+.rank-item { display:flex; align-items:center; padding:14px 0; border-bottom:1px solid rgba(255,255,255,0.1); gap:16px; }
+.rank-item:last-child { border-bottom:none; }
+.rank-item:first-child { background:linear-gradient(90deg, rgba(74,222,128,0.15) 0%, transparent 100%); padding:14px 12px; margin:0 -12px; border-radius:8px; border-bottom:none; }
+.rank-item:first-child .rank-name { font-weight:600; color:var(--green); }
+.rank-item:first-child .rank-count { font-size:20px; }
+.rank-num { font-family:var(--font-mono); font-size:20px; font-weight:600; color:var(--green); width:36px; text-align:center; }
+.rank-name { flex:1; font-size:16px; text-align:left; white-space:nowrap; overflow:hidden; text-overflow:ellipsis; }
+.rank-count { font-family:var(--font-mono); font-size:18px; font-weight:600; color:var(--yellow); }
+.badge { display:inline-block; padding:8px 18px; border-radius:24px; font-family:var(--font-pixel); font-size:9px; font-weight:400; text-transform:uppercase; letter-spacing:0.3px; margin-top:20px; border:2px solid; }
+.badge.green { border-color:var(--green); color:var(--green); background:rgba(74,222,128,0.1); }
+.badge.yellow { border-color:var(--yellow); color:var(--yellow); background:rgba(251,191,36,0.1); }
+.badge.red { border-color:var(--red); color:var(--red); background:rgba(248,113,113,0.1); }
+.badge.cyan { border-color:var(--cyan); color:var(--cyan); background:rgba(34,211,238,0.1); }
+.emoji-row { font-size:64px; letter-spacing:20px; margin:28px 0; }
+.tap-hint { position:absolute; bottom:60px; font-size:16px; color:var(--muted); animation:pulse 2s infinite; }
+@keyframes pulse { 0%,100%{opacity:0.4} 50%{opacity:1} }
 /* === SLIDE ANIMATIONS (Original/Merged Logic) === */
 .slide .slide-label,
 .slide .slide-text,
@@ -979,54 +1749,54 @@ background:var(--bg);
 .slide .summary-card,
 .slide .contrib-graph,
 .slide .contrib-stats,
-.slide .platform-bars {{
+.slide .platform-bars {
 opacity: 0;
 transform: translateY(20px);
-}}
-.gallery {{ transition: transform 0.55s cubic-bezier(0.22, 1, 0.36, 1); }}
-.slide.active .slide-label {{ animation: textFade 0.4s ease-out forwards; }}
-.slide.active .slide-text {{ animation: textFade 0.4s ease-out 0.1s forwards; }}
-.slide.active .slide-icon {{ animation: iconPop 0.5s cubic-bezier(0.34, 1.56, 0.64, 1) 0.05s forwards; }}
-.slide.active h1 {{ animation: titleReveal 0.5s ease-out 0.12s forwards; }}
-.slide.active .subtitle {{ animation: textFade 0.4s ease-out 0.25s forwards; }}
-.slide.active .subtitle2 {{ animation: textFade 0.4s ease-out 0.35s forwards; }}
-.slide.active .big-number {{ animation: numberFlip 0.6s ease-out 0.18s forwards; }}
-.slide.active .huge-name {{ animation: nameBlur 0.5s ease-out 0.2s forwards; }}
-.slide.active .personality-type {{ animation: glitchReveal 0.8s ease-out 0.15s forwards; }}
-.slide.active .roast {{ animation: roastType 0.6s ease-out 0.4s forwards; }}
-.slide.active .badge {{ animation: badgeStamp 0.4s ease-out 0.5s forwards; }}
-.slide.active .stat-item {{ animation: statFade 0.35s ease-out forwards; }}
-.slide.active .stat-item:nth-child(1) {{ animation-delay: 0.3s; }}
-.slide.active .rank-item {{ animation: rankSlide 0.35s ease-out forwards; }}
-.slide.active .rank-item:nth-child(1) {{ animation-delay: 0.1s; }}
-.slide.active .rank-item:nth-child(2) {{ animation-delay: 0.18s; }}
-.slide.active .rank-item:nth-child(3) {{ animation-delay: 0.26s; }}
-.slide.active .rank-item:nth-child(4) {{ animation-delay: 0.34s; }}
-.slide.active .rank-item:nth-child(5) {{ animation-delay: 0.42s; }}
-.slide.active .emoji-row {{ animation: emojiSpread 0.6s ease-out 0.2s forwards; }}
-.slide.active .summary-card {{ animation: cardRise 0.6s ease-out 0.1s forwards; }}
-.slide.active .screenshot-btn {{ opacity: 0; animation: buttonSlide 0.4s ease-out 0.5s forwards; }}
-.slide.active .share-hint {{ opacity: 0; animation: hintFade 0.4s ease-out 0.7s forwards; }}
-.slide.active .contrib-graph {{ animation: graphReveal 0.8s ease-out 0.15s forwards; }}
-.slide.active .contrib-stat {{ animation: statFade 0.35s ease-out forwards; }}
-.slide.active .contrib-stat:nth-child(1) {{ animation-delay: 0.5s; }}
-.slide.active .platform-bars {{ animation: textFade 0.5s ease-out 0.2s forwards; }}
-@keyframes textFade {{ 0% {{ opacity: 0; transform: translateY(15px); }} 100% {{ opacity: 1; transform: translateY(0); }} }}
-@keyframes titleReveal {{ 0% {{ opacity: 0; transform: translateY(25px) scale(0.95); }} 70% {{ transform: translateY(-3px) scale(1.01); }} 100% {{ opacity: 1; transform: translateY(0) scale(1); }} }}
-@keyframes iconPop {{ 0% {{ opacity: 0; transform: translateY(20px) scale(0.4) rotate(-15deg); }} 50% {{ transform: translateY(-8px) scale(1.15) rotate(8deg); }} 75% {{ transform: translateY(2px) scale(0.95) rotate(-3deg); }} 100% {{ opacity: 1; transform: translateY(0) scale(1) rotate(0); }} }}
-@keyframes numberFlip {{ 0% {{ opacity: 0; transform: perspective(400px) rotateX(-60deg) translateY(20px); }} 60% {{ transform: perspective(400px) rotateX(10deg); }} 100% {{ opacity: 1; transform: perspective(400px) rotateX(0) translateY(0); }} }}
-@keyframes nameBlur {{ 0% {{ opacity: 0; transform: translateY(20px); filter: blur(8px); }} 100% {{ opacity: 1; transform: translateY(0); filter: blur(0); }} }}
-@keyframes roastType {{ 0% {{ opacity: 0; clip-path: inset(0 100% 0 0); }} 100% {{ opacity: 1; clip-path: inset(0 0 0 0); }} }}
-@keyframes statFade {{ 0% {{ opacity: 0; transform: translateY(12px); }} 100% {{ opacity: 1; transform: translateY(0); }} }}
-@keyframes rankSlide {{ 0% {{ opacity: 0; transform: translateX(-20px); }} 100% {{ opacity: 1; transform: translateX(0); }} }}
-@keyframes badgeStamp {{ 0% {{ opacity: 0; transform: scale(1.4); }} 60% {{ transform: scale(0.95); }} 100% {{ opacity: 1; transform: scale(1); }} }}
-@keyframes emojiSpread {{ 0% {{ opacity: 0; letter-spacing: 0px; }} 100% {{ opacity: 1; letter-spacing: 20px; }} }}
-@keyframes cardRise {{ 0% {{ opacity: 0; transform: translateY(40px); }} 100% {{ opacity: 1; transform: translateY(0); }} }}
-@keyframes graphReveal {{ 0% {{ opacity: 0; transform: translateY(30px) scale(0.95); }} 100% {{ opacity: 1; transform: translateY(0) scale(1); }} }}
-@keyframes buttonSlide {{ 0% {{ opacity: 0; transform: translateY(15px); }} 100% {{ opacity: 1; transform: translateY(0); }} }}
-@keyframes hintFade {{ 0% {{ opacity: 0; }} 100% {{ opacity: 1; }} }}
-@keyframes glitchReveal {{ 0% {{ opacity: 0; transform: translateY(15px); filter: blur(4px); }} 50% {{ opacity: 0.8; transform: translateY(3px) skewX(-3deg); filter: blur(1px); }} 100% {{ opacity: 1; transform: translateY(0) skewX(0); filter: blur(0); }} }}
-.summary-card {{
+}
+.gallery { transition: transform 0.55s cubic-bezier(0.22, 1, 0.36, 1); }
+.slide.active .slide-label { animation: textFade 0.4s ease-out forwards; }
+.slide.active .slide-text { animation: textFade 0.4s ease-out 0.1s forwards; }
+.slide.active .slide-icon { animation: iconPop 0.5s cubic-bezier(0.34, 1.56, 0.64, 1) 0.05s forwards; }
+.slide.active h1 { animation: titleReveal 0.5s ease-out 0.12s forwards; }
+.slide.active .subtitle { animation: textFade 0.4s ease-out 0.25s forwards; }
+.slide.active .subtitle2 { animation: textFade 0.4s ease-out 0.35s forwards; }
+.slide.active .big-number { animation: numberFlip 0.6s ease-out 0.18s forwards; }
+.slide.active .huge-name { animation: nameBlur 0.5s ease-out 0.2s forwards; }
+.slide.active .personality-type { animation: glitchReveal 0.8s ease-out 0.15s forwards; }
+.slide.active .roast { animation: roastType 0.6s ease-out 0.4s forwards; }
+.slide.active .badge { animation: badgeStamp 0.4s ease-out 0.5s forwards; }
+.slide.active .stat-item { animation: statFade 0.35s ease-out forwards; }
+.slide.active .stat-item:nth-child(1) { animation-delay: 0.3s; }
+.slide.active .rank-item { animation: rankSlide 0.35s ease-out forwards; }
+.slide.active .rank-item:nth-child(1) { animation-delay: 0.1s; }
+.slide.active .rank-item:nth-child(2) { animation-delay: 0.18s; }
+.slide.active .rank-item:nth-child(3) { animation-delay: 0.26s; }
+.slide.active .rank-item:nth-child(4) { animation-delay: 0.34s; }
+.slide.active .rank-item:nth-child(5) { animation-delay: 0.42s; }
+.slide.active .emoji-row { animation: emojiSpread 0.6s ease-out 0.2s forwards; }
+.slide.active .summary-card { animation: cardRise 0.6s ease-out 0.1s forwards; }
+.slide.active .screenshot-btn { opacity: 0; animation: buttonSlide 0.4s ease-out 0.5s forwards; }
+.slide.active .share-hint { opacity: 0; animation: hintFade 0.4s ease-out 0.7s forwards; }
+.slide.active .contrib-graph { animation: graphReveal 0.8s ease-out 0.15s forwards; }
+.slide.active .contrib-stat { animation: statFade 0.35s ease-out forwards; }
+.slide.active .contrib-stat:nth-child(1) { animation-delay: 0.5s; }
+.slide.active .platform-bars { animation: textFade 0.5s ease-out 0.2s forwards; }
+@keyframes textFade { 0% { opacity: 0; transform: translateY(15px); } 100% { opacity: 1; transform: translateY(0); } }
+@keyframes titleReveal { 0% { opacity: 0; transform: translateY(25px) scale(0.95); } 70% { transform: translateY(-3px) scale(1.01); } 100% { opacity: 1; transform: translateY(0) scale(1); } }
+@keyframes iconPop { 0% { opacity: 0; transform: translateY(20px) scale(0.4) rotate(-15deg); } 50% { transform: translateY(-8px) scale(1.15) rotate(8deg); } 75% { transform: translateY(2px) scale(0.95) rotate(-3deg); } 100% { opacity: 1; transform: translateY(0) scale(1) rotate(0); } }
+@keyframes numberFlip { 0% { opacity: 0; transform: perspective(400px) rotateX(-60deg) translateY(20px); } 60% { transform: perspective(400px) rotateX(10deg); } 100% { opacity: 1; transform: perspective(400px) rotateX(0) translateY(0); } }
+@keyframes nameBlur { 0% { opacity: 0; transform: translateY(20px); filter: blur(8px); } 100% { opacity: 1; transform: translateY(0); filter: blur(0); } }
+@keyframes roastType { 0% { opacity: 0; clip-path: inset(0 100% 0 0); } 100% { opacity: 1; clip-path: inset(0 0 0 0); } }
+@keyframes statFade { 0% { opacity: 0; transform: translateY(12px); } 100% { opacity: 1; transform: translateY(0); } }
+@keyframes rankSlide { 0% { opacity: 0; transform: translateX(-20px); } 100% { opacity: 1; transform: translateX(0); } }
+@keyframes badgeStamp { 0% { opacity: 0; transform: scale(1.4); } 60% { transform: scale(0.95); } 100% { opacity: 1; transform: scale(1); } }
+@keyframes emojiSpread { 0% { opacity: 0; letter-spacing: 0px; } 100% { opacity: 1; letter-spacing: 20px; } }
+@keyframes cardRise { 0% { opacity: 0; transform: translateY(40px); } 100% { opacity: 1; transform: translateY(0); } }
+@keyframes graphReveal { 0% { opacity: 0; transform: translateY(30px) scale(0.95); } 100% { opacity: 1; transform: translateY(0) scale(1); } }
+@keyframes buttonSlide { 0% { opacity: 0; transform: translateY(15px); } 100% { opacity: 1; transform: translateY(0); } }
+@keyframes hintFade { 0% { opacity: 0; } 100% { opacity: 1; } }
+@keyframes glitchReveal { 0% { opacity: 0; transform: translateY(15px); filter: blur(4px); } 50% { opacity: 0.8; transform: translateY(3px) skewX(-3deg); filter: blur(1px); } 100% { opacity: 1; transform: translateY(0) skewX(0); filter: blur(0); } }
+.summary-card {
 background:linear-gradient(145deg,#1a1a2e 0%,#1a2f1a 100%);
 border:2px solid rgba(255,255,255,0.1);
 border-radius:24px;
@@ -1034,115 +1804,105 @@ padding:32px;
 width:100%;
 max-width:420px;
 text-align:center;
-}}
-.summary-header {{ display:flex; align-items:center; justify-content:center; gap:12px; margin-bottom:24px; padding-bottom:16px; border-bottom:1px solid rgba(255,255,255,0.1); }}
-.summary-logo {{ font-size:28px; }}
-.summary-title {{ font-family:var(--font-pixel); font-size:11px; font-weight:400; color:var(--text); }}
-.summary-hero {{ margin:24px 0; }}
-.summary-big-stat {{ display:flex; flex-direction:column; align-items:center; }}
-.summary-big-num {{ font-family:var(--font-mono); font-size:56px; font-weight:600; background:linear-gradient(90deg, var(--imessage), var(--whatsapp)); -webkit-background-clip:text; -webkit-text-fill-color:transparent; background-clip:text; line-height:1; letter-spacing:-1px; }}
-.summary-big-label {{ font-size:13px; color:var(--muted); text-transform:uppercase; letter-spacing:1px; margin-top:8px; }}
-.summary-platform-split {{ display:flex; justify-content:center; gap:24px; margin:16px 0; padding:12px 0; border-top:1px solid rgba(255,255,255,0.05); border-bottom:1px solid rgba(255,255,255,0.05); }}
-.summary-platform {{ font-family:var(--font-mono); font-size:14px; }}
-.summary-platform.imessage {{ color:var(--imessage); }}
-.summary-platform.whatsapp {{ color:var(--whatsapp); }}
-.summary-stats {{ display:grid; grid-template-columns:repeat(4,1fr); gap:12px; margin:24px 0; padding:20px 0; border-top:1px solid rgba(255,255,255,0.1); border-bottom:1px solid rgba(255,255,255,0.1); }}
-.summary-stat {{ display:flex; flex-direction:column; align-items:center; }}
-.summary-stat-val {{ font-family:var(--font-mono); font-size:20px; font-weight:600; color:var(--cyan); }}
-.summary-stat-lbl {{ font-size:9px; color:var(--muted); text-transform:uppercase; margin-top:4px; letter-spacing:0.3px; }}
-.summary-personality {{ margin:20px 0; }}
-.summary-personality-type {{ font-family:var(--font-pixel); font-size:12px; font-weight:400; color:var(--purple); text-transform:uppercase; letter-spacing:0.3px; }}
-.summary-top3 {{ margin:16px 0; display:flex; flex-direction:column; gap:6px; }}
-.summary-top3-label {{ font-size:10px; color:var(--muted); text-transform:uppercase; letter-spacing:0.5px; }}
-.summary-top3-names {{ font-size:13px; color:var(--text); }}
-.summary-footer {{ margin-top:20px; padding-top:16px; border-top:1px solid rgba(255,255,255,0.1); font-size:11px; color:var(--green); font-family:var(--font-pixel); font-weight:400; }}
-.screenshot-btn {{
+}
+.summary-header { display:flex; align-items:center; justify-content:center; gap:12px; margin-bottom:24px; padding-bottom:16px; border-bottom:1px solid rgba(255,255,255,0.1); }
+.summary-logo { font-size:28px; }
+.summary-title { font-family:var(--font-pixel); font-size:11px; font-weight:400; color:var(--text); }
+.summary-hero { margin:24px 0; }
+.summary-big-stat { display:flex; flex-direction:column; align-items:center; }
+.summary-big-num { font-family:var(--font-mono); font-size:56px; font-weight:600; background:linear-gradient(90deg, var(--imessage), var(--whatsapp)); -webkit-background-clip:text; -webkit-text-fill-color:transparent; background-clip:text; line-height:1; letter-spacing:-1px; }
+.summary-big-label { font-size:13px; color:var(--muted); text-transform:uppercase; letter-spacing:1px; margin-top:8px; }
+.summary-platform-split { display:flex; justify-content:center; gap:24px; margin:16px 0; padding:12px 0; border-top:1px solid rgba(255,255,255,0.05); border-bottom:1px solid rgba(255,255,255,0.05); }
+.summary-platform { font-family:var(--font-mono); font-size:14px; }
+.summary-platform.imessage { color:var(--imessage); }
+.summary-platform.whatsapp { color:var(--whatsapp); }
+.summary-stats { display:grid; grid-template-columns:repeat(4,1fr); gap:12px; margin:24px 0; padding:20px 0; border-top:1px solid rgba(255,255,255,0.1); border-bottom:1px solid rgba(255,255,255,0.1); }
+.summary-stat { display:flex; flex-direction:column; align-items:center; }
+.summary-stat-val { font-family:var(--font-mono); font-size:20px; font-weight:600; color:var(--cyan); }
+.summary-stat-lbl { font-size:9px; color:var(--muted); text-transform:uppercase; margin-top:4px; letter-spacing:0.3px; }
+.summary-personality { margin:20px 0; }
+.summary-personality-type { font-family:var(--font-pixel); font-size:12px; font-weight:400; color:var(--purple); text-transform:uppercase; letter-spacing:0.3px; }
+.summary-top3 { margin:16px 0; display:flex; flex-direction:column; gap:6px; }
+.summary-top3-label { font-size:10px; color:var(--muted); text-transform:uppercase; letter-spacing:0.5px; }
+.summary-top3-names { font-size:13px; color:var(--text); }
+.summary-footer { margin-top:20px; padding-top:16px; border-top:1px solid rgba(255,255,255,0.1); font-size:11px; color:var(--green); font-family:var(--font-pixel); font-weight:400; }
+.screenshot-btn {
 display:flex; align-items:center; justify-content:center; gap:10px;
 font-family:var(--font-pixel); font-size:10px; font-weight:400; text-transform:uppercase; letter-spacing:0.3px;
 background:linear-gradient(90deg, var(--imessage), var(--whatsapp)); color:#000; border:none;
 padding:16px 32px; border-radius:12px; margin-top:28px;
 cursor:pointer; transition:transform 0.2s,background 0.2s;
-}}
-.screenshot-btn:hover {{ transform:scale(1.02); }}
-.screenshot-btn:active {{ transform:scale(0.98); }}
-.btn-icon {{ font-size:20px; }}
-.share-hint {{ font-size:14px; color:var(--muted); margin-top:16px; }}
-.slide-save-btn {{
+}
+.screenshot-btn:hover { transform:scale(1.02); }
+.screenshot-btn:active { transform:scale(0.98); }
+.screenshot-btn.export-btn { margin-top:12px; background:transparent; color:var(--text); border:1px solid rgba(255,255,255,0.25); }
+.screenshot-btn.export-btn:hover { background:rgba(255,255,255,0.08); }
+.btn-icon { font-size:20px; }
+.share-hint { font-size:14px; color:var(--muted); margin-top:16px; }
+.slide-save-btn {
 position:absolute; bottom:100px; left:50%; transform:translateX(-50%);
 display:flex; align-items:center; justify-content:center; gap:8px;
 font-family:var(--font-pixel); font-size:9px; font-weight:400; text-transform:uppercase; letter-spacing:0.3px;
 background:rgba(74,222,128,0.15); color:var(--green); border:1px solid rgba(74,222,128,0.3);
 padding:10px 20px; border-radius:8px;
 cursor:pointer; transition:all 0.2s; opacity:0;
-}}
-.slide.active .slide-save-btn {{ opacity:1; }}
-.slide-save-btn:hover {{ background:rgba(74,222,128,0.25); border-color:var(--green); }}
-.slide.capturing, .slide.capturing * {{
+}
+.slide.active .slide-save-btn { opacity:1; }
+.slide-save-btn:hover { background:rgba(74,222,128,0.25); border-color:var(--green); }
+.slide.capturing, .slide.capturing * {
 animation: none !important;
 opacity: 1 !important;
 transform: none !important;
 filter: none !important;
 clip-path: none !important;
-}}
-.slide-watermark {{
+}
+.slide-watermark {
 position:absolute; bottom:24px; left:50%; transform:translateX(-50%);
 font-family:var(--font-pixel); font-size:10px; color:var(--green); opacity:0.6;
 display:none;
-}}
-.progress {{ position:fixed; bottom:24px; left:50%; transform:translateX(-50%); display:flex; gap:8px; z-index:100; }}
-.dot {{ width:10px; height:10px; border-radius:50%; background:rgba(255,255,255,0.2); transition:all 0.3s; cursor:pointer; }}
-.dot:hover {{ background:rgba(255,255,255,0.4); }}
-.dot.active {{ background:var(--green); transform:scale(1.3); }}
-.nav {{ position:fixed; top:50%; transform:translateY(-50%); font-size:36px; color:rgba(255,255,255,0.2); cursor:pointer; z-index:100; padding:24px; transition:color 0.2s; user-select:none; }}
-.nav:hover {{ color:rgba(255,255,255,0.5); }}
-.nav.prev {{ left:8px; }}
-.nav.next {{ right:8px; }}
-.nav.hidden {{ opacity:0; pointer-events:none; }}
-</style>
-</head>
-<body>
-<div class="gallery" id="gallery">{slides_html}</div>
-<div class="progress" id="progress"></div>
-<div class="nav prev" id="prev">‹</div>
-<div class="nav next" id="next">›</div>
-<script>
-const gallery = document.getElementById('gallery');
-const progressEl = document.getElementById('progress');
-const prevBtn = document.getElementById('prev');
-const nextBtn = document.getElementById('next');
-const total = {num_slides};
-let current = 0;
-for (let i = 0; i < total; i++) {{
+}
+.progress { position:fixed; bottom:24px; left:50%; transform:translateX(-50%); display:flex; gap:8px; z-index:100; }
+.dot { width:10px; height:10px; border-radius:50%; background:rgba(255,255,255,0.2); transition:all 0.3s; cursor:pointer; }
+.dot:hover { background:rgba(255,255,255,0.4); }
+.dot.active { background:var(--green); transform:scale(1.3); }
+.nav { position:fixed; top:50%; transform:translateY(-50%); font-size:36px; color:rgba(255,255,255,0.2); cursor:pointer; z-index:100; padding:24px; transition:color 0.2s; user-select:none; }
+.nav:hover { color:rgba(255,255,255,0.5); }
+.nav.prev { left:8px; }
+.nav.next { right:8px; }
+.nav.hidden { opacity:0; pointer-events:none; }'''
+
+REPORT_JS = '''let current = 0;
+for (let i = 0; i < total; i++) {
 const dot = document.createElement('div');
 dot.className = 'dot' + (i === 0 ? ' active' : '');
 dot.onclick = () => goTo(i);
 progressEl.appendChild(dot);
-}}
+}
 const dots = progressEl.querySelectorAll('.dot');
 const slides = gallery.querySelectorAll('.slide');
-function goTo(idx) {{
+function goTo(idx) {
 if (idx < 0 || idx >= total) return;
 slides.forEach(s => s.classList.remove('active'));
 current = idx;
-gallery.style.transform = `translateX(-${{current * 100}}vw)`;
+gallery.style.transform = `translateX(-${current * 100}vw)`;
 dots.forEach((d, i) => d.classList.toggle('active', i === current));
 prevBtn.classList.toggle('hidden', current === 0);
 nextBtn.classList.toggle('hidden', current === total - 1);
 setTimeout(() => slides[current].classList.add('active'), 50);
-}}
-document.addEventListener('click', (e) => {{
+}
+document.addEventListener('click', (e) => {
 if (e.target.closest('.nav, button, .dot')) return;
 const x = e.clientX / window.innerWidth;
 if (x < 0.3) goTo(current - 1);
 else goTo(current + 1);
-}});
-document.addEventListener('keydown', (e) => {{
-if (e.key === 'ArrowRight' || e.key === ' ') {{ e.preventDefault(); goTo(current + 1); }}
-if (e.key === 'ArrowLeft') {{ e.preventDefault(); goTo(current - 1); }}
-}});
-prevBtn.onclick = (e) => {{ e.stopPropagation(); goTo(current - 1); }};
-nextBtn.onclick = (e) => {{ e.stopPropagation(); goTo(current + 1); }};
-async function takeScreenshot() {{
+});
+document.addEventListener('keydown', (e) => {
+if (e.key === 'ArrowRight' || e.key === ' ') { e.preventDefault(); goTo(current + 1); }
+if (e.key === 'ArrowLeft') { e.preventDefault(); goTo(current - 1); }
+});
+prevBtn.onclick = (e) => { e.stopPropagation(); goTo(current - 1); };
+nextBtn.onclick = (e) => { e.stopPropagation(); goTo(current + 1); };
+async function takeScreenshot() {
 const card = document.getElementById('summaryCard');
 const btn = document.querySelector('.screenshot-btn');
 btn.innerHTML = '<span>Saving...</span>';
@@ -1151,31 +1911,51 @@ btn.disabled = true;
 card.style.opacity = '1';
 card.style.transform = 'none';
 await new Promise(r => setTimeout(r, 100));
-try {{
-const canvas = await html2canvas(card, {{ backgroundColor:'#1a2f1a', scale:2, logging:false, useCORS:true }});
+try {
+const canvas = await html2canvas(card, { backgroundColor:'#1a2f1a', scale:2, logging:false, useCORS:true });
 const link = document.createElement('a');
-link.download = 'texts_wrapped_{year}_summary.png';
+link.download = `texts_wrapped_${year}_summary.png`;
 link.href = canvas.toDataURL('image/png');
 link.click();
 btn.innerHTML = '<span class="btn-icon">✓</span><span>Saved!</span>';
-setTimeout(() => {{ btn.innerHTML = '<span class="btn-icon">📸</span><span>Save Screenshot</span>'; btn.disabled = false; }}, 2000);
-}} catch (err) {{
+setTimeout(() => { btn.innerHTML = '<span class="btn-icon">📸</span><span>Save Screenshot</span>'; btn.disabled = false; }, 2000);
+} catch (err) {
 btn.innerHTML = '<span class="btn-icon">📸</span><span>Save Screenshot</span>';
 btn.disabled = false;
-}}
-}}
-async function saveSlide(slideEl, filename, btn) {{
-btn.innerHTML = '⏳';
-btn.disabled = true;
+}
+}
+// Rasterized slides, kept because the report never changes: a repeat save or export is instant
+const slidePngs = new Map();
+function renderSlide(slideEl) {
+if (!slidePngs.has(slideEl)) {
+const png = captureSlide(slideEl);
+slidePngs.set(slideEl, png);
+png.catch(() => slidePngs.delete(slideEl));
+}
+return slidePngs.get(slideEl);
+}
+async function captureSlide(slideEl) {
+// Show the watermark, hide the save button and force every animation to its final state
 const watermark = slideEl.querySelector('.slide-watermark');
+const saveBtn = slideEl.querySelector('.slide-save-btn');
 if (watermark) watermark.style.display = 'block';
-btn.style.visibility = 'hidden';
+if (saveBtn) saveBtn.style.visibility = 'hidden';
 slideEl.classList.add('capturing');
-await new Promise(r => setTimeout(r, 50));
+try {
+// Two frames: the first applies the capture styles, the second has painted them
+await new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)));
+// Get computed background color (html2canvas has issues with CSS variables)
 const computedBg = getComputedStyle(slideEl).backgroundColor;
 const bgColor = computedBg && computedBg !== 'rgba(0, 0, 0, 0)' ? computedBg : '#0a0a12';
-try {{
-const canvas = await html2canvas(slideEl, {{ backgroundColor: bgColor, scale: 2, logging: false, useCORS: true, width: slideEl.offsetWidth, height: slideEl.offsetHeight }});
+const canvas = await html2canvas(slideEl, {
+backgroundColor: bgColor,
+scale: 2,
+logging: false,
+useCORS: true,
+width: slideEl.offsetWidth,
+height: slideEl.offsetHeight
+});
+// Square crop centered on the content
 const size = Math.min(canvas.width, canvas.height);
 const squareCanvas = document.createElement('canvas');
 squareCanvas.width = size;
@@ -1183,115 +1963,305 @@ squareCanvas.height = size;
 const ctx = squareCanvas.getContext('2d');
 ctx.fillStyle = bgColor;
 ctx.fillRect(0, 0, size, size);
-const srcX = (canvas.width - size) / 2;
-const srcY = (canvas.height - size) / 2;
-ctx.drawImage(canvas, srcX, srcY, size, size, 0, 0, size, size);
+ctx.drawImage(canvas, (canvas.width - size) / 2, (canvas.height - size) / 2, size, size, 0, 0, size, size);
+return await new Promise((resolve, reject) => squareCanvas.toBlob(b => b ? resolve(b) : reject(new Error('toBlob failed')), 'image/png'));
+} finally {
+slideEl.classList.remove('capturing');
+if (saveBtn) saveBtn.style.visibility = 'visible';
+if (watermark) watermark.style.display = 'none';
+}
+}
+function download(blob, filename) {
 const link = document.createElement('a');
 link.download = filename;
-link.href = squareCanvas.toDataURL('image/png');
+link.href = URL.createObjectURL(blob);
 link.click();
+setTimeout(() => URL.revokeObjectURL(link.href), 1000);
+}
+async function saveSlide(slideEl, filename, btn) {
+btn.innerHTML = '⏳';
+btn.disabled = true;
+try {
+download(await renderSlide(slideEl), filename);
 btn.innerHTML = '✓';
-setTimeout(() => {{ btn.innerHTML = '📸 Save'; btn.disabled = false; btn.style.visibility = 'visible'; }}, 2000);
-}} catch (err) {{
+setTimeout(() => { btn.innerHTML = '📸 Save'; btn.disabled = false; }, 2000);
+} catch (err) {
 btn.innerHTML = '📸 Save';
 btn.disabled = false;
-btn.style.visibility = 'visible';
-}}
-slideEl.classList.remove('capturing');
-if (watermark) watermark.style.display = 'none';
-}}
+}
+}
+function zipStore(files) {
+// Minimal ZIP writer for [{name, data: Uint8Array}]: stored entries (PNGs are already deflated), UTF-8 names, fixed 1980-01-01 timestamps
+const crcTable = new Uint32Array(256);
+for (let n = 0; n < 256; n++) {
+let c = n;
+for (let k = 0; k < 8; k++) c = c & 1 ? 0xEDB88320 ^ (c >>> 1) : c >>> 1;
+crcTable[n] = c;
+}
+const parts = [], central = [];
+let offset = 0;
+for (const file of files) {
+const name = new TextEncoder().encode(file.name);
+const size = file.data.length;
+let crc = 0xFFFFFFFF;
+for (let i = 0; i < size; i++) crc = crcTable[(crc ^ file.data[i]) & 0xFF] ^ (crc >>> 8);
+crc = (crc ^ 0xFFFFFFFF) >>> 0;
+const local = new DataView(new ArrayBuffer(30));
+local.setUint32(0, 0x04034b50, true);
+local.setUint16(4, 20, true);
+local.setUint16(6, 0x0800, true);
+local.setUint16(12, 0x21, true);
+local.setUint32(14, crc, true);
+local.setUint32(18, size, true);
+local.setUint32(22, size, true);
+local.setUint16(26, name.length, true);
+parts.push(local, name, file.data);
+const entry = new DataView(new ArrayBuffer(46));
+entry.setUint32(0, 0x02014b50, true);
+entry.setUint16(4, 20, true);
+entry.setUint16(6, 20, true);
+entry.setUint16(8, 0x0800, true);
+entry.setUint16(14, 0x21, true);
+entry.setUint32(16, crc, true);
+entry.setUint32(20, size, true);
+entry.setUint32(24, size, true);
+entry.setUint16(28, name.length, true);
+entry.setUint32(42, offset, true);
+central.push(entry, name);
+offset += 30 + name.length + size;
+}
+const end = new DataView(new ArrayBuffer(22));
+end.setUint32(0, 0x06054b50, true);
+end.setUint16(8, files.length, true);
+end.setUint16(10, files.length, true);
+end.setUint32(12, central.reduce((n, part) => n + part.byteLength, 0), true);
+end.setUint32(16, offset, true);
+return new Blob([...parts, ...central, end], { type: 'application/zip' });
+}
+function packZip(files) {
+// CRC32 over every PNG runs in a worker so the page stays responsive; this thread is the fallback
+return new Promise(resolve => {
+try {
+const src = new Blob([zipStore.toString(), ';onmessage = e => postMessage(zipStore(e.data));'], { type: 'text/javascript' });
+const worker = new Worker(URL.createObjectURL(src));
+worker.onmessage = e => { worker.terminate(); resolve(e.data); };
+worker.onerror = e => { e.preventDefault(); worker.terminate(); resolve(zipStore(files)); };
+worker.postMessage(files);
+} catch (err) {
+resolve(zipStore(files));
+}
+});
+}
+async function exportAll(btn) {
+const label = btn.innerHTML;
+btn.disabled = true;
+try {
+const targets = Array.from(slides).filter(s => s.querySelector('.slide-save-btn'));
+const files = [];
+for (const [i, slideEl] of targets.entries()) {
+btn.innerHTML = `<span>${i + 1}/${targets.length}</span>`;
+const png = await renderSlide(slideEl);
+const name = (slideEl.querySelector('.slide-save-btn').getAttribute('onclick').match(/'([^']+[.]png)'/) || [])[1] || `slide.png`;
+files.push({ name: `${String(i + 1).padStart(2, '0')}_${name}`, data: new Uint8Array(await png.arrayBuffer()) });
+// Yield between slides so input and animation frames get a turn
+await new Promise(r => setTimeout(r));
+}
+download(await packZip(files), `texts_wrapped_${year}_slides.zip`);
+btn.innerHTML = '<span class="btn-icon">✓</span><span>Exported!</span>';
+} catch (err) {
+btn.innerHTML = label;
+}
+setTimeout(() => { btn.innerHTML = label; btn.disabled = false; }, 2000);
+}
 // Contribution graph tooltip
 const tooltip = document.createElement('div');
 tooltip.className = 'contrib-tooltip';
 tooltip.style.display = 'none';
 document.body.appendChild(tooltip);
-document.querySelectorAll('.contrib-cell[data-date]').forEach(cell => {{
-cell.addEventListener('mouseenter', (e) => {{
+document.querySelectorAll('.contrib-cell[data-date]').forEach(cell => {
+cell.addEventListener('mouseenter', (e) => {
 const count = cell.dataset.count;
 const date = cell.dataset.date;
 const msgText = cell.dataset.msgText;
-tooltip.innerHTML = `<div class="tooltip-count">${{count}} ${{msgText}}</div><div class="tooltip-date">${{date}}</div>`;
+tooltip.innerHTML = `<div class="tooltip-count">${count} ${msgText}</div><div class="tooltip-date">${date}</div>`;
 tooltip.style.display = 'block';
-}});
-cell.addEventListener('mousemove', (e) => {{
+});
+cell.addEventListener('mousemove', (e) => {
 tooltip.style.left = (e.clientX + 12) + 'px';
 tooltip.style.top = (e.clientY - 10) + 'px';
-}});
-cell.addEventListener('mouseleave', () => {{
+});
+cell.addEventListener('mouseleave', () => {
 tooltip.style.display = 'none';
-}});
-}});
+});
+});
 goTo(0);
-</script>
-</body></html>'''
+'''
 
-with open(path, 'w') as f:
-    f.write(html)
-return path
+def iso_day(value):
+    """argparse type for --since/--until: 'YYYY-MM-DD' -> date."""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--output', '-o', default='combined_wrapped_2025.html')
     parser.add_argument('--use-2024', action='store_true')
+    parser.add_argument('--snapshot', nargs='?', const='file', choices=['file', 'memory'], help='analyze a point-in-time copy of the database (temp file or in memory)')
+    parser.add_argument('--offline', nargs='?', const='', metavar='DIR', help='make the report fully self-contained: no CDN script or web fonts; inlines html2canvas.min.js and Silkscreen/AzeretMono/SpaceGrotesk font files found in DIR')
+    parser.add_argument('--imessage-db', metavar='PATH', help='read this chat.db instead of ~/Library/Messages/chat.db (or set WRAP2025_IMESSAGE_DB)')
+    parser.add_argument('--whatsapp-db', metavar='PATH', help='read this ChatStorage.sqlite instead of searching the WhatsApp containers (or set WRAP2025_WHATSAPP_DB)')
+    parser.add_argument('--addressbook-dir', metavar='DIR', help='read contacts from this AddressBook directory (or set WRAP2025_ADDRESSBOOK_DIR)')
+    parser.add_argument('--since', type=iso_day, metavar='YYYY-MM-DD', help='analyze messages from this local date on (default: January 1 of the --until year)')
+    parser.add_argument('--until', type=iso_day, metavar='YYYY-MM-DD', help='analyze messages up to and including this local date (default: today)')
+    parser.add_argument('--json', nargs='?', const='combined_wrapped_2025.json', metavar='PATH', help='also save every merged stat, with contact names, as versioned JSON')
+    parser.add_argument('--ndjson', nargs='?', const='combined_wrapped_2025.ndjson', metavar='PATH', help='like --json, but one record per line (a line per contact/day row)')
+    parser.add_argument('--from-json', metavar='PATH', help='render the report from a --json/--ndjson file without reading any database')
+    parser.add_argument('--profile', nargs='?', const='combined_profile.json', metavar='PATH', help='time every stage and query (rows, SQLite VM steps, query plan), print the slowest and save them as JSON (default combined_profile.json)')
     args = parser.parse_args()
+    window = None
+    if args.since or args.until:
+        if args.use_2024:
+            parser.error('--since/--until cannot be combined with --use-2024')
+        until = args.until or date.today()
+        since = args.since or date(until.year, 1, 1)
+        if since > until:
+            parser.error('--since is after --until')
+        # Half-open [since, until + 1 day) in local Unix seconds, with ghosted/heating's split at the midnight halfway
+        # through it; each platform converts them to its own units
+        split = since + timedelta(days=((until - since).days + 1) // 2)
+        window = (local_ts(since.year, since.month, since.day), local_ts(split.year, split.month, split.day),
+                  local_ts(*(until + timedelta(days=1)).timetuple()[:3]))
+    global SNAPSHOT, OFFLINE, IMESSAGE_DB, WHATSAPP_DB, ADDRESSBOOK_DIR, PROFILE
+    IMESSAGE_DB = args.imessage_db or IMESSAGE_DB
+    WHATSAPP_DB = args.whatsapp_db or WHATSAPP_DB
+    ADDRESSBOOK_DIR = args.addressbook_dir or ADDRESSBOOK_DIR
+    SNAPSHOT = args.snapshot
+    OFFLINE = args.offline
+    PROFILE = {'queries': {}, 'stages': {}} if args.profile else None
     print("\n" + "="*50)
-    print(" COMBINED WRAPPED 2025 | wrap2025.com")
+    print("  COMBINED WRAPPED 2025 | wrap2025.com")
     print("="*50 + "\n")
+    if args.from_json:
+        print(f"[*] Loading {args.from_json}...")
+        try:
+            header, _, merged_data = load_stats(args.from_json)
+        except (OSError, ValueError) as e:
+            print(f"\n[FATAL] Can't render {args.from_json}: {e}")
+            sys.exit(1)
+        print(f"    ✓ {merged_data['stats'][0]:,} messages from {header['year']}")
+        spinner = Spinner()
+        print("[*] Generating report...")
+        spinner.start("Building your wrapped...")
+        with stage('render'):
+            gen_html(merged_data, args.output, header['year'], header['has_imessage'], header['has_whatsapp'])
+        spinner.stop(f"Saved to {args.output}")
+        if args.profile:
+            print(f"[*] Profile saved to {args.profile}")
+            write_profile(args.profile)
+        open_in_macos(args.output)
+        print("\n  Done! Click through your wrapped.\n")
+        return
     print("[*] Checking access...")
     has_imessage, has_whatsapp = check_access()
     platforms = []
     if has_imessage:
         platforms.append("iMessage")
-        print(f" ✓ iMessage: {IMESSAGE_DB}")
+        print(f"    ✓ iMessage: {IMESSAGE_DB}")
     if has_whatsapp:
         platforms.append("WhatsApp")
-        print(f" ✓ WhatsApp: {WHATSAPP_DB}")
+        print(f"    ✓ WhatsApp: {WHATSAPP_DB}")
     print(f"\n[*] Platforms: {' + '.join(platforms)}")
-    print("[*] Loading contacts...")
-    imessage_contacts = extract_imessage_contacts() if has_imessage else {}
-    whatsapp_contacts = extract_whatsapp_contacts() if has_whatsapp else {}
-    print(f" ✓ {len(imessage_contacts)} from AddressBook, {len(whatsapp_contacts)} from WhatsApp")
-    # Determine year
-    year = "2024" if args.use_2024 else "2025"
-    # Check if we have enough 2025 data
-    if not args.use_2024:
-        total_2025 = 0
+    if args.snapshot:
+        print("[*] Taking snapshots...")
+        for path in [p for p, ok in [(IMESSAGE_DB, has_imessage), (WHATSAPP_DB, has_whatsapp)] if ok]:
+            db = get_db(path)
+            print(f"    ✓ {os.path.basename(path)} -> {'memory' if db.keeper else db.path}")
+    spinner = Spinner()
+    # Contact extraction, the identity index and both platform analyses are independent, so all the
+    # stages run at once (sqlite3 releases the GIL while a query runs, and every thread gets its own connections)
+    with stage('pipeline'), ThreadPoolExecutor(max_workers=5, thread_name_prefix='pipeline') as pool:
+        jobs = {'identities': pool.submit(staged, 'identity index', build_identity_index)}
         if has_imessage:
-            r = q_imessage(f"SELECT COUNT(*) FROM message WHERE (date/1000000000+978307200)>{TS_2025_IMESSAGE}")
-            total_2025 += r[0][0]
+            jobs['imessage_contacts'] = pool.submit(staged, 'imessage contacts', extract_imessage_contacts)
         if has_whatsapp:
-            r = q_whatsapp(f"SELECT COUNT(*) FROM ZWAMESSAGE WHERE ZMESSAGEDATE>{TS_2025_WHATSAPP}")
-            total_2025 += r[0][0]
-        if total_2025 < 100:
-            print(f" ⚠️ Only {total_2025} msgs in 2025, using 2024")
-            year = "2024"
-    spinner = Spinner()
-    # Analyze each platform
-    imessage_data = {}
-    whatsapp_data = {}
+            jobs['whatsapp_contacts'] = pool.submit(staged, 'whatsapp contacts', extract_whatsapp_contacts)
+        # Determine year
+        year = "2024" if args.use_2024 else "2025"
+        if window:
+            year = str(until.year)
+        # Check if we have enough 2025 data (a date range is explicit, so there is nothing to fall back to)
+        elif not args.use_2024:
+            total_2025 = 0
+            if has_imessage:
+                r = q_imessage(f"SELECT COUNT(*) FROM message WHERE {date_after(TS_2025_IMESSAGE)}", 'count')
+                total_2025 += r[0][0]
+            if has_whatsapp:
+                r = q_whatsapp(f"SELECT COUNT(*) FROM ZWAMESSAGE WHERE ZMESSAGEDATE>{TS_2025_WHATSAPP}", 'count')
+                total_2025 += r[0][0]
+            if total_2025 < 100:
+                print(f"    ⚠️  Only {total_2025} msgs in 2025, using 2024")
+                year = "2024"
+        # Analyze each platform
+        # ghosted/heating compare the halves of a --since/--until range
+        if has_imessage:
+            if window:
+                ts_start, ts_jun, ts_end = window
+            else:
+                ts_start = TS_2024_IMESSAGE if year == "2024" else TS_2025_IMESSAGE
+                ts_jun = TS_JUN_2024_IMESSAGE if year == "2024" else TS_JUN_2025_IMESSAGE
+                ts_end = None
+            jobs['imessage'] = pool.submit(staged, 'imessage analyze', analyze_imessage, ts_start, ts_jun, ts_end)
+        if has_whatsapp:
+            if window:
+                ts_start, ts_jun, ts_end = (ts - COCOA_OFFSET for ts in window)
+            else:
+                ts_start = TS_2024_WHATSAPP if year == "2024" else TS_2025_WHATSAPP
+                ts_jun = TS_JUN_2024_WHATSAPP if year == "2024" else TS_JUN_2025_WHATSAPP
+                ts_end = None
+            jobs['whatsapp'] = pool.submit(staged, 'whatsapp analyze', analyze_whatsapp, ts_start, ts_jun, ts_end)
+        print(f"[*] Loading contacts and analyzing {' + '.join(platforms)} {year}...")
+        spinner.start("Reading message databases...")
+        results = {name: job.result() for name, job in jobs.items()}
+        spinner.stop("Contacts loaded and platforms analyzed")
+    imessage_contacts = results.get('imessage_contacts', ContactIndex())
+    whatsapp_contacts = results.get('whatsapp_contacts', {})
+    imessage_data = results.get('imessage', {})
+    whatsapp_data = results.get('whatsapp', {})
+    print(f"    ✓ {len(imessage_contacts)} from AddressBook, {len(whatsapp_contacts)} from WhatsApp")
     if has_imessage:
-        ts_start = TS_2024_IMESSAGE if year == "2024" else TS_2025_IMESSAGE
-        ts_jun = TS_JUN_2024_IMESSAGE if year == "2024" else TS_JUN_2025_IMESSAGE
-        print(f"[*] Analyzing iMessage {year}...")
-        spinner.start("Reading iMessage database...")
-        imessage_data = analyze_imessage(ts_start, ts_jun)
-        spinner.stop(f"{imessage_data['stats'][0]:,} iMessage messages analyzed")
+        print(f"    ✓ {imessage_data['stats'][0]:,} iMessage messages analyzed")
     if has_whatsapp:
-        ts_start = TS_2024_WHATSAPP if year == "2024" else TS_2025_WHATSAPP
-        ts_jun = TS_JUN_2024_WHATSAPP if year == "2024" else TS_JUN_2025_WHATSAPP
-        print(f"[*] Analyzing WhatsApp {year}...")
-        spinner.start("Reading WhatsApp database...")
-        whatsapp_data = analyze_whatsapp(ts_start, ts_jun)
-        spinner.stop(f"{whatsapp_data['stats'][0]:,} WhatsApp messages analyzed")
-    print(f"[*] Merging data...")
+        print(f"    ✓ {whatsapp_data['stats'][0]:,} WhatsApp messages analyzed")
+    print("[*] Merging data...")
     spinner.start("Combining platform stats...")
-    merged_data = merge_data(imessage_data, whatsapp_data, imessage_contacts, whatsapp_contacts, has_imessage, has_whatsapp)
+    with stage('merge'):
+        merged_data = merge_data(imessage_data, whatsapp_data, imessage_contacts, whatsapp_contacts, has_imessage, has_whatsapp, results['identities'])
+    if window:
+        merged_data['range'] = (since.isoformat(), until.isoformat())
+        merged_data['split'] = split.isoformat()
     spinner.stop(f"{merged_data['stats'][0]:,} total messages combined")
-    print(f"[*] Generating report...")
+    for path, ndjson in ((args.json, False), (args.ndjson, True)):
+        if path:
+            with stage('export'):
+                export_stats(merged_data, path, year, has_imessage, has_whatsapp, ndjson)
+            print(f"[*] Stats saved to {path}")
+    print("[*] Generating report...")
     spinner.start("Building your wrapped...")
-    gen_html(merged_data, args.output, year, has_imessage, has_whatsapp)
+    with stage('render'):
+        gen_html(merged_data, args.output, year, has_imessage, has_whatsapp)
     spinner.stop(f"Saved to {args.output}")
-    subprocess.run(['open', args.output])
-    print("\n Done! Click through your wrapped.\n")
+    if args.profile:
+        print(f"[*] Profile saved to {args.profile}")
+        write_profile(args.profile)
+    close_dbs()
+    open_in_macos(args.output)
+    print("\n  Done! Click through your wrapped.\n")
+
 if __name__ == '__main__':
-    main()
+    try:
+        main()
+    finally:
+        # Deletes a --snapshot copy even when main() fails or is interrupted before its own close_dbs()
+        close_dbs()
@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 
-import sqlite3, os, sys, re, subprocess, argparse, glob, threading, time
-from datetime import datetime, timedelta
+import sqlite3, os, sys, atexit, re, subprocess, argparse, glob, threading, time, tempfile, urllib.parse, heapq, hashlib, json, base64, contextlib, bisect, copy
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from array import array
+from datetime import datetime, date, timedelta
 
-IMESSAGE_DB = os.path.expanduser("~/Library/Messages/chat.db")
-ADDRESSBOOK_DIR = os.path.expanduser("~/Library/Application Support/AddressBook")
+IMESSAGE_DB = os.environ.get("WRAP2025_IMESSAGE_DB") or os.path.expanduser("~/Library/Messages/chat.db")
+ADDRESSBOOK_DIR = os.environ.get("WRAP2025_ADDRESSBOOK_DIR") or os.path.expanduser("~/Library/Application Support/AddressBook")
 
 class Spinner:
     def __init__(self, message=""):
@@ -25,7 +28,7 @@ class Spinner:
         if message:
             self.message = message
         self.spinning = True
-        self.thread = threading.Thread(target=self.spin)
+        self.thread = threading.Thread(target=self.spin, daemon=True)
         self.thread.start()
 
     def stop(self, final_message=None):
@@ -42,20 +45,384 @@ TS_JUN_2025 = 1748736000
 TS_2024 = 1704067200
 TS_JUN_2024 = 1717200000
 
+def apple_ns(ts):
+    """Unix timestamp -> raw message.date value (nanoseconds since 2001-01-01)."""
+    return (ts - 978307200) * 1000000000
+
+# Bounds are compared against the bare `date` column so SQLite can range-scan its index
+# instead of evaluating (date/1000000000+978307200) on every row.
+def date_after(ts, col='date'):
+    """Same rows as (col/1000000000+978307200)>ts: integer division only passes once a whole second past ts."""
+    return f"{col}>={apple_ns(ts + 1)}"
+
+def date_before(ts, col='date'):
+    return f"{col}<{apple_ns(ts)}"
+
+def date_from(ts, col='date'):
+    return f"{col}>={apple_ns(ts)}"
+
+def date_window(ts_start, ts_end=None, col='date'):
+    """Open window: date_after(ts_start), the fixed-year bound. Closed (--since/--until, --years): the half-open [ts_start, ts_end)."""
+    if ts_end is None:
+        return date_after(ts_start, col)
+    return f"{date_from(ts_start, col)} AND {date_before(ts_end, col)}"
+
+WEEKDAYS = ['Sunday','Monday','Tuesday','Wednesday','Thursday','Friday','Saturday']
+TAPBACK_PREFIXES = ('loved "', 'liked "', 'disliked "', 'laughed at "', 'emphasized "', 'questioned "')
+SCAN_BATCH_SIZE = 5000
+CACHE_PATH = os.path.expanduser("~/Library/Caches/wrap2025/imessage_scan.sqlite")
+CACHE_VERSION = 5
+
+# Emoji graphemes. Pictographs with default emoji presentation count on their own; text-default
+# symbols (❤ ☀ ✌ ...) only with VS16 or a skin tone. Flags, keycaps, tag sequences and ZWJ chains
+# (👩‍❤️‍👨, 👍🏽) are matched whole, so each grapheme is counted once.
+EMOJI_PRESENTATION = (
+    '\U0001F004\U0001F0CF\U0001F18E\U0001F191-\U0001F19A\U0001F201\U0001F21A\U0001F22F\U0001F232-\U0001F236'
+    '\U0001F238-\U0001F23A\U0001F250\U0001F251\U0001F300-\U0001F64F\U0001F680-\U0001F6FF\U0001F7E0-\U0001F7FF'
+    '\U0001F90C-\U0001F9FF\U0001FA70-\U0001FAFF\u231A\u231B\u23E9-\u23EC\u23F0\u23F3\u25FD\u25FE\u2614\u2615'
+    '\u2648-\u2653\u267F\u2693\u26A1\u26AA\u26AB\u26BD\u26BE\u26C4\u26C5\u26CE\u26D4\u26EA\u26F2\u26F3\u26F5'
+    '\u26FA\u26FD\u2705\u270A\u270B\u2728\u274C\u274E\u2753-\u2755\u2757\u2795-\u2797\u27B0\u27BF\u2B1B\u2B1C'
+    '\u2B50\u2B55'
+)
+EMOJI_TEXT = (
+    '\u00A9\u00AE\u203C\u2049\u2122\u2139\u2194-\u2199\u21A9\u21AA\u2328\u23CF\u23ED-\u23EF\u23F1\u23F2'
+    '\u23F8-\u23FA\u24C2\u25AA\u25AB\u25B6\u25C0\u25FB\u25FC\u2600-\u27BF\u2934\u2935\u2B05-\u2B07\u3030\u303D'
+    '\u3297\u3299\U0001F170\U0001F171\U0001F17E\U0001F17F\U0001F202\U0001F237'
+)
+EMOJI_SKIN = '\U0001F3FB-\U0001F3FF'
+EMOJI_RE = re.compile(
+    '[\U0001F1E6-\U0001F1FF]{2}'
+    '|\U0001F3F4[\U000E0020-\U000E007E]+\U000E007F'
+    '|[0-9#*]\uFE0F?\u20E3'
+    f'|(?:[{EMOJI_PRESENTATION}]|[{EMOJI_TEXT}](?=[\uFE0F{EMOJI_SKIN}]))[{EMOJI_SKIN}]?\uFE0F?'
+    f'(?:\u200D[{EMOJI_PRESENTATION}{EMOJI_TEXT}][{EMOJI_SKIN}]?\uFE0F?)*'
+)
+EMOJI_TOP_K = 5
+
+def count_emoji(texts, counts=None):
+    """Add every emoji grapheme in texts to a Counter (one regex pass, repeats included)."""
+    counts = Counter() if counts is None else counts
+    # Newlines can't be part of a grapheme, so a whole batch is scanned in one findall()
+    counts.update(EMOJI_RE.findall('\n'.join(texts)))
+    return counts
+
+def top_emoji(counts, k=EMOJI_TOP_K):
+    return heapq.nsmallest(k, counts.items(), key=lambda x: (-x[1], x[0]))
+
+def is_typed(text):
+    """A sent text whose words count: not empty, an attachment or a tapback reaction."""
+    return bool(text) and '￼' not in text and not text[:12].lower().startswith(TAPBACK_PREFIXES)
+
+# Words are runs of letters/digits (apostrophes inside allowed, curly ones normalized first), so
+# spacing, newlines and emoji don't count. A newline token marks message and line breaks, where
+# two-word phrases can't span.
+WORD_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)*|\n")
+STOPWORDS = frozenset("""
+    a about after all also am an and any are as at be because been but by can could did do does doing
+    don't for from get got had has have he her him his how i i'm if in into is it it's its just me my no
+    not of on or our out she so some than that that's the their them then there they this to too up us
+    was we were what when where which who will with would you you're your u im ur
+""".split()) | {'\n'}  # the break token is never a word
+TOP_WORDS_K = 10
+TOP_PHRASES_K = 5
+WORDS_CAPACITY = 1000  # counters kept by each top-words/phrases summary, however large the corpus
+
+def merge_heavy_hitters(summary, counts, capacity=WORDS_CAPACITY):
+    """Misra–Gries: add counts into the summary dict in place, then if it holds more than capacity keys,
+    take the (capacity+1)-th largest count off every key and drop those left at zero.
+
+    Each kept count undercounts by at most total/(capacity+1), and summaries merge the same way.
+    """
+    for key, n in counts.items():
+        summary[key] = summary.get(key, 0) + n
+    if len(summary) > capacity:
+        cut = heapq.nlargest(capacity + 1, summary.values())[-1]
+        for key, n in list(summary.items()):
+            if n > cut:
+                summary[key] = n - cut
+            else:
+                del summary[key]
+
+def count_vocabulary(texts, top_words, top_phrases):
+    """Tokenize a batch of sent texts in one pass: their exact word count. Words and two-word phrases
+    without stopwords are merged into the top_words / top_phrases summaries."""
+    tokens = WORD_RE.findall('\n'.join(texts).lower().replace('’', "'"))
+    words = Counter(tokens)
+    breaks = words.get('\n', 0)
+    merge_heavy_hitters(top_words, {w: n for w, n in words.items() if w not in STOPWORDS and not w.isdigit()})
+    phrases = Counter(zip(tokens, tokens[1:]))
+    merge_heavy_hitters(top_phrases, {f"{a} {b}": n for (a, b), n in phrases.items() if a not in STOPWORDS and b not in STOPWORDS})
+    return len(tokens) - breaks
+
+def top_counts(summary, k):
+    return heapq.nsmallest(k, summary.items(), key=lambda x: (-x[1], x[0]))
+
+# Newer macOS leaves message.text NULL and keeps the text only in attributedBody, a typedstream
+# archive of an NSAttributedString. Its first C-string field ('+') is the NSString's UTF-8 bytes.
+TYPEDSTREAM_TEXT = b'\x84\x01+'
+
+def attributed_text(blob):
+    """The text of an attributedBody blob, sliced out without decoding the rest of the archive; None if absent."""
+    i = blob.find(TYPEDSTREAM_TEXT) + 3 if blob else 0
+    if i < 3 or i >= len(blob):
+        return None
+    buf = memoryview(blob)
+    n = buf[i]
+    # Lengths under 0x80 are one byte; 0x81 / 0x82 prefix a little-endian 16 / 32-bit length
+    if n == 0x81:
+        if i + 3 > len(buf):
+            return None  # truncated blob: the length prefix itself is cut off
+        n, i = buf[i + 1] | buf[i + 2] << 8, i + 3
+    elif n == 0x82:
+        if i + 5 > len(buf):
+            return None
+        n, i = int.from_bytes(buf[i + 1:i + 5], 'little'), i + 5
+    else:
+        i += 1
+    return str(buf[i:i + n], 'utf-8', 'replace')
+
+class P2Quantile:
+    """Streaming estimate of one quantile in constant memory (Jain & Chlamtac's P² algorithm)."""
+    __slots__ = ('p', 'n', 'q', 'pos', 'want', 'step')
+
+    def __init__(self, p):
+        self.p, self.n = p, 0
+        self.q = []  # marker heights; the first five samples, sorted, until the markers exist
+        self.pos = [1, 2, 3, 4, 5]
+        self.want = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.step = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        self.n += 1
+        q, pos, want = self.q, self.pos, self.want
+        if self.n <= 5:
+            bisect.insort(q, x)
+            return
+        if x < q[0]:
+            q[0], k = x, 0
+        elif x >= q[4]:
+            q[4], k = x, 3
+        else:
+            k = bisect.bisect_right(q, x) - 1
+        for i in range(k + 1, 5):
+            pos[i] += 1
+        for i in range(5):
+            want[i] += self.step[i]
+        # Nudge each middle marker one position towards where it should be, along a parabola through its neighbours
+        for i in (1, 2, 3):
+            gap = want[i] - pos[i]
+            if (gap >= 1 and pos[i + 1] - pos[i] > 1) or (gap <= -1 and pos[i - 1] - pos[i] < -1):
+                s = 1 if gap > 0 else -1
+                h = q[i] + s / (pos[i + 1] - pos[i - 1]) * (
+                    (pos[i] - pos[i - 1] + s) * (q[i + 1] - q[i]) / (pos[i + 1] - pos[i])
+                    + (pos[i + 1] - pos[i] - s) * (q[i] - q[i - 1]) / (pos[i] - pos[i - 1]))
+                if not q[i - 1] < h < q[i + 1]:
+                    h = q[i] + s * (q[i + s] - q[i]) / (pos[i + s] - pos[i])
+                q[i] = h
+                pos[i] += s
+
+    def saved(self):
+        return [self.p, self.n, self.q, self.pos, self.want]
+
+    @classmethod
+    def restore(cls, saved):
+        p, n, q, pos, want = saved
+        s = cls(p)
+        s.n, s.q, s.pos, s.want = n, q, pos, want
+        return s
+
+    def value(self):
+        if self.n > 5:
+            return self.q[2]
+        # Too few samples for markers: the exact (nearest-rank) quantile
+        return self.q[round(self.p * (self.n - 1))] if self.q else None
+
+class ResponseTimes:
+    """Reply delays: an exact running mean plus P² median/p90 sketches overall and per contact, O(contacts) memory."""
+    QUANTILES = (0.5, 0.9)
+
+    def __init__(self):
+        self.n = self.total = 0
+        self.sketch = [P2Quantile(p) for p in self.QUANTILES]
+        self.contacts = {}  # key -> [replies, *sketches]
+
+    def add(self, key, secs):
+        self.n += 1
+        self.total += secs
+        for s in self.sketch:
+            s.add(secs)
+        c = self.contacts.get(key)
+        if c is None:
+            c = self.contacts[key] = [0] + [P2Quantile(p) for p in self.QUANTILES]
+        c[0] += 1
+        for s in c[1:]:
+            s.add(secs)
+
+    def mean_minutes(self):
+        return self.total / self.n / 60.0 if self.n else None
+
+    def quantiles(self):
+        """(median, p90) seconds over every reply, None without replies."""
+        return tuple(None if s.value() is None else round(s.value()) for s in self.sketch)
+
+    def per_contact(self, names=None, limit=20):
+        """[(name, replies, median, p90)] for the contacts replied to most; names maps keys to handles (None drops a key).
+
+        Sketches can't be merged, so when several keys share a handle the one with the most replies stands for it.
+        """
+        rows = {}
+        for key, (n, *sketch) in self.contacts.items():
+            name = key if names is None else names.get(key)
+            if name is not None and n > rows.get(name, (0,))[0]:
+                rows[name] = (n, *(round(s.value()) for s in sketch))
+        return sorted([(name, *r) for name, r in rows.items()], key=lambda x: (-x[1], x[0]))[:limit]
+
+SESSION_GAP = 14400     # a 1:1 message over 4h after its thread's last one opens a new conversation
+DOUBLE_TEXT_GAP = 600   # your message 10+ min after your own unanswered one is a double text
+
+class Session:
+    """One conversation: a run of a 1:1 thread's messages with no gap over SESSION_GAP."""
+    __slots__ = ('contact', 'start', 'end', 'from_me', 'last_me', 'sent', 'received', 'reply_n', 'reply_sum', 'double_texts')
+
+    def __init__(self, contact, start, from_me):
+        self.contact, self.start, self.end = contact, start, start
+        self.from_me = self.last_me = from_me
+        self.sent = self.received = self.reply_n = self.reply_sum = self.double_texts = 0
+
+    def saved(self):
+        return [getattr(self, k) for k in self.__slots__]
+
+    @classmethod
+    def restore(cls, saved):
+        s = cls.__new__(cls)
+        for k, v in zip(cls.__slots__, saved):
+            setattr(s, k, v)
+        return s
+
+class Conversations:
+    """1:1 messages, fed in date order, split per thread into Sessions.
+
+    A session is folded into the running totals once its thread moves on, so only each thread's
+    latest session is held: memory grows with threads, not messages.
+    """
+    TOTALS = ('count', 'started', 'messages', 'seconds', 'double')
+
+    def __init__(self):
+        self.replies = ResponseTimes()
+        self.open = {}       # thread -> its latest Session, which later messages may still extend
+        for k in self.TOTALS:
+            setattr(self, k, 0)
+        self.longest = None  # closed Session with the most messages
+
+    def add(self, thread, contact, ts, me):
+        prev = s = self.open.get(thread)
+        if prev is None or ts - prev.end > SESSION_GAP:
+            s = self.open[thread] = Session(contact, ts, me)
+        if prev is not None:
+            # A reply (10s-24h after a received message) may open the next session; it counts there
+            gap = ts - prev.end
+            if me and not prev.last_me and 10 < gap < 86400:
+                s.reply_n += 1
+                s.reply_sum += gap
+                self.replies.add(contact, gap)
+            elif me and prev.last_me and gap >= DOUBLE_TEXT_GAP:
+                s.double_texts += 1
+            if s is not prev:
+                self.close(prev)
+        s.end, s.last_me = ts, me
+        if me:
+            s.sent += 1
+        else:
+            s.received += 1
+
+    def close(self, s):
+        self.count += 1
+        self.started += s.from_me
+        self.messages += s.sent + s.received
+        self.seconds += s.end - s.start
+        self.double += s.double_texts > 0
+        if self.longest is None or s.sent + s.received > self.longest.sent + self.longest.received:
+            self.longest = s
+
+    def summary(self, d, names=None, epoch=0):
+        """Fill d's starter %, response-time and session metrics; names maps contacts to handles, epoch makes ts Unix time."""
+        # Open sessions count as they stand, on a copy so later messages can still extend them
+        t = copy.copy(self)
+        for s in self.open.values():
+            t.close(s)
+        replies = self.replies
+        d['starter_pct'] = round((t.started / t.count) * 100) if t.count else 50
+        d['resp'] = int(replies.mean_minutes() or 30)
+        d['resp_median'], d['resp_p90'] = replies.quantiles()
+        d['resp_contacts'] = replies.per_contact(names)
+        d['sessions'] = None
+        if t.count:
+            s = t.longest
+            d['sessions'] = {
+                'count': t.count,
+                'avg_minutes': round(t.seconds / t.count / 60),
+                'avg_messages': round(t.messages / t.count, 1),
+                'double_text_pct': round(t.double * 100 / t.count),
+                'longest': {
+                    'contact': s.contact if names is None else names.get(s.contact),
+                    'messages': s.sent + s.received,
+                    'minutes': round((s.end - s.start) / 60),
+                    'date': datetime.fromtimestamp(s.start + epoch).strftime('%Y-%m-%d'),
+                },
+            }
+        return d
+
+class DigitsOnly(dict):
+    """str.translate() table that keeps decimal digits (the characters a regex digit class matches) and drops everything else."""
+    def __missing__(self, c):
+        keep = self[c] = c if chr(c).isdecimal() else None
+        return keep
+
+DIGITS_ONLY = DigitsOnly()
+
 def normalize_phone(phone):
     if not phone: return None
-    digits = re.sub(r'\D', '', str(phone))
+    digits = str(phone).translate(DIGITS_ONLY)
     if len(digits) == 11 and digits.startswith('1'):
         digits = digits[1:]
     elif len(digits) > 10:
         return digits
     return digits[-10:] if len(digits) >= 10 else (digits if len(digits) >= 7 else None)
 
-def extract_contacts():
-    contacts = {}
+class ContactIndex(dict):
+    """extract_contacts() lookup keys -> names, plus a memo of handles already resolved by get_name()."""
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.names = {}
+
+    def name(self, handle):
+        try:
+            return self.names[handle]
+        except KeyError:
+            name = self.names[handle] = get_name(handle, self)
+            return name
+
+    def resolve_all(self, handles):
+        """Batch pass: resolve every distinct handle not seen yet."""
+        for handle in set(handles) - self.names.keys():
+            self.names[handle] = get_name(handle, self)
+        return self.names
+
+def extract_contacts(cache_path=None):
     db_paths = glob.glob(os.path.join(ADDRESSBOOK_DIR, "Sources", "*", "AddressBook-v22.abcddb"))
     main_db = os.path.join(ADDRESSBOOK_DIR, "AddressBook-v22.abcddb")
     if os.path.exists(main_db): db_paths.append(main_db)
+    # The index only changes when an AddressBook database (or its WAL) does
+    sources = sorted([f, os.stat(f).st_mtime_ns] for p in db_paths for f in (p, p + '-wal') if os.path.exists(f))
+    if cache_path:
+        try:
+            with open(cache_path) as f:
+                cached = json.load(f)
+            if cached.get('sources') == sources:
+                return ContactIndex(cached['contacts'])
+        except (OSError, ValueError):
+            pass
+    contacts = {}
     for db_path in db_paths:
         try:
             conn = sqlite3.connect(db_path)
@@ -66,7 +433,7 @@ def extract_contacts():
             for owner, phone in conn.execute("SELECT ZOWNER, ZFULLNUMBER FROM ZABCDPHONENUMBER WHERE ZFULLNUMBER IS NOT NULL"):
                 if owner in people:
                     name = people[owner]
-                    digits = re.sub(r'\D', '', str(phone))
+                    digits = str(phone).translate(DIGITS_ONLY)
                     if digits:
                         contacts[digits] = name
                         if len(digits) >= 10:
@@ -79,7 +446,16 @@ def extract_contacts():
                 if owner in people: contacts[email.lower().strip()] = people[owner]
             conn.close()
         except: pass
-    return contacts
+    if cache_path:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(cache_path)), suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'sources': sources, 'contacts': contacts}, f)
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass
+    return ContactIndex(contacts)
 
 def get_name(handle, contacts):
     # FIX: Check for None (NULL) handles returned by the LEFT JOIN
@@ -93,7 +469,7 @@ def get_name(handle, contacts):
         if lookup in contacts: return contacts[lookup]
         return handle.split('@')[0]
         
-    digits = re.sub(r'\D', '', str(handle))
+    digits = str(handle).translate(DIGITS_ONLY)
     if digits in contacts: return contacts[digits]
     if len(digits) == 11 and digits.startswith('1'):
         if digits[1:] in contacts: return contacts[digits[1:]]
@@ -104,9 +480,15 @@ def get_name(handle, contacts):
         
     return handle
 
+def open_in_macos(target):
+    """Hand a file or settings URL to macOS `open`; elsewhere (e.g. Linux CI on synthetic databases) there is nothing to hand it to."""
+    if sys.platform == 'darwin':
+        subprocess.run(['open', target])
+
 def check_access():
     if not os.path.exists(IMESSAGE_DB):
-        print("\n[FATAL] Not macOS.")
+        print(f"\n[FATAL] No Messages database at {IMESSAGE_DB}" + ("." if sys.platform == 'darwin' else " (not macOS)."))
+        print("   Use --imessage-db PATH (or WRAP2025_IMESSAGE_DB) to read another chat.db.")
         sys.exit(1)
     try:
         conn = sqlite3.connect(IMESSAGE_DB)
@@ -115,244 +497,493 @@ def check_access():
     except:
         print("\n⚠️  ACCESS DENIED")
         print("   System Settings → Privacy & Security → Full Disk Access → Add Terminal")
-        subprocess.run(['open', 'x-apple.systempreferences:com.apple.preference.security?Privacy_AllFiles'])
+        open_in_macos('x-apple.systempreferences:com.apple.preference.security?Privacy_AllFiles')
         sys.exit(1)
 
+# Page cache / mmap budget for the read-only analysis connections
+CACHE_SIZE_KB = 262144  # 256 MB
+MMAP_SIZE = 2147418112  # SQLite's default compile-time ceiling (~2 GB)
+
+class ReadOnlyDB:
+    """Opens a database once per thread in read-only URI mode and reuses it for every query."""
+    PRAGMAS = (
+        "PRAGMA query_only = ON",
+        f"PRAGMA cache_size = -{CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size = {MMAP_SIZE}",
+        "PRAGMA temp_store = MEMORY",
+    )
+
+    def __init__(self, path, snapshot=None):
+        self.source = path
+        self.path = path
+        self.uri = f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro"
+        self.keeper = None
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.conns = []
+        self.stats = []
+        self.scratch = None  # side database holding prepare()'s tables, attached to every connection as `scratch`
+        if snapshot:
+            self.take_snapshot(snapshot)
+
+    def take_snapshot(self, mode):
+        """Copy the live database, WAL included, with the backup API so every query sees one point in time."""
+        src = sqlite3.connect(self.uri, uri=True)
+        if mode == 'memory':
+            # Named shared-cache memory DB: worker connections see it for as long as the keeper stays open
+            self.path = ':memory:'
+            self.uri = f"file:wrapped-snapshot-{id(self)}?mode=memory&cache=shared"
+            self.keeper = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+            dst = self.keeper
+        else:
+            fd, self.path = tempfile.mkstemp(prefix='wrapped-snapshot-', suffix='.sqlite')
+            os.close(fd)
+            self.uri = f"file:{urllib.parse.quote(self.path)}?mode=ro"
+            dst = sqlite3.connect(self.path)
+        try:
+            src.backup(dst)
+            if dst is not self.keeper:
+                # The copy inherits a WAL source's journal mode, and read-only connections would then leave -wal/-shm files behind
+                dst.execute("PRAGMA journal_mode = DELETE")
+        except BaseException:
+            # A half-written copy of the chat database must not outlive a failed backup
+            dst.close()
+            self.close()
+            raise
+        finally:
+            src.close()
+            if dst is not self.keeper:
+                dst.close()
+
+    def connect(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+            for pragma in self.PRAGMAS:
+                conn.execute(pragma)
+            stats = {'thread': threading.current_thread().name, 'queries': 0, 'rows': 0, 'seconds': 0.0}
+            with self.lock:
+                self.conns.append(conn)
+                self.stats.append(stats)
+            self.local.conn, self.local.stats, self.local.attached = conn, stats, False
+        if self.scratch and not self.local.attached:
+            conn.execute("ATTACH DATABASE ? AS scratch", (self.scratch,))
+            self.local.attached = True
+        return conn
+
+    def prepare(self, name, script):
+        """Run setup SQL once, on the calling thread, building its tables in the `scratch` schema.
+
+        scratch is a temp database file every connection attaches, so --jobs workers read one shared copy
+        instead of each rebuilding it. Call it before the queries that read the tables, not while they run.
+        """
+        with self.lock:
+            if self.scratch is None:
+                fd, self.scratch = tempfile.mkstemp(prefix='wrapped-scratch-', suffix='.sqlite')
+                os.close(fd)
+        conn = self.connect()
+        stats = self.local.stats
+        t0 = time.perf_counter()
+        # query_only refuses writes to attached databases too, so lift it just for the setup script
+        conn.execute("PRAGMA query_only = OFF")
+        try:
+            with stage(f'setup {name}'):
+                # Throwaway tables: no rollback journal or fsyncs
+                conn.execute("PRAGMA scratch.journal_mode = OFF")
+                conn.execute("PRAGMA scratch.synchronous = OFF")
+                conn.executescript(script)
+        finally:
+            conn.execute("PRAGMA query_only = ON")
+        stats['queries'] += 1
+        stats['seconds'] += time.perf_counter() - t0
+
+    def q(self, sql, params=()):
+        conn = self.connect()
+        t0 = time.perf_counter()
+        r = conn.execute(sql, params).fetchall()
+        stats = self.local.stats
+        stats['queries'] += 1
+        stats['rows'] += len(r)
+        stats['seconds'] += time.perf_counter() - t0
+        return r
+
+    def stream(self, sql, batch_size, params=()):
+        """Yield result rows in fetchmany() batches instead of materializing them all."""
+        cur = self.connect().cursor()
+        stats = self.local.stats
+        t0 = time.perf_counter()
+        cur.execute(sql, params)
+        stats['queries'] += 1
+        try:
+            while True:
+                rows = cur.fetchmany(batch_size)
+                stats['seconds'] += time.perf_counter() - t0
+                if not rows:
+                    break
+                stats['rows'] += len(rows)
+                yield rows
+                t0 = time.perf_counter()
+        finally:
+            cur.close()
+
+    def close(self):
+        with self.lock:
+            for conn in self.conns:
+                conn.close()
+            self.conns = []
+        self.local = threading.local()
+        if self.keeper:
+            self.keeper.close()
+            self.keeper = None
+        elif self.path != self.source and os.path.exists(self.path):
+            os.remove(self.path)
+        if self.scratch and os.path.exists(self.scratch):
+            os.remove(self.scratch)
+        self.scratch = None
+
+DBS = {}
+DBS_LOCK = threading.Lock()
+SNAPSHOT = None  # None, 'file' or 'memory' (--snapshot)
+
+def get_db(path):
+    """Shared read-only connection manager for a database path."""
+    with DBS_LOCK:
+        if path not in DBS:
+            DBS[path] = ReadOnlyDB(path, snapshot=SNAPSHOT)
+        return DBS[path]
+
+def close_dbs():
+    with DBS_LOCK:
+        for db in DBS.values():
+            db.close()
+        DBS.clear()
+
+# Snapshot and scratch files are temp files: remove them even when the scripts are imported and close_dbs() is never called
+atexit.register(close_dbs)
+
 def q(sql):
-    conn = sqlite3.connect(IMESSAGE_DB)
-    r = conn.execute(sql).fetchall()
-    conn.close()
-    return r
+    return get_db(IMESSAGE_DB).q(sql)
+
+JOBS = 1  # worker threads for the metric queries (--jobs)
+METRIC_TIMES = {}  # metric name -> seconds its query took, filled by run_metrics()
+PROFILE = None  # {'queries': {...}, 'stages': {...}} while --profile is collecting, else None
+PROFILE_STEP = 1000  # SQLite VM instructions between progress-handler ticks
+PROFILE_LOCK = threading.Lock()
+
+@contextlib.contextmanager
+def stage(name):
+    """Add the wall time of the with-block to PROFILE['stages'][name] (a no-op without --profile)."""
+    if PROFILE is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        secs = time.perf_counter() - t0
+        with PROFILE_LOCK:
+            PROFILE['stages'][name] = PROFILE['stages'].get(name, 0.0) + secs
+
+def query_plan(conn, sql):
+    """EXPLAIN QUERY PLAN of sql as detail lines indented by their depth in the plan tree."""
+    depth, lines = {0: -1}, []
+    for node, parent, _, detail in conn.execute(f"EXPLAIN QUERY PLAN {sql}"):
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node] + detail)
+    return lines
+
+def profile_query(db, name, job):
+    """Run one metric like run_metrics() does, recording wall time, rows, VM steps and the plan of every statement it ran."""
+    conn = db.connect()
+    stats = db.local.stats
+    steps, statements = [0], []
+    def tick():
+        steps[0] += PROFILE_STEP
+        return 0
+    conn.set_progress_handler(tick, PROFILE_STEP)
+    conn.set_trace_callback(statements.append)
+    rows, t0 = stats['rows'], time.perf_counter()
+    try:
+        result = job(db) if callable(job) else db.q(job)
+    finally:
+        secs = time.perf_counter() - t0
+        conn.set_progress_handler(None, PROFILE_STEP)
+        conn.set_trace_callback(None)
+    plan = [line for sql in statements if re.match(r'\s*(SELECT|WITH)\b', sql, re.I) for line in query_plan(conn, sql)]
+    with PROFILE_LOCK:
+        PROFILE['queries'][name] = {'seconds': secs, 'rows': stats['rows'] - rows, 'vm_steps': steps[0], 'plan': plan}
+    return result
+
+def write_profile(path):
+    """Save PROFILE (slowest first) plus per-connection totals as JSON, and print it as two tables."""
+    stages = dict(sorted(PROFILE['stages'].items(), key=lambda x: -x[1]))
+    queries = dict(sorted(PROFILE['queries'].items(), key=lambda x: -x[1]['seconds']))
+    connections = [dict(stats, db=db.source) for db in DBS.values() for stats in db.stats]
+    with open(path, 'w') as f:
+        json.dump({'stages': stages, 'queries': queries, 'connections': connections}, f, indent=2)
+    print(f"      {'stage':<28} {'ms':>9}")
+    for name, secs in stages.items():
+        print(f"      {name:<28} {secs * 1000:9.1f}")
+    print(f"      {'query':<28} {'ms':>9} {'rows':>9} {'vm steps':>12}  plan")
+    for name, p in queries.items():
+        print(f"      {name:<28} {p['seconds'] * 1000:9.1f} {p['rows']:9,} {p['vm_steps']:12,}  {p['plan'][0].strip() if p['plan'] else '-'}")
+
+def emoji_histogram(db, sql, batch_size=SCAN_BATCH_SIZE, decode=None):
+    """Stream the (text,) rows of sql once and count their emoji; decode turns each value into text first."""
+    counts = Counter()
+    for rows in db.stream(sql, batch_size):
+        texts = [text for text, in rows] if decode is None else [text for text in (decode(v) for v, in rows) if text]
+        count_emoji(texts, counts)
+    return counts
+
+def vocabulary(db, sql, batch_size=SCAN_BATCH_SIZE):
+    """Stream the (text, attributedBody) rows of sql once: (exact word count, top-words summary, top-phrases summary)."""
+    words, top_words, top_phrases = 0, {}, {}
+    for rows in db.stream(sql, batch_size):
+        texts = [text if body is None else attributed_text(body) for text, body in rows]
+        words += count_vocabulary([text for text in texts if is_typed(text)], top_words, top_phrases)
+    return words, top_words, top_phrases
+
+def conversations(db, sql, batch_size=SCAN_BATCH_SIZE):
+    """Stream the (thread, contact, ts, from_me) 1:1 rows of sql, in ts order, into Conversations."""
+    talks = Conversations()
+    for rows in db.stream(sql, batch_size):
+        for row in rows:
+            talks.add(*row)
+    return talks
+
+def run_metrics(db, queries):
+    """Run independent named queries (SQL or callables), spread over JOBS threads (one connection each), and time every one."""
+    def run(name):
+        t0 = time.perf_counter()
+        job = queries[name]
+        if PROFILE is not None:
+            rows = profile_query(db, name, job)
+        else:
+            # A callable is a Python-side stage that streams its own rows from db
+            rows = job(db) if callable(job) else db.q(job)
+        METRIC_TIMES[name] = time.perf_counter() - t0
+        return rows
+    # A lone query runs on the caller's connection: a pool thread would open (and set up) a new one just for it
+    if JOBS <= 1 or len(queries) <= 1:
+        return {name: run(name) for name in queries}
+    with ThreadPoolExecutor(max_workers=min(JOBS, len(queries)), thread_name_prefix='metric') as pool:
+        return dict(zip(queries, pool.map(run, queries)))
+
+def merge_group_senders(raw_senders, contacts):
+    """Merge (sender_id, msg_count) rows whose handles resolve to the same contact (FORCED MERGE)."""
+    merged_senders = {}
+
+    for handle_id, msg_count in raw_senders:
+        # Resolve the raw ID to the contact's display name
+        contact_name = contacts.name(handle_id)
+
+        if contact_name not in merged_senders:
+            # Store new sender, using the resolved name for display
+            merged_senders[contact_name] = {'id': handle_id, 'msg_count': msg_count, 'display_name': contact_name}
+        else:
+            # Merge the message count for handles belonging to the same resolved name
+            merged_senders[contact_name]['msg_count'] += msg_count
 
-def analyze(ts_start, ts_jun, contacts):
-    d = {}
+    # Convert back to a list and re-sort by the combined count
+    return sorted(merged_senders.values(), key=lambda x: -x['msg_count'])
 
-    one_on_one_cte = """
-        WITH chat_participants AS (
-            SELECT chat_id, COUNT(*) as participant_count
-            FROM chat_handle_join
-            GROUP BY chat_id
-        ),
-        one_on_one_messages AS (
-            SELECT m.ROWID as msg_id
+def summarize(d):
+    """Daily-activity stats and personality, derived from the metrics both engines produce."""
+    from datetime import datetime as dt
+    if d['daily_counts']:
+        all_counts = list(d['daily_counts'].values())
+        d['max_daily'] = max(all_counts) if all_counts else 0
+        d['active_days'] = len([c for c in all_counts if c > 0])
+        d['avg_daily'] = round(sum(all_counts) / max(len(all_counts), 1))
+        monthly_counts = {}
+        for date_str, count in d['daily_counts'].items():
+            month_key = date_str[:7]
+            monthly_counts[month_key] = monthly_counts.get(month_key, 0) + count
+        busiest_month_key = max(monthly_counts, key=monthly_counts.get) if monthly_counts else '2025-01'
+        d['busiest_month'] = dt.strptime(busiest_month_key, '%Y-%m').strftime('%b')
+        first_dt = dt.strptime(min(d['daily_counts'].keys()), '%Y-%m-%d').date() if d['daily_counts'] else dt.now().date()
+        last_dt = dt.strptime(max(d['daily_counts'].keys()), '%Y-%m-%d').date() if d['daily_counts'] else dt.now().date()
+        total_days_in_range = (last_dt - first_dt).days + 1
+        d['quiet_days'] = total_days_in_range - d['active_days']
+    else:
+        d['max_daily'] = 0
+        d['active_days'] = 0
+        d['avg_daily'] = 0
+        d['busiest_month'] = 'N/A'
+        d['quiet_days'] = 0
+
+    s = d['stats']
+    ratio = s[1] / (s[2] + 1)
+    if d['hour'] < 5 or d['hour'] > 22: d['personality'] = ("NOCTURNAL MENACE", "terrorizes people at ungodly hours")
+    elif d['resp'] < 5: d['personality'] = ("TERMINALLY ONLINE", "has never touched grass")
+    elif d['resp'] > 120: d['personality'] = ("TOO COOL TO REPLY", "leaves everyone on read")
+    elif ratio < 0.5: d['personality'] = ("POPULAR (ALLEGEDLY)", "everyone wants a piece")
+    elif ratio > 2: d['personality'] = ("THE YAPPER", "carries every conversation alone")
+    elif d['starter_pct'] > 65: d['personality'] = ("CONVERSATION STARTER", "always making the first move")
+    elif d['starter_pct'] < 35: d['personality'] = ("THE WAITER", "never texts first, ever")
+    else: d['personality'] = ("SUSPICIOUSLY NORMAL", "no notes. boring but stable.")
+
+    return d
+
+def prepare_window(ts_start, ts_end=None):
+    """Classify chats, handles and the window's messages once, as indexed scratch tables every analysis connection joins."""
+    get_db(IMESSAGE_DB).prepare('window', f"""
+        DROP TABLE IF EXISTS scratch.chat_kind;
+        CREATE TABLE scratch.chat_kind (chat_id INTEGER PRIMARY KEY, participant_count INTEGER);
+        INSERT INTO chat_kind SELECT chat_id, COUNT(*) FROM chat_handle_join GROUP BY chat_id;
+
+        -- kind 1: one-on-one chat, kind 2: group chat (a message joined to several chats gets a row per chat)
+        DROP TABLE IF EXISTS scratch.message_kind;
+        CREATE TABLE scratch.message_kind (msg_id INTEGER, chat_id INTEGER, kind INTEGER);
+        INSERT INTO message_kind
+            SELECT m.ROWID, cmj.chat_id, CASE WHEN ck.participant_count=1 THEN 1 ELSE 2 END
             FROM message m
             JOIN chat_message_join cmj ON m.ROWID = cmj.message_id
-            JOIN chat_participants cp ON cmj.chat_id = cp.chat_id
-            WHERE cp.participant_count = 1
-        )
-    """
+            JOIN chat_kind ck ON cmj.chat_id = ck.chat_id
+            WHERE {date_window(ts_start, ts_end, 'm.date')};
+        CREATE INDEX scratch.message_kind_kind ON message_kind(kind, msg_id);
+        CREATE INDEX scratch.message_kind_chat ON message_kind(chat_id);
+
+        DROP TABLE IF EXISTS scratch.handle_kind;
+        CREATE TABLE scratch.handle_kind (handle_id INTEGER PRIMARY KEY, id TEXT, is_shortcode INTEGER);
+        INSERT INTO handle_kind
+            SELECT ROWID, id, LENGTH(REPLACE(REPLACE(id, '+', ''), '-', '')) BETWEEN 5 AND 6 AND REPLACE(REPLACE(id, '+', ''), '-', '') GLOB '[0-9]*'
+            FROM handle;
+    """)
+
+def analyze(ts_start, ts_jun, contacts, ts_end=None):
+    prepare_window(ts_start, ts_end)
+    d = {}
 
-    raw_stats = q(f"""{one_on_one_cte}
+    # Independent metric queries, run together by run_metrics() (in parallel with --jobs)
+    sql = {}
+    sql['stats'] = f"""
         SELECT COUNT(*), SUM(CASE WHEN is_from_me=1 THEN 1 ELSE 0 END), SUM(CASE WHEN is_from_me=0 THEN 1 ELSE 0 END), COUNT(DISTINCT handle_id)
         FROM message m
-        WHERE (date/1000000000+978307200)>{ts_start}
-        AND m.ROWID IN (SELECT msg_id FROM one_on_one_messages)
-    """)[0]
-    d['stats'] = (raw_stats[0] or 0, raw_stats[1] or 0, raw_stats[2] or 0, raw_stats[3] or 0)
-
-    d['top'] = q(f"""{one_on_one_cte}
+        WHERE {date_window(ts_start, ts_end)}
+        AND m.ROWID IN (SELECT msg_id FROM message_kind WHERE kind=1)
+    """
+    sql['top'] = f"""
         SELECT h.id, COUNT(*) t, SUM(CASE WHEN m.is_from_me=1 THEN 1 ELSE 0 END), SUM(CASE WHEN m.is_from_me=0 THEN 1 ELSE 0 END)
-        FROM message m JOIN handle h ON m.handle_id=h.ROWID
-        WHERE (m.date/1000000000+978307200)>{ts_start}
-        AND m.ROWID IN (SELECT msg_id FROM one_on_one_messages)
-        AND NOT (LENGTH(REPLACE(REPLACE(h.id, '+', ''), '-', '')) BETWEEN 5 AND 6 AND REPLACE(REPLACE(h.id, '+', ''), '-', '') GLOB '[0-9]*')
-        GROUP BY h.id ORDER BY t DESC LIMIT 20
-    """)
-
-    d['late'] = q(f"""{one_on_one_cte}
-        SELECT h.id, COUNT(*) n FROM message m JOIN handle h ON m.handle_id=h.ROWID
-        WHERE (m.date/1000000000+978307200)>{ts_start}
+        FROM message m JOIN handle_kind h ON m.handle_id=h.handle_id
+        WHERE {date_window(ts_start, ts_end, 'm.date')}
+        AND m.ROWID IN (SELECT msg_id FROM message_kind WHERE kind=1)
+        AND NOT h.is_shortcode
+        GROUP BY h.id ORDER BY t DESC, h.id LIMIT 20
+    """
+    sql['late'] = f"""
+        SELECT h.id, COUNT(*) n FROM message m JOIN handle_kind h ON m.handle_id=h.handle_id
+        WHERE {date_window(ts_start, ts_end, 'm.date')}
         AND CAST(strftime('%H',datetime((m.date/1000000000+978307200),'unixepoch','localtime')) AS INT)<5
-        AND m.ROWID IN (SELECT msg_id FROM one_on_one_messages)
-        AND NOT (LENGTH(REPLACE(REPLACE(h.id, '+', ''), '-', '')) BETWEEN 5 AND 6 AND REPLACE(REPLACE(h.id, '+', ''), '-', '') GLOB '[0-9]*')
-        GROUP BY h.id HAVING n>5 ORDER BY n DESC LIMIT 5
-    """)
-    
-    r = q(f"SELECT CAST(strftime('%H',datetime((date/1000000000+978307200),'unixepoch','localtime')) AS INT) h, COUNT(*) c FROM message WHERE (date/1000000000+978307200)>{ts_start} GROUP BY h ORDER BY c DESC LIMIT 1")
-    d['hour'] = r[0][0] if r else 12
-    
-    days = ['Sunday','Monday','Tuesday','Wednesday','Thursday','Friday','Saturday']
-    r = q(f"SELECT CAST(strftime('%w',datetime((date/1000000000+978307200),'unixepoch','localtime')) AS INT) d, COUNT(*) FROM message WHERE (date/1000000000+978307200)>{ts_start} GROUP BY d ORDER BY 2 DESC LIMIT 1")
-    d['day'] = days[r[0][0]] if r else '???'
-    
-    d['ghosted'] = q(f"""{one_on_one_cte}
-        SELECT h.id, SUM(CASE WHEN m.is_from_me=0 AND (m.date/1000000000+978307200)<{ts_jun} THEN 1 ELSE 0 END) b, SUM(CASE WHEN m.is_from_me=0 AND (m.date/1000000000+978307200)>={ts_jun} THEN 1 ELSE 0 END) a
-        FROM message m JOIN handle h ON m.handle_id=h.ROWID
-        WHERE (m.date/1000000000+978307200)>{ts_start}
-        AND m.ROWID IN (SELECT msg_id FROM one_on_one_messages)
-        AND NOT (LENGTH(REPLACE(REPLACE(h.id, '+', ''), '-', '')) BETWEEN 5 AND 6 AND REPLACE(REPLACE(h.id, '+', ''), '-', '') GLOB '[0-9]*')
-        GROUP BY h.id HAVING b>10 AND a<3 ORDER BY b DESC LIMIT 5
-    """)
-
-    d['heating'] = q(f"""{one_on_one_cte}
-        SELECT h.id, SUM(CASE WHEN (m.date/1000000000+978307200)<{ts_jun} THEN 1 ELSE 0 END) h1, SUM(CASE WHEN (m.date/1000000000+978307200)>={ts_jun} THEN 1 ELSE 0 END) h2
-        FROM message m JOIN handle h ON m.handle_id=h.ROWID
-        WHERE (m.date/1000000000+978307200)>{ts_start}
-        AND m.ROWID IN (SELECT msg_id FROM one_on_one_messages)
-        AND NOT (LENGTH(REPLACE(REPLACE(h.id, '+', ''), '-', '')) BETWEEN 5 AND 6 AND REPLACE(REPLACE(h.id, '+', ''), '-', '') GLOB '[0-9]*')
-        GROUP BY h.id HAVING h1>20 AND h2>h1*1.5 ORDER BY (h2-h1) DESC LIMIT 5
-    """)
-
-    d['fan'] = q(f"""{one_on_one_cte}
+        AND m.ROWID IN (SELECT msg_id FROM message_kind WHERE kind=1)
+        AND NOT h.is_shortcode
+        GROUP BY h.id HAVING n>5 ORDER BY n DESC, h.id LIMIT 5
+    """
+    sql['hour'] = f"SELECT CAST(strftime('%H',datetime((date/1000000000+978307200),'unixepoch','localtime')) AS INT) h, COUNT(*) c FROM message WHERE {date_window(ts_start, ts_end)} GROUP BY h ORDER BY c DESC, h LIMIT 1"
+    sql['day'] = f"SELECT CAST(strftime('%w',datetime((date/1000000000+978307200),'unixepoch','localtime')) AS INT) d, COUNT(*) FROM message WHERE {date_window(ts_start, ts_end)} GROUP BY d ORDER BY 2 DESC, d LIMIT 1"
+    sql['ghosted'] = f"""
+        SELECT h.id, SUM(CASE WHEN m.is_from_me=0 AND {date_before(ts_jun, 'm.date')} THEN 1 ELSE 0 END) b, SUM(CASE WHEN m.is_from_me=0 AND {date_from(ts_jun, 'm.date')} THEN 1 ELSE 0 END) a
+        FROM message m JOIN handle_kind h ON m.handle_id=h.handle_id
+        WHERE {date_window(ts_start, ts_end, 'm.date')}
+        AND m.ROWID IN (SELECT msg_id FROM message_kind WHERE kind=1)
+        AND NOT h.is_shortcode
+        GROUP BY h.id HAVING b>10 AND a<3 ORDER BY b DESC, h.id LIMIT 5
+    """
+    sql['heating'] = f"""
+        SELECT h.id, SUM(CASE WHEN {date_before(ts_jun, 'm.date')} THEN 1 ELSE 0 END) h1, SUM(CASE WHEN {date_from(ts_jun, 'm.date')} THEN 1 ELSE 0 END) h2
+        FROM message m JOIN handle_kind h ON m.handle_id=h.handle_id
+        WHERE {date_window(ts_start, ts_end, 'm.date')}
+        AND m.ROWID IN (SELECT msg_id FROM message_kind WHERE kind=1)
+        AND NOT h.is_shortcode
+        GROUP BY h.id HAVING h1>20 AND h2>h1*1.5 ORDER BY (h2-h1) DESC, h.id LIMIT 5
+    """
+    sql['fan'] = f"""
         SELECT h.id, SUM(CASE WHEN m.is_from_me=0 THEN 1 ELSE 0 END) t, SUM(CASE WHEN m.is_from_me=1 THEN 1 ELSE 0 END) y
-        FROM message m JOIN handle h ON m.handle_id=h.ROWID
-        WHERE (m.date/1000000000+978307200)>{ts_start}
-        AND m.ROWID IN (SELECT msg_id FROM one_on_one_messages)
-        AND NOT (LENGTH(REPLACE(REPLACE(h.id, '+', ''), '-', '')) BETWEEN 5 AND 6 AND REPLACE(REPLACE(h.id, '+', ''), '-', '') GLOB '[0-9]*')
-        GROUP BY h.id HAVING t>y*2 AND (t+y)>100 ORDER BY (t*1.0/NULLIF(y,0)) DESC LIMIT 5
-    """)
-
-    d['simp'] = q(f"""{one_on_one_cte}
+        FROM message m JOIN handle_kind h ON m.handle_id=h.handle_id
+        WHERE {date_window(ts_start, ts_end, 'm.date')}
+        AND m.ROWID IN (SELECT msg_id FROM message_kind WHERE kind=1)
+        AND NOT h.is_shortcode
+        GROUP BY h.id HAVING t>y*2 AND (t+y)>100 ORDER BY (t*1.0/NULLIF(y,0)) DESC, h.id LIMIT 5
+    """
+    sql['simp'] = f"""
         SELECT h.id, SUM(CASE WHEN m.is_from_me=1 THEN 1 ELSE 0 END) y, SUM(CASE WHEN m.is_from_me=0 THEN 1 ELSE 0 END) t
-        FROM message m JOIN handle h ON m.handle_id=h.ROWID
-        WHERE (m.date/1000000000+978307200)>{ts_start}
-        AND m.ROWID IN (SELECT msg_id FROM one_on_one_messages)
-        AND NOT (LENGTH(REPLACE(REPLACE(h.id, '+', ''), '-', '')) BETWEEN 5 AND 6 AND REPLACE(REPLACE(h.id, '+', ''), '-', '') GLOB '[0-9]*')
-        GROUP BY h.id HAVING y>t*2 AND (t+y)>100 ORDER BY (y*1.0/NULLIF(t,0)) DESC LIMIT 5
-    """)
-    
-    r = q(f"""
-        WITH chat_participants AS (
-            SELECT chat_id, COUNT(*) as participant_count
-            FROM chat_handle_join
-            GROUP BY chat_id
-        ),
-        one_on_one_messages AS (
-            SELECT m.ROWID as msg_id
-            FROM message m
-            JOIN chat_message_join cmj ON m.ROWID = cmj.message_id
-            JOIN chat_participants cp ON cmj.chat_id = cp.chat_id
-            WHERE cp.participant_count = 1
-        ),
-        g AS (
-            SELECT (m.date/1000000000+978307200) ts, m.is_from_me, m.handle_id,
-                    LAG(m.date/1000000000+978307200) OVER (PARTITION BY m.handle_id ORDER BY m.date) pt,
-                    LAG(m.is_from_me) OVER (PARTITION BY m.handle_id ORDER BY m.date) pf
-            FROM message m
-            WHERE (m.date/1000000000+978307200)>{ts_start}
-            AND m.ROWID IN (SELECT msg_id FROM one_on_one_messages)
-        )
-        SELECT AVG(ts-pt)/60.0 FROM g
-        WHERE is_from_me=1 AND pf=0 AND (ts-pt)<86400 AND (ts-pt)>10
+        FROM message m JOIN handle_kind h ON m.handle_id=h.handle_id
+        WHERE {date_window(ts_start, ts_end, 'm.date')}
+        AND m.ROWID IN (SELECT msg_id FROM message_kind WHERE kind=1)
+        AND NOT h.is_shortcode
+        GROUP BY h.id HAVING y>t*2 AND (t+y)>100 ORDER BY (y*1.0/NULLIF(t,0)) DESC, h.id LIMIT 5
+    """
+    # Starter %, response times and sessions from one pass over 1:1 messages. It walks the date index
+    # (unary + keeps the planner off the ROWID lookup), so rows arrive in order with no sort
+    sql['sessions'] = lambda db: conversations(db, f"""
+        SELECT m.handle_id, m.handle_id, m.date/1000000000+978307200, m.is_from_me
+        FROM message m
+        WHERE {date_window(ts_start, ts_end, 'm.date')}
+        AND +m.ROWID IN (SELECT msg_id FROM message_kind WHERE kind=1)
+        ORDER BY m.date
     """)
-    d['resp'] = int(r[0][0] or 30)
-    
-    emojis = ['😂','❤️','😭','🔥','💀','✨','🙏','👀','💯','😈']
-    counts = {}
-    for e in emojis:
-        r = q(f"SELECT COUNT(*) FROM message WHERE text LIKE '%{e}%' AND (date/1000000000+978307200)>{ts_start} AND is_from_me=1")
-        counts[e] = r[0][0]
-    d['emoji'] = sorted(counts.items(), key=lambda x:-x[1])[:5]
-    
-    r = q(f"""
-        SELECT
-            COUNT(*) as msg_count,
-            COALESCE(SUM(LENGTH(text) - LENGTH(REPLACE(text, ' ', ''))), 0) as extra_words
+    # Only non-ASCII texts can hold an emoji
+    sql['emoji'] = lambda db: emoji_histogram(db, f"SELECT text FROM message WHERE {date_window(ts_start, ts_end)} AND is_from_me=1 AND text GLOB '*[^ -~]*'")
+    # plus sent messages whose text only survives in attributedBody
+    sql['body_emoji'] = lambda db: emoji_histogram(db, f"SELECT attributedBody FROM message WHERE {date_window(ts_start, ts_end)} AND is_from_me=1 AND text IS NULL AND attributedBody IS NOT NULL", decode=attributed_text)
+    sql['words'] = lambda db: vocabulary(db, f"""
+        SELECT text, CASE WHEN text IS NULL THEN attributedBody END
         FROM message
-        WHERE (date/1000000000+978307200)>{ts_start}
+        WHERE {date_window(ts_start, ts_end)}
         AND is_from_me=1
-        AND text IS NOT NULL
-        AND LENGTH(text) > 0
-        AND text NOT LIKE 'Loved "%'
-        AND text NOT LIKE 'Liked "%'
-        AND text NOT LIKE 'Disliked "%'
-        AND text NOT LIKE 'Laughed at "%'
-        AND text NOT LIKE 'Emphasized "%'
-        AND text NOT LIKE 'Questioned "%'
-        AND text NOT LIKE '%￼%'
-    """)
-    msg_count = r[0][0] or 0
-    extra_words = r[0][1] or 0
-    d['words'] = msg_count + extra_words
-    
-    r = q(f"SELECT DATE(datetime((date/1000000000+978307200),'unixepoch','localtime')) d, COUNT(*) c FROM message WHERE (date/1000000000+978307200)>{ts_start} GROUP BY d ORDER BY c DESC LIMIT 1")
-    d['busiest_day'] = (r[0][0], r[0][1]) if r else None
-    
-    r = q(f"""
-        WITH chat_participants AS (
-            SELECT chat_id, COUNT(*) as participant_count
-            FROM chat_handle_join
-            GROUP BY chat_id
-        ),
-        one_on_one_messages AS (
-            SELECT m.ROWID as msg_id
-            FROM message m
-            JOIN chat_message_join cmj ON m.ROWID = cmj.message_id
-            JOIN chat_participants cp ON cmj.chat_id = cp.chat_id
-            WHERE cp.participant_count = 1
-        ),
-        convos AS (
-            SELECT m.is_from_me,
-                   (m.date/1000000000+978307200) as ts,
-                   LAG(m.date/1000000000+978307200) OVER (PARTITION BY m.handle_id ORDER BY m.date) as prev_ts
-            FROM message m
-            WHERE (m.date/1000000000+978307200)>{ts_start}
-            AND m.ROWID IN (SELECT msg_id FROM one_on_one_messages)
-        )
-        SELECT
-            SUM(CASE WHEN is_from_me=1 THEN 1 ELSE 0 END) as you_started,
-            COUNT(*) as total
-        FROM convos
-        WHERE prev_ts IS NULL OR (ts - prev_ts) > 14400
+        AND (text IS NOT NULL OR attributedBody IS NOT NULL)
     """)
-    if r and r[0][1] and r[0][1] > 0:
-        you_started = r[0][0] or 0
-        d['starter_pct'] = round((you_started / r[0][1]) * 100)
-    else:
-        d['starter_pct'] = 50
-
-    group_chat_cte = """
-        WITH chat_participants AS (
-            SELECT chat_id, COUNT(*) as participant_count
-            FROM chat_handle_join
-            GROUP BY chat_id
-        ),
-        group_chats AS (
-            SELECT chat_id FROM chat_participants WHERE participant_count >= 2
-        ),
-        group_messages AS (
-            SELECT m.ROWID as msg_id, cmj.chat_id
-            FROM message m
-            JOIN chat_message_join cmj ON m.ROWID = cmj.message_id
-            WHERE cmj.chat_id IN (SELECT chat_id FROM group_chats)
-        )
-    """
-
-    r = q(f"""{group_chat_cte}
+    sql['busiest_day'] = f"SELECT DATE(datetime((date/1000000000+978307200),'unixepoch','localtime')) d, COUNT(*) c FROM message WHERE {date_window(ts_start, ts_end)} GROUP BY d ORDER BY c DESC, d LIMIT 1"
+    sql['group_stats'] = f"""
         SELECT
-            (SELECT COUNT(DISTINCT chat_id) FROM group_messages gm
-             JOIN message m ON gm.msg_id = m.ROWID
-             WHERE (m.date/1000000000+978307200)>{ts_start}) as group_count,
+            (SELECT COUNT(DISTINCT chat_id) FROM message_kind WHERE kind=2) as group_count,
             COUNT(*) as total_msgs,
             SUM(CASE WHEN m.is_from_me=1 THEN 1 ELSE 0 END) as sent
         FROM message m
-        WHERE (m.date/1000000000+978307200)>{ts_start}
-        AND m.ROWID IN (SELECT msg_id FROM group_messages)
-    """)
-    d['group_stats'] = {'count': r[0][0] or 0, 'total': r[0][1] or 0, 'sent': r[0][2] or 0}
-
-    r = q(f"""
-        WITH chat_participants AS (
-            SELECT chat_id, COUNT(*) as participant_count FROM chat_handle_join GROUP BY chat_id
-        ),
-        group_chats AS (
-            SELECT chat_id FROM chat_participants WHERE participant_count >= 2
-        ),
-        group_messages AS (
-            SELECT m.ROWID as msg_id, cmj.chat_id FROM message m
-            JOIN chat_message_join cmj ON m.ROWID = cmj.message_id
-            WHERE cmj.chat_id IN (SELECT chat_id FROM group_chats)
-            AND (m.date/1000000000+978307200)>{ts_start}
-        )
-        SELECT 
-            c.ROWID, c.display_name, COUNT(*),
-            (SELECT COUNT(*) FROM chat_handle_join WHERE chat_id = c.ROWID)
+        WHERE {date_window(ts_start, ts_end, 'm.date')}
+        AND m.ROWID IN (SELECT msg_id FROM message_kind WHERE kind=2)
+    """
+    sql['group_leaderboard'] = """
+        SELECT c.ROWID, c.display_name, COUNT(*), ck.participant_count
         FROM chat c
-        JOIN group_messages gm ON c.ROWID = gm.chat_id
-        GROUP BY c.ROWID ORDER BY 3 DESC LIMIT 5
-    """)
+        JOIN message_kind mk ON c.ROWID = mk.chat_id
+        JOIN chat_kind ck ON c.ROWID = ck.chat_id
+        WHERE mk.kind=2
+        GROUP BY c.ROWID ORDER BY 3 DESC, c.ROWID LIMIT 5
+    """
+    sql['daily_counts'] = f"""
+        SELECT DATE(datetime((date/1000000000+978307200),'unixepoch','localtime')) as d, COUNT(*) as c
+        FROM message
+        WHERE {date_window(ts_start, ts_end)}
+        GROUP BY d
+        ORDER BY d
+    """
+
+    r = run_metrics(get_db(IMESSAGE_DB), sql)
+
+    raw_stats = r['stats'][0]
+    d['stats'] = (raw_stats[0] or 0, raw_stats[1] or 0, raw_stats[2] or 0, raw_stats[3] or 0)
+    for k in ('top', 'late', 'ghosted', 'heating', 'fan', 'simp'):
+        d[k] = r[k]
+    d['hour'] = r['hour'][0][0] if r['hour'] else 12
+    d['day'] = WEEKDAYS[r['day'][0][0]] if r['day'] else '???'
+    r['sessions'].summary(d, dict(q("SELECT handle_id, id FROM handle_kind WHERE NOT is_shortcode")))
+
+    d['emoji'] = top_emoji(r['emoji'] + r['body_emoji'])
+
+    d['words'], top_words, top_phrases = r['words']
+    d['top_words'] = top_counts(top_words, TOP_WORDS_K)
+    d['top_phrases'] = top_counts(top_phrases, TOP_PHRASES_K)
+
+    d['busiest_day'] = (r['busiest_day'][0][0], r['busiest_day'][0][1]) if r['busiest_day'] else None
+
+
+    g = r['group_stats']
+    d['group_stats'] = {'count': g[0][0] or 0, 'total': g[0][1] or 0, 'sent': g[0][2] or 0}
+
     d['group_leaderboard'] = []
-    for row in r:
+    for row in r['group_leaderboard']:
         chat_id, display_name, msg_count, participant_count = row
         d['group_leaderboard'].append({
             'chat_id': chat_id,
@@ -366,85 +997,547 @@ def analyze(ts_start, ts_jun, contacts):
         top_group_id = d['group_leaderboard'][0]['chat_id']
         
         # 1. Get raw sender IDs and message counts for all members
-        raw_senders = q(f"""
+        raw_senders = run_metrics(get_db(IMESSAGE_DB), {'group_senders': f"""
             SELECT 
                 CASE WHEN m.is_from_me = 1 THEN 'You' ELSE h.id END AS sender_id, 
                 COUNT(*) AS msg_count
-            FROM message m 
-            LEFT JOIN handle h ON m.handle_id = h.ROWID 
-            JOIN chat_message_join cmj ON m.ROWID = cmj.message_id
-            WHERE cmj.chat_id = {top_group_id}
-            AND (m.date/1000000000+978307200) > {ts_start}
+            FROM message_kind mk
+            JOIN message m ON m.ROWID = mk.msg_id
+            LEFT JOIN handle h ON m.handle_id = h.ROWID
+            WHERE mk.chat_id = {top_group_id}
             GROUP BY sender_id
-            ORDER BY msg_count DESC 
-        """)
-        
-        # 2. Merge Duplicates by Resolved Name (FORCED MERGE)
-        merged_senders = {}
+            ORDER BY msg_count DESC, sender_id
+        """})['group_senders']
         
-        for handle_id, msg_count in raw_senders:
-            # Resolve the raw ID to the contact's display name
-            contact_name = get_name(handle_id, contacts) 
-            
-            if contact_name not in merged_senders:
-                # Store new sender, using the resolved name for display
-                merged_senders[contact_name] = {'id': handle_id, 'msg_count': msg_count, 'display_name': contact_name}
+        with stage('merge senders'):
+            d['top_group_senders'] = merge_group_senders(raw_senders, contacts)
+
+    d['daily_counts'] = {row[0]: row[1] for row in r['daily_counts']}
+
+    return summarize(d)
+
+def is_shortcode(handle):
+    """5-6 digit business/shortcode senders (2FA codes, carriers), excluded from contact rankings."""
+    digits = handle.replace('+', '').replace('-', '')
+    return 5 <= len(digits) <= 6 and '0' <= digits[0] <= '9'
+
+class MessageColumns:
+    """The window's messages from one streamed pass, stored as compact array-backed columns."""
+    __slots__ = ('date', 'handle', 'from_me', 'kind', 'chat', 'text_len', 'extra_chats', 'words', 'top_words', 'top_phrases', 'emoji')
+    ONE_ON_ONE, GROUP = 1, 2
+
+    def __init__(self):
+        self.date = array('q')      # raw message.date (Apple epoch nanoseconds)
+        self.handle = array('i')    # message.handle_id, -1 for NULL
+        self.from_me = array('b')
+        self.kind = array('b')      # ONE_ON_ONE / GROUP bit flags
+        self.chat = array('i')      # group chat the message belongs to, 0 if none
+        self.text_len = array('i')
+        self.extra_chats = []       # (row, chat_id) for messages joined to more than one group chat
+        # Text is not kept as a column; the sent-text metrics are folded in during the scan
+        self.words = 0
+        self.top_words, self.top_phrases = {}, {}
+        self.emoji = Counter()
+
+    def __len__(self):
+        return len(self.date)
+
+    def add_sent(self, texts):
+        """Fold a batch of sent texts into the emoji and word metrics."""
+        count_emoji(texts, self.emoji)
+        self.words += count_vocabulary([text for text in texts if is_typed(text)], self.top_words, self.top_phrases)
+
+def scan_messages(ts_start, participants, batch_size=SCAN_BATCH_SIZE, after_rowid=0, upto_rowid=None, partition=None, ts_end=None):
+    """Stream every message in the window once, in ROWID order, into MessageColumns.
+
+    With partition (raw message.date -> key, None to drop the row), the same pass fills {key: MessageColumns} instead.
+    """
+    cols = MessageColumns()
+    parts, part = {}, cols  # part: key of the columns being filled; cols itself never matches one
+    date, handle, from_me, kind, chat, text_len = cols.date, cols.handle, cols.from_me, cols.kind, cols.chat, cols.text_len
+    last_rowid = None
+    rowid_range = f"AND m.ROWID > {after_rowid}" + (f" AND m.ROWID <= {upto_rowid}" if upto_rowid is not None else "")
+    for rows in get_db(IMESSAGE_DB).stream(f"""
+        SELECT m.ROWID, m.date, m.handle_id, m.is_from_me, LENGTH(m.text),
+               CASE WHEN m.is_from_me=1 THEN m.text END, CASE WHEN m.is_from_me=1 AND m.text IS NULL THEN m.attributedBody END, cmj.chat_id
+        FROM message m LEFT JOIN chat_message_join cmj ON cmj.message_id = m.ROWID
+        WHERE {date_window(ts_start, ts_end, 'm.date')} {rowid_range}
+        ORDER BY m.ROWID
+    """, batch_size):
+        sent_texts = []
+        for rowid, dt, h, me, tl, text, body, chat_id in rows:
+            pc = participants.get(chat_id, 0)
+            k = MessageColumns.ONE_ON_ONE if pc == 1 else MessageColumns.GROUP if pc >= 2 else 0
+            if rowid == last_rowid:
+                # Same message joined to another chat
+                i = len(date) - 1
+                kind[i] |= k
+                if k == MessageColumns.GROUP:
+                    if chat[i]:
+                        cols.extra_chats.append((i, chat_id))
+                    else:
+                        chat[i] = chat_id
+                continue
+            last_rowid = rowid
+            if partition is not None:
+                key = partition(dt)
+                if key != part:
+                    # Sent texts so far belong to the previous partition
+                    cols.add_sent(sent_texts)
+                    sent_texts, part = [], key
+                    cols = parts.get(key)
+                    if cols is None:
+                        cols = parts[key] = MessageColumns()
+                    date, handle, from_me, kind, chat, text_len = cols.date, cols.handle, cols.from_me, cols.kind, cols.chat, cols.text_len
+            date.append(dt)
+            handle.append(-1 if h is None else h)
+            from_me.append(me == 1)
+            kind.append(k)
+            chat.append(chat_id if k == MessageColumns.GROUP else 0)
+            text_len.append(tl or 0)
+            if body is not None:
+                text = attributed_text(body)
+            if text is not None:
+                sent_texts.append(text)
+        cols.add_sent(sent_texts)
+    if partition is not None:
+        parts.pop(None, None)
+        return parts
+    return cols
+
+class StaleScan(Exception):
+    """New rows can't be folded onto a saved ScanState (a thread's messages arrived out of date order)."""
+
+class ScanState:
+    """Running totals of the scan engine. fold() adds a batch of MessageColumns, result() turns them into `d`."""
+    COUNTERS = ('daily', 'hours', 'weekdays', 'people', 'groups', 'emoji', 'top_words', 'top_phrases')
+    TOTALS = ('total', 'sent', 'group_total', 'group_sent', 'words')
+
+    def __init__(self, ts_jun):
+        self.ts_jun = ts_jun
+        self.daily, self.hours, self.weekdays = {}, {}, {}
+        self.people = {}         # 1:1 handle_id -> 1
+        self.groups = {}         # group chat_id -> messages
+        self.emoji = Counter()
+        self.top_words, self.top_phrases = {}, {}  # Misra–Gries summaries, at most WORDS_CAPACITY keys each
+        for k in self.TOTALS:
+            setattr(self, k, 0)
+        self.contacts = {}       # handle_id -> [total, sent, received, late, received_h1, received_h2, h1, h2]
+        self.tails = {}          # handle_id -> (date, from_me) of its latest 1:1 message; later folds must not predate it
+        self.group_senders = {}  # (chat_id, handle_id, from_me) -> messages
+        self.talks = Conversations()     # 1:1 sessions: starter %, response times, session metrics
+        self.slots = {}
+
+    def local(self, ts):
+        # UTC offsets are whole multiples of 15 minutes, so a 15-minute bucket shares one local date/hour
+        slot = self.slots.get(ts // 900)
+        if slot is None:
+            t = time.localtime(ts // 900 * 900)
+            slot = self.slots[ts // 900] = (time.strftime('%Y-%m-%d', t), t.tm_hour, (t.tm_wday + 1) % 7)
+        return slot
+
+    def fold(self, cols):
+        daily, hours, weekdays, contacts, groups, group_senders = self.daily, self.hours, self.weekdays, self.contacts, self.groups, self.group_senders
+        ts_jun = self.ts_jun
+        one_on_one = []  # 1:1 rows, for the per-thread sequence metrics
+        for i, (dt, h, me, k, c) in enumerate(zip(cols.date, cols.handle, cols.from_me, cols.kind, cols.chat)):
+            ts = dt // 1000000000 + 978307200
+            day, hour, wday = self.local(ts)
+            daily[day] = daily.get(day, 0) + 1
+            hours[hour] = hours.get(hour, 0) + 1
+            weekdays[wday] = weekdays.get(wday, 0) + 1
+            if k & MessageColumns.ONE_ON_ONE:
+                self.total += 1
+                self.sent += me
+                if h != -1:
+                    self.people[h] = 1
+                one_on_one.append(i)
+                pc = contacts.get(h)
+                if pc is None:
+                    pc = contacts[h] = [0] * 8
+                pc[0] += 1
+                pc[1 if me else 2] += 1
+                if hour < 5:
+                    pc[3] += 1
+                if ts < ts_jun:
+                    pc[6] += 1
+                    if not me: pc[4] += 1
+                else:
+                    pc[7] += 1
+                    if not me: pc[5] += 1
+            if k & MessageColumns.GROUP:
+                self.group_total += 1
+                self.group_sent += me
+                groups[c] = groups.get(c, 0) + 1
+                group_senders[c, h, me] = group_senders.get((c, h, me), 0) + 1
+        for i, c in cols.extra_chats:
+            groups[c] = groups.get(c, 0) + 1
+            key = (c, cols.handle[i], cols.from_me[i])
+            group_senders[key] = group_senders.get(key, 0) + 1
+
+        # Conversations see the 1:1 rows in date order, as the SQL engine streams them (the sort is
+        # stable, so equal dates keep ROWID order there too)
+        date, from_me, handle = cols.date, cols.from_me, cols.handle
+        talks, tails = self.talks, self.tails
+        for i in sorted(one_on_one, key=date.__getitem__):
+            h = handle[i]
+            tail = tails.get(h)
+            if tail and date[i] < tail[0]:
+                raise StaleScan(h)
+            talks.add(h, h, date[i] // 1000000000 + 978307200, from_me[i])
+            tails[h] = (date[i], from_me[i])
+
+        self.words += cols.words
+        self.emoji.update(cols.emoji)
+        merge_heavy_hitters(self.top_words, cols.top_words)
+        merge_heavy_hitters(self.top_phrases, cols.top_phrases)
+
+    def result(self, handles, participants, chat_names, contacts):
+        per_contact = {}  # h.id -> summed counters of every handle with that id
+        for h, pc in self.contacts.items():
+            hid = handles.get(h)
+            if hid is None or is_shortcode(hid):
+                continue
+            if hid in per_contact:
+                per_contact[hid] = [a + b for a, b in zip(per_contact[hid], pc)]
             else:
-                # Merge the message count for handles belonging to the same resolved name
-                merged_senders[contact_name]['msg_count'] += msg_count
-        
-        # 3. Convert back to a list and re-sort by the combined count
-        d['top_group_senders'] = sorted(merged_senders.values(), key=lambda x: -x['msg_count'])
-        
-    daily_counts = q(f"""
-        SELECT DATE(datetime((date/1000000000+978307200),'unixepoch','localtime')) as d, COUNT(*) as c
-        FROM message
-        WHERE (date/1000000000+978307200)>{ts_start}
-        GROUP BY d
-        ORDER BY d
-    """)
-    d['daily_counts'] = {row[0]: row[1] for row in daily_counts}
+                per_contact[hid] = pc
+        hours, weekdays = self.hours, self.weekdays
+
+        d = {}
+        d['stats'] = (self.total, self.sent, self.total - self.sent, len(self.people))
+        d['top'] = sorted([(hid, pc[0], pc[1], pc[2]) for hid, pc in per_contact.items()], key=lambda x: (-x[1], x[0]))[:20]
+        d['late'] = sorted([(hid, pc[3]) for hid, pc in per_contact.items() if pc[3] > 5], key=lambda x: (-x[1], x[0]))[:5]
+        d['hour'] = min(hours, key=lambda h: (-hours[h], h)) if hours else 12
+        d['day'] = WEEKDAYS[min(weekdays, key=lambda w: (-weekdays[w], w))] if weekdays else '???'
+        d['ghosted'] = sorted([(hid, pc[4], pc[5]) for hid, pc in per_contact.items() if pc[4] > 10 and pc[5] < 3], key=lambda x: (-x[1], x[0]))[:5]
+        d['heating'] = sorted([(hid, pc[6], pc[7]) for hid, pc in per_contact.items() if pc[6] > 20 and pc[7] > pc[6] * 1.5], key=lambda x: (x[1] - x[2], x[0]))[:5]
+        # ORDER BY ratio DESC puts a NULL ratio (zero denominator) last
+        d['fan'] = sorted([(hid, pc[2], pc[1]) for hid, pc in per_contact.items() if pc[2] > pc[1] * 2 and pc[0] > 100], key=lambda x: (x[2] == 0, -x[1] / x[2] if x[2] else 0, x[0]))[:5]
+        d['simp'] = sorted([(hid, pc[1], pc[2]) for hid, pc in per_contact.items() if pc[1] > pc[2] * 2 and pc[0] > 100], key=lambda x: (x[2] == 0, -x[1] / x[2] if x[2] else 0, x[0]))[:5]
+        self.talks.summary(d, {h: hid for h, hid in handles.items() if not is_shortcode(hid)})
+
+        d['emoji'] = top_emoji(self.emoji)
+        d['words'] = self.words
+        d['top_words'] = top_counts(self.top_words, TOP_WORDS_K)
+        d['top_phrases'] = top_counts(self.top_phrases, TOP_PHRASES_K)
+        d['daily_counts'] = dict(sorted(self.daily.items()))
+        d['busiest_day'] = min(d['daily_counts'].items(), key=lambda x: -x[1]) if self.daily else None
+
+        d['group_stats'] = {'count': len(self.groups), 'total': self.group_total, 'sent': self.group_sent}
+        d['group_leaderboard'] = [
+            {'chat_id': c, 'name': chat_names[c], 'msg_count': n, 'participant_count': participants[c]}
+            for c, n in sorted([x for x in self.groups.items() if x[0] in chat_names], key=lambda x: (-x[1], x[0]))[:5]
+        ]
+        d['top_group_senders'] = []
+        if d['group_leaderboard']:
+            top_group_id = d['group_leaderboard'][0]['chat_id']
+            senders = {}
+            for (c, h, me), n in self.group_senders.items():
+                if c == top_group_id:
+                    sender = 'You' if me else handles.get(h)
+                    senders[sender] = senders.get(sender, 0) + n
+            raw_senders = sorted(senders.items(), key=lambda x: (-x[1], x[0] or ''))
+            with stage('merge senders'):
+                d['top_group_senders'] = merge_group_senders(raw_senders, contacts)
+
+        return summarize(d)
+
+class ScanCache:
+    """Sidecar SQLite file holding a ScanState plus the high-water message ROWID it covers (--cache)."""
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+        CREATE TABLE IF NOT EXISTS counter (name TEXT, key, n INTEGER, PRIMARY KEY (name, key));
+        CREATE TABLE IF NOT EXISTS contact (handle_id INTEGER PRIMARY KEY, total, sent, received, late, received_h1, received_h2, h1, h2);
+        CREATE TABLE IF NOT EXISTS tail (handle_id INTEGER PRIMARY KEY, date INTEGER, from_me INTEGER);
+        CREATE TABLE IF NOT EXISTS group_sender (chat_id INTEGER, handle_id INTEGER, from_me INTEGER, n INTEGER, PRIMARY KEY (chat_id, handle_id, from_me));
+        CREATE TABLE IF NOT EXISTS reply (handle_id INTEGER PRIMARY KEY, n INTEGER, sketch TEXT);
+        CREATE TABLE IF NOT EXISTS session (handle_id INTEGER PRIMARY KEY, state TEXT);
+    """
 
-    from datetime import datetime as dt, date as ddate
-    if d['daily_counts']:
-        all_counts = list(d['daily_counts'].values())
-        d['max_daily'] = max(all_counts) if all_counts else 0
-        d['active_days'] = len([c for c in all_counts if c > 0])
-        d['avg_daily'] = round(sum(all_counts) / max(len(all_counts), 1))
-        monthly_counts = {}
-        for date_str, count in d['daily_counts'].items():
-            month_key = date_str[:7]
-            monthly_counts[month_key] = monthly_counts.get(month_key, 0) + count
-        busiest_month_key = max(monthly_counts, key=monthly_counts.get) if monthly_counts else '2025-01'
-        d['busiest_month'] = dt.strptime(busiest_month_key, '%Y-%m').strftime('%b')
-        first_dt = dt.strptime(min(d['daily_counts'].keys()), '%Y-%m-%d').date() if d['daily_counts'] else dt.now().date()
-        last_dt = dt.strptime(max(d['daily_counts'].keys()), '%Y-%m-%d').date() if d['daily_counts'] else dt.now().date()
-        total_days_in_range = (last_dt - first_dt).days + 1
-        d['quiet_days'] = total_days_in_range - d['active_days']
-    else:
-        d['max_daily'] = 0
-        d['active_days'] = 0
-        d['avg_daily'] = 0
-        d['busiest_month'] = 'N/A'
-        d['quiet_days'] = 0
+    def __init__(self, path, ts_start, ts_jun, participants, ts_end=None):
+        self.path = path
+        st = os.stat(IMESSAGE_DB)
+        # Anything that changes which rows fold where invalidates the whole cache
+        self.identity = {
+            'version': CACHE_VERSION,
+            'source': os.path.abspath(IMESSAGE_DB),
+            'inode': st.st_ino,
+            'device': st.st_dev,
+            'window': f"{ts_start}-{ts_jun}-{ts_end}",
+            'tz': f"{os.environ.get('TZ', '')}|{time.tzname}|{time.timezone}|{time.altzone}",
+            'chats': hashlib.sha1(repr(sorted(participants.items())).encode()).hexdigest(),
+        }
+
+    def connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.executescript(self.SCHEMA)
+        return conn
+
+    def load(self, ts_jun):
+        """(state, high_water) if the cache still describes this database, else (None, 0)."""
+        if not os.path.exists(self.path):
+            return None, 0
+        try:
+            conn = self.connect()
+        except sqlite3.DatabaseError:
+            return None, 0
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+            if any(meta.get(k) != v for k, v in self.identity.items()) or 'high_water' not in meta:
+                return None, 0
+            # Rows deleted at or below the high-water mark would still be counted
+            below = q(f"SELECT COUNT(*) FROM message WHERE ROWID <= {meta['high_water']}")[0][0]
+            if below != meta['below']:
+                return None, 0
+            state = ScanState(ts_jun)
+            for k in ScanState.TOTALS:
+                setattr(state, k, meta[k])
+            for name, key, n in conn.execute("SELECT name, key, n FROM counter"):
+                getattr(state, name)[key] = n
+            state.contacts = {r[0]: list(r[1:]) for r in conn.execute("SELECT * FROM contact")}
+            state.tails = {h: (dt, me) for h, dt, me in conn.execute("SELECT handle_id, date, from_me FROM tail")}
+            state.group_senders = {(c, h, me): n for c, h, me, n in conn.execute("SELECT chat_id, handle_id, from_me, n FROM group_sender")}
+            talks, saved = state.talks, json.loads(meta['conversations'])
+            for k in Conversations.TOTALS:
+                setattr(talks, k, saved[k])
+            talks.longest = saved['longest'] and Session.restore(saved['longest'])
+            talks.open = {h: Session.restore(json.loads(s)) for h, s in conn.execute("SELECT handle_id, state FROM session")}
+            replies = talks.replies
+            replies.n, replies.total = saved['replies']
+            replies.sketch = [P2Quantile.restore(s) for s in saved['sketch']]
+            replies.contacts = {h: [n] + [P2Quantile.restore(s) for s in json.loads(sketch)] for h, n, sketch in conn.execute("SELECT * FROM reply")}
+            return state, meta['high_water']
+        finally:
+            conn.close()
 
-    s = d['stats']
-    ratio = s[1] / (s[2] + 1)
-    if d['hour'] < 5 or d['hour'] > 22: d['personality'] = ("NOCTURNAL MENACE", "terrorizes people at ungodly hours")
-    elif d['resp'] < 5: d['personality'] = ("TERMINALLY ONLINE", "has never touched grass")
-    elif d['resp'] > 120: d['personality'] = ("TOO COOL TO REPLY", "leaves everyone on read")
-    elif ratio < 0.5: d['personality'] = ("POPULAR (ALLEGEDLY)", "everyone wants a piece")
-    elif ratio > 2: d['personality'] = ("THE YAPPER", "carries every conversation alone")
-    elif d['starter_pct'] > 65: d['personality'] = ("CONVERSATION STARTER", "always making the first move")
-    elif d['starter_pct'] < 35: d['personality'] = ("THE WAITER", "never texts first, ever")
-    else: d['personality'] = ("SUSPICIOUSLY NORMAL", "no notes. boring but stable.")
+    def save(self, state, high_water):
+        below = q(f"SELECT COUNT(*) FROM message WHERE ROWID <= {high_water}")[0][0]
+        meta = {**self.identity, 'high_water': high_water, 'below': below}
+        meta.update((k, getattr(state, k)) for k in ScanState.TOTALS)
+        talks = state.talks
+        meta['conversations'] = json.dumps({
+            **{k: getattr(talks, k) for k in Conversations.TOTALS},
+            'longest': talks.longest and talks.longest.saved(),
+            'replies': [talks.replies.n, talks.replies.total],
+            'sketch': [s.saved() for s in talks.replies.sketch],
+        })
+        conn = self.connect()
+        try:
+            with conn:
+                for table in ('meta', 'counter', 'contact', 'tail', 'group_sender', 'reply', 'session'):
+                    conn.execute(f"DELETE FROM {table}")
+                conn.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+                conn.executemany("INSERT INTO counter VALUES (?, ?, ?)",
+                                 [(name, key, n) for name in ScanState.COUNTERS for key, n in getattr(state, name).items()])
+                conn.executemany("INSERT INTO contact VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [(h, *pc) for h, pc in state.contacts.items()])
+                conn.executemany("INSERT INTO tail VALUES (?, ?, ?)", [(h, dt, me) for h, (dt, me) in state.tails.items()])
+                conn.executemany("INSERT INTO group_sender VALUES (?, ?, ?, ?)", [(*k, n) for k, n in state.group_senders.items()])
+                conn.executemany("INSERT INTO reply VALUES (?, ?, ?)",
+                                 [(h, n, json.dumps([s.saved() for s in sketch])) for h, (n, *sketch) in talks.replies.contacts.items()])
+                conn.executemany("INSERT INTO session VALUES (?, ?)", [(h, json.dumps(s.saved())) for h, s in talks.open.items()])
+        finally:
+            conn.close()
 
-    return d
+def analyze_scan(ts_start, ts_jun, contacts, batch_size=SCAN_BATCH_SIZE, cache_path=None, ts_end=None):
+    """Single-pass engine: the same `d` as analyze(), computed from one scan of the message table.
 
-def gen_html(d, contacts, path):
+    With cache_path, the totals are kept in a sidecar file and later runs only scan rows added since.
+    """
+    handles = dict(q("SELECT ROWID, id FROM handle"))
+    participants = dict(q("SELECT chat_id, COUNT(*) FROM chat_handle_join GROUP BY chat_id"))
+    chat_names = dict(q("SELECT ROWID, display_name FROM chat"))
+    high_water = q("SELECT COALESCE(MAX(ROWID), 0) FROM message")[0][0]
+    cache = ScanCache(cache_path, ts_start, ts_jun, participants, ts_end) if cache_path else None
+    state, after = cache.load(ts_jun) if cache else (None, 0)
+    try:
+        if state is None:
+            raise StaleScan()
+        state.fold(scan_messages(ts_start, participants, batch_size, after, high_water, ts_end=ts_end))
+    except StaleScan:
+        state = ScanState(ts_jun)
+        state.fold(scan_messages(ts_start, participants, batch_size, 0, high_water, ts_end=ts_end))
+    if cache:
+        cache.save(state, high_water)
+    return state.result(handles, participants, chat_names, contacts)
+
+def local_ts(year, month=1, day=1):
+    """Unix timestamp of local midnight on year-month-day."""
+    return int(time.mktime((year, month, day, 0, 0, 0, 0, 0, -1)))
+
+def analyze_years(first, last, contacts, batch_size=SCAN_BATCH_SIZE):
+    """Scan engine over the local calendar years first..last: one streamed pass, rows partitioned by year, {year: `d`}."""
+    handles = dict(q("SELECT ROWID, id FROM handle"))
+    participants = dict(q("SELECT chat_id, COUNT(*) FROM chat_handle_join GROUP BY chat_id"))
+    chat_names = dict(q("SELECT ROWID, display_name FROM chat"))
+    edges = [apple_ns(local_ts(y)) for y in range(first, last + 2)]
+    def year_of(dt):
+        i = bisect.bisect_right(edges, dt)
+        return first + i - 1 if 0 < i < len(edges) else None
+    # Bounded at both ends, so rows after `last` (say, the current year) are never streamed just to be dropped
+    parts = scan_messages(local_ts(first), participants, batch_size, partition=year_of, ts_end=local_ts(last + 1))
+    years = {}
+    for year in range(first, last + 1):
+        state = ScanState(local_ts(year, 6))
+        if year in parts:
+            state.fold(parts[year])
+        years[year] = state.result(handles, participants, chat_names, contacts)
+        years[year]['year'] = year
+    return years
+
+def year_over_year(years):
+    """Per-year headline numbers for the year-over-year slides, oldest first."""
+    return [{'year': y, 'messages': d['stats'][0], 'people': d['stats'][3], 'resp': d['resp'] if d['stats'][0] else None,
+             'top': [row[0] for row in d['top'][:5]]}
+            for y, d in sorted(years.items())]
+
+# Contribution graph geometry: 10px cells on a 12px pitch, right of the day labels and below the month labels
+CONTRIB_X, CONTRIB_Y, CONTRIB_PITCH = 32, 20, 12
+CONTRIB_FILLS = ('rgba(255,255,255,0.12)', 'rgba(74,222,128,0.25)', 'rgba(74,222,128,0.45)', 'rgba(74,222,128,0.70)', '#4ade80')
+
+def contrib_svg(daily_counts, first, last, max_count):
+    """GitHub-style calendar of daily_counts ('YYYY-MM-DD' -> n) from date first to date last, as one SVG.
+
+    Cells are placed and bucketed by level with date-ordinal arithmetic and carry inline fills so screenshots
+    keep them. The day counts ride along in a single data attribute for the page's delegated tooltip handler.
+    """
+    start = first.toordinal()
+    days = last.toordinal() - start + 1
+    lead = (first.weekday() + 1) % 7  # rows run Sunday -> Saturday
+    counts = [0] * days
+    for day, count in daily_counts.items():
+        i = date.fromisoformat(day).toordinal() - start
+        if 0 <= i < days: counts[i] = count
+    cells = ([], [], [], [], [])
+    for i, count in enumerate(counts):
+        if count == 0: level = 0
+        elif count <= max_count * 0.25: level = 1
+        elif count <= max_count * 0.5: level = 2
+        elif count <= max_count * 0.75: level = 3
+        else: level = 4
+        col, row = divmod(lead + i, 7)
+        cells[level].append(f'<rect x="{CONTRIB_X + col * CONTRIB_PITCH}" y="{CONTRIB_Y + row * CONTRIB_PITCH}" width="10" height="10" rx="2"/>')
+    labels = [f'<text x="{CONTRIB_X - 4}" y="{CONTRIB_Y + row * CONTRIB_PITCH + 8}" text-anchor="end" font-size="9">{name}</text>'
+              for row, name in enumerate(('Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'))]
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        month_start = date(year, month, 1)
+        col = (lead + max(month_start.toordinal() - start, 0)) // 7
+        labels.append(f'<text x="{CONTRIB_X + col * CONTRIB_PITCH}" y="12" font-size="10">{month_start.strftime("%b")}</text>')
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    width = CONTRIB_X + (lead + days + 6) // 7 * CONTRIB_PITCH - 2
+    height = CONTRIB_Y + 7 * CONTRIB_PITCH - 2
+    return (f'<svg class="contrib-svg" xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}" '
+            f'data-x="{CONTRIB_X}" data-y="{CONTRIB_Y}" data-pitch="{CONTRIB_PITCH}" data-start="{first.isoformat()}" data-lead="{lead}" data-counts="{",".join(map(str, counts))}">'
+            f'<g fill="#8892a0" font-family="Space Grotesk,sans-serif">{"".join(labels)}</g>'
+            + ''.join(f'<g fill="{fill}">{"".join(rects)}</g>' for fill, rects in zip(CONTRIB_FILLS, cells) if rects)
+            + '</svg>')
+
+OFFLINE = None  # None: load html2canvas and fonts from CDNs; else a directory ('' for none) of files to inline (--offline)
+
+CDN_ASSETS = '''<script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>
+<link rel="preconnect" href="https://fonts.googleapis.com">
+<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+<link href="https://fonts.googleapis.com/css2?family=Silkscreen&family=Azeret+Mono:wght@400;500;600;700&family=Space+Grotesk:wght@400;500;700&display=swap" rel="stylesheet">'''
+
+# Font families the stylesheet uses, and the file stem --offline looks for in its directory
+REPORT_FONTS = (('Silkscreen', 'Silkscreen'), ('Azeret Mono', 'AzeretMono'), ('Space Grotesk', 'SpaceGrotesk'))
+FONT_TYPES = {'.woff2': 'font/woff2', '.woff': 'font/woff', '.ttf': 'font/ttf', '.otf': 'font/otf'}
+
+# Stand-in for html2canvas when --offline has no vendored copy: clone the node with its computed styles
+# into an SVG foreignObject (with the page's @font-face rules) and draw that onto a canvas
+RASTERIZE_JS = r"""
+window.html2canvas = async (node, opts = {}) => {
+    const scale = opts.scale || 1;
+    const width = opts.width || node.offsetWidth, height = opts.height || node.offsetHeight;
+    const inline = (src, dst) => {
+        const cs = getComputedStyle(src);
+        dst.style.cssText = Array.from(cs, p => `${p}:${cs.getPropertyValue(p)}`).join(';');
+        for (let i = 0; i < src.children.length; i++) inline(src.children[i], dst.children[i]);
+    };
+    const clone = node.cloneNode(true);
+    inline(node, clone);
+    clone.style.transform = 'none';
+    const fonts = Array.from(document.querySelectorAll('style'), s => (s.textContent.match(/@font-face\s*{[^}]*}/g) || []).join('')).join('');
+    const svg = `<svg xmlns="http://www.w3.org/2000/svg" width="${width}" height="${height}"><style>${fonts}</style>`
+        + `<foreignObject width="100%" height="100%">${new XMLSerializer().serializeToString(clone)}</foreignObject></svg>`;
+    const img = new Image();
+    img.src = 'data:image/svg+xml;charset=utf-8,' + encodeURIComponent(svg);
+    await img.decode();
+    const canvas = document.createElement('canvas');
+    canvas.width = width * scale;
+    canvas.height = height * scale;
+    const ctx = canvas.getContext('2d');
+    if (opts.backgroundColor) {
+        ctx.fillStyle = opts.backgroundColor;
+        ctx.fillRect(0, 0, canvas.width, canvas.height);
+    }
+    ctx.scale(scale, scale);
+    ctx.drawImage(img, 0, 0);
+    return canvas;
+};
+"""
+
+def report_assets():
+    """<head> tags for html2canvas and the fonts: CDN links, or with --offline everything inlined so opening the report makes no requests."""
+    if OFFLINE is None:
+        return CDN_ASSETS
+    vendored = os.path.join(OFFLINE, 'html2canvas.min.js')
+    if OFFLINE and os.path.isfile(vendored):
+        with open(vendored, encoding='utf-8') as f:
+            script = f.read().replace('</script', '<\\/script')
+    else:
+        script = RASTERIZE_JS
+    faces = []
+    for family, stem in REPORT_FONTS:
+        # An installed copy wins, then a file from the --offline directory; with neither the stylesheet's generic family is used
+        src = [f"local('{family}')"]
+        for ext, mime in FONT_TYPES.items():
+            path = os.path.join(OFFLINE, stem + ext)
+            if OFFLINE and os.path.isfile(path):
+                with open(path, 'rb') as f:
+                    src.append(f"url(data:{mime};base64,{base64.b64encode(f.read()).decode()})")
+                break
+        faces.append(f"@font-face {{ font-family:'{family}'; src:{', '.join(src)}; font-weight:100 900; font-display:block; }}")
+    return f"<script>{script}</script>\n<style>\n{chr(10).join(faces)}\n</style>"
+
+class HtmlReport:
+    """Streams the report through a buffered temp file beside path, moved into place only once it is complete."""
+    def __init__(self, path, buffering=1 << 16):
+        self.path = path
+        self.slides = 0
+        fd, self.tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix='.' + os.path.basename(path), suffix='.tmp')
+        self.f = os.fdopen(fd, 'w', encoding='utf-8', buffering=buffering)
+
+    def write(self, html):
+        self.f.write(html)
+
+    def slide(self, html):
+        self.slides += 1
+        self.f.write(html)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *_):
+        self.f.close()
+        if exc_type is None:
+            os.chmod(self.tmp, 0o644)
+            os.replace(self.tmp, self.path)
+        else:
+            os.unlink(self.tmp)
+
+def delay_label(secs):
+    """A reply delay for a slide: 40s, 12m, 3.5h."""
+    return f"{secs}s" if secs < 60 else f"{secs // 60}m" if secs < 3600 else f"{secs / 3600:.1f}h"
+
+def write_report(out, d, contacts):
     s = d['stats']
     top = d['top']
-    n = lambda h: get_name(h, contacts)
+    # Every name on the slides, resolved once up front
+    contacts.resolve_all(row[0] for k in ('top', 'late', 'ghosted', 'heating', 'fan', 'simp') for row in d.get(k) or ())
+    n = contacts.name
     ptype, proast = d['personality']
     hr = d['hour']
     if hr == 0: hr_str = "12AM"
@@ -464,14 +1557,33 @@ def gen_html(d, contacts, path):
     now = dt.now()
     year_start = dt(int(d['year']), 1, 1)
     days_elapsed = max(1, (now - year_start).days)
+    if d.get('range'):
+        # --since/--until: the range's own length, both ends included
+        days_elapsed = (date.fromisoformat(d['range'][1]) - date.fromisoformat(d['range'][0])).days + 1
     msgs_per_day = s[0] // days_elapsed
     words = d['words']
     words_display = f"{words // 1000:,}K" if words >= 1000 else f"{words:,}"
     pages = max(1, words // 250)
     
-    slides = []
+    favicon = "data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>🌯</text></svg>"
+    out.write(f'''<!DOCTYPE html>
+<html><head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width,initial-scale=1">
+<title>iMessage Wrapped {d.get('year', '2025')}</title>
+<link rel="icon" href="{favicon}">
+{report_assets()}
+<style>
+''')
+    out.write(REPORT_CSS)
+    out.write('''
+</style>
+</head>
+<body>
+
+<div class="gallery" id="gallery">''')
 
-    slides.append('''
+    out.slide('''
     <div class="slide intro">
         <div class="slide-icon">📱</div>
         <h1>iMESSAGE<br>WRAPPED</h1>
@@ -479,7 +1591,7 @@ def gen_html(d, contacts, path):
         <div class="tap-hint">click anywhere to start →</div>
     </div>''')
 
-    slides.append(f'''
+    out.slide(f'''
     <div class="slide">
         <div class="slide-label">// TOTAL DAMAGE</div>
         <div class="big-number green">{s[0]:,}</div>
@@ -493,7 +1605,7 @@ def gen_html(d, contacts, path):
         <div class="slide-watermark">wrap2025.com</div>
     </div>''')
     
-    slides.append(f'''
+    out.slide(f'''
     <div class="slide">
         <div class="slide-label">// WORD COUNT</div>
         <div class="big-number cyan">{words_display}</div>
@@ -503,77 +1615,42 @@ def gen_html(d, contacts, path):
         <div class="slide-watermark">wrap2025.com</div>
     </div>''')
 
+    top_words = d.get('top_words') or []
+    if len(top_words) >= 3:
+        # Rank only: the counts are Misra–Gries lower bounds (see merge_heavy_hitters), not exact totals
+        words_html = ''.join([f'<div class="rank-item"><span class="rank-num">{i}</span><span class="rank-name">{w}</span></div>' for i,(w,_) in enumerate(top_words[:5],1)])
+        phrase = (d.get('top_phrases') or [None])[0]
+        out.slide(f'''
+    <div class="slide">
+        <div class="slide-label">// YOUR VOCABULARY</div>
+        <div class="slide-text">words you can't stop typing</div>
+        <div class="rank-list">{words_html}</div>
+        {f'<div class="roast">catchphrase: "{phrase[0]}"</div>' if phrase else ''}
+        <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_vocabulary.png', this)">📸 Save</button>
+        <div class="slide-watermark">wrap2025.com</div>
+    </div>''')
+
     if d['daily_counts']:
         from datetime import datetime as dt, date as ddate
         today = dt.now().date()
         year = d.get('year', today.year)
         year_start = ddate(year, 1, 1)
         year_end = today if year == today.year else ddate(year, 12, 31)
+        if d.get('range'):
+            year_start, year_end = map(ddate.fromisoformat, d['range'])
 
-        cal_cells = []
-        first_day = year_start - timedelta(days=(year_start.weekday() + 1) % 7)
-        last_day = year_end + timedelta(days=(5 - year_end.weekday()) % 7)
-
-        current_date = first_day
         max_count = d['max_daily'] if d['max_daily'] > 0 else 1
-        month_labels = []
-        last_month = None
-        week_idx = 0
-        
-        while current_date <= last_day:
-            week_cells = []
-            for _ in range(7):
-                date_str = current_date.strftime('%Y-%m-%d')
-                count = d['daily_counts'].get(date_str, 0)
-
-                if (year_start <= current_date <= year_end) and current_date.month != last_month:
-                    month_labels.append((week_idx, current_date.strftime('%b')))
-                    last_month = current_date.month
-
-                if count == 0: level = 0
-                elif count <= max_count * 0.25: level = 1
-                elif count <= max_count * 0.5: level = 2
-                elif count <= max_count * 0.75: level = 3
-                else: level = 4
-
-                in_year = year_start <= current_date <= year_end
-                week_cells.append((date_str, count, level, in_year))
-                current_date += timedelta(days=1)
-
-            cal_cells.append(week_cells)
-            week_idx += 1
-            if week_idx > 60: break
-
-        contrib_html = '<div class="contrib-graph">'
-        contrib_html += '<div class="contrib-container">'
-        contrib_html += '<div class="contrib-days"><span>Sun</span><span>Mon</span><span>Tue</span><span>Wed</span><span>Thu</span><span>Fri</span><span>Sat</span></div>'
-        contrib_html += '<div class="contrib-main">'
-        contrib_html += '<div class="contrib-months">'
-        for week_num, month_name in month_labels:
-            left_px = week_num * 12
-            contrib_html += f'<span style="position:absolute;left:{left_px}px">{month_name}</span>'
-        contrib_html += '</div>'
-        contrib_html += '<div class="contrib-grid">'
-        for week in cal_cells:
-            contrib_html += '<div class="contrib-week">'
-            for date_str, count, level, in_year in week:
-                if in_year:
-                    try: date_obj = dt.strptime(date_str, '%Y-%m-%d')
-                    except: formatted_date = date_str
-                    msg_text = "message" if count == 1 else "messages"
-                    contrib_html += f'<div class="contrib-cell level-{level}" data-date="{date_obj.strftime("%b %d, %Y")}" data-count="{count}" data-msg-text="{msg_text}"></div>'
-                else:
-                    contrib_html += '<div class="contrib-cell empty"></div>'
-            contrib_html += '</div>'
-        contrib_html += '</div></div></div>'
-        contrib_html += '<div class="contrib-legend"><span>Less</span><div class="contrib-cell level-0"></div><div class="contrib-cell level-1"></div><div class="contrib-cell level-2"></div><div class="contrib-cell level-3"></div><div class="contrib-cell level-4"></div><span>More</span></div>'
-        contrib_html += '</div>'
 
-        slides.append(f'''
+        out.slide('''
         <div class="slide contrib-slide">
             <div class="slide-label">// MESSAGE ACTIVITY</div>
             <div class="slide-text">your texting throughout the year</div>
-            {contrib_html}
+            ''')
+        out.write('<div class="contrib-graph">')
+        out.write(contrib_svg(d['daily_counts'], year_start, year_end, max_count))
+        out.write('<div class="contrib-legend"><span>Less</span><div class="contrib-cell level-0"></div><div class="contrib-cell level-1"></div><div class="contrib-cell level-2"></div><div class="contrib-cell level-3"></div><div class="contrib-cell level-4"></div><span>More</span></div>')
+        out.write('</div>')
+        out.write(f'''
             <div class="contrib-stats">
                 <div class="contrib-stat"><span class="contrib-stat-num">{d['avg_daily']}</span><span class="contrib-stat-lbl">avg/day</span></div>
                 <div class="contrib-stat"><span class="contrib-stat-num">{d['busiest_month']}</span><span class="contrib-stat-lbl">busiest month</span></div>
@@ -584,7 +1661,7 @@ def gen_html(d, contacts, path):
         </div>''')
 
     if top:
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide pink-bg">
             <div class="slide-label">// YOUR #1</div>
             <div class="slide-text">most texted person</div>
@@ -595,7 +1672,7 @@ def gen_html(d, contacts, path):
             <div class="slide-watermark">wrap2025.com</div>
         </div>''')
 
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide">
             <div class="slide-label">// INNER CIRCLE</div>
             <div class="slide-text">your top 5</div>
@@ -610,7 +1687,7 @@ def gen_html(d, contacts, path):
         lurker_label = "LURKER" if lurker_pct > 60 else "CONTRIBUTOR" if lurker_pct < 40 else "BALANCED"
         lurker_class = "yellow" if lurker_pct > 60 else "green" if lurker_pct < 40 else "cyan"
 
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide">
             <div class="slide-label">// GROUP CHATS</div>
             <div class="slide-icon">👥</div>
@@ -630,13 +1707,7 @@ def gen_html(d, contacts, path):
             def format_group_name(gc):
                 if gc['name']:
                     return gc['name']
-                handles = q(f"""
-                    SELECT h.id FROM chat_handle_join chj
-                    JOIN handle h ON chj.handle_id = h.ROWID
-                    WHERE chj.chat_id = {gc['chat_id']}
-                    LIMIT 2
-                """)
-                names = [n(h[0]) for h in handles if n(h[0])]
+                names = [n(h) for h in group_members(gc) if n(h)]
                 if names:
                     extra = gc['participant_count'] - len(names)
                     return f"{', '.join(names)} +{extra}" if extra > 0 else ', '.join(names)
@@ -646,7 +1717,7 @@ def gen_html(d, contacts, path):
                 f'<div class="rank-item"><span class="rank-num">{i}</span><span class="rank-name">{format_group_name(gc)}</span><span class="rank-count">{gc["msg_count"]:,}</span></div>'
                 for i, gc in enumerate(d['group_leaderboard'][:5], 1)
             ])
-            slides.append(f'''
+            out.slide(f'''
             <div class="slide orange-bg">
                 <div class="slide-label">// TOP GROUP CHATS</div>
                 <div class="slide-text">your most active groups</div>
@@ -663,7 +1734,7 @@ def gen_html(d, contacts, path):
                     f'<div class="rank-item"><span class="rank-num">#{i+1}</span><span class="rank-name">{s["display_name"]}</span><span class="rank-count green">{s["msg_count"]:,}</span></div>'
                     for i, s in enumerate(d['top_group_senders'])
                 ])
-                slides.append(f'''
+                out.slide(f'''
                 <div class="slide whatsapp-bg">
                     <div class="slide-label">// MVP LEADERBOARD</div>
                     <div class="slide-text">all contributors in "{top_group_name}"</div>
@@ -673,7 +1744,7 @@ def gen_html(d, contacts, path):
                 </div>''')
 
 
-    slides.append(f'''
+    out.slide(f'''
     <div class="slide purple-bg">
         <div class="slide-label">// DIAGNOSIS</div>
         <div class="slide-text">texting personality</div>
@@ -685,7 +1756,7 @@ def gen_html(d, contacts, path):
 
     starter_label = "YOU START" if d['starter_pct'] > 50 else "THEY START"
     starter_class = "green" if d['starter_pct'] > 50 else "yellow"
-    slides.append(f'''
+    out.slide(f'''
     <div class="slide">
         <div class="slide-label">// WHO TEXTS FIRST</div>
         <div class="slide-text">conversation initiator</div>
@@ -696,20 +1767,52 @@ def gen_html(d, contacts, path):
         <div class="slide-watermark">wrap2025.com</div>
     </div>''')
 
+    sessions = d.get('sessions')
+    if sessions:
+        longest = sessions['longest']
+        with_whom = f" with {n(longest['contact'])}" if longest['contact'] else ''
+        double_class = 'red' if sessions['double_text_pct'] > 30 else 'cyan'
+        out.slide(f'''
+    <div class="slide">
+        <div class="slide-label">// CONVERSATIONS</div>
+        <div class="slide-text">{sessions['count']:,} conversations, each about</div>
+        <div class="big-number cyan">{sessions['avg_minutes']}</div>
+        <div class="slide-text">minutes · {sessions['avg_messages']} messages</div>
+        <div class="badge {double_class}">DOUBLE-TEXTED IN {sessions['double_text_pct']}%</div>
+        <div class="roast">longest: {longest['messages']:,} messages{with_whom} on {longest['date']}</div>
+        <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_conversations.png', this)">📸 Save</button>
+        <div class="slide-watermark">wrap2025.com</div>
+    </div>''')
+
     resp_class = 'green' if d['resp'] < 10 else 'yellow' if d['resp'] < 60 else 'red'
     resp_label = "INSTANT" if d['resp'] < 10 else "NORMAL" if d['resp'] < 60 else "SLOW"
-    slides.append(f'''
+    out.slide(f'''
     <div class="slide">
         <div class="slide-label">// RESPONSE TIME</div>
         <div class="slide-text">avg reply</div>
         <div class="big-number {resp_class}">{d['resp']}</div>
         <div class="slide-text">minutes</div>
         <div class="badge {resp_class}">{resp_label}</div>
+        {f'<div class="roast" style="margin-top:16px;">median {delay_label(d["resp_median"])} · 90% within {delay_label(d["resp_p90"])}</div>' if d.get('resp_median') is not None else ''}
         <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_response_time.png', this)">📸 Save</button>
         <div class="slide-watermark">wrap2025.com</div>
     </div>''')
 
-    slides.append(f'''
+    # Your most-answered people, fastest median reply first
+    speed = sorted((d.get('resp_contacts') or [])[:5], key=lambda x: (x[2], x[0]))
+    if len(speed) >= 3:
+        speed_html = ''.join([f'<div class="rank-item"><span class="rank-num">{i}</span><span class="rank-name">{n(h)}</span><span class="rank-count">{delay_label(med)}</span></div>' for i,(h,_,med,_) in enumerate(speed,1)])
+        out.slide(f'''
+        <div class="slide">
+            <div class="slide-label">// REPLY SPEED</div>
+            <div class="slide-text">who gets answered first</div>
+            <div class="rank-list">{speed_html}</div>
+            <div class="roast" style="margin-top:16px;">median reply to your 5 most-answered</div>
+            <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_reply_speed.png', this)">📸 Save</button>
+            <div class="slide-watermark">wrap2025.com</div>
+        </div>''')
+
+    out.slide(f'''
     <div class="slide">
         <div class="slide-label">// PEAK HOURS</div>
         <div class="slide-text">most active</div>
@@ -721,7 +1824,7 @@ def gen_html(d, contacts, path):
 
     if d['late']:
         ln = d['late'][0]
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide">
             <div class="slide-label">// 3AM BESTIE</div>
             <div class="slide-icon">🌙</div>
@@ -733,7 +1836,7 @@ def gen_html(d, contacts, path):
         </div>''')
 
     if d['busiest_day']:
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide">
             <div class="slide-label">// BUSIEST DAY</div>
             <div class="slide-text">your most unhinged day</div>
@@ -747,7 +1850,7 @@ def gen_html(d, contacts, path):
     if d['fan']:
         f = d['fan'][0]
         ratio = round(f[1]/(f[2]+1), 1)
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide">
             <div class="slide-label">// BIGGEST FAN</div>
             <div class="slide-text">texts you most</div>
@@ -760,7 +1863,7 @@ def gen_html(d, contacts, path):
     if d['simp']:
         si = d['simp'][0]
         ratio = round(si[1]/(si[2]+1), 1)
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide red-bg">
             <div class="slide-label">// DOWN BAD</div>
             <div class="slide-text">you simp for</div>
@@ -770,12 +1873,17 @@ def gen_html(d, contacts, path):
             <div class="slide-watermark">wrap2025.com</div>
         </div>''')
 
+    # A --since/--until range is split at d['split'], the fixed year at June 1
+    split = date.fromisoformat(d['split']) if d.get('split') else None
+    heat_since = f"since {split:%b} {split.day}" if split else "in H2"
+    ghost_before = f"before {split:%b} {split.day}" if split else "before June"
+
     if d['heating']:
         heat_html = ''.join([f'<div class="rank-item"><span class="rank-num">🔥</span><span class="rank-name">{n(h)}</span><span class="rank-count green">+{h2-h1}</span></div>' for h,h1,h2 in d['heating'][:5]])
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide orange-bg">
             <div class="slide-label">// HEATING UP</div>
-            <div class="slide-text">getting stronger in H2</div>
+            <div class="slide-text">getting stronger {heat_since}</div>
             <div class="rank-list">{heat_html}</div>
             <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_heating_up.png', this)">📸 Save</button>
             <div class="slide-watermark">wrap2025.com</div>
@@ -783,19 +1891,19 @@ def gen_html(d, contacts, path):
 
     if d['ghosted']:
         ghost_html = ''.join([f'<div class="rank-item"><span class="rank-num">👻</span><span class="rank-name">{n(h)}</span><span class="rank-count"><span class="green">{b}</span> → <span class="red">{a}</span></span></div>' for h,b,a in d['ghosted'][:5]])
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide">
             <div class="slide-label">// GHOSTED</div>
             <div class="slide-text">they chose peace</div>
             <div class="rank-list">{ghost_html}</div>
-            <div class="roast" style="margin-top:16px;">before June → after</div>
+            <div class="roast" style="margin-top:16px;">{ghost_before} → after</div>
             <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_ghosted.png', this)">📸 Save</button>
             <div class="slide-watermark">wrap2025.com</div>
         </div>''')
 
     if d['emoji'] and any(e[1] > 0 for e in d['emoji']):
         emo = '  '.join([e[0] for e in d['emoji'] if e[1] > 0])
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide">
             <div class="slide-label">// EMOJIS</div>
             <div class="slide-text">your emotional range</div>
@@ -804,8 +1912,66 @@ def gen_html(d, contacts, path):
             <div class="slide-watermark">wrap2025.com</div>
         </div>''')
 
+    yoy = d.get('yoy') or []
+    if len(yoy) > 1:
+        prev, cur = yoy[-2], yoy[-1]
+        peak = max(y['messages'] for y in yoy) or 1
+        growth = round((cur['messages'] - prev['messages']) / prev['messages'] * 100) if prev['messages'] else None
+        growth_str = 'NEW' if growth is None else f"{growth:+d}%"
+        growth_class = 'green' if growth is None or growth >= 0 else 'red'
+        growth_html = ''.join([f'<div class="rank-item"><span class="rank-num year">{y["year"]}</span><span class="rank-name"><span class="yoy-bar" style="width:{max(y["messages"] * 100 // peak, 1)}%"></span></span><span class="rank-count">{y["messages"]:,}</span></div>' for y in reversed(yoy)])
+        out.slide(f'''
+        <div class="slide">
+            <div class="slide-label">// YEAR OVER YEAR</div>
+            <div class="big-number {growth_class}">{growth_str}</div>
+            <div class="slide-text">messages vs {prev['year']}</div>
+            <div class="rank-list">{growth_html}</div>
+            <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_year_over_year.png', this)">📸 Save</button>
+            <div class="slide-watermark">wrap2025.com</div>
+        </div>''')
+
+        # Churn is by resolved name, so a contact who switched handles still counts as staying
+        before = {n(h): i for i, h in enumerate(prev['top'], 1)}
+        churn = []
+        for i, h in enumerate(cur['top'], 1):
+            name = n(h)
+            if name not in before:
+                churn.append(f'<div class="rank-item"><span class="rank-num">🆕</span><span class="rank-name">{name}</span><span class="rank-count green">#{i}</span></div>')
+            elif before[name] != i:
+                churn.append(f'<div class="rank-item"><span class="rank-num">{"⬆️" if i < before[name] else "⬇️"}</span><span class="rank-name">{name}</span><span class="rank-count">#{before[name]} → #{i}</span></div>')
+        now_names = {n(h) for h in cur['top']}
+        churn += [f'<div class="rank-item"><span class="rank-num">📉</span><span class="rank-name">{name}</span><span class="rank-count red">out</span></div>' for name in before if name not in now_names]
+        kept = len(now_names & before.keys())
+        if churn:
+            out.slide(f'''
+            <div class="slide purple-bg">
+                <div class="slide-label">// ROSTER CHANGES</div>
+                <div class="slide-text">your top 5 vs {prev['year']}</div>
+                <div class="rank-list">{''.join(churn[:6])}</div>
+                <div class="roast" style="margin-top:16px;">{kept} of 5 survived the year</div>
+                <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_roster_changes.png', this)">📸 Save</button>
+                <div class="slide-watermark">wrap2025.com</div>
+            </div>''')
+
+        timed = [y for y in yoy if y['resp'] is not None]
+        if len(timed) > 1:
+            delta = timed[-1]['resp'] - timed[0]['resp']
+            trend_class = 'green' if delta <= 0 else 'red'
+            trend_label = "GETTING FASTER" if delta < 0 else "SAME SPEED" if delta == 0 else "GETTING SLOWER"
+            trend_html = ''.join([f'<div class="rank-item"><span class="rank-num year">{y["year"]}</span><span class="rank-name">avg reply</span><span class="rank-count">{y["resp"]}m</span></div>' for y in reversed(timed)])
+            out.slide(f'''
+            <div class="slide">
+                <div class="slide-label">// REPLY SPEED TREND</div>
+                <div class="big-number {trend_class}">{delta:+d}</div>
+                <div class="slide-text">minutes since {timed[0]['year']}</div>
+                <div class="rank-list">{trend_html}</div>
+                <div class="badge {trend_class}">{trend_label}</div>
+                <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_reply_speed_trend.png', this)">📸 Save</button>
+                <div class="slide-watermark">wrap2025.com</div>
+            </div>''')
+
     top3_names = ', '.join([n(h[0]) for h,_,_,_ in top[:3]]) if top else "No contacts"
-    slides.append(f'''
+    out.slide(f'''
     <div class="slide summary-slide">
         <div class="summary-card" id="summaryCard">
             <div class="summary-header">
@@ -851,27 +2017,127 @@ def gen_html(d, contacts, path):
             <span class="btn-icon">📸</span>
             <span>Save Screenshot</span>
         </button>
+        <button class="screenshot-btn export-btn" onclick="exportAll(this)">
+            <span class="btn-icon">📦</span>
+            <span>Export All Slides</span>
+        </button>
         <div class="share-hint">share your damage</div>
     </div>''')
     
-    slides_html = ''.join(slides)
-    num_slides = len(slides)
-    
-    favicon = "data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>🌯</text></svg>"
-    
-    html = f'''<!DOCTYPE html>
-<html><head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width,initial-scale=1">
-<title>iMessage Wrapped {d.get('year', '2025')}</title>
-<link rel="icon" href="{favicon}">
-<script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>
-<link rel="preconnect" href="https://fonts.googleapis.com">
-<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-<link href="https://fonts.googleapis.com/css2?family=Silkscreen&family=Azeret+Mono:wght@400;500;600;700&family=Space+Grotesk:wght@400;500;700&display=swap" rel="stylesheet">
-<style>
+    out.write(f'''</div>
+<div class="progress" id="progress"></div>
+<div class="nav prev" id="prev">‹</div>
+<div class="nav next" id="next">›</div>
+
+<script>
+const gallery = document.getElementById('gallery');
+const progressEl = document.getElementById('progress');
+const prevBtn = document.getElementById('prev');
+const nextBtn = document.getElementById('next');
+const total = {out.slides};
+const year = '{d.get('year', '2025')}';
+''')
+    out.write(REPORT_JS)
+    out.write('''</script>
+</body></html>''')
 
-:root {{
+def gen_html(d, contacts, path):
+    with HtmlReport(path) as out:
+        write_report(out, d, contacts)
+    return path
+
+def group_members(gc):
+    """First two handles of an unnamed group chat, which stand in for its name (kept in the entry by export_stats())."""
+    if 'members' in gc:
+        return gc['members']
+    return [h for h, in q(f"""
+        SELECT h.id FROM chat_handle_join chj
+        JOIN handle h ON chj.handle_id = h.ROWID
+        WHERE chj.chat_id = {gc['chat_id']}
+        LIMIT 2
+    """)]
+
+EXPORT_FORMAT = 'wrap2025-stats'
+EXPORT_VERSION = 1
+# Sections with a row per contact, group or day; NDJSON gives each row its own record
+EXPORT_ROWS = ('top', 'late', 'ghosted', 'heating', 'fan', 'simp', 'resp_contacts', 'top_words', 'top_phrases', 'group_leaderboard', 'top_group_senders', 'daily_counts', 'yoy')
+
+def export_stats(d, contacts, path, ndjson=False):
+    """Write every metric in d, with the names its handles resolve to, as versioned JSON or NDJSON.
+
+    The file carries everything write_report() reads, so --from-json can render it without the databases.
+    """
+    d = dict(d, group_leaderboard=[gc if gc['name'] else dict(gc, members=group_members(gc)) for gc in d['group_leaderboard']])
+    handles = [row[0] for k in ('top', 'late', 'ghosted', 'heating', 'fan', 'simp', 'resp_contacts') for row in d.get(k) or ()]
+    handles += [d['sessions']['longest']['contact']] if d.get('sessions') else []
+    handles += [h for gc in d['group_leaderboard'] for h in gc.get('members', ())]
+    handles += [h for y in d.get('yoy') or () for h in y['top']]
+    names = {h: contacts.name(h) for h in handles if h is not None}
+    header = {'format': EXPORT_FORMAT, 'version': EXPORT_VERSION, 'source': 'imessage', 'generated': datetime.now().isoformat(timespec='seconds')}
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            if not ndjson:
+                json.dump({**header, 'names': names, 'data': d}, f, ensure_ascii=False)
+            else:
+                line = lambda record: f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                line({'kind': 'header', **header})
+                for h, name in names.items():
+                    line({'kind': 'name', 'handle': h, 'name': name})
+                for key, value in d.items():
+                    if key not in EXPORT_ROWS:
+                        line({'kind': 'metric', 'key': key, 'value': value})
+                    elif isinstance(value, dict):
+                        line({'kind': 'metric', 'key': key, 'value': {}})
+                        for name, v in value.items():
+                            line({'kind': 'row', 'key': key, 'name': name, 'value': v})
+                    else:
+                        line({'kind': 'metric', 'key': key, 'value': []})
+                        for row in value:
+                            line({'kind': 'row', 'key': key, 'value': row})
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return path
+
+def load_stats(path, source='imessage'):
+    """Read an export_stats() file of either layout back into (header, names, d)."""
+    with open(path, encoding='utf-8') as f:
+        try:
+            first = json.loads(f.readline())
+        except ValueError:
+            first = None
+        if isinstance(first, dict) and first.get('kind') == 'header':
+            header, names, d = first, {}, {}
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record['kind'] == 'name':
+                    names[record['handle']] = record['name']
+                elif record['kind'] == 'metric':
+                    d[record['key']] = record['value']
+                elif 'name' in record:
+                    d[record['key']][record['name']] = record['value']
+                else:
+                    d[record['key']].append(record['value'])
+        else:
+            if not isinstance(first, dict):
+                # Not a one-line document (indented by hand or another tool), so parse the whole file
+                f.seek(0)
+                first = json.load(f)
+            header = first
+            names, d = header.pop('names', {}), header.pop('data', {})
+    if header.get('format') != EXPORT_FORMAT or header.get('source') != source:
+        raise ValueError(f"not a {source} stats export")
+    if header.get('version', 0) > EXPORT_VERSION:
+        raise ValueError(f"written by a newer version (format {header['version']}, this script reads {EXPORT_VERSION})")
+    return header, names, d
+
+# Stylesheet and script shared by every report, kept out of the per-run formatting
+REPORT_CSS = '''
+:root {
     --bg: #0a0a12;
     --text: #f0f0f0;
     --muted: #8892a0;
@@ -886,19 +2152,19 @@ def gen_html(d, contacts, path):
     --font-pixel: 'Silkscreen', cursive;
     --font-mono: 'Azeret Mono', monospace;
     --font-body: 'Space Grotesk', sans-serif;
-}}
+}
 
-* {{ margin:0; padding:0; box-sizing:border-box; -webkit-tap-highlight-color:transparent; }}
-html, body {{ height:100%; overflow:hidden; }}
-body {{ font-family:'Space Grotesk',sans-serif; background:var(--bg); color:var(--text); }}
+* { margin:0; padding:0; box-sizing:border-box; -webkit-tap-highlight-color:transparent; }
+html, body { height:100%; overflow:hidden; }
+body { font-family:'Space Grotesk',sans-serif; background:var(--bg); color:var(--text); }
 
-.gallery {{
+.gallery {
     display:flex;
     height:100%;
     transition:transform 0.4s cubic-bezier(0.22, 1, 0.36, 1);
-}}
+}
 
-.slide {{
+.slide {
     position:relative;
     min-width:100vw;
     height:100vh;
@@ -909,90 +2175,84 @@ body {{ font-family:'Space Grotesk',sans-serif; background:var(--bg); color:var(
     padding:40px 32px 80px;
     text-align:center;
     background:var(--bg);
-}}
+}
 
-.slide.intro {{ background:linear-gradient(145deg,#12121f 0%,#1a1a2e 50%,#0f2847 100%); }}
-.slide.pink-bg {{ background:linear-gradient(145deg,#12121f 0%,#2d1a3d 100%); }}
-.slide.purple-bg {{ background:linear-gradient(145deg,#12121f 0%,#1f1a3d 100%); }}
-.slide.orange-bg {{ background:linear-gradient(145deg,#12121f 0%,#2d1f1a 100%); }}
-.slide.red-bg {{ background:linear-gradient(145deg,#12121f 0%,#2d1a1a 100%); }}
-.slide.whatsapp-bg {{ background:linear-gradient(145deg,#12121f 0%,#0d2f1a 100%); }}
-.slide.summary-slide {{ background:linear-gradient(145deg,#0f2847 0%,#12121f 50%,#1a1a2e 100%); }}
-.slide.contrib-slide {{ background:linear-gradient(145deg,#12121f 0%,#0f1f2d 100%); padding:24px 16px 80px; }}
+.slide.intro { background:linear-gradient(145deg,#12121f 0%,#1a1a2e 50%,#0f2847 100%); }
+.slide.pink-bg { background:linear-gradient(145deg,#12121f 0%,#2d1a3d 100%); }
+.slide.purple-bg { background:linear-gradient(145deg,#12121f 0%,#1f1a3d 100%); }
+.slide.orange-bg { background:linear-gradient(145deg,#12121f 0%,#2d1f1a 100%); }
+.slide.red-bg { background:linear-gradient(145deg,#12121f 0%,#2d1a1a 100%); }
+.slide.whatsapp-bg { background:linear-gradient(145deg,#12121f 0%,#0d2f1a 100%); }
+.slide.summary-slide { background:linear-gradient(145deg,#0f2847 0%,#12121f 50%,#1a1a2e 100%); }
+.slide.contrib-slide { background:linear-gradient(145deg,#12121f 0%,#0f1f2d 100%); padding:24px 16px 80px; }
 
 /* === CONTRIBUTION GRAPH STYLES */
-.contrib-graph {{ display:flex; flex-direction:column; align-items:center; margin:20px auto; padding:0 8px; }}
-.contrib-container {{ display:flex; gap:4px; }}
-.contrib-days {{ display:flex; flex-direction:column; gap:2px; font-size:9px; color:var(--muted); padding-top:20px; min-width:28px; text-align:right; padding-right:4px; }}
-.contrib-days span {{ height:10px; line-height:10px; }}
-.contrib-main {{ display:flex; flex-direction:column; }}
-.contrib-months {{ position:relative; height:16px; margin-bottom:4px; font-size:10px; color:var(--muted); }}
-.contrib-months span {{ position:absolute; white-space:nowrap; }}
-.contrib-grid {{ display:flex; gap:2px; }}
-.contrib-week {{ display:flex; flex-direction:column; gap:2px; }}
-.contrib-cell {{ width:10px; height:10px; border-radius:2px; background:rgba(255,255,255,0.05); }}
-.contrib-cell.empty {{ background:transparent; }}
-.contrib-cell.level-0 {{ background:rgba(255,255,255,0.12); }}
-.contrib-cell.level-1 {{ background:rgba(74,222,128,0.25); }}
-.contrib-cell.level-2 {{ background:rgba(74,222,128,0.45); }}
-.contrib-cell.level-3 {{ background:rgba(74,222,128,0.70); }}
-.contrib-cell.level-4 {{ background:var(--green); }}
-.contrib-cell:not(.empty) {{ cursor:pointer; position:relative; }}
-.contrib-tooltip {{ position:fixed; background:rgba(20,20,30,0.95); color:var(--text); padding:8px 12px; border-radius:6px; font-size:12px; pointer-events:none; z-index:1000; white-space:nowrap; border:1px solid rgba(255,255,255,0.1); box-shadow:0 4px 12px rgba(0,0,0,0.3); }}
-.contrib-tooltip .tooltip-count {{ font-family:var(--font-mono); color:var(--green); font-weight:600; }}
-.contrib-tooltip .tooltip-date {{ color:var(--muted); font-size:11px; margin-top:2px; }}
-.contrib-legend {{ display:flex; align-items:center; justify-content:center; gap:4px; margin-top:12px; font-size:10px; color:var(--muted); }}
-.contrib-legend .contrib-cell {{ cursor:default; }}
-.contrib-stats {{ display:flex; gap:32px; margin-top:24px; justify-content:center; }}
-.contrib-stat {{ display:flex; flex-direction:column; align-items:center; }}
-.contrib-stat-num {{ font-family:var(--font-mono); font-size:28px; font-weight:600; color:var(--green); }}
-.contrib-stat-lbl {{ font-size:11px; color:var(--muted); margin-top:4px; text-transform:uppercase; letter-spacing:0.5px; }}
-
-.slide h1 {{ font-family:var(--font-pixel); font-size:36px; font-weight:400; line-height:1.2; margin:20px 0; }}
-.slide-label {{ font-family:var(--font-pixel); font-size:12px; font-weight:400; color:var(--green); letter-spacing:0.5px; margin-bottom:16px; }}
-.slide-icon {{ font-size:80px; margin-bottom:16px; }}
-.slide-text {{ font-size:18px; color:var(--muted); margin:8px 0; }}
-.subtitle {{ font-size:18px; color:var(--muted); margin-top:8px; }}
-
-.big-number {{ font-family:var(--font-mono); font-size:80px; font-weight:500; line-height:1; letter-spacing:-2px; }}
-.pct {{ font-family:var(--font-body); font-size:48px; }}
-.huge-name {{ font-family:var(--font-body); font-size:32px; font-weight:600; line-height:1.25; word-break:break-word; max-width:90%; margin:16px 0; }}
-.personality-type {{ font-family:var(--font-pixel); font-size:18px; font-weight:400; line-height:1.25; color:var(--purple); margin:24px 0; text-transform:uppercase; letter-spacing:0.5px; }}
-.roast {{ font-style:italic; color:var(--muted); font-size:18px; margin-top:16px; max-width:400px; }}
-
-.green {{ color:var(--green); }}
-.yellow {{ color:var(--yellow); }}
-.red {{ color:var(--red); }}
-.cyan {{ color:var(--cyan); }}
-.pink {{ color:var(--pink); }}
-.orange {{ color:var(--orange); }}
-.purple {{ color:var(--purple); }}
-
-.stat-grid {{ display:flex; gap:40px; margin-top:28px; }}
-.stat-item {{ display:flex; flex-direction:column; align-items:center; }}
-.stat-num {{ font-family:var(--font-mono); font-size:24px; font-weight:600; color:var(--cyan); }}
-.stat-lbl {{ font-size:11px; color:var(--muted); margin-top:6px; text-transform:uppercase; letter-spacing:0.5px; }}
-
-.rank-list {{ width:100%; max-width:420px; margin-top:20px; padding:0 16px 16px; }}
-.rank-item {{ display:flex; align-items:center; padding:14px 0; border-bottom:1px solid rgba(255,255,255,0.1); gap:16px; }}
-.rank-item:last-child {{ border-bottom:none; }}
-.rank-item:first-child {{ background:linear-gradient(90deg, rgba(74,222,128,0.15) 0%, transparent 100%); padding:14px 12px; margin:0 -12px; border-radius:8px; border-bottom:none; }}
-.rank-item:first-child .rank-name {{ font-weight:600; color:var(--green); }}
-.rank-item:first-child .rank-count {{ font-size:20px; }}
-.rank-num {{ font-family:var(--font-mono); font-size:20px; font-weight:600; color:var(--green); width:36px; text-align:center; }}
-.rank-name {{ flex:1; font-size:16px; text-align:left; white-space:nowrap; overflow:hidden; text-overflow:ellipsis; }}
-.rank-count {{ font-family:var(--font-mono); font-size:18px; font-weight:600; color:var(--yellow); }}
-
-.badge {{ display:inline-block; padding:8px 18px; border-radius:24px; font-family:var(--font-pixel); font-size:9px; font-weight:400; text-transform:uppercase; letter-spacing:0.3px; margin-top:20px; border:2px solid; }}
-.badge.green {{ border-color:var(--green); color:var(--green); background:rgba(74,222,128,0.1); }}
-.badge.yellow {{ border-color:var(--yellow); color:var(--yellow); background:rgba(251,191,36,0.1); }}
-.badge.red {{ border-color:var(--red); color:var(--red); background:rgba(248,113,113,0.1); }}
-.badge.cyan {{ border-color:var(--cyan); color:var(--cyan); background:rgba(34,211,238,0.1); }}
-
-.emoji-row {{ font-size:64px; letter-spacing:20px; margin:28px 0; }}
-
-.tap-hint {{ position:absolute; bottom:60px; font-size:16px; color:var(--muted); animation:pulse 2s infinite; }}
-@keyframes pulse {{ 0%,100%{{opacity:0.4}} 50%{{opacity:1}} }}
+.contrib-graph { display:flex; flex-direction:column; align-items:center; margin:20px auto; padding:0 8px; }
+.contrib-svg { display:block; max-width:100%; height:auto; }
+.contrib-svg rect { cursor:pointer; }
+.contrib-cell { width:10px; height:10px; border-radius:2px; background:rgba(255,255,255,0.05); }
+.contrib-cell.level-0 { background:rgba(255,255,255,0.12); }
+.contrib-cell.level-1 { background:rgba(74,222,128,0.25); }
+.contrib-cell.level-2 { background:rgba(74,222,128,0.45); }
+.contrib-cell.level-3 { background:rgba(74,222,128,0.70); }
+.contrib-cell.level-4 { background:var(--green); }
+.contrib-tooltip { position:fixed; background:rgba(20,20,30,0.95); color:var(--text); padding:8px 12px; border-radius:6px; font-size:12px; pointer-events:none; z-index:1000; white-space:nowrap; border:1px solid rgba(255,255,255,0.1); box-shadow:0 4px 12px rgba(0,0,0,0.3); }
+.contrib-tooltip .tooltip-count { font-family:var(--font-mono); color:var(--green); font-weight:600; }
+.contrib-tooltip .tooltip-date { color:var(--muted); font-size:11px; margin-top:2px; }
+.contrib-legend { display:flex; align-items:center; justify-content:center; gap:4px; margin-top:12px; font-size:10px; color:var(--muted); }
+.contrib-legend .contrib-cell { cursor:default; }
+.contrib-stats { display:flex; gap:32px; margin-top:24px; justify-content:center; }
+.contrib-stat { display:flex; flex-direction:column; align-items:center; }
+.contrib-stat-num { font-family:var(--font-mono); font-size:28px; font-weight:600; color:var(--green); }
+.contrib-stat-lbl { font-size:11px; color:var(--muted); margin-top:4px; text-transform:uppercase; letter-spacing:0.5px; }
+
+.slide h1 { font-family:var(--font-pixel); font-size:36px; font-weight:400; line-height:1.2; margin:20px 0; }
+.slide-label { font-family:var(--font-pixel); font-size:12px; font-weight:400; color:var(--green); letter-spacing:0.5px; margin-bottom:16px; }
+.slide-icon { font-size:80px; margin-bottom:16px; }
+.slide-text { font-size:18px; color:var(--muted); margin:8px 0; }
+.subtitle { font-size:18px; color:var(--muted); margin-top:8px; }
+
+.big-number { font-family:var(--font-mono); font-size:80px; font-weight:500; line-height:1; letter-spacing:-2px; }
+.pct { font-family:var(--font-body); font-size:48px; }
+.huge-name { font-family:var(--font-body); font-size:32px; font-weight:600; line-height:1.25; word-break:break-word; max-width:90%; margin:16px 0; }
+.personality-type { font-family:var(--font-pixel); font-size:18px; font-weight:400; line-height:1.25; color:var(--purple); margin:24px 0; text-transform:uppercase; letter-spacing:0.5px; }
+.roast { font-style:italic; color:var(--muted); font-size:18px; margin-top:16px; max-width:400px; }
+
+.green { color:var(--green); }
+.yellow { color:var(--yellow); }
+.red { color:var(--red); }
+.cyan { color:var(--cyan); }
+.pink { color:var(--pink); }
+.orange { color:var(--orange); }
+.purple { color:var(--purple); }
+
+.stat-grid { display:flex; gap:40px; margin-top:28px; }
+.stat-item { display:flex; flex-direction:column; align-items:center; }
+.stat-num { font-family:var(--font-mono); font-size:24px; font-weight:600; color:var(--cyan); }
+.stat-lbl { font-size:11px; color:var(--muted); margin-top:6px; text-transform:uppercase; letter-spacing:0.5px; }
+
+.rank-list { width:100%; max-width:420px; margin-top:20px; padding:0 16px 16px; }
+.rank-item { display:flex; align-items:center; padding:14px 0; border-bottom:1px solid rgba(255,255,255,0.1); gap:16px; }
+.rank-item:last-child { border-bottom:none; }
+.rank-item:first-child { background:linear-gradient(90deg, rgba(74,222,128,0.15) 0%, transparent 100%); padding:14px 12px; margin:0 -12px; border-radius:8px; border-bottom:none; }
+.rank-item:first-child .rank-name { font-weight:600; color:var(--green); }
+.rank-item:first-child .rank-count { font-size:20px; }
+.rank-num { font-family:var(--font-mono); font-size:20px; font-weight:600; color:var(--green); width:36px; text-align:center; }
+.rank-name { flex:1; font-size:16px; text-align:left; white-space:nowrap; overflow:hidden; text-overflow:ellipsis; }
+.rank-count { font-family:var(--font-mono); font-size:18px; font-weight:600; color:var(--yellow); }
+.rank-num.year { width:56px; font-size:16px; }
+.yoy-bar { display:block; height:10px; border-radius:5px; background:var(--green); }
+
+.badge { display:inline-block; padding:8px 18px; border-radius:24px; font-family:var(--font-pixel); font-size:9px; font-weight:400; text-transform:uppercase; letter-spacing:0.3px; margin-top:20px; border:2px solid; }
+.badge.green { border-color:var(--green); color:var(--green); background:rgba(74,222,128,0.1); }
+.badge.yellow { border-color:var(--yellow); color:var(--yellow); background:rgba(251,191,36,0.1); }
+.badge.red { border-color:var(--red); color:var(--red); background:rgba(248,113,113,0.1); }
+.badge.cyan { border-color:var(--cyan); color:var(--cyan); background:rgba(34,211,238,0.1); }
+
+.emoji-row { font-size:64px; letter-spacing:20px; margin:28px 0; }
+
+.tap-hint { position:absolute; bottom:60px; font-size:16px; color:var(--muted); animation:pulse 2s infinite; }
+@keyframes pulse { 0%,100%{opacity:0.4} 50%{opacity:1} }
 
 /* === SLIDE ANIMATIONS === */
 /* Elements start hidden, animate when slide is active */
@@ -1011,277 +2271,277 @@ body {{ font-family:'Space Grotesk',sans-serif; background:var(--bg); color:var(
 .slide .subtitle,
 .slide .summary-card,
 .slide .contrib-graph,
-.slide .contrib-stats {{
+.slide .contrib-stats {
     opacity: 0;
     transform: translateY(20px);
-}}
+}
 
 /* Gallery transition */
-.gallery {{ transition: transform 0.55s cubic-bezier(0.22, 1, 0.36, 1); }}
+.gallery { transition: transform 0.55s cubic-bezier(0.22, 1, 0.36, 1); }
 
 /* === DEFAULT ANIMATIONS - Varied motion styles === */
-.slide.active .slide-label {{ animation: labelSlide 0.4s ease-out forwards; }}
-.slide.active .slide-text {{ animation: textFade 0.4s ease-out 0.1s forwards; }}
-.slide.active .slide-icon {{ animation: iconPop 0.5s cubic-bezier(0.34, 1.56, 0.64, 1) 0.05s forwards; }}
-.slide.active h1 {{ animation: titleReveal 0.5s ease-out 0.12s forwards; }}
-.slide.active .subtitle {{ animation: textFade 0.4s ease-out 0.25s forwards; }}
-.slide.active .big-number {{ animation: numberFlip 0.6s ease-out 0.18s forwards; }}
-.slide.active .huge-name {{ animation: nameBlur 0.5s ease-out 0.2s forwards; }}
-.slide.active .personality-type {{ animation: glitchReveal 0.8s ease-out 0.15s forwards; }}
-.slide.active .roast {{ animation: roastType 0.6s ease-out 0.4s forwards; }}
-.slide.active .badge {{ animation: badgeStamp 0.4s ease-out 0.5s forwards; }}
-.slide.active .stat-grid {{ animation: none; opacity: 1; transform: none; }}
-.slide.active .stat-item {{ animation: statFade 0.35s ease-out forwards; }}
-.slide.active .stat-item:nth-child(1) {{ animation-delay: 0.3s; }}
-.slide.active .stat-item:nth-child(2) {{ animation-delay: 0.38s; }}
-.slide.active .stat-item:nth-child(3) {{ animation-delay: 0.46s; }}
-.slide.active .rank-list {{ animation: none; opacity: 1; transform: none; }}
-.slide.active .rank-item {{ animation: rankSlide 0.35s ease-out forwards; }}
-.slide.active .rank-item:first-child {{ animation: topRankDrop 0.45s ease-out forwards; }}
-.slide.active .rank-item:nth-child(1) {{ animation-delay: 0.1s; }}
-.slide.active .rank-item:nth-child(2) {{ animation-delay: 0.18s; }}
-.slide.active .rank-item:nth-child(3) {{ animation-delay: 0.26s; }}
-.slide.active .rank-item:nth-child(4) {{ animation-delay: 0.34s; }}
-.slide.active .rank-item:nth-child(5) {{ animation-delay: 0.42s; }}
-.slide.active .emoji-row {{ animation: emojiSpread 0.6s ease-out 0.2s forwards; }}
-.slide.active .summary-card {{ animation: cardRise 0.6s ease-out 0.1s forwards; }}
-.slide.active .screenshot-btn {{ opacity: 0; animation: buttonSlide 0.4s ease-out 0.5s forwards; }}
-.slide.active .share-hint {{ opacity: 0; animation: hintFade 0.4s ease-out 0.7s forwards; }}
+.slide.active .slide-label { animation: labelSlide 0.4s ease-out forwards; }
+.slide.active .slide-text { animation: textFade 0.4s ease-out 0.1s forwards; }
+.slide.active .slide-icon { animation: iconPop 0.5s cubic-bezier(0.34, 1.56, 0.64, 1) 0.05s forwards; }
+.slide.active h1 { animation: titleReveal 0.5s ease-out 0.12s forwards; }
+.slide.active .subtitle { animation: textFade 0.4s ease-out 0.25s forwards; }
+.slide.active .big-number { animation: numberFlip 0.6s ease-out 0.18s forwards; }
+.slide.active .huge-name { animation: nameBlur 0.5s ease-out 0.2s forwards; }
+.slide.active .personality-type { animation: glitchReveal 0.8s ease-out 0.15s forwards; }
+.slide.active .roast { animation: roastType 0.6s ease-out 0.4s forwards; }
+.slide.active .badge { animation: badgeStamp 0.4s ease-out 0.5s forwards; }
+.slide.active .stat-grid { animation: none; opacity: 1; transform: none; }
+.slide.active .stat-item { animation: statFade 0.35s ease-out forwards; }
+.slide.active .stat-item:nth-child(1) { animation-delay: 0.3s; }
+.slide.active .stat-item:nth-child(2) { animation-delay: 0.38s; }
+.slide.active .stat-item:nth-child(3) { animation-delay: 0.46s; }
+.slide.active .rank-list { animation: none; opacity: 1; transform: none; }
+.slide.active .rank-item { animation: rankSlide 0.35s ease-out forwards; }
+.slide.active .rank-item:first-child { animation: topRankDrop 0.45s ease-out forwards; }
+.slide.active .rank-item:nth-child(1) { animation-delay: 0.1s; }
+.slide.active .rank-item:nth-child(2) { animation-delay: 0.18s; }
+.slide.active .rank-item:nth-child(3) { animation-delay: 0.26s; }
+.slide.active .rank-item:nth-child(4) { animation-delay: 0.34s; }
+.slide.active .rank-item:nth-child(5) { animation-delay: 0.42s; }
+.slide.active .emoji-row { animation: emojiSpread 0.6s ease-out 0.2s forwards; }
+.slide.active .summary-card { animation: cardRise 0.6s ease-out 0.1s forwards; }
+.slide.active .screenshot-btn { opacity: 0; animation: buttonSlide 0.4s ease-out 0.5s forwards; }
+.slide.active .share-hint { opacity: 0; animation: hintFade 0.4s ease-out 0.7s forwards; }
 
 /* === INTRO SLIDE - Spin entrance === */
-.slide.intro.active .slide-icon {{ animation: introIconSpin 0.7s ease-out forwards; }}
-.slide.intro.active h1 {{ animation: introTitleGlitch 0.6s ease-out 0.3s forwards; }}
-.slide.intro.active .subtitle {{ animation: textFade 0.4s ease-out 0.5s forwards; }}
+.slide.intro.active .slide-icon { animation: introIconSpin 0.7s ease-out forwards; }
+.slide.intro.active h1 { animation: introTitleGlitch 0.6s ease-out 0.3s forwards; }
+.slide.intro.active .subtitle { animation: textFade 0.4s ease-out 0.5s forwards; }
 
 /* === PINK SLIDE (#1 person) - Soft glow === */
-.slide.pink-bg.active .slide-label {{ animation: textFade 0.4s ease-out forwards; }}
-.slide.pink-bg.active .huge-name {{ animation: nameGlow 0.6s ease-out 0.15s forwards; }}
-.slide.pink-bg.active .big-number {{ animation: numberFlip 0.6s ease-out 0.35s forwards; }}
+.slide.pink-bg.active .slide-label { animation: textFade 0.4s ease-out forwards; }
+.slide.pink-bg.active .huge-name { animation: nameGlow 0.6s ease-out 0.15s forwards; }
+.slide.pink-bg.active .big-number { animation: numberFlip 0.6s ease-out 0.35s forwards; }
 
 /* === PURPLE SLIDE (Personality) - Glitch === */
-.slide.purple-bg.active .slide-label {{ animation: labelGlitch 0.5s ease-out forwards; }}
-.slide.purple-bg.active .personality-type {{ animation: personalityGlitch 0.8s ease-out 0.12s forwards; }}
-.slide.purple-bg.active .roast {{ animation: flickerReveal 0.6s ease-out 0.45s forwards; }}
+.slide.purple-bg.active .slide-label { animation: labelGlitch 0.5s ease-out forwards; }
+.slide.purple-bg.active .personality-type { animation: personalityGlitch 0.8s ease-out 0.12s forwards; }
+.slide.purple-bg.active .roast { animation: flickerReveal 0.6s ease-out 0.45s forwards; }
 
 /* === RED SLIDE (Down Bad) - Drop from above */
-.slide.red-bg.active .slide-label {{ animation: textFade 0.4s ease-out forwards; }}
-.slide.red-bg.active .huge-name {{ animation: dramaticDrop 0.5s ease-out 0.12s forwards; }}
-.slide.red-bg.active .big-number {{ animation: shakeReveal 0.5s ease-out 0.35s forwards; }}
+.slide.red-bg.active .slide-label { animation: textFade 0.4s ease-out forwards; }
+.slide.red-bg.active .huge-name { animation: dramaticDrop 0.5s ease-out 0.12s forwards; }
+.slide.red-bg.active .big-number { animation: shakeReveal 0.5s ease-out 0.35s forwards; }
 
 /* === ORANGE SLIDE (Heating Up / Top Groups) - Glow rise */
-.slide.orange-bg.active .slide-label {{ animation: fireLabel 0.4s ease-out forwards; }}
-.slide.orange-bg.active .rank-item {{ animation: glowRise 0.4s ease-out forwards; }}
-.slide.orange-bg.active .rank-item:first-child {{ animation: glowRise 0.45s ease-out forwards; }}
-.slide.orange-bg.active .rank-item:nth-child(1) {{ animation-delay: 0.06s; }}
-.slide.orange-bg.active .rank-item:nth-child(2) {{ animation-delay: 0.14s; }}
-.slide.orange-bg.active .rank-item:nth-child(3) {{ animation-delay: 0.22s; }}
-.slide.orange-bg.active .rank-item:nth-child(4) {{ animation-delay: 0.30s; }}
-.slide.orange-bg.active .rank-item:nth-child(5) {{ animation-delay: 0.38s; }}
+.slide.orange-bg.active .slide-label { animation: fireLabel 0.4s ease-out forwards; }
+.slide.orange-bg.active .rank-item { animation: glowRise 0.4s ease-out forwards; }
+.slide.orange-bg.active .rank-item:first-child { animation: glowRise 0.45s ease-out forwards; }
+.slide.orange-bg.active .rank-item:nth-child(1) { animation-delay: 0.06s; }
+.slide.orange-bg.active .rank-item:nth-child(2) { animation-delay: 0.14s; }
+.slide.orange-bg.active .rank-item:nth-child(3) { animation-delay: 0.22s; }
+.slide.orange-bg.active .rank-item:nth-child(4) { animation-delay: 0.30s; }
+.slide.orange-bg.active .rank-item:nth-child(5) { animation-delay: 0.38s; }
 
 /* === MVP Slide (Whatsapp BG) - Quick fade-in to distinguish */
-.slide.whatsapp-bg.active .slide-label {{ animation: textFade 0.4s ease-out forwards; }}
-.slide.whatsapp-bg.active .slide-text {{ animation: textFade 0.4s ease-out 0.1s forwards; }}
-.slide.whatsapp-bg.active .rank-item {{ animation: rankSlide 0.35s ease-out forwards; }}
-.slide.whatsapp-bg.active .rank-item:nth-child(1) {{ animation-delay: 0.1s; }}
-.slide.whatsapp-bg.active .rank-item:nth-child(2) {{ animation-delay: 0.18s; }}
-.slide.whatsapp-bg.active .rank-item:nth-child(3) {{ animation-delay: 0.26s; }}
+.slide.whatsapp-bg.active .slide-label { animation: textFade 0.4s ease-out forwards; }
+.slide.whatsapp-bg.active .slide-text { animation: textFade 0.4s ease-out 0.1s forwards; }
+.slide.whatsapp-bg.active .rank-item { animation: rankSlide 0.35s ease-out forwards; }
+.slide.whatsapp-bg.active .rank-item:nth-child(1) { animation-delay: 0.1s; }
+.slide.whatsapp-bg.active .rank-item:nth-child(2) { animation-delay: 0.18s; }
+.slide.whatsapp-bg.active .rank-item:nth-child(3) { animation-delay: 0.26s; }
 
 
 /* === SUMMARY SLIDE - Clean rise */
-.slide.summary-slide.active .summary-card {{ animation: cardRise 0.6s ease-out 0.1s forwards; }}
+.slide.summary-slide.active .summary-card { animation: cardRise 0.6s ease-out 0.1s forwards; }
 
 /* === CONTRIBUTION GRAPH SLIDE - Grid reveal */
-.slide.contrib-slide.active .contrib-graph {{ animation: graphReveal 0.8s ease-out 0.15s forwards; }}
-.slide.contrib-slide.active .contrib-stats {{ animation: none; opacity: 1; transform: none; }}
-.slide.contrib-slide.active .contrib-stat {{ animation: statFade 0.35s ease-out forwards; }}
-.slide.contrib-slide.active .contrib-stat:nth-child(1) {{ animation-delay: 0.5s; }}
-.slide.contrib-slide.active .contrib-stat:nth-child(2) {{ animation-delay: 0.6s; }}
-.slide.contrib-slide.active .contrib-stat:nth-child(3) {{ animation-delay: 0.7s; }}
+.slide.contrib-slide.active .contrib-graph { animation: graphReveal 0.8s ease-out 0.15s forwards; }
+.slide.contrib-slide.active .contrib-stats { animation: none; opacity: 1; transform: none; }
+.slide.contrib-slide.active .contrib-stat { animation: statFade 0.35s ease-out forwards; }
+.slide.contrib-slide.active .contrib-stat:nth-child(1) { animation-delay: 0.5s; }
+.slide.contrib-slide.active .contrib-stat:nth-child(2) { animation-delay: 0.6s; }
+.slide.contrib-slide.active .contrib-stat:nth-child(3) { animation-delay: 0.7s; }
 
 /* ===== KEYFRAMES */
 
 /* Base animations - VARIED STYLES */
 
 /* Slide from diagonal */
-@keyframes labelSlide {{
-    0% {{ opacity: 0; transform: translateY(12px) translateX(-8px); }}
-    100% {{ opacity: 1; transform: translateY(0) translateX(0); }}
-}}
+@keyframes labelSlide {
+    0% { opacity: 0; transform: translateY(12px) translateX(-8px); }
+    100% { opacity: 1; transform: translateY(0) translateX(0); }
+}
 
 /* Simple fade up */
-@keyframes textFade {{
-    0% {{ opacity: 0; transform: translateY(15px); }}
-    100% {{ opacity: 1; transform: translateY(0); }}
-}}
+@keyframes textFade {
+    0% { opacity: 0; transform: translateY(15px); }
+    100% { opacity: 1; transform: translateY(0); }
+}
 
 /* Scale with slight overshoot */
-@keyframes titleReveal {{
-    0% {{ opacity: 0; transform: translateY(25px) scale(0.95); }}
-    70% {{ transform: translateY(-3px) scale(1.01); }}
-    100% {{ opacity: 1; transform: translateY(0) scale(1); }}
-}}
+@keyframes titleReveal {
+    0% { opacity: 0; transform: translateY(25px) scale(0.95); }
+    70% { transform: translateY(-3px) scale(1.01); }
+    100% { opacity: 1; transform: translateY(0) scale(1); }
+}
 
 /* Wobble rotation */
-@keyframes iconPop {{
-    0% {{ opacity: 0; transform: translateY(20px) scale(0.4) rotate(-15deg); }}
-    50% {{ transform: translateY(-8px) scale(1.15) rotate(8deg); }}
-    75% {{ transform: translateY(2px) scale(0.95) rotate(-3deg); }}
-    100% {{ opacity: 1; transform: translateY(0) scale(1) rotate(0); }}
-}}
+@keyframes iconPop {
+    0% { opacity: 0; transform: translateY(20px) scale(0.4) rotate(-15deg); }
+    50% { transform: translateY(-8px) scale(1.15) rotate(8deg); }
+    75% { transform: translateY(2px) scale(0.95) rotate(-3deg); }
+    100% { opacity: 1; transform: translateY(0) scale(1) rotate(0); }
+}
 
 /* 3D flip reveal - for impactful numbers */
-@keyframes numberFlip {{
-    0% {{ opacity: 0; transform: perspective(400px) rotateX(-60deg) translateY(20px); }}
-    60% {{ transform: perspective(400px) rotateX(10deg); }}
-    100% {{ opacity: 1; transform: perspective(400px) rotateX(0) translateY(0); }}
-}}
+@keyframes numberFlip {
+    0% { opacity: 0; transform: perspective(400px) rotateX(-60deg) translateY(20px); }
+    60% { transform: perspective(400px) rotateX(10deg); }
+    100% { opacity: 1; transform: perspective(400px) rotateX(0) translateY(0); }
+}
 
 /* Soft blur fade - for names */
-@keyframes nameBlur {{
-    0% {{ opacity: 0; transform: translateY(20px); filter: blur(8px); }}
-    100% {{ opacity: 1; transform: translateY(0); filter: blur(0); }}
-}}
+@keyframes nameBlur {
+    0% { opacity: 0; transform: translateY(20px); filter: blur(8px); }
+    100% { opacity: 1; transform: translateY(0); filter: blur(0); }
+}
 
 /* Typewriter cursor feel */
-@keyframes roastType {{
-    0% {{ opacity: 0; clip-path: inset(0 100% 0 0); }}
-    100% {{ opacity: 1; clip-path: inset(0 0 0 0); }}
-}}
+@keyframes roastType {
+    0% { opacity: 0; clip-path: inset(0 100% 0 0); }
+    100% { opacity: 1; clip-path: inset(0 0 0 0); }
+}
 
 /* Stagger fade in - for stat items */
-@keyframes statFade {{
-    0% {{ opacity: 0; transform: translateY(12px); }}
-    100% {{ opacity: 1; transform: translateY(0); }}
-}}
+@keyframes statFade {
+    0% { opacity: 0; transform: translateY(12px); }
+    100% { opacity: 1; transform: translateY(0); }
+}
 
 /* Horizontal slide - for rank items */
-@keyframes rankSlide {{
-    0% {{ opacity: 0; transform: translateX(-20px); }}
-    100% {{ opacity: 1; transform: translateX(0); }}
-}}
+@keyframes rankSlide {
+    0% { opacity: 0; transform: translateX(-20px); }
+    100% { opacity: 1; transform: translateX(0); }
+}
 
 /* Crown drop for #1 */
-@keyframes topRankDrop {{
-    0% {{ opacity: 0; transform: translateY(-30px); }}
-    70% {{ transform: translateY(4px); }}
-    100% {{ opacity: 1; transform: translateY(0); }}
-}}
+@keyframes topRankDrop {
+    0% { opacity: 0; transform: translateY(-30px); }
+    70% { transform: translateY(4px); }
+    100% { opacity: 1; transform: translateY(0); }
+}
 
 /* Pill stamp - for badges */
-@keyframes badgeStamp {{
-    0% {{ opacity: 0; transform: scale(1.4); }}
-    60% {{ transform: scale(0.95); }}
-    100% {{ opacity: 1; transform: scale(1); }}
-}}
+@keyframes badgeStamp {
+    0% { opacity: 0; transform: scale(1.4); }
+    60% { transform: scale(0.95); }
+    100% { opacity: 1; transform: scale(1); }
+}
 
 /* Letter spread - for emoji row */
-@keyframes emojiSpread {{
-    0% {{ opacity: 0; letter-spacing: 0px; }}
-    100% {{ opacity: 1; letter-spacing: 20px; }}
-}}
+@keyframes emojiSpread {
+    0% { opacity: 0; letter-spacing: 0px; }
+    100% { opacity: 1; letter-spacing: 20px; }
+}
 
 /* Clean rise - for cards */
-@keyframes cardRise {{
-    0% {{ opacity: 0; transform: translateY(40px); }}
-    100% {{ opacity: 1; transform: translateY(0); }}
-}}
+@keyframes cardRise {
+    0% { opacity: 0; transform: translateY(40px); }
+    100% { opacity: 1; transform: translateY(0); }
+}
 
 /* Graph reveal - for contribution graph */
-@keyframes graphReveal {{
-    0% {{ opacity: 0; transform: translateY(30px) scale(0.95); }}
-    100% {{ opacity: 1; transform: translateY(0) scale(1); }}
-}}
+@keyframes graphReveal {
+    0% { opacity: 0; transform: translateY(30px) scale(0.95); }
+    100% { opacity: 1; transform: translateY(0) scale(1); }
+}
 
 /* Simple slide up */
-@keyframes buttonSlide {{
-    0% {{ opacity: 0; transform: translateY(15px); }}
-    100% {{ opacity: 1; transform: translateY(0); }}
-}}
+@keyframes buttonSlide {
+    0% { opacity: 0; transform: translateY(15px); }
+    100% { opacity: 1; transform: translateY(0); }
+}
 
 /* Fade only */
-@keyframes hintFade {{
-    0% {{ opacity: 0; }}
-    100% {{ opacity: 1; }}
-}}
+@keyframes hintFade {
+    0% { opacity: 0; }
+    100% { opacity: 1; }
+}
 
 /* Intro slide - spin and glitch */
-@keyframes introIconSpin {{
-    0% {{ opacity: 0; transform: rotate(-180deg) scale(0.3); }}
-    100% {{ transform: rotate(0) scale(1); }}
-}}
-
-@keyframes introTitleGlitch {{
-    0% {{ opacity: 0; transform: translateY(15px); filter: blur(6px); }}
-    40% {{ opacity: 0.8; transform: translateY(3px) skewX(-3deg); filter: blur(2px); }}
-    70% {{ transform: translateY(-2px) skewX(2deg); filter: blur(0); }}
-    100% {{ opacity: 1; transform: translateY(0) skewX(0); }}
-}}
+@keyframes introIconSpin {
+    0% { opacity: 0; transform: rotate(-180deg) scale(0.3); }
+    100% { transform: rotate(0) scale(1); }
+}
+
+@keyframes introTitleGlitch {
+    0% { opacity: 0; transform: translateY(15px); filter: blur(6px); }
+    40% { opacity: 0.8; transform: translateY(3px) skewX(-3deg); filter: blur(2px); }
+    70% { transform: translateY(-2px) skewX(2deg); filter: blur(0); }
+    100% { opacity: 1; transform: translateY(0) skewX(0); }
+}
 
 /* Pink slide - soft glow */
-@keyframes nameGlow {{
-    0% {{ opacity: 0; transform: translateY(15px); filter: blur(4px) brightness(1.3); }}
-    100% {{ opacity: 1; transform: translateY(0); filter: blur(0) brightness(1); }}
-}}
+@keyframes nameGlow {
+    0% { opacity: 0; transform: translateY(15px); filter: blur(4px) brightness(1.3); }
+    100% { opacity: 1; transform: translateY(0); filter: blur(0) brightness(1); }
+}
 
 /* Purple slide - glitch chaos */
-@keyframes labelGlitch {{
-    0% {{ opacity: 0; transform: skewX(-5deg); }}
-    50% {{ opacity: 0.7; transform: skewX(3deg); }}
-    100% {{ transform: skewX(0); }}
-}}
-
-@keyframes personalityGlitch {{
-    0% {{ opacity: 0; transform: translateY(20px); filter: blur(8px); }}
-    20% {{ opacity: 0.5; transform: translateY(10px) skewX(-8deg); filter: blur(4px); }}
-    40% {{ opacity: 0.7; transform: translateY(5px) skewX(5deg); filter: blur(2px); }}
-    60% {{ opacity: 0.9; transform: translateY(-2px) skewX(-2deg); filter: blur(1px); }}
-    80% {{ transform: skewX(1deg); }}
-    100% {{ opacity: 1; transform: translateY(0) skewX(0); filter: blur(0); }}
-}}
-
-@keyframes flickerReveal {{
-    0% {{ opacity: 0; }}
-    20% {{ opacity: 0.4; }}
-    35% {{ opacity: 0.1; }}
-    50% {{ opacity: 0.7; }}
-    65% {{ opacity: 0.3; }}
-    80% {{ opacity: 0.9; }}
-    100% {{ opacity: 1; }}
-}}
-
-@keyframes glitchReveal {{
-    0% {{ opacity: 0; transform: translateY(15px); filter: blur(4px); }}
-    50% {{ opacity: 0.8; transform: translateY(3px) skewX(-3deg); filter: blur(1px); }}
-    100% {{ opacity: 1; transform: translateY(0) skewX(0); filter: blur(0); }}
-}}
+@keyframes labelGlitch {
+    0% { opacity: 0; transform: skewX(-5deg); }
+    50% { opacity: 0.7; transform: skewX(3deg); }
+    100% { transform: skewX(0); }
+}
+
+@keyframes personalityGlitch {
+    0% { opacity: 0; transform: translateY(20px); filter: blur(8px); }
+    20% { opacity: 0.5; transform: translateY(10px) skewX(-8deg); filter: blur(4px); }
+    40% { opacity: 0.7; transform: translateY(5px) skewX(5deg); filter: blur(2px); }
+    60% { opacity: 0.9; transform: translateY(-2px) skewX(-2deg); filter: blur(1px); }
+    80% { transform: skewX(1deg); }
+    100% { opacity: 1; transform: translateY(0) skewX(0); filter: blur(0); }
+}
+
+@keyframes flickerReveal {
+    0% { opacity: 0; }
+    20% { opacity: 0.4; }
+    35% { opacity: 0.1; }
+    50% { opacity: 0.7; }
+    65% { opacity: 0.3; }
+    80% { opacity: 0.9; }
+    100% { opacity: 1; }
+}
+
+@keyframes glitchReveal {
+    0% { opacity: 0; transform: translateY(15px); filter: blur(4px); }
+    50% { opacity: 0.8; transform: translateY(3px) skewX(-3deg); filter: blur(1px); }
+    100% { opacity: 1; transform: translateY(0) skewX(0); filter: blur(0); }
+}
 
 /* Red slide - dramatic drop */
-@keyframes dramaticDrop {{
-    0% {{ opacity: 0; transform: translateY(-50px); }}
-    70% {{ transform: translateY(5px); }}
-    100% {{ opacity: 1; transform: translateY(0); }}
-}}
-
-@keyframes shakeReveal {{
-    0% {{ opacity: 0; transform: translateX(0); }}
-    25% {{ opacity: 0.7; transform: translateX(-6px); }}
-    50% {{ transform: translateX(6px); }}
-    75% {{ transform: translateX(-3px); }}
-    100% {{ opacity: 1; transform: translateX(0); }}
-}}
+@keyframes dramaticDrop {
+    0% { opacity: 0; transform: translateY(-50px); }
+    70% { transform: translateY(5px); }
+    100% { opacity: 1; transform: translateY(0); }
+}
+
+@keyframes shakeReveal {
+    0% { opacity: 0; transform: translateX(0); }
+    25% { opacity: 0.7; transform: translateX(-6px); }
+    50% { transform: translateX(6px); }
+    75% { transform: translateX(-3px); }
+    100% { opacity: 1; transform: translateX(0); }
+}
 
 /* Orange slide - glow rise */
-@keyframes fireLabel {{
-    0% {{ opacity: 0; filter: brightness(1.4); }}
-    100% {{ filter: brightness(1); }}
-}}
+@keyframes fireLabel {
+    0% { opacity: 0; filter: brightness(1.4); }
+    100% { filter: brightness(1); }
+}
 
-@keyframes glowRise {{
-    0% {{ opacity: 0; transform: translateY(20px); }}
-    100% {{ opacity: 1; transform: translateY(0); }}
-}}
+@keyframes glowRise {
+    0% { opacity: 0; transform: translateY(20px); }
+    100% { opacity: 1; transform: translateY(0); }
+}
 
-.summary-card {{
+.summary-card {
     background:linear-gradient(145deg,#1a1a2e 0%,#0f1a2e 100%);
     border:2px solid rgba(255,255,255,0.1);
     border-radius:24px;
@@ -1289,129 +2549,117 @@ body {{ font-family:'Space Grotesk',sans-serif; background:var(--bg); color:var(
     width:100%;
     max-width:420px;
     text-align:center;
-}}
-.summary-header {{ display:flex; align-items:center; justify-content:center; gap:12px; margin-bottom:24px; padding-bottom:16px; border-bottom:1px solid rgba(255,255,255,0.1); }}
-.summary-logo {{ font-size:28px; }}
-.summary-title {{ font-family:var(--font-pixel); font-size:11px; font-weight:400; color:var(--text); }}
-.summary-hero {{ margin:24px 0; }}
-.summary-big-stat {{ display:flex; flex-direction:column; align-items:center; }}
-.summary-big-num {{ font-family:var(--font-mono); font-size:56px; font-weight:600; color:var(--green); line-height:1; letter-spacing:-1px; }}
-.summary-big-label {{ font-size:13px; color:var(--muted); text-transform:uppercase; letter-spacing:1px; margin-top:8px; }}
-.summary-stats {{ display:grid; grid-template-columns:repeat(4,1fr); gap:12px; margin:24px 0; padding:20px 0; border-top:1px solid rgba(255,255,255,0.1); border-bottom:1px solid rgba(255,255,255,0.1); }}
-.summary-stat {{ display:flex; flex-direction:column; align-items:center; }}
-.summary-stat-val {{ font-family:var(--font-mono); font-size:20px; font-weight:600; color:var(--cyan); }}
-.summary-stat-lbl {{ font-size:9px; color:var(--muted); text-transform:uppercase; margin-top:4px; letter-spacing:0.3px; }}
-.summary-personality {{ margin:20px 0; }}
-.summary-personality-type {{ font-family:var(--font-pixel); font-size:12px; font-weight:400; color:var(--purple); text-transform:uppercase; letter-spacing:0.3px; }}
-.summary-top3 {{ margin:16px 0; display:flex; flex-direction:column; gap:6px; }}
-.summary-top3-label {{ font-size:10px; color:var(--muted); text-transform:uppercase; letter-spacing:0.5px; }}
-.summary-top3-names {{ font-size:13px; color:var(--text); }}
-.summary-footer {{ margin-top:20px; padding-top:16px; border-top:1px solid rgba(255,255,255,0.1); font-size:11px; color:var(--green); font-family:var(--font-pixel); font-weight:400; }}
-
-.screenshot-btn {{
+}
+.summary-header { display:flex; align-items:center; justify-content:center; gap:12px; margin-bottom:24px; padding-bottom:16px; border-bottom:1px solid rgba(255,255,255,0.1); }
+.summary-logo { font-size:28px; }
+.summary-title { font-family:var(--font-pixel); font-size:11px; font-weight:400; color:var(--text); }
+.summary-hero { margin:24px 0; }
+.summary-big-stat { display:flex; flex-direction:column; align-items:center; }
+.summary-big-num { font-family:var(--font-mono); font-size:56px; font-weight:600; color:var(--green); line-height:1; letter-spacing:-1px; }
+.summary-big-label { font-size:13px; color:var(--muted); text-transform:uppercase; letter-spacing:1px; margin-top:8px; }
+.summary-stats { display:grid; grid-template-columns:repeat(4,1fr); gap:12px; margin:24px 0; padding:20px 0; border-top:1px solid rgba(255,255,255,0.1); border-bottom:1px solid rgba(255,255,255,0.1); }
+.summary-stat { display:flex; flex-direction:column; align-items:center; }
+.summary-stat-val { font-family:var(--font-mono); font-size:20px; font-weight:600; color:var(--cyan); }
+.summary-stat-lbl { font-size:9px; color:var(--muted); text-transform:uppercase; margin-top:4px; letter-spacing:0.3px; }
+.summary-personality { margin:20px 0; }
+.summary-personality-type { font-family:var(--font-pixel); font-size:12px; font-weight:400; color:var(--purple); text-transform:uppercase; letter-spacing:0.3px; }
+.summary-top3 { margin:16px 0; display:flex; flex-direction:column; gap:6px; }
+.summary-top3-label { font-size:10px; color:var(--muted); text-transform:uppercase; letter-spacing:0.5px; }
+.summary-top3-names { font-size:13px; color:var(--text); }
+.summary-footer { margin-top:20px; padding-top:16px; border-top:1px solid rgba(255,255,255,0.1); font-size:11px; color:var(--green); font-family:var(--font-pixel); font-weight:400; }
+
+.screenshot-btn {
     display:flex; align-items:center; justify-content:center; gap:10px;
     font-family:var(--font-pixel); font-size:10px; font-weight:400; text-transform:uppercase; letter-spacing:0.3px;
     background:var(--green); color:#000; border:none;
     padding:16px 32px; border-radius:12px; margin-top:28px;
     cursor:pointer; transition:transform 0.2s,background 0.2s;
-}}
-.screenshot-btn:hover {{ background:#6ee7b7; transform:scale(1.02); }}
-.screenshot-btn:active {{ transform:scale(0.98); }}
-.btn-icon {{ font-size:20px; }}
-.share-hint {{ font-size:14px; color:var(--muted); margin-top:16px; }}
-
-.slide-save-btn {{
+}
+.screenshot-btn:hover { background:#6ee7b7; transform:scale(1.02); }
+.screenshot-btn:active { transform:scale(0.98); }
+.screenshot-btn.export-btn { margin-top:12px; background:transparent; color:var(--text); border:1px solid rgba(255,255,255,0.25); }
+.screenshot-btn.export-btn:hover { background:rgba(255,255,255,0.08); }
+.btn-icon { font-size:20px; }
+.share-hint { font-size:14px; color:var(--muted); margin-top:16px; }
+
+.slide-save-btn {
     position:absolute; bottom:100px; left:50%; transform:translateX(-50%);
     display:flex; align-items:center; justify-content:center; gap:8px;
     font-family:var(--font-pixel); font-size:9px; font-weight:400; text-transform:uppercase; letter-spacing:0.3px;
     background:rgba(74,222,128,0.15); color:var(--green); border:1px solid rgba(74,222,128,0.3);
     padding:10px 20px; border-radius:8px;
     cursor:pointer; transition:all 0.2s; opacity:0;
-}}
-.slide.active .slide-save-btn {{ opacity:1; }}
-.slide-save-btn:hover {{ background:rgba(74,222,128,0.25); border-color:var(--green); }}
+}
+.slide.active .slide-save-btn { opacity:1; }
+.slide-save-btn:hover { background:rgba(74,222,128,0.25); border-color:var(--green); }
 
 /* Force all elements visible for screenshot capture */
 .slide.capturing,
-.slide.capturing * {{
+.slide.capturing * {
     animation: none !important;
     opacity: 1 !important;
     transform: none !important;
     filter: none !important;
     clip-path: none !important;
-}}
-.slide-watermark {{
+}
+.slide-watermark {
     position:absolute; bottom:24px; left:50%; transform:translateX(-50%);
     font-family:var(--font-pixel); font-size:10px; color:var(--green); opacity:0.6;
     display:none;
-}}
-
-.progress {{ position:fixed; bottom:24px; left:50%; transform:translateX(-50%); display:flex; gap:8px; z-index:100; }}
-.dot {{ width:10px; height:10px; border-radius:50%; background:rgba(255,255,255,0.2); transition:all 0.3s; cursor:pointer; }}
-.dot:hover {{ background:rgba(255,255,255,0.4); }}
-.dot.active {{ background:var(--green); transform:scale(1.3); }}
-
-.nav {{ position:fixed; top:50%; transform:translateY(-50%); font-size:36px; color:rgba(255,255,255,0.2); cursor:pointer; z-index:100; padding:24px; transition:color 0.2s; user-select:none; }}
-.nav:hover {{ color:rgba(255,255,255,0.5); }}
-.nav.prev {{ left:8px; }}
-.nav.next {{ right:8px; }}
-.nav.hidden {{ opacity:0; pointer-events:none; }}
-</style>
-</head>
-<body>
+}
 
-<div class="gallery" id="gallery">{slides_html}</div>
-<div class="progress" id="progress"></div>
-<div class="nav prev" id="prev">‹</div>
-<div class="nav next" id="next">›</div>
+.progress { position:fixed; bottom:24px; left:50%; transform:translateX(-50%); display:flex; gap:8px; z-index:100; }
+.dot { width:10px; height:10px; border-radius:50%; background:rgba(255,255,255,0.2); transition:all 0.3s; cursor:pointer; }
+.dot:hover { background:rgba(255,255,255,0.4); }
+.dot.active { background:var(--green); transform:scale(1.3); }
 
-<script>
-const gallery = document.getElementById('gallery');
-const progressEl = document.getElementById('progress');
-const prevBtn = document.getElementById('prev');
-const nextBtn = document.getElementById('next');
-const total = {num_slides};
-let current = 0;
+.nav { position:fixed; top:50%; transform:translateY(-50%); font-size:36px; color:rgba(255,255,255,0.2); cursor:pointer; z-index:100; padding:24px; transition:color 0.2s; user-select:none; }
+.nav:hover { color:rgba(255,255,255,0.5); }
+.nav.prev { left:8px; }
+.nav.next { right:8px; }
+.nav.hidden { opacity:0; pointer-events:none; }'''
+
+REPORT_JS = '''let current = 0;
 
-for (let i = 0; i < total; i++) {{
+for (let i = 0; i < total; i++) {
     const dot = document.createElement('div');
     dot.className = 'dot' + (i === 0 ? ' active' : '');
     dot.onclick = () => goTo(i);
     progressEl.appendChild(dot);
-}}
+}
 const dots = progressEl.querySelectorAll('.dot');
 
 const slides = gallery.querySelectorAll('.slide');
 
-function goTo(idx) {{
+function goTo(idx) {
     if (idx < 0 || idx >= total) return;
     // Remove active from all slides
     slides.forEach(s => s.classList.remove('active'));
     current = idx;
-    gallery.style.transform = `translateX(-${{current * 100}}vw)`;
+    gallery.style.transform = `translateX(-${current * 100}vw)`;
     dots.forEach((d, i) => d.classList.toggle('active', i === current));
     prevBtn.classList.toggle('hidden', current === 0);
     nextBtn.classList.toggle('hidden', current === total - 1);
     // Add active to current slide after a tiny delay for animation reset
     setTimeout(() => slides[current].classList.add('active'), 50);
-}}
+}
 
-document.addEventListener('click', (e) => {{
+document.addEventListener('click', (e) => {
     if (e.target.closest('.nav, button, .dot')) return;
     const x = e.clientX / window.innerWidth;
     if (x < 0.3) goTo(current - 1);
     else goTo(current + 1);
-}});
+});
 
-document.addEventListener('keydown', (e) => {{
-    if (e.key === 'ArrowRight' || e.key === ' ') {{ e.preventDefault(); goTo(current + 1); }}
-    if (e.key === 'ArrowLeft') {{ e.preventDefault(); goTo(current - 1); }}
-}});
+document.addEventListener('keydown', (e) => {
+    if (e.key === 'ArrowRight' || e.key === ' ') { e.preventDefault(); goTo(current + 1); }
+    if (e.key === 'ArrowLeft') { e.preventDefault(); goTo(current - 1); }
+});
 
-prevBtn.onclick = (e) => {{ e.stopPropagation(); goTo(current - 1); }};
-nextBtn.onclick = (e) => {{ e.stopPropagation(); goTo(current + 1); }};
+prevBtn.onclick = (e) => { e.stopPropagation(); goTo(current - 1); };
+nextBtn.onclick = (e) => { e.stopPropagation(); goTo(current + 1); };
 
-async function takeScreenshot() {{
+async function takeScreenshot() {
     const card = document.getElementById('summaryCard');
     const btn = document.querySelector('.screenshot-btn');
     btn.innerHTML = '<span>Saving...</span>';
@@ -1420,85 +2668,178 @@ async function takeScreenshot() {{
     card.style.opacity = '1';
     card.style.transform = 'none';
     await new Promise(r => setTimeout(r, 100));
-    try {{
-        const canvas = await html2canvas(card, {{ backgroundColor:'#0f1a2e', scale:2, logging:false, useCORS:true }});
+    try {
+        const canvas = await html2canvas(card, { backgroundColor:'#0f1a2e', scale:2, logging:false, useCORS:true });
         const link = document.createElement('a');
-        link.download = 'imessage_wrapped_{d.get('year', '2025')}_summary.png';
+        link.download = `imessage_wrapped_${year}_summary.png`;
         link.href = canvas.toDataURL('image/png');
         link.click();
         btn.innerHTML = '<span class="btn-icon">✓</span><span>Saved!</span>';
-        setTimeout(() => {{ btn.innerHTML = '<span class="btn-icon">📸</span><span>Save Screenshot</span>'; btn.disabled = false; }}, 2000);
-    }} catch (err) {{
+        setTimeout(() => { btn.innerHTML = '<span class="btn-icon">📸</span><span>Save Screenshot</span>'; btn.disabled = false; }, 2000);
+    } catch (err) {
         btn.innerHTML = '<span class="btn-icon">📸</span><span>Save Screenshot</span>';
         btn.disabled = false;
-    }}
-}}
-
-async function saveSlide(slideEl, filename, btn) {{
-    btn.innerHTML = '⏳';
-    btn.disabled = true;
-
-    // Show watermark for screenshot
+    }
+}
+
+// Rasterized slides, kept because the report never changes: a repeat save or export is instant
+const slidePngs = new Map();
+
+function renderSlide(slideEl) {
+    if (!slidePngs.has(slideEl)) {
+        const png = captureSlide(slideEl);
+        slidePngs.set(slideEl, png);
+        png.catch(() => slidePngs.delete(slideEl));
+    }
+    return slidePngs.get(slideEl);
+}
+
+async function captureSlide(slideEl) {
+    // Show the watermark, hide the save button and force every animation to its final state
     const watermark = slideEl.querySelector('.slide-watermark');
+    const saveBtn = slideEl.querySelector('.slide-save-btn');
     if (watermark) watermark.style.display = 'block';
-
-    // Hide the save button temporarily
-    btn.style.visibility = 'hidden';
-
-    // Add capturing class to force all animations to final state
+    if (saveBtn) saveBtn.style.visibility = 'hidden';
     slideEl.classList.add('capturing');
-
-    // Wait for browser to apply styles
-    await new Promise(r => setTimeout(r, 50));
-
-    // Get computed background color (html2canvas has issues with CSS variables)
-    const computedBg = getComputedStyle(slideEl).backgroundColor;
-    const bgColor = computedBg && computedBg !== 'rgba(0, 0, 0, 0)' ? computedBg : '#0a0a12';
-
-    try {{
-        const canvas = await html2canvas(slideEl, {{
+    try {
+        // Two frames: the first applies the capture styles, the second has painted them
+        await new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)));
+
+        // Get computed background color (html2canvas has issues with CSS variables)
+        const computedBg = getComputedStyle(slideEl).backgroundColor;
+        const bgColor = computedBg && computedBg !== 'rgba(0, 0, 0, 0)' ? computedBg : '#0a0a12';
+        const canvas = await html2canvas(slideEl, {
             backgroundColor: bgColor,
             scale: 2,
             logging: false,
             useCORS: true,
             width: slideEl.offsetWidth,
             height: slideEl.offsetHeight
-        }});
+        });
 
-        // Create a square canvas centered on content
+        // Square crop centered on the content
         const size = Math.min(canvas.width, canvas.height);
         const squareCanvas = document.createElement('canvas');
         squareCanvas.width = size;
         squareCanvas.height = size;
         const ctx = squareCanvas.getContext('2d');
-
-        // Fill with background color
         ctx.fillStyle = bgColor;
         ctx.fillRect(0, 0, size, size);
-
-        // Calculate crop position (center of original)
-        const srcX = (canvas.width - size) / 2;
-        const srcY = (canvas.height - size) / 2;
-
-        // Draw centered portion
-        ctx.drawImage(canvas, srcX, srcY, size, size, 0, 0, size, size);
-
-        const link = document.createElement('a');
-        link.download = filename;
-        link.href = squareCanvas.toDataURL('image/png');
-        link.click();
+        ctx.drawImage(canvas, (canvas.width - size) / 2, (canvas.height - size) / 2, size, size, 0, 0, size, size);
+        return await new Promise((resolve, reject) => squareCanvas.toBlob(b => b ? resolve(b) : reject(new Error('toBlob failed')), 'image/png'));
+    } finally {
+        slideEl.classList.remove('capturing');
+        if (saveBtn) saveBtn.style.visibility = 'visible';
+        if (watermark) watermark.style.display = 'none';
+    }
+}
+
+function download(blob, filename) {
+    const link = document.createElement('a');
+    link.download = filename;
+    link.href = URL.createObjectURL(blob);
+    link.click();
+    setTimeout(() => URL.revokeObjectURL(link.href), 1000);
+}
+
+async function saveSlide(slideEl, filename, btn) {
+    btn.innerHTML = '⏳';
+    btn.disabled = true;
+    try {
+        download(await renderSlide(slideEl), filename);
         btn.innerHTML = '✓';
-        setTimeout(() => {{ btn.innerHTML = '📸 Save'; btn.disabled = false; btn.style.visibility = 'visible'; }}, 2000);
-    }} catch (err) {{
+        setTimeout(() => { btn.innerHTML = '📸 Save'; btn.disabled = false; }, 2000);
+    } catch (err) {
         btn.innerHTML = '📸 Save';
         btn.disabled = false;
-        btn.style.visibility = 'visible';
-    }}
-
-    // Remove capturing class and hide watermark
-    slideEl.classList.remove('capturing');
-    if (watermark) watermark.style.display = 'none';
-}}
+    }
+}
+
+function zipStore(files) {
+    // Minimal ZIP writer for [{name, data: Uint8Array}]: stored entries (PNGs are already deflated), UTF-8 names, fixed 1980-01-01 timestamps
+    const crcTable = new Uint32Array(256);
+    for (let n = 0; n < 256; n++) {
+        let c = n;
+        for (let k = 0; k < 8; k++) c = c & 1 ? 0xEDB88320 ^ (c >>> 1) : c >>> 1;
+        crcTable[n] = c;
+    }
+    const parts = [], central = [];
+    let offset = 0;
+    for (const file of files) {
+        const name = new TextEncoder().encode(file.name);
+        const size = file.data.length;
+        let crc = 0xFFFFFFFF;
+        for (let i = 0; i < size; i++) crc = crcTable[(crc ^ file.data[i]) & 0xFF] ^ (crc >>> 8);
+        crc = (crc ^ 0xFFFFFFFF) >>> 0;
+        const local = new DataView(new ArrayBuffer(30));
+        local.setUint32(0, 0x04034b50, true);
+        local.setUint16(4, 20, true);
+        local.setUint16(6, 0x0800, true);
+        local.setUint16(12, 0x21, true);
+        local.setUint32(14, crc, true);
+        local.setUint32(18, size, true);
+        local.setUint32(22, size, true);
+        local.setUint16(26, name.length, true);
+        parts.push(local, name, file.data);
+        const entry = new DataView(new ArrayBuffer(46));
+        entry.setUint32(0, 0x02014b50, true);
+        entry.setUint16(4, 20, true);
+        entry.setUint16(6, 20, true);
+        entry.setUint16(8, 0x0800, true);
+        entry.setUint16(14, 0x21, true);
+        entry.setUint32(16, crc, true);
+        entry.setUint32(20, size, true);
+        entry.setUint32(24, size, true);
+        entry.setUint16(28, name.length, true);
+        entry.setUint32(42, offset, true);
+        central.push(entry, name);
+        offset += 30 + name.length + size;
+    }
+    const end = new DataView(new ArrayBuffer(22));
+    end.setUint32(0, 0x06054b50, true);
+    end.setUint16(8, files.length, true);
+    end.setUint16(10, files.length, true);
+    end.setUint32(12, central.reduce((n, part) => n + part.byteLength, 0), true);
+    end.setUint32(16, offset, true);
+    return new Blob([...parts, ...central, end], { type: 'application/zip' });
+}
+
+function packZip(files) {
+    // CRC32 over every PNG runs in a worker so the page stays responsive; this thread is the fallback
+    return new Promise(resolve => {
+        try {
+            const src = new Blob([zipStore.toString(), ';onmessage = e => postMessage(zipStore(e.data));'], { type: 'text/javascript' });
+            const worker = new Worker(URL.createObjectURL(src));
+            worker.onmessage = e => { worker.terminate(); resolve(e.data); };
+            worker.onerror = e => { e.preventDefault(); worker.terminate(); resolve(zipStore(files)); };
+            worker.postMessage(files);
+        } catch (err) {
+            resolve(zipStore(files));
+        }
+    });
+}
+
+async function exportAll(btn) {
+    const label = btn.innerHTML;
+    btn.disabled = true;
+    try {
+        const targets = Array.from(slides).filter(s => s.querySelector('.slide-save-btn'));
+        const files = [];
+        for (const [i, slideEl] of targets.entries()) {
+            btn.innerHTML = `<span>${i + 1}/${targets.length}</span>`;
+            const png = await renderSlide(slideEl);
+            const name = (slideEl.querySelector('.slide-save-btn').getAttribute('onclick').match(/'([^']+[.]png)'/) || [])[1] || `slide.png`;
+            files.push({ name: `${String(i + 1).padStart(2, '0')}_${name}`, data: new Uint8Array(await png.arrayBuffer()) });
+            // Yield between slides so input and animation frames get a turn
+            await new Promise(r => setTimeout(r));
+        }
+        download(await packZip(files), `imessage_wrapped_${year}_slides.zip`);
+        btn.innerHTML = '<span class="btn-icon">✓</span><span>Exported!</span>';
+    } catch (err) {
+        btn.innerHTML = label;
+    }
+    setTimeout(() => { btn.innerHTML = label; btn.disabled = false; }, 2000);
+}
 
 // Contribution graph tooltip
 const tooltip = document.createElement('div');
@@ -1506,23 +2847,189 @@ tooltip.className = 'contrib-tooltip';
 tooltip.style.display = 'none';
 document.body.appendChild(tooltip);
 
-document.querySelectorAll('.contrib-cell[data-date]').forEach(cell => {{
-    cell.addEventListener('mouseenter', (e) => {{
-        const count = cell.dataset.count;
-        const date = cell.dataset.date;
-        const msgText = cell.dataset.msgText;
-        tooltip.innerHTML = `<div class="tooltip-count">${{count}} ${{msgText}}</div><div class="tooltip-date">${{date}}</div>`;
+document.querySelectorAll('.contrib-svg').forEach(svg => {
+    // One delegated handler per graph: a cell's day follows from its position and the grid geometry on the <svg>
+    const counts = svg.dataset.counts.split(',').map(Number);
+    const [y, m, d] = svg.dataset.start.split('-').map(Number);
+    const lead = Number(svg.dataset.lead);
+    const [x0, y0, pitch] = [svg.dataset.x, svg.dataset.y, svg.dataset.pitch].map(Number);
+    svg.addEventListener('pointermove', (e) => {
+        if (e.target.tagName !== 'rect') { tooltip.style.display = 'none'; return; }
+        const i = (e.target.x.baseVal.value - x0) / pitch * 7 + (e.target.y.baseVal.value - y0) / pitch - lead;
+        const date = new Date(y, m - 1, d + i).toLocaleDateString('en-US', { month: 'short', day: '2-digit', year: 'numeric' });
+        tooltip.innerHTML = `<div class="tooltip-count">${counts[i]} ${counts[i] === 1 ? 'message' : 'messages'}</div><div class="tooltip-date">${date}</div>`;
         tooltip.style.display = 'block';
-    }});
-    cell.addEventListener('mousemove', (e) => {{
         tooltip.style.left = (e.clientX + 12) + 'px';
         tooltip.style.top = (e.clientY - 10) + 'px';
-    }});
-    cell.addEventListener('mouseleave', () => {{
+    });
+    svg.addEventListener('pointerleave', () => {
         tooltip.style.display = 'none';
-    }});
-}});
+    });
+});
 
 goTo(0);
-</script>
-</body></html>
+'''
+
+def year_range(value):
+    """argparse type for --years: 'YYYY' or 'YYYY-YYYY' -> (first, last)."""
+    m = re.fullmatch(r'(\d{4})(?:-(\d{4}))?', value)
+    if not m or int(m[2] or m[1]) < int(m[1]):
+        raise argparse.ArgumentTypeError(f"expected YYYY or YYYY-YYYY, got {value!r}")
+    return int(m[1]), int(m[2] or m[1])
+
+def iso_day(value):
+    """argparse type for --since/--until: 'YYYY-MM-DD' -> date."""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output', '-o', default='imessage_wrapped_2025.html')
+    parser.add_argument('--use-2024', action='store_true')
+    parser.add_argument('--snapshot', nargs='?', const='file', choices=['file', 'memory'], help='analyze a point-in-time copy of the database (temp file or in memory)')
+    parser.add_argument('--jobs', '-j', type=int, help='run the metric queries on N threads and report how long each took')
+    parser.add_argument('--engine', choices=['sql', 'scan'], default='sql', help='sql: one query per metric; scan: a single streamed pass over the messages')
+    parser.add_argument('--batch-size', type=int, default=SCAN_BATCH_SIZE, help='rows fetched per batch by --engine scan')
+    parser.add_argument('--cache', nargs='?', const=CACHE_PATH, metavar='PATH', help=f'keep scan totals in a sidecar file so later runs only read new messages (implies --engine scan; default {CACHE_PATH})')
+    parser.add_argument('--offline', nargs='?', const='', metavar='DIR', help='make the report fully self-contained: no CDN script or web fonts; inlines html2canvas.min.js and Silkscreen/AzeretMono/SpaceGrotesk font files found in DIR')
+    parser.add_argument('--imessage-db', metavar='PATH', help='read this chat.db instead of ~/Library/Messages/chat.db (or set WRAP2025_IMESSAGE_DB)')
+    parser.add_argument('--addressbook-dir', metavar='DIR', help='read contacts from this AddressBook directory (or set WRAP2025_ADDRESSBOOK_DIR)')
+    parser.add_argument('--years', type=year_range, metavar='YYYY-YYYY', help='analyze every local calendar year in the range from one scan and add year-over-year slides; the report covers the last year')
+    parser.add_argument('--since', type=iso_day, metavar='YYYY-MM-DD', help='analyze messages from this local date on (default: January 1 of the --until year)')
+    parser.add_argument('--until', type=iso_day, metavar='YYYY-MM-DD', help='analyze messages up to and including this local date (default: today)')
+    parser.add_argument('--json', nargs='?', const='imessage_wrapped_2025.json', metavar='PATH', help='also save every computed stat, with contact names, as versioned JSON')
+    parser.add_argument('--ndjson', nargs='?', const='imessage_wrapped_2025.ndjson', metavar='PATH', help='like --json, but one record per line (a line per contact/day row)')
+    parser.add_argument('--from-json', metavar='PATH', help='render the report from a --json/--ndjson file without reading any database')
+    parser.add_argument('--profile', nargs='?', const='imessage_profile.json', metavar='PATH', help='time every stage and metric query (rows, SQLite VM steps, query plan), print the slowest and save them as JSON (default imessage_profile.json)')
+    args = parser.parse_args()
+    if args.years and (args.cache or args.use_2024):
+        parser.error('--years cannot be combined with --cache or --use-2024')
+    dated = args.since or args.until
+    if dated and (args.years or args.use_2024):
+        parser.error('--since/--until cannot be combined with --years or --use-2024')
+    global SNAPSHOT, JOBS, OFFLINE, IMESSAGE_DB, ADDRESSBOOK_DIR, PROFILE
+    IMESSAGE_DB = args.imessage_db or IMESSAGE_DB
+    ADDRESSBOOK_DIR = args.addressbook_dir or ADDRESSBOOK_DIR
+    SNAPSHOT = args.snapshot
+    OFFLINE = args.offline
+    JOBS = max(args.jobs or 1, 1)
+    PROFILE = {'queries': {}, 'stages': {}} if args.profile else None
+
+    print("\n" + "="*50)
+    print("  iMESSAGE WRAPPED 2025 | wrap2025.com")
+    print("="*50 + "\n")
+
+    if args.from_json:
+        print(f"[*] Loading {args.from_json}...")
+        try:
+            _, names, data = load_stats(args.from_json)
+        except (OSError, ValueError) as e:
+            print(f"\n[FATAL] Can't render {args.from_json}: {e}")
+            sys.exit(1)
+        # Names were resolved when the file was written; nothing here reads AddressBook or chat.db
+        contacts = ContactIndex()
+        contacts.names.update(names)
+        print(f"    ✓ {data['stats'][0]:,} messages from {data['year']}")
+        spinner = Spinner()
+        print("[*] Generating report...")
+        spinner.start("Building your wrapped...")
+        with stage('render'):
+            gen_html(data, contacts, args.output)
+        spinner.stop(f"Saved to {args.output}")
+        if args.profile:
+            print(f"[*] Profile saved to {args.profile}")
+            write_profile(args.profile)
+        open_in_macos(args.output)
+        print("\n  Done! Click through your wrapped.\n")
+        return
+
+    print("[*] Checking access...")
+    check_access()
+    print(f"    ✓ Found database: {IMESSAGE_DB}")
+
+    if args.snapshot:
+        print("[*] Taking snapshot...")
+        db = get_db(IMESSAGE_DB)
+        print(f"    ✓ Snapshot in {'memory' if db.keeper else db.path}")
+
+    print("[*] Loading contacts...")
+    with stage('contacts'):
+        contacts = extract_contacts(os.path.join(os.path.dirname(os.path.abspath(args.cache)), 'contacts.json') if args.cache else None)
+    print(f"    ✓ {len(contacts)} indexed")
+
+    ts_start, ts_jun = (TS_2024, TS_JUN_2024) if args.use_2024 else (TS_2025, TS_JUN_2025)
+    ts_end = None
+    year = "2024" if args.use_2024 else "2025"
+    if dated:
+        until = args.until or date.today()
+        since = args.since or date(until.year, 1, 1)
+        if since > until:
+            parser.error('--since is after --until')
+        # Half-open [since, until + 1 day) in local time; ghosted/heating split it at the midnight halfway through
+        split = since + timedelta(days=((until - since).days + 1) // 2)
+        ts_start = local_ts(since.year, since.month, since.day)
+        ts_end = local_ts(*(until + timedelta(days=1)).timetuple()[:3])
+        ts_jun = local_ts(split.year, split.month, split.day)
+        year = str(until.year)
+
+    # --years reads every year in its single scan and a date range is explicit, so there is nothing to fall back to
+    test = 100 if args.years or dated else q(f"SELECT COUNT(*) FROM message WHERE {date_after(TS_2025)}")[0][0]
+    if test < 100 and not args.use_2024:
+        print(f"    ⚠️  {test} msgs in 2025, using 2024")
+        ts_start, ts_jun = TS_2024, TS_JUN_2024
+        year = "2024"
+
+    spinner = Spinner()
+
+    if args.years:
+        year = f"{args.years[0]}-{args.years[1]}" if args.years[0] != args.years[1] else str(args.years[0])
+    print(f"[*] Analyzing {year}...")
+    spinner.start("Reading message database...")
+    with stage('analyze'):
+        if args.years:
+            years = analyze_years(*args.years, contacts, args.batch_size)
+            data = years[args.years[1]]
+            data['yoy'] = year_over_year(years)
+            year = str(args.years[1])
+        elif args.engine == 'scan' or args.cache:
+            data = analyze_scan(ts_start, ts_jun, contacts, args.batch_size, args.cache, ts_end)
+        else:
+            data = analyze(ts_start, ts_jun, contacts, ts_end)
+    data['year'] = int(year)
+    if dated:
+        data['range'] = (since.isoformat(), until.isoformat())
+        data['split'] = split.isoformat()
+    spinner.stop(f"{data['stats'][0]:,} messages analyzed")
+    if args.jobs:
+        for name, secs in sorted(METRIC_TIMES.items(), key=lambda x: -x[1]):
+            print(f"      {name:<18} {secs * 1000:8.1f} ms")
+
+    for path, ndjson in ((args.json, False), (args.ndjson, True)):
+        if path:
+            with stage('export'):
+                export_stats(data, contacts, path, ndjson)
+            print(f"[*] Stats saved to {path}")
+
+    print("[*] Generating report...")
+    spinner.start("Building your wrapped...")
+    with stage('render'):
+        gen_html(data, contacts, args.output)
+    spinner.stop(f"Saved to {args.output}")
+
+    if args.profile:
+        print(f"[*] Profile saved to {args.profile}")
+        write_profile(args.profile)
+
+    close_dbs()
+
+    open_in_macos(args.output)
+    print("\n  Done! Click through your wrapped.\n")
+
+if __name__ == '__main__':
+    try:
+        main()
+    finally:
+        # Deletes a --snapshot copy even when main() fails or is interrupted before its own close_dbs()
+        close_dbs()
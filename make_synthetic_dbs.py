@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Synthetic Messages / WhatsApp / AddressBook databases for benchmarking the wrapped scripts.
+
+Builds chat.db, ChatStorage.sqlite and an AddressBook-v22.abcddb with the tables and
+columns the scripts read, at any size (1K to tens of millions of messages). It is
+seedable and streams rows in executemany() batches. Point a script at the result with
+--imessage-db / --whatsapp-db / --addressbook-dir, or the WRAP2025_IMESSAGE_DB /
+WRAP2025_WHATSAPP_DB / WRAP2025_ADDRESSBOOK_DIR environment variables:
+
+    python3 make_synthetic_dbs.py ./fixture --messages 1000000
+    python3 imessage_wrapped.py --imessage-db fixture/chat.db --addressbook-dir fixture/AddressBook
+"""
+
+import sqlite3, os, sys, argparse, random, time, itertools
+from datetime import datetime, timedelta
+
+COCOA_EPOCH = 978307200  # 2001-01-01 UTC: zero of both apps' timestamps
+BATCH_SIZE = 50000
+DEFAULT_YEAR = 2025
+TEXT_POOL = 50000  # distinct message bodies; rows draw from these
+
+FIRST_NAMES = "Ava Ben Cleo Dan Eli Fay Gus Hana Ivan Jade Kai Lena Milo Nora Omar Pia Quinn Rosa Sam Tara Uma Vik Wes Xena Yara Zed".split()
+LAST_NAMES = "Adams Brooks Chen Diaz Evans Fox Gray Hill Ito Jones Khan Lee Moss Nash Ortiz Park Reed Shah Tran Vega Wolf Young".split()
+WORDS = ("the you to and it a i that is of lol what in me my so for on have this just but be not "
+         "ok are we was like yeah do at with your get no if all can up go out haha when love know "
+         "dinner tonight coffee sure maybe tomorrow omg wait why home work see soon call later good "
+         "night morning literally actually fr ngl bro dude wanna gonna time now here there").split()
+EMOJI = ['\U0001F602', '\u2764\ufe0f', '\U0001F525', '\U0001F62D', '\U0001F60D', '\U0001F64F', '\U0001F480',
+         '\U0001F44D', '\U0001F973', '\U0001F440', '\u2728', '\U0001F923', '\U0001F44D\U0001F3FD', '\U0001F1FA\U0001F1F8']
+REACTIONS = ('Loved', 'Liked', 'Laughed at', 'Emphasized', 'Disliked', 'Questioned')
+# Relative message volume per hour of day (midnight first): quiet nights, lunch bump, evening peak
+HOUR_WEIGHTS = (3, 2, 1, 1, 1, 1, 2, 4, 6, 7, 7, 8, 9, 8, 7, 7, 8, 9, 11, 12, 12, 11, 8, 5)
+
+IMESSAGE_SCHEMA = """
+CREATE TABLE handle (ROWID INTEGER PRIMARY KEY AUTOINCREMENT UNIQUE, id TEXT NOT NULL, country TEXT,
+    service TEXT NOT NULL, uncanonicalized_id TEXT, person_centric_id TEXT, UNIQUE (id, service));
+CREATE TABLE chat (ROWID INTEGER PRIMARY KEY AUTOINCREMENT, guid TEXT UNIQUE NOT NULL, style INTEGER,
+    state INTEGER, account_id TEXT, chat_identifier TEXT, service_name TEXT, room_name TEXT,
+    display_name TEXT, group_id TEXT, is_archived INTEGER DEFAULT 0);
+CREATE TABLE message (ROWID INTEGER PRIMARY KEY AUTOINCREMENT, guid TEXT UNIQUE NOT NULL, text TEXT,
+    replace INTEGER DEFAULT 0, service_center TEXT, handle_id INTEGER DEFAULT 0, subject TEXT,
+    country TEXT, attributedBody BLOB, version INTEGER DEFAULT 0, type INTEGER DEFAULT 0,
+    service TEXT, account TEXT, error INTEGER DEFAULT 0, date INTEGER, date_read INTEGER,
+    date_delivered INTEGER, is_delivered INTEGER DEFAULT 0, is_finished INTEGER DEFAULT 0,
+    is_from_me INTEGER DEFAULT 0, is_read INTEGER DEFAULT 0, is_sent INTEGER DEFAULT 0,
+    cache_has_attachments INTEGER DEFAULT 0, cache_roomnames TEXT, item_type INTEGER DEFAULT 0,
+    associated_message_guid TEXT, associated_message_type INTEGER DEFAULT 0);
+CREATE TABLE chat_handle_join (chat_id INTEGER REFERENCES chat (ROWID) ON DELETE CASCADE,
+    handle_id INTEGER REFERENCES handle (ROWID) ON DELETE CASCADE, UNIQUE(chat_id, handle_id));
+CREATE TABLE chat_message_join (chat_id INTEGER REFERENCES chat (ROWID) ON DELETE CASCADE,
+    message_id INTEGER REFERENCES message (ROWID) ON DELETE CASCADE, message_date INTEGER DEFAULT 0,
+    PRIMARY KEY (chat_id, message_id));
+"""
+IMESSAGE_INDEXES = """
+CREATE INDEX message_idx_date ON message(date);
+CREATE INDEX message_idx_handle ON message(handle_id, date);
+CREATE INDEX message_idx_is_read ON message(is_read, is_from_me, is_finished);
+CREATE INDEX chat_message_join_idx_message_id_only ON chat_message_join(message_id);
+CREATE INDEX chat_message_join_idx_message_date_id_chat_id ON chat_message_join(chat_id, message_date, message_id);
+CREATE INDEX chat_handle_join_idx_handle_id ON chat_handle_join(handle_id);
+"""
+WHATSAPP_SCHEMA = """
+CREATE TABLE ZWACHATSESSION (Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZARCHIVED INTEGER,
+    ZSESSIONTYPE INTEGER, ZUNREADCOUNT INTEGER, ZLASTMESSAGEDATE TIMESTAMP, ZCONTACTJID VARCHAR,
+    ZPARTNERNAME VARCHAR, ZLASTMESSAGETEXT VARCHAR);
+CREATE TABLE ZWAMESSAGE (Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZISFROMME INTEGER,
+    ZMESSAGESTATUS INTEGER, ZMESSAGETYPE INTEGER, ZCHATSESSION INTEGER, ZGROUPMEMBER INTEGER,
+    ZMESSAGEDATE TIMESTAMP, ZSENTDATE TIMESTAMP, ZFROMJID VARCHAR, ZTOJID VARCHAR, ZSTANZAID VARCHAR,
+    ZTEXT VARCHAR);
+CREATE TABLE ZWAPROFILEPUSHNAME (Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZJID VARCHAR,
+    ZPUSHNAME VARCHAR);
+"""
+WHATSAPP_INDEXES = """
+CREATE INDEX ZWAMESSAGE_ZCHATSESSION_INDEX ON ZWAMESSAGE (ZCHATSESSION);
+CREATE INDEX ZWAMESSAGE_ZMESSAGEDATE_INDEX ON ZWAMESSAGE (ZMESSAGEDATE);
+CREATE INDEX ZWAMESSAGE_ZFROMJID_INDEX ON ZWAMESSAGE (ZFROMJID);
+CREATE INDEX ZWAPROFILEPUSHNAME_ZJID_INDEX ON ZWAPROFILEPUSHNAME (ZJID);
+"""
+ADDRESSBOOK_SCHEMA = """
+CREATE TABLE ZABCDRECORD (Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZFIRSTNAME VARCHAR,
+    ZLASTNAME VARCHAR, ZORGANIZATION VARCHAR, ZNICKNAME VARCHAR);
+CREATE TABLE ZABCDPHONENUMBER (Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZOWNER INTEGER,
+    ZLABEL VARCHAR, ZFULLNUMBER VARCHAR);
+CREATE TABLE ZABCDEMAILADDRESS (Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER, ZOWNER INTEGER,
+    ZLABEL VARCHAR, ZADDRESS VARCHAR);
+"""
+
+class World:
+    """The people, chats and message bodies both apps draw from, so the combined script has overlaps to reconcile."""
+    def __init__(self, rnd, contacts, groups, group_size, emoji_density):
+        self.people = []
+        seen = set()
+        while len(self.people) < contacts:
+            # Mostly US numbers, some international ones (no trunk 1) to exercise phone normalization
+            digits = f"1{rnd.randrange(200, 999)}{rnd.randrange(2000000, 9999999)}" if rnd.random() < 0.85 else f"44{rnd.randrange(7000000000, 7999999999)}"
+            if digits in seen: continue
+            seen.add(digits)
+            self.people.append({
+                'digits': digits,
+                'first': rnd.choice(FIRST_NAMES), 'last': rnd.choice(LAST_NAMES),
+                'email': rnd.random() < 0.1,
+                'in_addressbook': rnd.random() < 0.8,
+                # Also texts you over SMS: the same number as a second handle, under service SMS
+                'sms': rnd.random() < 0.15,
+            })
+        lo, hi = group_size
+        self.groups = [rnd.sample(range(contacts), min(contacts, rnd.randint(lo, hi))) for _ in range(groups)]
+        # Chat popularity is Zipf-like: a handful of people get most of the messages
+        weights = [1 / (rank + 1) ** 0.9 for rank in range(contacts)] + [0.5 / (g + 1) ** 0.7 for g in range(groups)]
+        self.chat_weights = list(itertools.accumulate(weights))
+        self.texts = [self.text(rnd, rnd.random() < emoji_density) for _ in range(TEXT_POOL)]
+
+    def text(self, rnd, emoji):
+        words = [rnd.choice(WORDS) for _ in range(max(1, int(rnd.expovariate(1 / 6))))]
+        if emoji:
+            for _ in range(rnd.choice((1, 1, 1, 2, 3))):
+                words.insert(rnd.randrange(len(words) + 1), rnd.choice(EMOJI) * rnd.choice((1, 1, 2)))
+        return ' '.join(words)
+
+    def is_group(self, chat):
+        return chat >= len(self.people)
+
+def day_weights(rnd, days):
+    """Per-day share of the year's messages: noisy, a little busier on weekends."""
+    return [rnd.gammavariate(4, 1) * (1.2 if d.weekday() >= 5 else 1.0) for d in days]
+
+def split_total(total, weights):
+    """Integer counts proportional to weights that add up to exactly total."""
+    scale = total / sum(weights)
+    counts, acc, prev = [], 0.0, 0
+    for w in weights:
+        acc += w * scale
+        counts.append(round(acc) - prev)
+        prev = round(acc)
+    return counts
+
+def message_times(rnd, world, total, start, end, distribution):
+    """Yield (unix_ts, chat) in time order, one day at a time so memory stays flat at any size."""
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    cum = world.chat_weights
+    for day, count in zip(days, split_total(total, day_weights(rnd, days))):
+        if not count: continue
+        day0 = day.timestamp()
+        span = min(86400, end.timestamp() - day0)
+        if distribution == 'uniform':
+            times = [day0 + rnd.random() * span for _ in range(count)]
+            chats = rnd.choices(range(len(cum)), cum_weights=cum, k=count)
+            batch = list(zip(times, chats))
+        elif distribution == 'diurnal':
+            hours = rnd.choices(range(24), HOUR_WEIGHTS, k=count)
+            chats = rnd.choices(range(len(cum)), cum_weights=cum, k=count)
+            batch = [(min(day0 + (h + rnd.random()) * 3600, day0 + span), c) for h, c in zip(hours, chats)]
+        else:
+            # bursty: conversations of a few to a few dozen messages, seconds to minutes apart, in one chat
+            batch = []
+            while len(batch) < count:
+                chat = rnd.choices(range(len(cum)), cum_weights=cum)[0]
+                t = day0 + (rnd.choices(range(24), HOUR_WEIGHTS)[0] + rnd.random()) * 3600
+                for _ in range(min(count - len(batch), 1 + int(rnd.expovariate(1 / 8)))):
+                    batch.append((min(t, day0 + span), chat))
+                    t += rnd.expovariate(1 / 60)
+        batch.sort()
+        yield from batch
+
+def bulk_insert(conn, sql, rows, label, total):
+    """executemany() in BATCH_SIZE slices, with a progress line."""
+    t0, done = time.time(), 0
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, BATCH_SIZE))
+        if not batch: break
+        conn.executemany(sql, batch)
+        done += len(batch)
+        rate = done / max(time.time() - t0, 1e-9)
+        print(f"\r    {label}: {done:,}/{total:,} ({rate:,.0f} rows/s)", end='', file=sys.stderr)
+    print(file=sys.stderr)
+
+def open_fresh(path, schema):
+    if os.path.exists(path): os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.executescript("PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF; PRAGMA locking_mode=EXCLUSIVE; PRAGMA cache_size=-262144;")
+    conn.executescript(schema)
+    return conn
+
+def typedstream(text):
+    """attributedBody as newer macOS writes it: a typedstream NSAttributedString archive whose NSString holds text."""
+    data = text.encode()
+    # typedstream integers: one byte under 0x80, else 0x81 / 0x82 and a little-endian 16 / 32-bit value
+    number = lambda n: bytes([n]) if n < 0x80 else b'\x81' + n.to_bytes(2, 'little') if n < 0x10000 else b'\x82' + n.to_bytes(4, 'little')
+    length, run = number(len(data)), number(len(text.encode('utf-16-le')) // 2)
+    return (b'\x04\x0bstreamtyped\x81\xe8\x03\x84\x01@\x84\x84\x84\x12NSAttributedString\x00\x84\x84\x08NSObject\x00\x85'
+            b'\x92\x84\x84\x84\x08NSString\x01\x94\x84\x01+' + length + data +
+            b'\x86\x84\x02iI\x01' + run + b'\x92\x84\x84\x84\x0cNSDictionary\x00\x94\x84\x01i\x01\x92\x84\x96\x96'
+            b'\x1d__kIMMessagePartAttributeName\x86\x92\x84\x84\x84\x08NSNumber\x00\x84\x84\x07NSValue\x00\x94\x84\x01*\x84\x99\x99\x00\x86\x86\x86')
+
+def build_imessage(path, rnd, world, total, start, end, distribution, body_only=0.0):
+    conn = open_fresh(path, IMESSAGE_SCHEMA)
+    handles = []
+    for p in world.people:
+        handles.append((f"+{p['digits']}", 'iMessage'))
+        if p['email']: handles.append((f"{p['first']}.{p['last']}{p['digits'][-3:]}@example.com".lower(), 'iMessage'))
+    shortcodes = ['22395', '32665', '72975', '262966']
+    handles += [(code, 'SMS') for code in shortcodes]
+    sms_people = [i for i, p in enumerate(world.people) if p['sms']]
+    handles += [(f"+{world.people[i]['digits']}", 'SMS') for i in sms_people]
+    conn.executemany("INSERT INTO handle (id, service) VALUES (?, ?)", handles)
+    handle_of = {h: i + 1 for i, h in enumerate(handles)}  # (id, service) -> ROWID: one id can have a handle per service
+    person_handle = [handle_of[(f"+{p['digits']}", 'iMessage')] for p in world.people]
+
+    chats, members = [], []
+    for i, p in enumerate(world.people):
+        chats.append((f"iMessage;-;+{p['digits']}", 45, f"+{p['digits']}", None))
+        members.append((i + 1, person_handle[i]))
+    for g, group in enumerate(world.groups):
+        chat_id = len(world.people) + g + 1
+        chats.append((f"iMessage;+;chat{100000 + g}", 43, f"chat{100000 + g}", f"Group {g + 1}" if g % 3 else None))
+        members += [(chat_id, person_handle[m]) for m in group]
+    for code in shortcodes:
+        chats.append((f"SMS;-;{code}", 45, code, None))
+        members.append((len(chats), handle_of[(code, 'SMS')]))
+    sms_chat = {}  # person -> (chat ROWID, handle ROWID) of their SMS thread
+    for i in sms_people:
+        number = f"+{world.people[i]['digits']}"
+        chats.append((f"SMS;-;{number}", 45, number, None))
+        sms_chat[i] = (len(chats), handle_of[(number, 'SMS')])
+        members.append(sms_chat[i])
+    conn.executemany("INSERT INTO chat (guid, style, chat_identifier, display_name) VALUES (?, ?, ?, ?)", chats)
+    conn.executemany("INSERT INTO chat_handle_join VALUES (?, ?)", members)
+
+    texts, n_people, first_shortcode_chat = world.texts, len(world.people), len(world.people) + len(world.groups) + 1
+    joins = []
+    def rows():
+        for rowid, (ts, chat) in enumerate(message_times(rnd, world, total, start, end, distribution), 1):
+            date = int((ts - COCOA_EPOCH) * 1e9)
+            if rnd.random() < 0.004:
+                # 2FA / carrier texts from a shortcode
+                code = rnd.randrange(len(shortcodes))
+                chat_id, handle, from_me, assoc, service = first_shortcode_chat + code, handle_of[(shortcodes[code], 'SMS')], False, 0, 'SMS'
+                text = f"Your verification code is {rnd.randrange(100000, 999999)}"
+            else:
+                chat_id, service = chat + 1, 'iMessage'
+                if world.is_group(chat):
+                    from_me = rnd.random() < 0.25
+                    handle = 0 if from_me else person_handle[rnd.choice(world.groups[chat - n_people])]
+                else:
+                    from_me = rnd.random() < 0.45
+                    handle = person_handle[chat]  # 1:1 rows carry the other party's handle both ways
+                    if chat in sms_chat and rnd.random() < 0.3:
+                        (chat_id, handle), service = sms_chat[chat], 'SMS'
+                text, assoc = texts[rnd.randrange(len(texts))], 0
+                r = rnd.random()
+                if r < 0.03:
+                    kind = rnd.randrange(len(REACTIONS))
+                    text, assoc = f'{REACTIONS[kind]} "{text}"', 2000 + kind
+                elif r < 0.05:
+                    text = '\ufffc'  # attachment placeholder
+            body = None
+            if body_only and rnd.random() < body_only:
+                # Newer macOS: the text lives only in the attributedBody archive
+                text, body = None, typedstream(text)
+            joins.append((chat_id, rowid, date))
+            yield (rowid, f"SYN-{rowid:012d}", text, body, handle, service, date, date + 30_000_000_000 if not from_me else 0,
+                   int(from_me), 1, assoc)
+            if len(joins) >= BATCH_SIZE:
+                conn.executemany("INSERT INTO chat_message_join VALUES (?, ?, ?)", joins)
+                joins.clear()
+    bulk_insert(conn, "INSERT INTO message (ROWID, guid, text, attributedBody, handle_id, service, date, date_read, is_from_me, is_finished, associated_message_type) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows(), 'chat.db messages', total)
+    conn.executemany("INSERT INTO chat_message_join VALUES (?, ?, ?)", joins)
+    conn.executescript(IMESSAGE_INDEXES)
+    conn.commit(); conn.close()
+
+def build_whatsapp(path, rnd, world, total, start, end, distribution):
+    conn = open_fresh(path, WHATSAPP_SCHEMA)
+    jids = [f"{p['digits']}@s.whatsapp.net" for p in world.people]
+    sessions = [(i + 1, 0, jids[i], f"{p['first']} {p['last']}") for i, p in enumerate(world.people)]
+    sessions += [(len(jids) + g + 1, 1, f"1203630{rnd.randrange(10**11, 10**12)}@g.us", f"WA Group {g + 1}") for g in range(len(world.groups))]
+    conn.executemany("INSERT INTO ZWACHATSESSION (Z_PK, Z_ENT, Z_OPT, ZSESSIONTYPE, ZCONTACTJID, ZPARTNERNAME) VALUES (?, 8, 1, ?, ?, ?)", sessions)
+    conn.executemany("INSERT INTO ZWAPROFILEPUSHNAME (Z_ENT, Z_OPT, ZJID, ZPUSHNAME) VALUES (11, 1, ?, ?)",
+                     [(jid, world.people[i]['first']) for i, jid in enumerate(jids) if i % 3])
+    texts, n_people = world.texts, len(world.people)
+    def rows():
+        for pk, (ts, chat) in enumerate(message_times(rnd, world, total, start, end, distribution), 1):
+            if world.is_group(chat):
+                from_me = rnd.random() < 0.25
+                frm = None if from_me else jids[rnd.choice(world.groups[chat - n_people])]
+                to = sessions[chat][2] if from_me else None
+            else:
+                from_me = rnd.random() < 0.45
+                frm, to = (None, jids[chat]) if from_me else (jids[chat], None)
+            yield (pk, int(from_me), chat + 1, ts - COCOA_EPOCH, texts[rnd.randrange(len(texts))], frm, to)
+    bulk_insert(conn, "INSERT INTO ZWAMESSAGE (Z_PK, Z_ENT, Z_OPT, ZISFROMME, ZMESSAGETYPE, ZCHATSESSION, ZMESSAGEDATE, ZTEXT, ZFROMJID, ZTOJID) VALUES (?, 9, 1, ?, 0, ?, ?, ?, ?, ?)",
+                rows(), 'ChatStorage.sqlite messages', total)
+    conn.executescript(WHATSAPP_INDEXES)
+    conn.commit(); conn.close()
+
+def build_addressbook(path, rnd, world):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = open_fresh(path, ADDRESSBOOK_SCHEMA)
+    records, phones, emails = [], [], []
+    for i, p in enumerate(world.people):
+        if not p['in_addressbook']: continue
+        records.append((i + 1, p['first'], p['last']))
+        d = p['digits']
+        # The formats people actually type into Contacts
+        if d.startswith('1'):
+            shown = rnd.choice((f"({d[1:4]}) {d[4:7]}-{d[7:]}", f"+1 {d[1:4]}-{d[4:7]}-{d[7:]}", d[1:], f"+{d}"))
+        else:
+            shown = f"+{d[:2]} {d[2:6]} {d[6:]}"
+        phones.append((i + 1, '_$!<Mobile>!$_', shown))
+        if p['email']: emails.append((i + 1, '_$!<Home>!$_', f"{p['first']}.{p['last']}{d[-3:]}@Example.com"))
+    conn.executemany("INSERT INTO ZABCDRECORD (Z_PK, Z_ENT, Z_OPT, ZFIRSTNAME, ZLASTNAME) VALUES (?, 22, 1, ?, ?)", records)
+    conn.executemany("INSERT INTO ZABCDPHONENUMBER (Z_ENT, Z_OPT, ZOWNER, ZLABEL, ZFULLNUMBER) VALUES (19, 1, ?, ?, ?)", phones)
+    conn.executemany("INSERT INTO ZABCDEMAILADDRESS (Z_ENT, Z_OPT, ZOWNER, ZLABEL, ZADDRESS) VALUES (9, 1, ?, ?, ?)", emails)
+    conn.commit(); conn.close()
+
+def group_size(value):
+    lo, _, hi = value.partition('-')
+    lo, hi = int(lo), int(hi or lo)
+    if not 2 <= lo <= hi: raise argparse.ArgumentTypeError("expected MIN-MAX with 2 <= MIN <= MAX")
+    return lo, hi
+
+def main():
+    parser = argparse.ArgumentParser(description="Build synthetic chat.db, ChatStorage.sqlite and AddressBook databases.")
+    parser.add_argument('output', help='directory to write chat.db, ChatStorage.sqlite and AddressBook/ into')
+    parser.add_argument('--messages', '-n', type=int, default=100000, help='iMessage rows (default 100000)')
+    parser.add_argument('--whatsapp-messages', type=int, help='WhatsApp rows (default: half of --messages; 0 skips the database)')
+    parser.add_argument('--contacts', type=int, default=300, help='people to talk to (default 300)')
+    parser.add_argument('--groups', type=int, default=25, help='group chats (default 25)')
+    parser.add_argument('--group-size', type=group_size, default=(3, 8), metavar='MIN-MAX', help='members per group besides you (default 3-8)')
+    parser.add_argument('--emoji-density', type=float, default=0.15, help='share of messages containing emoji (default 0.15)')
+    parser.add_argument('--body-only', type=float, default=0.0, help='share of iMessage rows with NULL text and the body only in attributedBody, as on newer macOS (default 0)')
+    parser.add_argument('--distribution', choices=['uniform', 'diurnal', 'bursty'], default='bursty', help='when messages are sent within a day (default bursty conversations)')
+    parser.add_argument('--year', type=int, default=DEFAULT_YEAR, help=f'year the messages fall in, all of it (default {DEFAULT_YEAR})')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    start = datetime(args.year, 1, 1)
+    # The whole year, even one still in progress: the same arguments and --seed always build the same databases
+    end = datetime(args.year, 12, 31, 23, 59, 59)
+    wa_total = args.messages // 2 if args.whatsapp_messages is None else args.whatsapp_messages
+    os.makedirs(args.output, exist_ok=True)
+
+    t0 = time.time()
+    world = World(rnd, args.contacts, args.groups, args.group_size, args.emoji_density)
+    build_addressbook(os.path.join(args.output, 'AddressBook', 'AddressBook-v22.abcddb'), rnd, world)
+    if args.messages:
+        build_imessage(os.path.join(args.output, 'chat.db'), rnd, world, args.messages, start, end, args.distribution, args.body_only)
+    if wa_total:
+        build_whatsapp(os.path.join(args.output, 'ChatStorage.sqlite'), rnd, world, wa_total, start, end, args.distribution)
+    print(f"[*] Built {args.output} in {time.time() - t0:.1f}s")
+    print(f"    --imessage-db {os.path.join(args.output, 'chat.db')} --whatsapp-db {os.path.join(args.output, 'ChatStorage.sqlite')} --addressbook-dir {os.path.join(args.output, 'AddressBook')}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""attributed_text() on typedstream blobs, including ones cut off mid-length."""
+
+import os, sys, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import imessage_wrapped, combined_wrapped
+from make_synthetic_dbs import typedstream
+
+class AttributedText(unittest.TestCase):
+    def test_round_trip(self):
+        # One-byte, 0x81 (16-bit) and 0x82 (32-bit) length prefixes
+        for module in (imessage_wrapped, combined_wrapped):
+            for text in ('hi 👋', 'x' * 300, 'y' * 70000):
+                with self.subTest(module=module.__name__, length=len(text)):
+                    self.assertEqual(module.attributed_text(typedstream(text)), text)
+
+    def test_no_text(self):
+        for module in (imessage_wrapped, combined_wrapped):
+            self.assertIsNone(module.attributed_text(None))
+            self.assertIsNone(module.attributed_text(b'streamtyped NSString'))
+
+    def test_truncated_length_prefix(self):
+        for module in (imessage_wrapped, combined_wrapped):
+            for text in ('x' * 300, 'y' * 70000):
+                blob = typedstream(text)
+                start = blob.find(module.TYPEDSTREAM_TEXT) + len(module.TYPEDSTREAM_TEXT)
+                prefix = 3 if len(text) < 0x10000 else 5
+                for cut in range(start, start + prefix):
+                    with self.subTest(module=module.__name__, length=len(text), cut=cut - start):
+                        self.assertIsNone(module.attributed_text(blob[:cut]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+"""Which rows the date predicates keep: --since/--until windows are half-open [since, until + 1 day)."""
+
+import os, sys, sqlite3, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import imessage_wrapped, whatsapp_wrapped, combined_wrapped
+
+COCOA_OFFSET = 978307200
+
+class DateWindows(unittest.TestCase):
+    def setUp(self):
+        self.since = imessage_wrapped.local_ts(2025, 3, 1)
+        self.until = imessage_wrapped.local_ts(2025, 4, 1)
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute("CREATE TABLE message (date INTEGER)")
+        self.conn.execute("CREATE TABLE ZWAMESSAGE (ZMESSAGEDATE TIMESTAMP)")
+
+    def tearDown(self):
+        self.conn.close()
+
+    def kept(self, table, where, values):
+        self.conn.execute(f"DELETE FROM {table}")
+        self.conn.executemany(f"INSERT INTO {table} VALUES (?)", [(v,) for v in values])
+        return [v for v, in self.conn.execute(f"SELECT * FROM {table} WHERE {where} ORDER BY 1")]
+
+    def test_imessage_closed_window(self):
+        apple_ns = imessage_wrapped.apple_ns
+        edges = [apple_ns(self.since) - 1, apple_ns(self.since), apple_ns(self.until) - 1, apple_ns(self.until)]
+        for module in (imessage_wrapped, combined_wrapped):
+            with self.subTest(module=module.__name__):
+                self.assertEqual(self.kept('message', module.date_window(self.since, self.until), edges), edges[1:3])
+
+    def test_imessage_open_window(self):
+        # The fixed-year bound keeps its original meaning: whole seconds after ts_start
+        apple_ns = imessage_wrapped.apple_ns
+        edges = [apple_ns(self.since), apple_ns(self.since) + 999999999, apple_ns(self.since + 1)]
+        self.assertEqual(self.kept('message', imessage_wrapped.date_window(self.since), edges), edges[2:])
+
+    def test_cocoa_closed_window(self):
+        since, until = self.since - COCOA_OFFSET, self.until - COCOA_OFFSET
+        edges = [since - 0.5, since, since + 0.25, until - 0.1, until]
+        for module in (whatsapp_wrapped, combined_wrapped):
+            with self.subTest(module=module.__name__):
+                self.assertEqual(self.kept('ZWAMESSAGE', module.cocoa_window(since, until), edges), edges[1:4])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+"""IdentityIndex / build_identity_index(): one root per AddressBook person across iMessage handles and WhatsApp JIDs."""
+
+import os, sys, sqlite3, tempfile, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import combined_wrapped
+from make_synthetic_dbs import ADDRESSBOOK_SCHEMA
+
+class IdentityIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        conn = sqlite3.connect(os.path.join(self.tmp.name, 'AddressBook-v22.abcddb'))
+        conn.executescript(ADDRESSBOOK_SCHEMA)
+        conn.execute("INSERT INTO ZABCDRECORD (Z_PK, ZFIRSTNAME, ZLASTNAME) VALUES (1, 'Ada', 'Lovelace')")
+        conn.execute("INSERT INTO ZABCDPHONENUMBER (ZOWNER, ZFULLNUMBER) VALUES (1, '(555) 555-1234')")
+        conn.execute("INSERT INTO ZABCDEMAILADDRESS (ZOWNER, ZADDRESS) VALUES (1, 'Ada@Example.com ')")
+        conn.commit()
+        conn.close()
+        self.saved, combined_wrapped.ADDRESSBOOK_DIR = combined_wrapped.ADDRESSBOOK_DIR, self.tmp.name
+        self.index = combined_wrapped.build_identity_index()
+
+    def tearDown(self):
+        combined_wrapped.ADDRESSBOOK_DIR = self.saved
+        self.tmp.cleanup()
+
+    def test_record_unites_phone_jid_and_email(self):
+        roots = {handle: self.index.resolve(handle)
+                 for handle in ('+1 (555) 555-1234', '15555551234@s.whatsapp.net', 'ada@example.com', 'ADA@example.com')}
+        self.assertEqual(len(set(roots.values())), 1, roots)
+        self.assertEqual(self.index.names[roots['ada@example.com']], 'Ada Lovelace')
+
+    def test_unknown_handle_resolves_to_itself(self):
+        for handle in ('+44 20 7946 0000', 'stranger@example.org', '447700900123@s.whatsapp.net'):
+            with self.subTest(handle=handle):
+                key = combined_wrapped.IdentityIndex.key(handle)
+                self.assertEqual(self.index.resolve(handle), key)
+                self.assertNotIn(key, self.index.names)
+        self.assertEqual(self.index.find('12345'), '12345')
+
+if __name__ == '__main__':
+    unittest.main()
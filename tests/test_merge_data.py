@@ -0,0 +1,85 @@
+"""merge_data(): per-person half-year vectors summed across platforms, then ranked like the platform SQL."""
+
+import os, sys, sqlite3, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import combined_wrapped
+from combined_wrapped import IdentityIndex, merge_data
+
+# The platform reports' HAVING/ORDER BY over (sent, received) before the split + (sent, received) from it on
+PLATFORM_SQL = {
+    'ghosted': "SELECT id FROM v WHERE r1>10 AND r2<3 ORDER BY r1 DESC, id LIMIT 5",
+    'heating': "SELECT id FROM v WHERE s1+r1>20 AND s2+r2>(s1+r1)*1.5 ORDER BY ((s2+r2)-(s1+r1)) DESC, id LIMIT 5",
+    'fan': "SELECT id FROM v WHERE r1+r2>(s1+s2)*2 AND (s1+r1+s2+r2)>100 ORDER BY ((r1+r2)*1.0/NULLIF(s1+s2,0)) DESC, id LIMIT 5",
+    'simp': "SELECT id FROM v WHERE s1+s2>(r1+r2)*2 AND (s1+r1+s2+r2)>100 ORDER BY ((s1+s2)*1.0/NULLIF(r1+r2,0)) DESC, id LIMIT 5",
+}
+
+def identities(*people):
+    """An IdentityIndex with one AddressBook record per (name, number) pair."""
+    index = IdentityIndex()
+    for i, (name, number) in enumerate(people):
+        node = f"ab:0:{i}"
+        index.union(node, 'tel:' + combined_wrapped.normalize_phone(number))
+        index.names[node] = name
+    return index
+
+class MergeData(unittest.TestCase):
+    # Each person's messages are split evenly over the two platforms, so no platform alone reaches a threshold
+    HALVES = {
+        'ghost': (0, 6, 0, 1),      # received before 12 > 10, after 2 < 3
+        'heat': (6, 6, 10, 10),     # h1 24 > 20, h2 40 > 36
+        'fan': (5, 30, 5, 20),      # received 100 > 2 * 20, total 120 > 100
+        'simp': (30, 5, 20, 5),     # sent 100 > 2 * 20, total 120 > 100
+    }
+    NUMBERS = {'ghost': '5551110001', 'heat': '5551110002', 'fan': '5551110003', 'simp': '5551110004'}
+
+    def platforms(self):
+        imessage = {'contacts': {f"+1{number}": self.HALVES[who] for who, number in self.NUMBERS.items()}}
+        whatsapp = {'contacts': {f"1{number}@s.whatsapp.net": self.HALVES[who] for who, number in self.NUMBERS.items()}}
+        return imessage, whatsapp
+
+    def test_summed_vector_crosses_thresholds(self):
+        imessage, whatsapp = self.platforms()
+        index = identities(*((who.title(), number) for who, number in self.NUMBERS.items()))
+        d = merge_data(imessage, whatsapp, {}, {}, True, True, index)
+        for key, name in (('ghosted', 'Ghost'), ('heating', 'Heat'), ('fan', 'Fan'), ('simp', 'Simp')):
+            with self.subTest(key=key):
+                self.assertEqual([p['name'] for p in d[key]], [name])
+        self.assertEqual(d['ghosted'][0]['before'], 12)
+        self.assertEqual((d['heating'][0]['h1'], d['heating'][0]['h2']), (24, 40))
+        self.assertEqual(len(d['top']), 4)
+        # Eight handles, four people
+        self.assertEqual(d['stats'][3], 4)
+
+    def test_one_platform_alone_stays_below(self):
+        imessage, whatsapp = self.platforms()
+        index = identities(*((who.title(), number) for who, number in self.NUMBERS.items()))
+        for has_imessage, has_whatsapp in ((True, False), (False, True)):
+            d = merge_data(imessage, whatsapp, {}, {}, has_imessage, has_whatsapp, index)
+            for key in ('ghosted', 'heating', 'fan', 'simp'):
+                with self.subTest(has_imessage=has_imessage, key=key):
+                    self.assertEqual(d[key], [])
+
+    def test_order_matches_platform_sql(self):
+        # Ties on every sort value, names that sort opposite to the handles, and a zero denominator (a NULL ratio)
+        halves = {
+            '+15550000003': (0, 15, 0, 1), '+15550000001': (0, 15, 0, 2), '+15550000002': (0, 15, 0, 0), '+15550000009': (0, 40, 0, 0),
+            '+15550000013': (11, 11, 17, 17), '+15550000011': (11, 11, 17, 17), '+15550000012': (5, 17, 30, 30),
+            '+15550000023': (10, 50, 10, 50), '+15550000021': (10, 50, 10, 50), '+15550000022': (0, 60, 0, 50), '+15550000024': (20, 90, 0, 0),
+            '+15550000033': (50, 10, 50, 10), '+15550000031': (60, 0, 50, 0), '+15550000032': (50, 10, 50, 10),
+        }
+        contacts = {h[-10:]: f"Contact {99 - int(h[-2:]):02d}" for h in halves}
+        d = merge_data({'contacts': halves}, {}, contacts, {}, True, False)
+        conn = sqlite3.connect(':memory:')
+        conn.execute("CREATE TABLE v (id TEXT, s1 INTEGER, r1 INTEGER, s2 INTEGER, r2 INTEGER)")
+        conn.executemany("INSERT INTO v VALUES (?, ?, ?, ?, ?)", [(h, *v) for h, v in halves.items()])
+        for key, sql in PLATFORM_SQL.items():
+            with self.subTest(key=key):
+                expected = [h for h, in conn.execute(sql)]
+                self.assertTrue(expected)
+                self.assertEqual([p['handle'] for p in d[key]], expected)
+        conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""EXPLAIN QUERY PLAN checks: the date predicates the scripts build must range-scan an index, not the whole table."""
+
+import os, sys, sqlite3, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import imessage_wrapped, whatsapp_wrapped, combined_wrapped
+from make_synthetic_dbs import IMESSAGE_SCHEMA, IMESSAGE_INDEXES, WHATSAPP_SCHEMA, WHATSAPP_INDEXES
+
+TS_START = 1735689600  # 2025-01-01 UTC
+TS_END = 1743465600  # 2025-04-01 UTC
+COCOA_START, COCOA_END = TS_START - 978307200, TS_END - 978307200
+
+def plan(conn, sql):
+    return ' | '.join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+
+class QueryPlanCase(unittest.TestCase):
+    schema = indexes = ''
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.executescript(self.schema + self.indexes)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def assertIndexed(self, sql, table):
+        detail = plan(self.conn, sql)
+        self.assertRegex(detail, rf"SEARCH {table}\b.*USING (COVERING )?INDEX", detail)
+        self.assertNotRegex(detail, rf"SCAN {table}\b", detail)
+
+class IMessageDatePlans(QueryPlanCase):
+    schema, indexes = IMESSAGE_SCHEMA, IMESSAGE_INDEXES
+
+    def test_date_window(self):
+        for window in (imessage_wrapped.date_window(TS_START), imessage_wrapped.date_window(TS_START, TS_END), combined_wrapped.date_window(TS_START, TS_END)):
+            with self.subTest(window=window):
+                self.assertIndexed(f"SELECT COUNT(*) FROM message WHERE {window}", 'message')
+                self.assertIndexed(f"SELECT text FROM message WHERE {window} AND is_from_me=1", 'message')
+
+    def test_aliased_column(self):
+        window = imessage_wrapped.date_window(TS_START, TS_END, 'm.date')
+        self.assertIndexed(f"SELECT COUNT(*) FROM message m WHERE {window}", 'm')
+
+    def test_half_split(self):
+        for half in (imessage_wrapped.date_before(TS_END), imessage_wrapped.date_from(TS_START)):
+            with self.subTest(half=half):
+                self.assertIndexed(f"SELECT COUNT(*) FROM message WHERE {half}", 'message')
+
+    def test_converted_column_scans(self):
+        # The form the helpers replaced: an expression over date can't use message_idx_date
+        detail = plan(self.conn, f"SELECT COUNT(*) FROM message WHERE (date/1000000000+978307200)>{TS_START}")
+        self.assertIn('SCAN message', detail)
+
+class WhatsAppDatePlans(QueryPlanCase):
+    schema, indexes = WHATSAPP_SCHEMA, WHATSAPP_INDEXES
+
+    def test_cocoa_window(self):
+        for window in (whatsapp_wrapped.cocoa_window(COCOA_START), whatsapp_wrapped.cocoa_window(COCOA_START, COCOA_END), combined_wrapped.cocoa_window(COCOA_START, COCOA_END)):
+            with self.subTest(window=window):
+                self.assertIndexed(f"SELECT COUNT(*) FROM ZWAMESSAGE WHERE {window}", 'ZWAMESSAGE')
+                self.assertIndexed(f"SELECT ZTEXT FROM ZWAMESSAGE WHERE {window} AND ZISFROMME=1", 'ZWAMESSAGE')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""The scan engine over a small make_synthetic_dbs.py fixture: its incremental cache, and parity with the SQL engine."""
+
+import os, sys, json, shutil, sqlite3, subprocess, tempfile, unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import imessage_wrapped as im
+
+def build_fixture(path, messages=4000):
+    """chat.db and AddressBook/ from make_synthetic_dbs.py: fixed seed and year, no WhatsApp database."""
+    subprocess.run([sys.executable, os.path.join(ROOT, 'make_synthetic_dbs.py'), path, '--messages', str(messages),
+                    '--whatsapp-messages', '0', '--contacts', '40', '--groups', '5', '--seed', '7'],
+                   check=True, capture_output=True)
+
+class FixtureCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.fixture = os.path.join(cls.tmp.name, 'fixture')
+        build_fixture(cls.fixture)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        # Each test gets its own copy of chat.db to modify
+        self.db = os.path.join(self.tmp.name, f"{self.id()}.db")
+        shutil.copyfile(os.path.join(self.fixture, 'chat.db'), self.db)
+        self.saved = im.IMESSAGE_DB, im.ADDRESSBOOK_DIR
+        im.IMESSAGE_DB, im.ADDRESSBOOK_DIR = self.db, os.path.join(self.fixture, 'AddressBook')
+        self.contacts = im.extract_contacts()
+
+    def tearDown(self):
+        im.close_dbs()
+        im.IMESSAGE_DB, im.ADDRESSBOOK_DIR = self.saved
+
+class ScanCacheTest(FixtureCase):
+    def scan(self, cache=None):
+        return im.analyze_scan(im.TS_2025, im.TS_JUN_2025, self.contacts, 500, cache)
+
+    def cached_high_water(self, cache):
+        participants = dict(im.q("SELECT chat_id, COUNT(*) FROM chat_handle_join GROUP BY chat_id"))
+        return im.ScanCache(cache, im.TS_2025, im.TS_JUN_2025, participants).load(im.TS_JUN_2025)[1]
+
+    def test_warm_run_matches_cold_scan(self):
+        cache = self.db + '.cache'
+        cold = self.scan()
+        self.assertEqual(self.scan(cache), cold)
+        self.assertEqual(self.cached_high_water(cache), im.q("SELECT MAX(ROWID) FROM message")[0][0])
+        self.assertEqual(self.scan(cache), cold)
+
+    def test_appended_rows_are_folded_in(self):
+        # Hold back the newest rows, cache the rest, then add them back above the high-water mark
+        cache, held = self.db + '.cache', 300
+        conn = sqlite3.connect(self.db)
+        top = conn.execute("SELECT MAX(ROWID) FROM message").fetchone()[0]
+        conn.execute("CREATE TABLE held_message AS SELECT * FROM message WHERE ROWID > ?", (top - held,))
+        conn.execute("CREATE TABLE held_join AS SELECT * FROM chat_message_join WHERE message_id > ?", (top - held,))
+        conn.execute("DELETE FROM chat_message_join WHERE message_id > ?", (top - held,))
+        conn.execute("DELETE FROM message WHERE ROWID > ?", (top - held,))
+        conn.commit()
+        self.scan(cache)
+        self.assertEqual(self.cached_high_water(cache), top - held)
+        conn.execute("INSERT INTO message SELECT * FROM held_message")
+        conn.execute("INSERT INTO chat_message_join SELECT * FROM held_join")
+        conn.commit()
+        conn.close()
+        # Still valid: only the rows above its mark are new
+        self.assertEqual(self.cached_high_water(cache), top - held)
+        self.assertEqual(self.scan(cache), self.scan())
+        self.assertEqual(self.cached_high_water(cache), top)
+
+    def test_deleted_rows_invalidate_cache(self):
+        cache = self.db + '.cache'
+        self.scan(cache)
+        conn = sqlite3.connect(self.db)
+        conn.execute("DELETE FROM chat_message_join WHERE message_id IN (SELECT ROWID FROM message WHERE ROWID % 10 = 0)")
+        conn.execute("DELETE FROM message WHERE ROWID % 10 = 0")
+        conn.commit()
+        conn.close()
+        self.assertEqual(self.cached_high_water(cache), 0)
+        self.assertEqual(self.scan(cache), self.scan())
+
+class EngineParity(FixtureCase):
+    # Misra-Gries phrase counts depend on how the rows are batched, so the engines can differ there
+    APPROXIMATE = {'top_phrases'}
+
+    def compare(self, ts_start, ts_jun, ts_end=None):
+        # Through JSON, so tuples from one engine compare equal to lists from the other
+        sql = json.loads(json.dumps(im.analyze(ts_start, ts_jun, self.contacts, ts_end), default=str))
+        scan = json.loads(json.dumps(im.analyze_scan(ts_start, ts_jun, self.contacts, 500, ts_end=ts_end), default=str))
+        self.assertEqual(set(sql), set(scan))
+        for key in sorted(set(sql) - self.APPROXIMATE):
+            with self.subTest(key=key):
+                self.assertEqual(scan[key], sql[key])
+
+    def test_year(self):
+        self.compare(im.TS_2025, im.TS_JUN_2025)
+
+    def test_date_range(self):
+        self.compare(im.local_ts(2025, 3, 1), im.local_ts(2025, 3, 16), im.local_ts(2025, 4, 1))
+
+if __name__ == '__main__':
+    unittest.main()
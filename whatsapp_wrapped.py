@@ -4,8 +4,10 @@ WhatsApp Wrapped 2025 - Your texting habits, exposed.
 Usage: python3 whatsapp_wrapped.py
 """
 
-import sqlite3, os, sys, re, subprocess, argparse, glob, threading, time
-from datetime import datetime
+import sqlite3, os, sys, atexit, re, subprocess, argparse, glob, threading, time, tempfile, urllib.parse, heapq, base64, json, contextlib, bisect, copy
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta
 
 # WhatsApp database locations (try in order)
 WHATSAPP_PATHS = [
@@ -34,7 +36,7 @@ class Spinner:
         if message:
             self.message = message
         self.spinning = True
-        self.thread = threading.Thread(target=self.spin)
+        self.thread = threading.Thread(target=self.spin, daemon=True)
         self.thread.start()
 
     def stop(self, final_message=None):
@@ -57,7 +59,294 @@ TS_JUN_2025 = 770428800  # Cocoa time for Jun 1, 2025
 TS_2024 = 725846400  # Cocoa time for Jan 1, 2024
 TS_JUN_2024 = 738892800  # Cocoa time for Jun 1, 2024
 
-WHATSAPP_DB = None
+def cocoa_window(ts_start, ts_end=None, col='ZMESSAGEDATE'):
+    """Open window: col>ts_start, the fixed-year bound. Closed (--since/--until): the half-open [ts_start, ts_end).
+
+    Bounds are Cocoa seconds so the date index serves the range.
+    """
+    if ts_end is None:
+        return f"{col}>{ts_start}"
+    return f"{col}>={ts_start} AND {col}<{ts_end}"
+
+def local_ts(year, month=1, day=1):
+    """Unix timestamp of local midnight on year-month-day."""
+    return int(time.mktime((year, month, day, 0, 0, 0, 0, 0, -1)))
+
+WEEKDAYS = ['Sunday','Monday','Tuesday','Wednesday','Thursday','Friday','Saturday']
+SCAN_BATCH_SIZE = 5000  # rows per fetchmany() batch when streaming
+
+# Emoji graphemes. Pictographs with default emoji presentation count on their own; text-default
+# symbols (❤ ☀ ✌ ...) only with VS16 or a skin tone. Flags, keycaps, tag sequences and ZWJ chains
+# (👩‍❤️‍👨, 👍🏽) are matched whole, so each grapheme is counted once.
+EMOJI_PRESENTATION = (
+    '\U0001F004\U0001F0CF\U0001F18E\U0001F191-\U0001F19A\U0001F201\U0001F21A\U0001F22F\U0001F232-\U0001F236'
+    '\U0001F238-\U0001F23A\U0001F250\U0001F251\U0001F300-\U0001F64F\U0001F680-\U0001F6FF\U0001F7E0-\U0001F7FF'
+    '\U0001F90C-\U0001F9FF\U0001FA70-\U0001FAFF\u231A\u231B\u23E9-\u23EC\u23F0\u23F3\u25FD\u25FE\u2614\u2615'
+    '\u2648-\u2653\u267F\u2693\u26A1\u26AA\u26AB\u26BD\u26BE\u26C4\u26C5\u26CE\u26D4\u26EA\u26F2\u26F3\u26F5'
+    '\u26FA\u26FD\u2705\u270A\u270B\u2728\u274C\u274E\u2753-\u2755\u2757\u2795-\u2797\u27B0\u27BF\u2B1B\u2B1C'
+    '\u2B50\u2B55'
+)
+EMOJI_TEXT = (
+    '\u00A9\u00AE\u203C\u2049\u2122\u2139\u2194-\u2199\u21A9\u21AA\u2328\u23CF\u23ED-\u23EF\u23F1\u23F2'
+    '\u23F8-\u23FA\u24C2\u25AA\u25AB\u25B6\u25C0\u25FB\u25FC\u2600-\u27BF\u2934\u2935\u2B05-\u2B07\u3030\u303D'
+    '\u3297\u3299\U0001F170\U0001F171\U0001F17E\U0001F17F\U0001F202\U0001F237'
+)
+EMOJI_SKIN = '\U0001F3FB-\U0001F3FF'
+EMOJI_RE = re.compile(
+    '[\U0001F1E6-\U0001F1FF]{2}'
+    '|\U0001F3F4[\U000E0020-\U000E007E]+\U000E007F'
+    '|[0-9#*]\uFE0F?\u20E3'
+    f'|(?:[{EMOJI_PRESENTATION}]|[{EMOJI_TEXT}](?=[\uFE0F{EMOJI_SKIN}]))[{EMOJI_SKIN}]?\uFE0F?'
+    f'(?:\u200D[{EMOJI_PRESENTATION}{EMOJI_TEXT}][{EMOJI_SKIN}]?\uFE0F?)*'
+)
+EMOJI_TOP_K = 5
+
+def count_emoji(texts, counts=None):
+    """Add every emoji grapheme in texts to a Counter (one regex pass, repeats included)."""
+    counts = Counter() if counts is None else counts
+    # Newlines can't be part of a grapheme, so a whole batch is scanned in one findall()
+    counts.update(EMOJI_RE.findall('\n'.join(texts)))
+    return counts
+
+def top_emoji(counts, k=EMOJI_TOP_K):
+    return heapq.nsmallest(k, counts.items(), key=lambda x: (-x[1], x[0]))
+
+# Words are runs of letters/digits (apostrophes inside allowed, curly ones normalized first), so
+# spacing, newlines and emoji don't count. A newline token marks message and line breaks, where
+# two-word phrases can't span.
+WORD_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)*|\n")
+STOPWORDS = frozenset("""
+    a about after all also am an and any are as at be because been but by can could did do does doing
+    don't for from get got had has have he her him his how i i'm if in into is it it's its just me my no
+    not of on or our out she so some than that that's the their them then there they this to too up us
+    was we were what when where which who will with would you you're your u im ur
+""".split()) | {'\n'}  # the break token is never a word
+TOP_WORDS_K = 10
+TOP_PHRASES_K = 5
+WORDS_CAPACITY = 1000  # counters kept by each top-words/phrases summary, however large the corpus
+
+def merge_heavy_hitters(summary, counts, capacity=WORDS_CAPACITY):
+    """Misra–Gries: add counts into the summary dict in place, then if it holds more than capacity keys,
+    take the (capacity+1)-th largest count off every key and drop those left at zero.
+
+    Each kept count undercounts by at most total/(capacity+1), and summaries merge the same way.
+    """
+    for key, n in counts.items():
+        summary[key] = summary.get(key, 0) + n
+    if len(summary) > capacity:
+        cut = heapq.nlargest(capacity + 1, summary.values())[-1]
+        for key, n in list(summary.items()):
+            if n > cut:
+                summary[key] = n - cut
+            else:
+                del summary[key]
+
+def count_vocabulary(texts, top_words, top_phrases):
+    """Tokenize a batch of sent texts in one pass: their exact word count. Words and two-word phrases
+    without stopwords are merged into the top_words / top_phrases summaries."""
+    tokens = WORD_RE.findall('\n'.join(texts).lower().replace('’', "'"))
+    words = Counter(tokens)
+    breaks = words.get('\n', 0)
+    merge_heavy_hitters(top_words, {w: n for w, n in words.items() if w not in STOPWORDS and not w.isdigit()})
+    phrases = Counter(zip(tokens, tokens[1:]))
+    merge_heavy_hitters(top_phrases, {f"{a} {b}": n for (a, b), n in phrases.items() if a not in STOPWORDS and b not in STOPWORDS})
+    return len(tokens) - breaks
+
+def top_counts(summary, k):
+    return heapq.nsmallest(k, summary.items(), key=lambda x: (-x[1], x[0]))
+
+class P2Quantile:
+    """Streaming estimate of one quantile in constant memory (Jain & Chlamtac's P² algorithm)."""
+    __slots__ = ('p', 'n', 'q', 'pos', 'want', 'step')
+
+    def __init__(self, p):
+        self.p, self.n = p, 0
+        self.q = []  # marker heights; the first five samples, sorted, until the markers exist
+        self.pos = [1, 2, 3, 4, 5]
+        self.want = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.step = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        self.n += 1
+        q, pos, want = self.q, self.pos, self.want
+        if self.n <= 5:
+            bisect.insort(q, x)
+            return
+        if x < q[0]:
+            q[0], k = x, 0
+        elif x >= q[4]:
+            q[4], k = x, 3
+        else:
+            k = bisect.bisect_right(q, x) - 1
+        for i in range(k + 1, 5):
+            pos[i] += 1
+        for i in range(5):
+            want[i] += self.step[i]
+        # Nudge each middle marker one position towards where it should be, along a parabola through its neighbours
+        for i in (1, 2, 3):
+            gap = want[i] - pos[i]
+            if (gap >= 1 and pos[i + 1] - pos[i] > 1) or (gap <= -1 and pos[i - 1] - pos[i] < -1):
+                s = 1 if gap > 0 else -1
+                h = q[i] + s / (pos[i + 1] - pos[i - 1]) * (
+                    (pos[i] - pos[i - 1] + s) * (q[i + 1] - q[i]) / (pos[i + 1] - pos[i])
+                    + (pos[i + 1] - pos[i] - s) * (q[i] - q[i - 1]) / (pos[i] - pos[i - 1]))
+                if not q[i - 1] < h < q[i + 1]:
+                    h = q[i] + s * (q[i + s] - q[i]) / (pos[i + s] - pos[i])
+                q[i] = h
+                pos[i] += s
+
+    def saved(self):
+        return [self.p, self.n, self.q, self.pos, self.want]
+
+    @classmethod
+    def restore(cls, saved):
+        p, n, q, pos, want = saved
+        s = cls(p)
+        s.n, s.q, s.pos, s.want = n, q, pos, want
+        return s
+
+    def value(self):
+        if self.n > 5:
+            return self.q[2]
+        # Too few samples for markers: the exact (nearest-rank) quantile
+        return self.q[round(self.p * (self.n - 1))] if self.q else None
+
+class ResponseTimes:
+    """Reply delays: an exact running mean plus P² median/p90 sketches overall and per contact, O(contacts) memory."""
+    QUANTILES = (0.5, 0.9)
+
+    def __init__(self):
+        self.n = self.total = 0
+        self.sketch = [P2Quantile(p) for p in self.QUANTILES]
+        self.contacts = {}  # key -> [replies, *sketches]
+
+    def add(self, key, secs):
+        self.n += 1
+        self.total += secs
+        for s in self.sketch:
+            s.add(secs)
+        c = self.contacts.get(key)
+        if c is None:
+            c = self.contacts[key] = [0] + [P2Quantile(p) for p in self.QUANTILES]
+        c[0] += 1
+        for s in c[1:]:
+            s.add(secs)
+
+    def mean_minutes(self):
+        return self.total / self.n / 60.0 if self.n else None
+
+    def quantiles(self):
+        """(median, p90) seconds over every reply, None without replies."""
+        return tuple(None if s.value() is None else round(s.value()) for s in self.sketch)
+
+    def per_contact(self, names=None, limit=20):
+        """[(name, replies, median, p90)] for the contacts replied to most; names maps keys to handles (None drops a key).
+
+        Sketches can't be merged, so when several keys share a handle the one with the most replies stands for it.
+        """
+        rows = {}
+        for key, (n, *sketch) in self.contacts.items():
+            name = key if names is None else names.get(key)
+            if name is not None and n > rows.get(name, (0,))[0]:
+                rows[name] = (n, *(round(s.value()) for s in sketch))
+        return sorted([(name, *r) for name, r in rows.items()], key=lambda x: (-x[1], x[0]))[:limit]
+
+SESSION_GAP = 14400     # a 1:1 message over 4h after its thread's last one opens a new conversation
+DOUBLE_TEXT_GAP = 600   # your message 10+ min after your own unanswered one is a double text
+
+class Session:
+    """One conversation: a run of a 1:1 thread's messages with no gap over SESSION_GAP."""
+    __slots__ = ('contact', 'start', 'end', 'from_me', 'last_me', 'sent', 'received', 'reply_n', 'reply_sum', 'double_texts')
+
+    def __init__(self, contact, start, from_me):
+        self.contact, self.start, self.end = contact, start, start
+        self.from_me = self.last_me = from_me
+        self.sent = self.received = self.reply_n = self.reply_sum = self.double_texts = 0
+
+    def saved(self):
+        return [getattr(self, k) for k in self.__slots__]
+
+    @classmethod
+    def restore(cls, saved):
+        s = cls.__new__(cls)
+        for k, v in zip(cls.__slots__, saved):
+            setattr(s, k, v)
+        return s
+
+class Conversations:
+    """1:1 messages, fed in date order, split per thread into Sessions.
+
+    A session is folded into the running totals once its thread moves on, so only each thread's
+    latest session is held: memory grows with threads, not messages.
+    """
+    TOTALS = ('count', 'started', 'messages', 'seconds', 'double')
+
+    def __init__(self):
+        self.replies = ResponseTimes()
+        self.open = {}       # thread -> its latest Session, which later messages may still extend
+        for k in self.TOTALS:
+            setattr(self, k, 0)
+        self.longest = None  # closed Session with the most messages
+
+    def add(self, thread, contact, ts, me):
+        prev = s = self.open.get(thread)
+        if prev is None or ts - prev.end > SESSION_GAP:
+            s = self.open[thread] = Session(contact, ts, me)
+        if prev is not None:
+            # A reply (10s-24h after a received message) may open the next session; it counts there
+            gap = ts - prev.end
+            if me and not prev.last_me and 10 < gap < 86400:
+                s.reply_n += 1
+                s.reply_sum += gap
+                self.replies.add(contact, gap)
+            elif me and prev.last_me and gap >= DOUBLE_TEXT_GAP:
+                s.double_texts += 1
+            if s is not prev:
+                self.close(prev)
+        s.end, s.last_me = ts, me
+        if me:
+            s.sent += 1
+        else:
+            s.received += 1
+
+    def close(self, s):
+        self.count += 1
+        self.started += s.from_me
+        self.messages += s.sent + s.received
+        self.seconds += s.end - s.start
+        self.double += s.double_texts > 0
+        if self.longest is None or s.sent + s.received > self.longest.sent + self.longest.received:
+            self.longest = s
+
+    def summary(self, d, names=None, epoch=0):
+        """Fill d's starter %, response-time and session metrics; names maps contacts to handles, epoch makes ts Unix time."""
+        # Open sessions count as they stand, on a copy so later messages can still extend them
+        t = copy.copy(self)
+        for s in self.open.values():
+            t.close(s)
+        replies = self.replies
+        d['starter_pct'] = round((t.started / t.count) * 100) if t.count else 50
+        d['resp'] = int(replies.mean_minutes() or 30)
+        d['resp_median'], d['resp_p90'] = replies.quantiles()
+        d['resp_contacts'] = replies.per_contact(names)
+        d['sessions'] = None
+        if t.count:
+            s = t.longest
+            d['sessions'] = {
+                'count': t.count,
+                'avg_minutes': round(t.seconds / t.count / 60),
+                'avg_messages': round(t.messages / t.count, 1),
+                'double_text_pct': round(t.double * 100 / t.count),
+                'longest': {
+                    'contact': s.contact if names is None else names.get(s.contact),
+                    'messages': s.sent + s.received,
+                    'minutes': round((s.end - s.start) / 60),
+                    'date': datetime.fromtimestamp(s.start + epoch).strftime('%Y-%m-%d'),
+                },
+            }
+        return d
+
+WHATSAPP_DB = os.environ.get("WRAP2025_WHATSAPP_DB")  # None: first of WHATSAPP_PATHS that exists (--whatsapp-db)
 
 def find_database():
     """Find the WhatsApp database path."""
@@ -98,9 +387,14 @@ def get_name(jid, contacts):
         return f"+{phone}"
     return jid
 
+def open_in_macos(target):
+    """Hand a file or settings URL to macOS `open`; elsewhere (e.g. Linux CI on synthetic databases) there is nothing to hand it to."""
+    if sys.platform == 'darwin':
+        subprocess.run(['open', target])
+
 def check_access():
     global WHATSAPP_DB
-    WHATSAPP_DB = find_database()
+    WHATSAPP_DB = WHATSAPP_DB or find_database()
 
     if not WHATSAPP_DB:
         print("\n[FATAL] WhatsApp database not found.")
@@ -117,16 +411,279 @@ def check_access():
     except Exception as e:
         print("\n[!] ACCESS DENIED")
         print("   System Settings -> Privacy & Security -> Full Disk Access -> Add Terminal")
-        subprocess.run(['open', 'x-apple.systempreferences:com.apple.preference.security?Privacy_AllFiles'])
+        open_in_macos('x-apple.systempreferences:com.apple.preference.security?Privacy_AllFiles')
         sys.exit(1)
 
-def q(sql):
-    conn = sqlite3.connect(WHATSAPP_DB)
-    r = conn.execute(sql).fetchall()
-    conn.close()
-    return r
+# Page cache / mmap budget for the read-only analysis connections
+CACHE_SIZE_KB = 262144  # 256 MB
+MMAP_SIZE = 2147418112  # SQLite's default compile-time ceiling (~2 GB)
+
+class ReadOnlyDB:
+    """Opens a database once per thread in read-only URI mode and reuses it for every query."""
+    PRAGMAS = (
+        "PRAGMA query_only = ON",
+        f"PRAGMA cache_size = -{CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size = {MMAP_SIZE}",
+        "PRAGMA temp_store = MEMORY",
+    )
+
+    def __init__(self, path, snapshot=None):
+        self.source = path
+        self.path = path
+        self.uri = f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro"
+        self.keeper = None
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.conns = []
+        self.stats = []
+        self.scratch = None  # side database holding prepare()'s tables, attached to every connection as `scratch`
+        if snapshot:
+            self.take_snapshot(snapshot)
+
+    def take_snapshot(self, mode):
+        """Copy the live database, WAL included, with the backup API so every query sees one point in time."""
+        src = sqlite3.connect(self.uri, uri=True)
+        if mode == 'memory':
+            # Named shared-cache memory DB: worker connections see it for as long as the keeper stays open
+            self.path = ':memory:'
+            self.uri = f"file:wrapped-snapshot-{id(self)}?mode=memory&cache=shared"
+            self.keeper = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+            dst = self.keeper
+        else:
+            fd, self.path = tempfile.mkstemp(prefix='wrapped-snapshot-', suffix='.sqlite')
+            os.close(fd)
+            self.uri = f"file:{urllib.parse.quote(self.path)}?mode=ro"
+            dst = sqlite3.connect(self.path)
+        try:
+            src.backup(dst)
+            if dst is not self.keeper:
+                # The copy inherits a WAL source's journal mode, and read-only connections would then leave -wal/-shm files behind
+                dst.execute("PRAGMA journal_mode = DELETE")
+        except BaseException:
+            # A half-written copy of the chat database must not outlive a failed backup
+            dst.close()
+            self.close()
+            raise
+        finally:
+            src.close()
+            if dst is not self.keeper:
+                dst.close()
+
+    def connect(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+            for pragma in self.PRAGMAS:
+                conn.execute(pragma)
+            stats = {'thread': threading.current_thread().name, 'queries': 0, 'rows': 0, 'seconds': 0.0}
+            with self.lock:
+                self.conns.append(conn)
+                self.stats.append(stats)
+            self.local.conn, self.local.stats, self.local.attached = conn, stats, False
+        if self.scratch and not self.local.attached:
+            conn.execute("ATTACH DATABASE ? AS scratch", (self.scratch,))
+            self.local.attached = True
+        return conn
+
+    def prepare(self, name, script):
+        """Run setup SQL once, on the calling thread, building its tables in the `scratch` schema.
+
+        scratch is a temp database file every connection attaches, so --jobs workers read one shared copy
+        instead of each rebuilding it. Call it before the queries that read the tables, not while they run.
+        """
+        with self.lock:
+            if self.scratch is None:
+                fd, self.scratch = tempfile.mkstemp(prefix='wrapped-scratch-', suffix='.sqlite')
+                os.close(fd)
+        conn = self.connect()
+        stats = self.local.stats
+        t0 = time.perf_counter()
+        # query_only refuses writes to attached databases too, so lift it just for the setup script
+        conn.execute("PRAGMA query_only = OFF")
+        try:
+            with stage(f'setup {name}'):
+                # Throwaway tables: no rollback journal or fsyncs
+                conn.execute("PRAGMA scratch.journal_mode = OFF")
+                conn.execute("PRAGMA scratch.synchronous = OFF")
+                conn.executescript(script)
+        finally:
+            conn.execute("PRAGMA query_only = ON")
+        stats['queries'] += 1
+        stats['seconds'] += time.perf_counter() - t0
+
+    def q(self, sql, params=()):
+        conn = self.connect()
+        t0 = time.perf_counter()
+        r = conn.execute(sql, params).fetchall()
+        stats = self.local.stats
+        stats['queries'] += 1
+        stats['rows'] += len(r)
+        stats['seconds'] += time.perf_counter() - t0
+        return r
+
+    def stream(self, sql, batch_size, params=()):
+        """Yield result rows in fetchmany() batches instead of materializing them all."""
+        cur = self.connect().cursor()
+        stats = self.local.stats
+        t0 = time.perf_counter()
+        cur.execute(sql, params)
+        stats['queries'] += 1
+        try:
+            while True:
+                rows = cur.fetchmany(batch_size)
+                stats['seconds'] += time.perf_counter() - t0
+                if not rows:
+                    break
+                stats['rows'] += len(rows)
+                yield rows
+                t0 = time.perf_counter()
+        finally:
+            cur.close()
+
+    def close(self):
+        with self.lock:
+            for conn in self.conns:
+                conn.close()
+            self.conns = []
+        self.local = threading.local()
+        if self.keeper:
+            self.keeper.close()
+            self.keeper = None
+        elif self.path != self.source and os.path.exists(self.path):
+            os.remove(self.path)
+        if self.scratch and os.path.exists(self.scratch):
+            os.remove(self.scratch)
+        self.scratch = None
+
+DBS = {}
+DBS_LOCK = threading.Lock()
+SNAPSHOT = None  # None, 'file' or 'memory' (--snapshot)
+
+def get_db(path):
+    """Shared read-only connection manager for a database path."""
+    with DBS_LOCK:
+        if path not in DBS:
+            DBS[path] = ReadOnlyDB(path, snapshot=SNAPSHOT)
+        return DBS[path]
+
+def close_dbs():
+    with DBS_LOCK:
+        for db in DBS.values():
+            db.close()
+        DBS.clear()
+
+# Snapshot and scratch files are temp files: remove them even when the scripts are imported and close_dbs() is never called
+atexit.register(close_dbs)
 
-def analyze(ts_start, ts_jun):
+def q(sql):
+    return get_db(WHATSAPP_DB).q(sql)
+
+JOBS = 1  # worker threads for the metric queries (--jobs)
+METRIC_TIMES = {}  # metric name -> seconds its query took, filled by run_metrics()
+PROFILE = None  # {'queries': {...}, 'stages': {...}} while --profile is collecting, else None
+PROFILE_STEP = 1000  # SQLite VM instructions between progress-handler ticks
+PROFILE_LOCK = threading.Lock()
+
+@contextlib.contextmanager
+def stage(name):
+    """Add the wall time of the with-block to PROFILE['stages'][name] (a no-op without --profile)."""
+    if PROFILE is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        secs = time.perf_counter() - t0
+        with PROFILE_LOCK:
+            PROFILE['stages'][name] = PROFILE['stages'].get(name, 0.0) + secs
+
+def query_plan(conn, sql):
+    """EXPLAIN QUERY PLAN of sql as detail lines indented by their depth in the plan tree."""
+    depth, lines = {0: -1}, []
+    for node, parent, _, detail in conn.execute(f"EXPLAIN QUERY PLAN {sql}"):
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node] + detail)
+    return lines
+
+def profile_query(db, name, job):
+    """Run one metric like run_metrics() does, recording wall time, rows, VM steps and the plan of every statement it ran."""
+    conn = db.connect()
+    stats = db.local.stats
+    steps, statements = [0], []
+    def tick():
+        steps[0] += PROFILE_STEP
+        return 0
+    conn.set_progress_handler(tick, PROFILE_STEP)
+    conn.set_trace_callback(statements.append)
+    rows, t0 = stats['rows'], time.perf_counter()
+    try:
+        result = job(db) if callable(job) else db.q(job)
+    finally:
+        secs = time.perf_counter() - t0
+        conn.set_progress_handler(None, PROFILE_STEP)
+        conn.set_trace_callback(None)
+    plan = [line for sql in statements if re.match(r'\s*(SELECT|WITH)\b', sql, re.I) for line in query_plan(conn, sql)]
+    with PROFILE_LOCK:
+        PROFILE['queries'][name] = {'seconds': secs, 'rows': stats['rows'] - rows, 'vm_steps': steps[0], 'plan': plan}
+    return result
+
+def write_profile(path):
+    """Save PROFILE (slowest first) plus per-connection totals as JSON, and print it as two tables."""
+    stages = dict(sorted(PROFILE['stages'].items(), key=lambda x: -x[1]))
+    queries = dict(sorted(PROFILE['queries'].items(), key=lambda x: -x[1]['seconds']))
+    connections = [dict(stats, db=db.source) for db in DBS.values() for stats in db.stats]
+    with open(path, 'w') as f:
+        json.dump({'stages': stages, 'queries': queries, 'connections': connections}, f, indent=2)
+    print(f"      {'stage':<28} {'ms':>9}")
+    for name, secs in stages.items():
+        print(f"      {name:<28} {secs * 1000:9.1f}")
+    print(f"      {'query':<28} {'ms':>9} {'rows':>9} {'vm steps':>12}  plan")
+    for name, p in queries.items():
+        print(f"      {name:<28} {p['seconds'] * 1000:9.1f} {p['rows']:9,} {p['vm_steps']:12,}  {p['plan'][0].strip() if p['plan'] else '-'}")
+
+
+def emoji_histogram(db, sql, batch_size=SCAN_BATCH_SIZE):
+    """Stream the (text,) rows of sql once and count their emoji."""
+    counts = Counter()
+    for rows in db.stream(sql, batch_size):
+        count_emoji([text for text, in rows], counts)
+    return counts
+
+def vocabulary(db, sql, batch_size=SCAN_BATCH_SIZE):
+    """Stream the (text,) rows of sql once: (exact word count, top-words summary, top-phrases summary)."""
+    words, top_words, top_phrases = 0, {}, {}
+    for rows in db.stream(sql, batch_size):
+        words += count_vocabulary([text for text, in rows], top_words, top_phrases)
+    return words, top_words, top_phrases
+
+def conversations(db, sql, batch_size=SCAN_BATCH_SIZE):
+    """Stream the (thread, contact, ts, from_me) 1:1 rows of sql, in ts order, into Conversations."""
+    talks = Conversations()
+    for rows in db.stream(sql, batch_size):
+        for row in rows:
+            talks.add(*row)
+    return talks
+
+def run_metrics(db, queries):
+    """Run independent named queries (SQL or callables), spread over JOBS threads (one connection each), and time every one."""
+    def run(name):
+        t0 = time.perf_counter()
+        job = queries[name]
+        if PROFILE is not None:
+            rows = profile_query(db, name, job)
+        else:
+            # A callable is a Python-side stage that streams its own rows from db
+            rows = job(db) if callable(job) else db.q(job)
+        METRIC_TIMES[name] = time.perf_counter() - t0
+        return rows
+    # A lone query runs on the caller's connection: a pool thread would open (and set up) a new one just for it
+    if JOBS <= 1 or len(queries) <= 1:
+        return {name: run(name) for name in queries}
+    with ThreadPoolExecutor(max_workers=min(JOBS, len(queries)), thread_name_prefix='metric') as pool:
+        return dict(zip(queries, pool.map(run, queries)))
+
+def analyze(ts_start, ts_jun, ts_end=None):
     d = {}
 
     # WhatsApp schema:
@@ -146,160 +703,177 @@ def analyze(ts_start, ts_jun):
         )
     """
 
+    group_chat_cte = """
+        WITH group_sessions AS (
+            SELECT Z_PK FROM ZWACHATSESSION WHERE ZSESSIONTYPE = 1
+        ),
+        group_messages AS (
+            SELECT m.Z_PK as msg_id, m.ZCHATSESSION
+            FROM ZWAMESSAGE m
+            JOIN group_sessions s ON m.ZCHATSESSION = s.Z_PK
+        )
+    """
+
+    # Independent metric queries, run together by run_metrics() (in parallel with --jobs)
+    sql = {}
+
     # Stats: total, sent, received, unique contacts (1:1 only)
-    raw_stats = q(f"""{one_on_one_cte}
+    sql['stats'] = f"""{one_on_one_cte}
         SELECT COUNT(*), SUM(CASE WHEN m.ZISFROMME=1 THEN 1 ELSE 0 END), SUM(CASE WHEN m.ZISFROMME=0 THEN 1 ELSE 0 END), COUNT(DISTINCT dm.ZCONTACTJID)
         FROM ZWAMESSAGE m
         JOIN dm_messages dm ON m.Z_PK = dm.msg_id
-        WHERE m.ZMESSAGEDATE>{ts_start}
-    """)[0]
-    d['stats'] = (raw_stats[0] or 0, raw_stats[1] or 0, raw_stats[2] or 0, raw_stats[3] or 0)
+        WHERE {cocoa_window(ts_start, ts_end, 'm.ZMESSAGEDATE')}
+    """
 
     # Top contacts (1:1 only)
-    d['top'] = q(f"""{one_on_one_cte}
+    sql['top'] = f"""{one_on_one_cte}
         SELECT dm.ZCONTACTJID, COUNT(*) t, SUM(CASE WHEN m.ZISFROMME=1 THEN 1 ELSE 0 END), SUM(CASE WHEN m.ZISFROMME=0 THEN 1 ELSE 0 END)
         FROM ZWAMESSAGE m
         JOIN dm_messages dm ON m.Z_PK = dm.msg_id
-        WHERE m.ZMESSAGEDATE>{ts_start}
-        GROUP BY dm.ZCONTACTJID ORDER BY t DESC LIMIT 20
-    """)
+        WHERE {cocoa_window(ts_start, ts_end, 'm.ZMESSAGEDATE')}
+        GROUP BY dm.ZCONTACTJID ORDER BY t DESC, dm.ZCONTACTJID LIMIT 20
+    """
 
     # Late night texters (1:1 only) - messages between midnight and 5am
-    d['late'] = q(f"""{one_on_one_cte}
+    sql['late'] = f"""{one_on_one_cte}
         SELECT dm.ZCONTACTJID, COUNT(*) n FROM ZWAMESSAGE m
         JOIN dm_messages dm ON m.Z_PK = dm.msg_id
-        WHERE m.ZMESSAGEDATE>{ts_start}
+        WHERE {cocoa_window(ts_start, ts_end, 'm.ZMESSAGEDATE')}
         AND CAST(strftime('%H',datetime(m.ZMESSAGEDATE+{COCOA_OFFSET},'unixepoch','localtime')) AS INT)<5
-        GROUP BY dm.ZCONTACTJID HAVING n>5 ORDER BY n DESC LIMIT 5
-    """)
+        GROUP BY dm.ZCONTACTJID HAVING n>5 ORDER BY n DESC, dm.ZCONTACTJID LIMIT 5
+    """
 
     # Peak hour
-    r = q(f"SELECT CAST(strftime('%H',datetime(ZMESSAGEDATE+{COCOA_OFFSET},'unixepoch','localtime')) AS INT) h, COUNT(*) c FROM ZWAMESSAGE WHERE ZMESSAGEDATE>{ts_start} GROUP BY h ORDER BY c DESC LIMIT 1")
-    d['hour'] = r[0][0] if r else 12
+    sql['hour'] = f"SELECT CAST(strftime('%H',datetime(ZMESSAGEDATE+{COCOA_OFFSET},'unixepoch','localtime')) AS INT) h, COUNT(*) c FROM ZWAMESSAGE WHERE {cocoa_window(ts_start, ts_end)} GROUP BY h ORDER BY c DESC, h LIMIT 1"
 
     # Peak day
-    days = ['Sunday','Monday','Tuesday','Wednesday','Thursday','Friday','Saturday']
-    r = q(f"SELECT CAST(strftime('%w',datetime(ZMESSAGEDATE+{COCOA_OFFSET},'unixepoch','localtime')) AS INT) d, COUNT(*) FROM ZWAMESSAGE WHERE ZMESSAGEDATE>{ts_start} GROUP BY d ORDER BY 2 DESC LIMIT 1")
-    d['day'] = days[r[0][0]] if r else '???'
+    sql['day'] = f"SELECT CAST(strftime('%w',datetime(ZMESSAGEDATE+{COCOA_OFFSET},'unixepoch','localtime')) AS INT) d, COUNT(*) FROM ZWAMESSAGE WHERE {cocoa_window(ts_start, ts_end)} GROUP BY d ORDER BY 2 DESC, d LIMIT 1"
 
     # Ghosted (1:1 only) - people who texted before June but not after
-    d['ghosted'] = q(f"""{one_on_one_cte}
+    sql['ghosted'] = f"""{one_on_one_cte}
         SELECT dm.ZCONTACTJID, SUM(CASE WHEN m.ZISFROMME=0 AND m.ZMESSAGEDATE<{ts_jun} THEN 1 ELSE 0 END) b, SUM(CASE WHEN m.ZISFROMME=0 AND m.ZMESSAGEDATE>={ts_jun} THEN 1 ELSE 0 END) a
         FROM ZWAMESSAGE m
         JOIN dm_messages dm ON m.Z_PK = dm.msg_id
-        WHERE m.ZMESSAGEDATE>{ts_start}
-        GROUP BY dm.ZCONTACTJID HAVING b>10 AND a<3 ORDER BY b DESC LIMIT 5
-    """)
+        WHERE {cocoa_window(ts_start, ts_end, 'm.ZMESSAGEDATE')}
+        GROUP BY dm.ZCONTACTJID HAVING b>10 AND a<3 ORDER BY b DESC, dm.ZCONTACTJID LIMIT 5
+    """
 
     # Heating up (1:1 only) - relationships growing in H2
-    d['heating'] = q(f"""{one_on_one_cte}
+    sql['heating'] = f"""{one_on_one_cte}
         SELECT dm.ZCONTACTJID, SUM(CASE WHEN m.ZMESSAGEDATE<{ts_jun} THEN 1 ELSE 0 END) h1, SUM(CASE WHEN m.ZMESSAGEDATE>={ts_jun} THEN 1 ELSE 0 END) h2
         FROM ZWAMESSAGE m
         JOIN dm_messages dm ON m.Z_PK = dm.msg_id
-        WHERE m.ZMESSAGEDATE>{ts_start}
-        GROUP BY dm.ZCONTACTJID HAVING h1>20 AND h2>h1*1.5 ORDER BY (h2-h1) DESC LIMIT 5
-    """)
+        WHERE {cocoa_window(ts_start, ts_end, 'm.ZMESSAGEDATE')}
+        GROUP BY dm.ZCONTACTJID HAVING h1>20 AND h2>h1*1.5 ORDER BY (h2-h1) DESC, dm.ZCONTACTJID LIMIT 5
+    """
 
     # Biggest fan (1:1 only) - people who text you way more than you text them
-    d['fan'] = q(f"""{one_on_one_cte}
+    sql['fan'] = f"""{one_on_one_cte}
         SELECT dm.ZCONTACTJID, SUM(CASE WHEN m.ZISFROMME=0 THEN 1 ELSE 0 END) t, SUM(CASE WHEN m.ZISFROMME=1 THEN 1 ELSE 0 END) y
         FROM ZWAMESSAGE m
         JOIN dm_messages dm ON m.Z_PK = dm.msg_id
-        WHERE m.ZMESSAGEDATE>{ts_start}
-        GROUP BY dm.ZCONTACTJID HAVING t>y*2 AND (t+y)>100 ORDER BY (t*1.0/NULLIF(y,0)) DESC LIMIT 5
-    """)
+        WHERE {cocoa_window(ts_start, ts_end, 'm.ZMESSAGEDATE')}
+        GROUP BY dm.ZCONTACTJID HAVING t>y*2 AND (t+y)>100 ORDER BY (t*1.0/NULLIF(y,0)) DESC, dm.ZCONTACTJID LIMIT 5
+    """
 
     # Simp (1:1 only) - people you text way more than they text you
-    d['simp'] = q(f"""{one_on_one_cte}
+    sql['simp'] = f"""{one_on_one_cte}
         SELECT dm.ZCONTACTJID, SUM(CASE WHEN m.ZISFROMME=1 THEN 1 ELSE 0 END) y, SUM(CASE WHEN m.ZISFROMME=0 THEN 1 ELSE 0 END) t
         FROM ZWAMESSAGE m
         JOIN dm_messages dm ON m.Z_PK = dm.msg_id
-        WHERE m.ZMESSAGEDATE>{ts_start}
-        GROUP BY dm.ZCONTACTJID HAVING y>t*2 AND (t+y)>100 ORDER BY (y*1.0/NULLIF(t,0)) DESC LIMIT 5
-    """)
+        WHERE {cocoa_window(ts_start, ts_end, 'm.ZMESSAGEDATE')}
+        GROUP BY dm.ZCONTACTJID HAVING y>t*2 AND (t+y)>100 ORDER BY (y*1.0/NULLIF(t,0)) DESC, dm.ZCONTACTJID LIMIT 5
+    """
 
-    # Response time (1:1 only)
-    r = q(f"""
-        WITH dm_sessions AS (
-            SELECT Z_PK, ZCONTACTJID FROM ZWACHATSESSION WHERE ZSESSIONTYPE = 0
-        ),
-        dm_messages AS (
-            SELECT m.Z_PK as msg_id, m.ZCHATSESSION
-            FROM ZWAMESSAGE m
-            JOIN dm_sessions s ON m.ZCHATSESSION = s.Z_PK
-        ),
-        g AS (
-            SELECT m.ZMESSAGEDATE ts, m.ZISFROMME, m.ZCHATSESSION,
-                   LAG(m.ZMESSAGEDATE) OVER (PARTITION BY m.ZCHATSESSION ORDER BY m.ZMESSAGEDATE) pt,
-                   LAG(m.ZISFROMME) OVER (PARTITION BY m.ZCHATSESSION ORDER BY m.ZMESSAGEDATE) pf
-            FROM ZWAMESSAGE m
-            JOIN dm_messages dm ON m.Z_PK = dm.msg_id
-            WHERE m.ZMESSAGEDATE>{ts_start}
-        )
-        SELECT AVG(ts-pt)/60.0 FROM g
-        WHERE ZISFROMME=1 AND pf=0 AND (ts-pt)<86400 AND (ts-pt)>10
+    # Starter %, response times and sessions (1:1 only) from one pass, streamed in date order off the
+    # date index so no window sort is needed
+    sql['sessions'] = lambda db: conversations(db, f"""
+        SELECT m.ZCHATSESSION, s.ZCONTACTJID, m.ZMESSAGEDATE, m.ZISFROMME
+        FROM ZWAMESSAGE m
+        JOIN ZWACHATSESSION s ON m.ZCHATSESSION = s.Z_PK
+        WHERE {cocoa_window(ts_start, ts_end, 'm.ZMESSAGEDATE')}
+        AND s.ZSESSIONTYPE = 0
+        ORDER BY m.ZMESSAGEDATE
     """)
-    d['resp'] = int(r[0][0] or 30)
 
     # Emoji usage
-    emojis = ['😂','❤️','😭','🔥','💀','✨','🙏','👀','💯','😈']
-    counts = {}
-    for e in emojis:
-        r = q(f"SELECT COUNT(*) FROM ZWAMESSAGE WHERE ZTEXT LIKE '%{e}%' AND ZMESSAGEDATE>{ts_start} AND ZISFROMME=1")
-        counts[e] = r[0][0]
-    d['emoji'] = sorted(counts.items(), key=lambda x:-x[1])[:5]
+    # Only non-ASCII texts can hold an emoji
+    sql['emoji'] = lambda db: emoji_histogram(db, f"SELECT ZTEXT FROM ZWAMESSAGE WHERE {cocoa_window(ts_start, ts_end)} AND ZISFROMME=1 AND ZTEXT GLOB '*[^ -~]*'")
 
     # Total words sent
-    r = q(f"""
-        SELECT
-            COUNT(*) as msg_count,
-            COALESCE(SUM(LENGTH(ZTEXT) - LENGTH(REPLACE(ZTEXT, ' ', ''))), 0) as extra_words
+    sql['words'] = lambda db: vocabulary(db, f"""
+        SELECT ZTEXT
         FROM ZWAMESSAGE
-        WHERE ZMESSAGEDATE>{ts_start}
+        WHERE {cocoa_window(ts_start, ts_end)}
         AND ZISFROMME=1
         AND ZTEXT IS NOT NULL
         AND LENGTH(ZTEXT) > 0
     """)
-    msg_count = r[0][0] or 0
-    extra_words = r[0][1] or 0
-    d['words'] = msg_count + extra_words
 
     # Busiest day
-    r = q(f"SELECT DATE(datetime(ZMESSAGEDATE+{COCOA_OFFSET},'unixepoch','localtime')) d, COUNT(*) c FROM ZWAMESSAGE WHERE ZMESSAGEDATE>{ts_start} GROUP BY d ORDER BY c DESC LIMIT 1")
-    if r:
-        d['busiest_day'] = (r[0][0], r[0][1])
-    else:
-        d['busiest_day'] = None
+    sql['busiest_day'] = f"SELECT DATE(datetime(ZMESSAGEDATE+{COCOA_OFFSET},'unixepoch','localtime')) d, COUNT(*) c FROM ZWAMESSAGE WHERE {cocoa_window(ts_start, ts_end)} GROUP BY d ORDER BY c DESC, d LIMIT 1"
 
-    # Conversation starter % (1:1 only)
-    r = q(f"""
-        WITH dm_sessions AS (
-            SELECT Z_PK, ZCONTACTJID FROM ZWACHATSESSION WHERE ZSESSIONTYPE = 0
-        ),
-        dm_messages AS (
-            SELECT m.Z_PK as msg_id, m.ZCHATSESSION
-            FROM ZWAMESSAGE m
-            JOIN dm_sessions s ON m.ZCHATSESSION = s.Z_PK
-        ),
-        convos AS (
-            SELECT m.ZISFROMME,
-                   m.ZMESSAGEDATE as ts,
-                   LAG(m.ZMESSAGEDATE) OVER (PARTITION BY m.ZCHATSESSION ORDER BY m.ZMESSAGEDATE) as prev_ts
-            FROM ZWAMESSAGE m
-            JOIN dm_messages dm ON m.Z_PK = dm.msg_id
-            WHERE m.ZMESSAGEDATE>{ts_start}
+
+    # Daily message counts for the contribution graph
+    sql['daily_counts'] = f"""
+        SELECT DATE(datetime(ZMESSAGEDATE+{COCOA_OFFSET},'unixepoch','localtime')) as d, COUNT(*) as c
+        FROM ZWAMESSAGE
+        WHERE {cocoa_window(ts_start, ts_end)}
+        GROUP BY d
+        ORDER BY d
+    """
+
+    # Group chat overview
+    sql['group_stats'] = f"""{group_chat_cte}
+        SELECT
+            (SELECT COUNT(DISTINCT gm.ZCHATSESSION) FROM group_messages gm
+             JOIN ZWAMESSAGE m ON m.Z_PK = gm.msg_id
+             WHERE {cocoa_window(ts_start, ts_end, 'm.ZMESSAGEDATE')}) as group_count,
+            COUNT(*) as total_msgs,
+            SUM(CASE WHEN m.ZISFROMME=1 THEN 1 ELSE 0 END) as sent
+        FROM ZWAMESSAGE m
+        WHERE {cocoa_window(ts_start, ts_end, 'm.ZMESSAGEDATE')}
+        AND m.Z_PK IN (SELECT msg_id FROM group_messages)
+    """
+
+    # Group chat leaderboard
+    sql['group_leaderboard'] = f"""
+        WITH group_sessions AS (
+            SELECT Z_PK, ZPARTNERNAME FROM ZWACHATSESSION WHERE ZSESSIONTYPE = 1
         )
         SELECT
-            SUM(CASE WHEN ZISFROMME=1 THEN 1 ELSE 0 END) as you_started,
-            COUNT(*) as total
-        FROM convos
-        WHERE prev_ts IS NULL OR (ts - prev_ts) > 14400
-    """)
-    if r and r[0][1] and r[0][1] > 0:
-        you_started = r[0][0] or 0
-        d['starter_pct'] = round((you_started / r[0][1]) * 100)
+            s.Z_PK as chat_id,
+            s.ZPARTNERNAME as name,
+            COUNT(*) as msg_count
+        FROM ZWAMESSAGE m
+        JOIN group_sessions s ON m.ZCHATSESSION = s.Z_PK
+        WHERE {cocoa_window(ts_start, ts_end, 'm.ZMESSAGEDATE')}
+        GROUP BY s.Z_PK
+        ORDER BY msg_count DESC, s.Z_PK
+        LIMIT 5
+    """
+
+    r = run_metrics(get_db(WHATSAPP_DB), sql)
+
+    raw_stats = r['stats'][0]
+    d['stats'] = (raw_stats[0] or 0, raw_stats[1] or 0, raw_stats[2] or 0, raw_stats[3] or 0)
+    for k in ('top', 'late', 'ghosted', 'heating', 'fan', 'simp'):
+        d[k] = r[k]
+    d['hour'] = r['hour'][0][0] if r['hour'] else 12
+    d['day'] = WEEKDAYS[r['day'][0][0]] if r['day'] else '???'
+    r['sessions'].summary(d, epoch=978307200)
+
+    d['emoji'] = top_emoji(r['emoji'])
+
+    d['words'], top_words, top_phrases = r['words']
+    d['top_words'] = top_counts(top_words, TOP_WORDS_K)
+    d['top_phrases'] = top_counts(top_phrases, TOP_PHRASES_K)
+
+    if r['busiest_day']:
+        d['busiest_day'] = (r['busiest_day'][0][0], r['busiest_day'][0][1])
     else:
-        d['starter_pct'] = 50
+        d['busiest_day'] = None
+
 
     # Personality
     s = d['stats']
@@ -314,18 +888,10 @@ def analyze(ts_start, ts_jun):
     else: d['personality'] = ("SUSPICIOUSLY NORMAL", "no notes. boring but stable.")
 
     # === CONTRIBUTION GRAPH DATA ===
-    # Get daily message counts for the year
-    daily_counts = q(f"""
-        SELECT DATE(datetime(ZMESSAGEDATE+{COCOA_OFFSET},'unixepoch','localtime')) as d, COUNT(*) as c
-        FROM ZWAMESSAGE
-        WHERE ZMESSAGEDATE>{ts_start}
-        GROUP BY d
-        ORDER BY d
-    """)
-    d['daily_counts'] = {row[0]: row[1] for row in daily_counts}
+    d['daily_counts'] = {row[0]: row[1] for row in r['daily_counts']}
 
     # Calculate streaks and stats
-    from datetime import datetime as dt, timedelta
+    from datetime import datetime as dt
     if d['daily_counts']:
         all_counts = list(d['daily_counts'].values())
         d['max_daily'] = max(all_counts) if all_counts else 0
@@ -369,56 +935,18 @@ def analyze(ts_start, ts_jun):
         d['quiet_days'] = 0
 
     # === GROUP CHAT STATS ===
-    group_chat_cte = """
-        WITH group_sessions AS (
-            SELECT Z_PK FROM ZWACHATSESSION WHERE ZSESSIONTYPE = 1
-        ),
-        group_messages AS (
-            SELECT m.Z_PK as msg_id, m.ZCHATSESSION
-            FROM ZWAMESSAGE m
-            JOIN group_sessions s ON m.ZCHATSESSION = s.Z_PK
-        )
-    """
-
-    # Group chat overview
-    r = q(f"""{group_chat_cte}
-        SELECT
-            (SELECT COUNT(DISTINCT gm.ZCHATSESSION) FROM group_messages gm
-             JOIN ZWAMESSAGE m ON m.Z_PK = gm.msg_id
-             WHERE m.ZMESSAGEDATE>{ts_start}) as group_count,
-            COUNT(*) as total_msgs,
-            SUM(CASE WHEN m.ZISFROMME=1 THEN 1 ELSE 0 END) as sent
-        FROM ZWAMESSAGE m
-        WHERE m.ZMESSAGEDATE>{ts_start}
-        AND m.Z_PK IN (SELECT msg_id FROM group_messages)
-    """)
-    if r and r[0][0]:
+    g = r['group_stats']
+    if g and g[0][0]:
         d['group_stats'] = {
-            'count': r[0][0] or 0,
-            'total': r[0][1] or 0,
-            'sent': r[0][2] or 0
+            'count': g[0][0] or 0,
+            'total': g[0][1] or 0,
+            'sent': g[0][2] or 0
         }
     else:
         d['group_stats'] = {'count': 0, 'total': 0, 'sent': 0}
 
-    # Group chat leaderboard
-    r = q(f"""
-        WITH group_sessions AS (
-            SELECT Z_PK, ZPARTNERNAME FROM ZWACHATSESSION WHERE ZSESSIONTYPE = 1
-        )
-        SELECT
-            s.Z_PK as chat_id,
-            s.ZPARTNERNAME as name,
-            COUNT(*) as msg_count
-        FROM ZWAMESSAGE m
-        JOIN group_sessions s ON m.ZCHATSESSION = s.Z_PK
-        WHERE m.ZMESSAGEDATE>{ts_start}
-        GROUP BY s.Z_PK
-        ORDER BY msg_count DESC
-        LIMIT 5
-    """)
     d['group_leaderboard'] = []
-    for row in r:
+    for row in r['group_leaderboard']:
         chat_id, name, msg_count = row
         d['group_leaderboard'].append({
             'chat_id': chat_id,
@@ -428,7 +956,147 @@ def analyze(ts_start, ts_jun):
 
     return d
 
-def gen_html(d, contacts, path):
+# Contribution graph geometry: 10px cells on a 12px pitch, right of the day labels and below the month labels
+CONTRIB_X, CONTRIB_Y, CONTRIB_PITCH = 32, 20, 12
+CONTRIB_FILLS = ('rgba(255,255,255,0.12)', 'rgba(37,211,102,0.25)', 'rgba(37,211,102,0.45)', 'rgba(37,211,102,0.70)', '#25D366')
+
+def contrib_svg(daily_counts, first, last, max_count):
+    """GitHub-style calendar of daily_counts ('YYYY-MM-DD' -> n) from date first to date last, as one SVG.
+
+    Cells are placed and bucketed by level with date-ordinal arithmetic and carry inline fills so screenshots
+    keep them. The day counts ride along in a single data attribute for the page's delegated tooltip handler.
+    """
+    start = first.toordinal()
+    days = last.toordinal() - start + 1
+    lead = (first.weekday() + 1) % 7  # rows run Sunday -> Saturday
+    counts = [0] * days
+    for day, count in daily_counts.items():
+        i = date.fromisoformat(day).toordinal() - start
+        if 0 <= i < days: counts[i] = count
+    cells = ([], [], [], [], [])
+    for i, count in enumerate(counts):
+        if count == 0: level = 0
+        elif count <= max_count * 0.25: level = 1
+        elif count <= max_count * 0.5: level = 2
+        elif count <= max_count * 0.75: level = 3
+        else: level = 4
+        col, row = divmod(lead + i, 7)
+        cells[level].append(f'<rect x="{CONTRIB_X + col * CONTRIB_PITCH}" y="{CONTRIB_Y + row * CONTRIB_PITCH}" width="10" height="10" rx="2"/>')
+    labels = [f'<text x="{CONTRIB_X - 4}" y="{CONTRIB_Y + row * CONTRIB_PITCH + 8}" text-anchor="end" font-size="9">{name}</text>'
+              for row, name in enumerate(('Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'))]
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        month_start = date(year, month, 1)
+        col = (lead + max(month_start.toordinal() - start, 0)) // 7
+        labels.append(f'<text x="{CONTRIB_X + col * CONTRIB_PITCH}" y="12" font-size="10">{month_start.strftime("%b")}</text>')
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    width = CONTRIB_X + (lead + days + 6) // 7 * CONTRIB_PITCH - 2
+    height = CONTRIB_Y + 7 * CONTRIB_PITCH - 2
+    return (f'<svg class="contrib-svg" xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}" '
+            f'data-x="{CONTRIB_X}" data-y="{CONTRIB_Y}" data-pitch="{CONTRIB_PITCH}" data-start="{first.isoformat()}" data-lead="{lead}" data-counts="{",".join(map(str, counts))}">'
+            f'<g fill="#8892a0" font-family="Space Grotesk,sans-serif">{"".join(labels)}</g>'
+            + ''.join(f'<g fill="{fill}">{"".join(rects)}</g>' for fill, rects in zip(CONTRIB_FILLS, cells) if rects)
+            + '</svg>')
+
+OFFLINE = None  # None: load html2canvas and fonts from CDNs; else a directory ('' for none) of files to inline (--offline)
+
+CDN_ASSETS = '''<script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>
+<link rel="preconnect" href="https://fonts.googleapis.com">
+<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+<link href="https://fonts.googleapis.com/css2?family=Silkscreen&family=Azeret+Mono:wght@400;500;600;700&family=Space+Grotesk:wght@400;500;700&display=swap" rel="stylesheet">'''
+
+# Font families the stylesheet uses, and the file stem --offline looks for in its directory
+REPORT_FONTS = (('Silkscreen', 'Silkscreen'), ('Azeret Mono', 'AzeretMono'), ('Space Grotesk', 'SpaceGrotesk'))
+FONT_TYPES = {'.woff2': 'font/woff2', '.woff': 'font/woff', '.ttf': 'font/ttf', '.otf': 'font/otf'}
+
+# Stand-in for html2canvas when --offline has no vendored copy: clone the node with its computed styles
+# into an SVG foreignObject (with the page's @font-face rules) and draw that onto a canvas
+RASTERIZE_JS = r"""
+window.html2canvas = async (node, opts = {}) => {
+    const scale = opts.scale || 1;
+    const width = opts.width || node.offsetWidth, height = opts.height || node.offsetHeight;
+    const inline = (src, dst) => {
+        const cs = getComputedStyle(src);
+        dst.style.cssText = Array.from(cs, p => `${p}:${cs.getPropertyValue(p)}`).join(';');
+        for (let i = 0; i < src.children.length; i++) inline(src.children[i], dst.children[i]);
+    };
+    const clone = node.cloneNode(true);
+    inline(node, clone);
+    clone.style.transform = 'none';
+    const fonts = Array.from(document.querySelectorAll('style'), s => (s.textContent.match(/@font-face\s*{[^}]*}/g) || []).join('')).join('');
+    const svg = `<svg xmlns="http://www.w3.org/2000/svg" width="${width}" height="${height}"><style>${fonts}</style>`
+        + `<foreignObject width="100%" height="100%">${new XMLSerializer().serializeToString(clone)}</foreignObject></svg>`;
+    const img = new Image();
+    img.src = 'data:image/svg+xml;charset=utf-8,' + encodeURIComponent(svg);
+    await img.decode();
+    const canvas = document.createElement('canvas');
+    canvas.width = width * scale;
+    canvas.height = height * scale;
+    const ctx = canvas.getContext('2d');
+    if (opts.backgroundColor) {
+        ctx.fillStyle = opts.backgroundColor;
+        ctx.fillRect(0, 0, canvas.width, canvas.height);
+    }
+    ctx.scale(scale, scale);
+    ctx.drawImage(img, 0, 0);
+    return canvas;
+};
+"""
+
+def report_assets():
+    """<head> tags for html2canvas and the fonts: CDN links, or with --offline everything inlined so opening the report makes no requests."""
+    if OFFLINE is None:
+        return CDN_ASSETS
+    vendored = os.path.join(OFFLINE, 'html2canvas.min.js')
+    if OFFLINE and os.path.isfile(vendored):
+        with open(vendored, encoding='utf-8') as f:
+            script = f.read().replace('</script', '<\\/script')
+    else:
+        script = RASTERIZE_JS
+    faces = []
+    for family, stem in REPORT_FONTS:
+        # An installed copy wins, then a file from the --offline directory; with neither the stylesheet's generic family is used
+        src = [f"local('{family}')"]
+        for ext, mime in FONT_TYPES.items():
+            path = os.path.join(OFFLINE, stem + ext)
+            if OFFLINE and os.path.isfile(path):
+                with open(path, 'rb') as f:
+                    src.append(f"url(data:{mime};base64,{base64.b64encode(f.read()).decode()})")
+                break
+        faces.append(f"@font-face {{ font-family:'{family}'; src:{', '.join(src)}; font-weight:100 900; font-display:block; }}")
+    return f"<script>{script}</script>\n<style>\n{chr(10).join(faces)}\n</style>"
+
+class HtmlReport:
+    """Streams the report through a buffered temp file beside path, moved into place only once it is complete."""
+    def __init__(self, path, buffering=1 << 16):
+        self.path = path
+        self.slides = 0
+        fd, self.tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix='.' + os.path.basename(path), suffix='.tmp')
+        self.f = os.fdopen(fd, 'w', encoding='utf-8', buffering=buffering)
+
+    def write(self, html):
+        self.f.write(html)
+
+    def slide(self, html):
+        self.slides += 1
+        self.f.write(html)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *_):
+        self.f.close()
+        if exc_type is None:
+            os.chmod(self.tmp, 0o644)
+            os.replace(self.tmp, self.path)
+        else:
+            os.unlink(self.tmp)
+
+def delay_label(secs):
+    """A reply delay for a slide: 40s, 12m, 3.5h."""
+    return f"{secs}s" if secs < 60 else f"{secs // 60}m" if secs < 3600 else f"{secs / 3600:.1f}h"
+
+def write_report(out, d, contacts):
     s = d['stats']
     top = d['top']
     n = lambda h: get_name(h, contacts)
@@ -458,12 +1126,31 @@ def gen_html(d, contacts, path):
     now = dt.now()
     year_start = dt(now.year, 1, 1)
     days_elapsed = max(1, (now - year_start).days)
+    if d.get('range'):
+        # --since/--until: the range's own length, both ends included
+        days_elapsed = (date.fromisoformat(d['range'][1]) - date.fromisoformat(d['range'][0])).days + 1
     msgs_per_day = s[0] // days_elapsed
 
-    slides = []
+    favicon = "data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>🌯</text></svg>"
+    out.write(f'''<!DOCTYPE html>
+<html><head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width,initial-scale=1">
+<title>WhatsApp Wrapped 2025</title>
+<link rel="icon" href="{favicon}">
+{report_assets()}
+<style>
+''')
+    out.write(REPORT_CSS)
+    out.write('''
+</style>
+</head>
+<body>
+
+<div class="gallery" id="gallery">''')
 
     # Slide 1: Intro
-    slides.append('''
+    out.slide('''
     <div class="slide intro">
         <div class="slide-icon">💬</div>
         <h1>WHATSAPP<br>WRAPPED</h1>
@@ -472,7 +1159,7 @@ def gen_html(d, contacts, path):
     </div>''')
 
     # Slide 2: Total messages
-    slides.append(f'''
+    out.slide(f'''
     <div class="slide">
         <div class="slide-label">// TOTAL DAMAGE</div>
         <div class="big-number green">{s[0]:,}</div>
@@ -490,7 +1177,7 @@ def gen_html(d, contacts, path):
     words = d['words']
     words_display = f"{words // 1000:,}K" if words >= 1000 else f"{words:,}"
     pages = max(1, words // 250)
-    slides.append(f'''
+    out.slide(f'''
     <div class="slide">
         <div class="slide-label">// WORD COUNT</div>
         <div class="big-number cyan">{words_display}</div>
@@ -500,113 +1187,44 @@ def gen_html(d, contacts, path):
         <div class="slide-watermark">wrap2025.com</div>
     </div>''')
 
+    top_words = d.get('top_words') or []
+    if len(top_words) >= 3:
+        # Rank only: the counts are Misra–Gries lower bounds (see merge_heavy_hitters), not exact totals
+        words_html = ''.join([f'<div class="rank-item"><span class="rank-num">{i}</span><span class="rank-name">{w}</span></div>' for i,(w,_) in enumerate(top_words[:5],1)])
+        phrase = (d.get('top_phrases') or [None])[0]
+        out.slide(f'''
+    <div class="slide">
+        <div class="slide-label">// YOUR VOCABULARY</div>
+        <div class="slide-text">words you can't stop typing</div>
+        <div class="rank-list">{words_html}</div>
+        {f'<div class="roast">catchphrase: "{phrase[0]}"</div>' if phrase else ''}
+        <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_vocabulary.png', this)">📸 Save</button>
+        <div class="slide-watermark">wrap2025.com</div>
+    </div>''')
+
     # Slide 4: Contribution Graph (GitHub-style activity heatmap) - Year overview
     if d['daily_counts']:
-        from datetime import datetime as dt, date as ddate, timedelta
+        from datetime import datetime as dt, date as ddate
         today = dt.now().date()
         year = int(d.get('year', today.year))
         year_start = ddate(year, 1, 1)
         # Show up to today for the current year, else finish on Dec 31 of that year
         year_end = today if year == today.year else ddate(year, 12, 31)
+        if d.get('range'):
+            year_start, year_end = map(ddate.fromisoformat, d['range'])
 
-        # Build the calendar grid (weeks x 7 days, GitHub style Sunday→Saturday)
-        cal_cells = []
-
-        # Find the Sunday on or before Jan 1
-        first_day = year_start - timedelta(days=(year_start.weekday() + 1) % 7)
-        # Find the Saturday of the last week that contains year_end
-        last_day = year_end + timedelta(days=(5 - year_end.weekday()) % 7)
-
-        current_date = first_day
         max_count = max(d['daily_counts'].values()) if d['daily_counts'] else 1
 
-        # Month labels - track when months start
-        month_labels = []
-        last_month = None
-
-        week_idx = 0
-        while current_date <= last_day:
-            week_cells = []
-            for _ in range(7):  # Sun to Sat
-                date_str = current_date.strftime('%Y-%m-%d')
-                count = d['daily_counts'].get(date_str, 0)
-
-                # Track month changes for labels
-                if (year_start <= current_date <= year_end) and current_date.month != last_month:
-                    month_labels.append((week_idx, current_date.strftime('%b')))
-                    last_month = current_date.month
-
-                # Determine intensity level (0-4 like GitHub)
-                if count == 0:
-                    level = 0
-                elif count <= max_count * 0.25:
-                    level = 1
-                elif count <= max_count * 0.5:
-                    level = 2
-                elif count <= max_count * 0.75:
-                    level = 3
-                else:
-                    level = 4
-
-                # Only show cells for the target year
-                in_year = year_start <= current_date <= year_end
-                week_cells.append((date_str, count, level, in_year))
-                current_date += timedelta(days=1)
-
-            cal_cells.append(week_cells)
-            week_idx += 1
-            if week_idx > 60:  # Safety limit
-                break
-
-        # Build the HTML grid with proper structure
-        contrib_html = '<div class="contrib-graph">'
-        contrib_html += '<div class="contrib-container">'
-
-        # Y-axis: Day labels
-        contrib_html += '<div class="contrib-days"><span>Sun</span><span>Mon</span><span>Tue</span><span>Wed</span><span>Thu</span><span>Fri</span><span>Sat</span></div>'
-
-        contrib_html += '<div class="contrib-main">'
-
-        # X-axis: Month labels - position based on week index, each week is 12px (10px cell + 2px gap)
-        contrib_html += '<div class="contrib-months">'
-        for week_num, month_name in month_labels:
-            # Position each month label at the start of its first week
-            left_px = week_num * 12  # 10px cell + 2px gap
-            contrib_html += f'<span style="position:absolute;left:{left_px}px">{month_name}</span>'
-        contrib_html += '</div>'
-
-        # Grid of cells
-        contrib_html += '<div class="contrib-grid">'
-        for week in cal_cells:
-            contrib_html += '<div class="contrib-week">'
-            for date_str, count, level, in_year in week:
-                if in_year:
-                    # Format date nicely for tooltip (e.g., "Dec 7, 2025")
-                    from datetime import datetime as dt_parse
-                    try:
-                        date_obj = dt_parse.strptime(date_str, '%Y-%m-%d')
-                        formatted_date = date_obj.strftime('%b %d, %Y')
-                    except:
-                        formatted_date = date_str
-                    msg_text = "message" if count == 1 else "messages"
-                    contrib_html += f'<div class="contrib-cell level-{level}" data-date="{formatted_date}" data-count="{count}" data-msg-text="{msg_text}"></div>'
-                else:
-                    contrib_html += '<div class="contrib-cell empty"></div>'
-            contrib_html += '</div>'
-        contrib_html += '</div>'
-
-        contrib_html += '</div>'  # close contrib-main
-        contrib_html += '</div>'  # close contrib-container
-
-        # Legend
-        contrib_html += '<div class="contrib-legend"><span>Less</span><div class="contrib-cell level-0"></div><div class="contrib-cell level-1"></div><div class="contrib-cell level-2"></div><div class="contrib-cell level-3"></div><div class="contrib-cell level-4"></div><span>More</span></div>'
-        contrib_html += '</div>'
-
-        slides.append(f'''
+        out.slide('''
         <div class="slide contrib-slide">
             <div class="slide-label">// MESSAGE ACTIVITY</div>
             <div class="slide-text">your texting throughout the year</div>
-            {contrib_html}
+            ''')
+        out.write('<div class="contrib-graph">')
+        out.write(contrib_svg(d['daily_counts'], year_start, year_end, max_count))
+        out.write('<div class="contrib-legend"><span>Less</span><div class="contrib-cell level-0"></div><div class="contrib-cell level-1"></div><div class="contrib-cell level-2"></div><div class="contrib-cell level-3"></div><div class="contrib-cell level-4"></div><span>More</span></div>')
+        out.write('</div>')
+        out.write(f'''
             <div class="contrib-stats">
                 <div class="contrib-stat"><span class="contrib-stat-num">{d['avg_daily']}</span><span class="contrib-stat-lbl">avg/day</span></div>
                 <div class="contrib-stat"><span class="contrib-stat-num">{d['busiest_month']}</span><span class="contrib-stat-lbl">busiest month</span></div>
@@ -618,7 +1236,7 @@ def gen_html(d, contacts, path):
 
     # Slide 5: Your #1
     if top:
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide whatsapp-bg">
             <div class="slide-label">// YOUR #1</div>
             <div class="slide-text">most texted person</div>
@@ -631,7 +1249,7 @@ def gen_html(d, contacts, path):
 
         # Slide 5: Top 5
         top5_html = ''.join([f'<div class="rank-item"><span class="rank-num">{i}</span><span class="rank-name">{n(h)}</span><span class="rank-count">{t:,}</span></div>' for i,(h,t,_,_) in enumerate(top[:5],1)])
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide">
             <div class="slide-label">// INNER CIRCLE</div>
             <div class="slide-text">your top 5</div>
@@ -647,7 +1265,7 @@ def gen_html(d, contacts, path):
         lurker_label = "LURKER" if lurker_pct > 60 else "CONTRIBUTOR" if lurker_pct < 40 else "BALANCED"
         lurker_class = "yellow" if lurker_pct > 60 else "green" if lurker_pct < 40 else "cyan"
 
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide">
             <div class="slide-label">// GROUP CHATS</div>
             <div class="slide-icon">👥</div>
@@ -668,7 +1286,7 @@ def gen_html(d, contacts, path):
                 f'<div class="rank-item"><span class="rank-num">{i}</span><span class="rank-name">{gc["name"]}</span><span class="rank-count">{gc["msg_count"]:,}</span></div>'
                 for i, gc in enumerate(d['group_leaderboard'][:5], 1)
             ])
-            slides.append(f'''
+            out.slide(f'''
             <div class="slide orange-bg">
                 <div class="slide-label">// TOP GROUP CHATS</div>
                 <div class="slide-text">your most active groups</div>
@@ -678,7 +1296,7 @@ def gen_html(d, contacts, path):
             </div>''')
 
     # Personality slide
-    slides.append(f'''
+    out.slide(f'''
     <div class="slide purple-bg">
         <div class="slide-label">// DIAGNOSIS</div>
         <div class="slide-text">texting personality</div>
@@ -691,7 +1309,7 @@ def gen_html(d, contacts, path):
     # Who texts first
     starter_label = "YOU START" if d['starter_pct'] > 50 else "THEY START"
     starter_class = "green" if d['starter_pct'] > 50 else "yellow"
-    slides.append(f'''
+    out.slide(f'''
     <div class="slide">
         <div class="slide-label">// WHO TEXTS FIRST</div>
         <div class="slide-text">conversation initiator</div>
@@ -702,22 +1320,54 @@ def gen_html(d, contacts, path):
         <div class="slide-watermark">wrap2025.com</div>
     </div>''')
 
+    sessions = d.get('sessions')
+    if sessions:
+        longest = sessions['longest']
+        with_whom = f" with {n(longest['contact'])}" if longest['contact'] else ''
+        double_class = 'red' if sessions['double_text_pct'] > 30 else 'cyan'
+        out.slide(f'''
+    <div class="slide">
+        <div class="slide-label">// CONVERSATIONS</div>
+        <div class="slide-text">{sessions['count']:,} conversations, each about</div>
+        <div class="big-number cyan">{sessions['avg_minutes']}</div>
+        <div class="slide-text">minutes · {sessions['avg_messages']} messages</div>
+        <div class="badge {double_class}">DOUBLE-TEXTED IN {sessions['double_text_pct']}%</div>
+        <div class="roast">longest: {longest['messages']:,} messages{with_whom} on {longest['date']}</div>
+        <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_conversations.png', this)">📸 Save</button>
+        <div class="slide-watermark">wrap2025.com</div>
+    </div>''')
+
     # Response time
     resp_class = 'green' if d['resp'] < 10 else 'yellow' if d['resp'] < 60 else 'red'
     resp_label = "INSTANT" if d['resp'] < 10 else "NORMAL" if d['resp'] < 60 else "SLOW"
-    slides.append(f'''
+    out.slide(f'''
     <div class="slide">
         <div class="slide-label">// RESPONSE TIME</div>
         <div class="slide-text">avg reply</div>
         <div class="big-number {resp_class}">{d['resp']}</div>
         <div class="slide-text">minutes</div>
         <div class="badge {resp_class}">{resp_label}</div>
+        {f'<div class="roast" style="margin-top:16px;">median {delay_label(d["resp_median"])} · 90% within {delay_label(d["resp_p90"])}</div>' if d.get('resp_median') is not None else ''}
         <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_response_time.png', this)">📸 Save</button>
         <div class="slide-watermark">wrap2025.com</div>
     </div>''')
 
+    # Your most-answered people, fastest median reply first
+    speed = sorted((d.get('resp_contacts') or [])[:5], key=lambda x: (x[2], x[0]))
+    if len(speed) >= 3:
+        speed_html = ''.join([f'<div class="rank-item"><span class="rank-num">{i}</span><span class="rank-name">{n(h)}</span><span class="rank-count">{delay_label(med)}</span></div>' for i,(h,_,med,_) in enumerate(speed,1)])
+        out.slide(f'''
+        <div class="slide">
+            <div class="slide-label">// REPLY SPEED</div>
+            <div class="slide-text">who gets answered first</div>
+            <div class="rank-list">{speed_html}</div>
+            <div class="roast" style="margin-top:16px;">median reply to your 5 most-answered</div>
+            <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_reply_speed.png', this)">📸 Save</button>
+            <div class="slide-watermark">wrap2025.com</div>
+        </div>''')
+
     # Peak hours
-    slides.append(f'''
+    out.slide(f'''
     <div class="slide">
         <div class="slide-label">// PEAK HOURS</div>
         <div class="slide-text">most active</div>
@@ -730,7 +1380,7 @@ def gen_html(d, contacts, path):
     # 3AM Bestie
     if d['late']:
         ln = d['late'][0]
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide">
             <div class="slide-label">// 3AM BESTIE</div>
             <div class="slide-icon">🌙</div>
@@ -743,7 +1393,7 @@ def gen_html(d, contacts, path):
 
     # Busiest Day
     if d['busiest_day']:
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide">
             <div class="slide-label">// BUSIEST DAY</div>
             <div class="slide-text">your most unhinged day</div>
@@ -758,7 +1408,7 @@ def gen_html(d, contacts, path):
     if d['fan']:
         f = d['fan'][0]
         ratio = round(f[1]/(f[2]+1), 1)
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide">
             <div class="slide-label">// BIGGEST FAN</div>
             <div class="slide-text">texts you most</div>
@@ -772,7 +1422,7 @@ def gen_html(d, contacts, path):
     if d['simp']:
         si = d['simp'][0]
         ratio = round(si[1]/(si[2]+1), 1)
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide red-bg">
             <div class="slide-label">// DOWN BAD</div>
             <div class="slide-text">you simp for</div>
@@ -782,13 +1432,18 @@ def gen_html(d, contacts, path):
             <div class="slide-watermark">wrap2025.com</div>
         </div>''')
 
+    # A --since/--until range is split at d['split'], the fixed year at June 1
+    split = date.fromisoformat(d['split']) if d.get('split') else None
+    heat_since = f"since {split:%b} {split.day}" if split else "in H2"
+    ghost_before = f"before {split:%b} {split.day}" if split else "before June"
+
     # Heating Up
     if d['heating']:
         heat_html = ''.join([f'<div class="rank-item"><span class="rank-num">🔥</span><span class="rank-name">{n(h)}</span><span class="rank-count green">+{h2-h1}</span></div>' for h,h1,h2 in d['heating'][:5]])
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide orange-bg">
             <div class="slide-label">// HEATING UP</div>
-            <div class="slide-text">getting stronger in H2</div>
+            <div class="slide-text">getting stronger {heat_since}</div>
             <div class="rank-list">{heat_html}</div>
             <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_heating_up.png', this)">📸 Save</button>
             <div class="slide-watermark">wrap2025.com</div>
@@ -797,12 +1452,12 @@ def gen_html(d, contacts, path):
     # Ghosted
     if d['ghosted']:
         ghost_html = ''.join([f'<div class="rank-item"><span class="rank-num">👻</span><span class="rank-name">{n(h)}</span><span class="rank-count"><span class="green">{b}</span> → <span class="red">{a}</span></span></div>' for h,b,a in d['ghosted'][:5]])
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide">
             <div class="slide-label">// GHOSTED</div>
             <div class="slide-text">they chose peace</div>
             <div class="rank-list">{ghost_html}</div>
-            <div class="roast" style="margin-top:16px;">before June → after</div>
+            <div class="roast" style="margin-top:16px;">{ghost_before} → after</div>
             <button class="slide-save-btn" onclick="saveSlide(this.parentElement, 'wrapped_ghosted.png', this)">📸 Save</button>
             <div class="slide-watermark">wrap2025.com</div>
         </div>''')
@@ -810,7 +1465,7 @@ def gen_html(d, contacts, path):
     # Emojis
     if d['emoji'] and any(e[1] > 0 for e in d['emoji']):
         emo = '  '.join([e[0] for e in d['emoji'] if e[1] > 0])
-        slides.append(f'''
+        out.slide(f'''
         <div class="slide">
             <div class="slide-label">// EMOJIS</div>
             <div class="slide-text">your emotional range</div>
@@ -821,7 +1476,7 @@ def gen_html(d, contacts, path):
 
     # Final slide: Summary
     top3_names = ', '.join([n(h) for h,_,_,_ in top[:3]]) if top else "No contacts"
-    slides.append(f'''
+    out.slide(f'''
     <div class="slide summary-slide">
         <div class="summary-card" id="summaryCard">
             <div class="summary-header">
@@ -867,27 +1522,112 @@ def gen_html(d, contacts, path):
             <span class="btn-icon">📸</span>
             <span>Save Screenshot</span>
         </button>
+        <button class="screenshot-btn export-btn" onclick="exportAll(this)">
+            <span class="btn-icon">📦</span>
+            <span>Export All Slides</span>
+        </button>
         <div class="share-hint">share your damage</div>
     </div>''')
 
-    slides_html = ''.join(slides)
-    num_slides = len(slides)
+    out.write(f'''</div>
+<div class="progress" id="progress"></div>
+<div class="nav prev" id="prev">‹</div>
+<div class="nav next" id="next">›</div>
 
-    favicon = "data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>🌯</text></svg>"
+<script>
+const gallery = document.getElementById('gallery');
+const progressEl = document.getElementById('progress');
+const prevBtn = document.getElementById('prev');
+const nextBtn = document.getElementById('next');
+const total = {out.slides};
+''')
+    out.write(REPORT_JS)
+    out.write('''</script>
+</body></html>''')
 
-    html = f'''<!DOCTYPE html>
-<html><head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width,initial-scale=1">
-<title>WhatsApp Wrapped 2025</title>
-<link rel="icon" href="{favicon}">
-<script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>
-<link rel="preconnect" href="https://fonts.googleapis.com">
-<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-<link href="https://fonts.googleapis.com/css2?family=Silkscreen&family=Azeret+Mono:wght@400;500;600;700&family=Space+Grotesk:wght@400;500;700&display=swap" rel="stylesheet">
-<style>
+def gen_html(d, contacts, path):
+    with HtmlReport(path) as out:
+        write_report(out, d, contacts)
+    return path
+
+EXPORT_FORMAT = 'wrap2025-stats'
+EXPORT_VERSION = 1
+# Sections with a row per contact, group or day; NDJSON gives each row its own record
+EXPORT_ROWS = ('top', 'late', 'ghosted', 'heating', 'fan', 'simp', 'resp_contacts', 'top_words', 'top_phrases', 'group_leaderboard', 'daily_counts', 'top_days')
+
+def export_stats(d, contacts, path, ndjson=False):
+    """Write every metric in d, with the names its handles resolve to, as versioned JSON or NDJSON.
 
-:root {{
+    The file carries everything write_report() reads, so --from-json can render it without the database.
+    """
+    handles = [row[0] for k in ('top', 'late', 'ghosted', 'heating', 'fan', 'simp', 'resp_contacts') for row in d.get(k) or ()]
+    handles += [d['sessions']['longest']['contact']] if d.get('sessions') else []
+    names = {h: get_name(h, contacts) for h in handles if h is not None}
+    header = {'format': EXPORT_FORMAT, 'version': EXPORT_VERSION, 'source': 'whatsapp', 'generated': datetime.now().isoformat(timespec='seconds')}
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            if not ndjson:
+                json.dump({**header, 'names': names, 'data': d}, f, ensure_ascii=False)
+            else:
+                line = lambda record: f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                line({'kind': 'header', **header})
+                for h, name in names.items():
+                    line({'kind': 'name', 'handle': h, 'name': name})
+                for key, value in d.items():
+                    if key not in EXPORT_ROWS:
+                        line({'kind': 'metric', 'key': key, 'value': value})
+                    elif isinstance(value, dict):
+                        line({'kind': 'metric', 'key': key, 'value': {}})
+                        for name, v in value.items():
+                            line({'kind': 'row', 'key': key, 'name': name, 'value': v})
+                    else:
+                        line({'kind': 'metric', 'key': key, 'value': []})
+                        for row in value:
+                            line({'kind': 'row', 'key': key, 'value': row})
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return path
+
+def load_stats(path, source='whatsapp'):
+    """Read an export_stats() file of either layout back into (header, names, d)."""
+    with open(path, encoding='utf-8') as f:
+        try:
+            first = json.loads(f.readline())
+        except ValueError:
+            first = None
+        if isinstance(first, dict) and first.get('kind') == 'header':
+            header, names, d = first, {}, {}
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record['kind'] == 'name':
+                    names[record['handle']] = record['name']
+                elif record['kind'] == 'metric':
+                    d[record['key']] = record['value']
+                elif 'name' in record:
+                    d[record['key']][record['name']] = record['value']
+                else:
+                    d[record['key']].append(record['value'])
+        else:
+            if not isinstance(first, dict):
+                # Not a one-line document (indented by hand or another tool), so parse the whole file
+                f.seek(0)
+                first = json.load(f)
+            header = first
+            names, d = header.pop('names', {}), header.pop('data', {})
+    if header.get('format') != EXPORT_FORMAT or header.get('source') != source:
+        raise ValueError(f"not a {source} stats export")
+    if header.get('version', 0) > EXPORT_VERSION:
+        raise ValueError(f"written by a newer version (format {header['version']}, this script reads {EXPORT_VERSION})")
+    return header, names, d
+
+# Stylesheet and script shared by every report, kept out of the per-run formatting
+REPORT_CSS = '''
+:root {
     --bg: #0a0a12;
     --text: #f0f0f0;
     --muted: #8892a0;
@@ -902,19 +1642,19 @@ def gen_html(d, contacts, path):
     --font-pixel: 'Silkscreen', cursive;
     --font-mono: 'Azeret Mono', monospace;
     --font-body: 'Space Grotesk', sans-serif;
-}}
+}
 
-* {{ margin:0; padding:0; box-sizing:border-box; -webkit-tap-highlight-color:transparent; }}
-html, body {{ height:100%; overflow:hidden; }}
-body {{ font-family:'Space Grotesk',sans-serif; background:var(--bg); color:var(--text); }}
+* { margin:0; padding:0; box-sizing:border-box; -webkit-tap-highlight-color:transparent; }
+html, body { height:100%; overflow:hidden; }
+body { font-family:'Space Grotesk',sans-serif; background:var(--bg); color:var(--text); }
 
-.gallery {{
+.gallery {
     display:flex;
     height:100%;
     transition:transform 0.4s cubic-bezier(0.4,0,0.2,1);
-}}
+}
 
-.slide {{
+.slide {
     position:relative;
     min-width:100vw;
     height:100vh;
@@ -925,89 +1665,81 @@ body {{ font-family:'Space Grotesk',sans-serif; background:var(--bg); color:var(
     padding:40px 32px 80px;
     text-align:center;
     background:var(--bg);
-}}
+}
 
-.slide.intro {{ background:linear-gradient(145deg,#12121f 0%,#0d1f0f 50%,#0f2847 100%); }}
-.slide.whatsapp-bg {{ background:linear-gradient(145deg,#12121f 0%,#0d2f1a 100%); }}
-.slide.purple-bg {{ background:linear-gradient(145deg,#12121f 0%,#1f1a3d 100%); }}
-.slide.orange-bg {{ background:linear-gradient(145deg,#12121f 0%,#2d1f1a 100%); }}
-.slide.red-bg {{ background:linear-gradient(145deg,#12121f 0%,#2d1a1a 100%); }}
-.slide.summary-slide {{ background:linear-gradient(145deg,#0d1f0f 0%,#12121f 50%,#1a1a2e 100%); }}
-.slide.contrib-slide {{ background:linear-gradient(145deg,#12121f 0%,#0d1f1a 100%); padding:24px 16px 80px; }}
+.slide.intro { background:linear-gradient(145deg,#12121f 0%,#0d1f0f 50%,#0f2847 100%); }
+.slide.whatsapp-bg { background:linear-gradient(145deg,#12121f 0%,#0d2f1a 100%); }
+.slide.purple-bg { background:linear-gradient(145deg,#12121f 0%,#1f1a3d 100%); }
+.slide.orange-bg { background:linear-gradient(145deg,#12121f 0%,#2d1f1a 100%); }
+.slide.red-bg { background:linear-gradient(145deg,#12121f 0%,#2d1a1a 100%); }
+.slide.summary-slide { background:linear-gradient(145deg,#0d1f0f 0%,#12121f 50%,#1a1a2e 100%); }
+.slide.contrib-slide { background:linear-gradient(145deg,#12121f 0%,#0d1f1a 100%); padding:24px 16px 80px; }
 
 /* === CONTRIBUTION GRAPH STYLES === */
-.contrib-graph {{ display:flex; flex-direction:column; align-items:center; margin:20px auto; padding:0 8px; }}
-.contrib-container {{ display:flex; gap:4px; }}
-.contrib-days {{ display:flex; flex-direction:column; gap:2px; font-size:9px; color:var(--muted); padding-top:20px; min-width:28px; text-align:right; padding-right:4px; }}
-.contrib-days span {{ height:10px; line-height:10px; }}
-.contrib-main {{ display:flex; flex-direction:column; }}
-.contrib-months {{ position:relative; height:16px; margin-bottom:4px; font-size:10px; color:var(--muted); }}
-.contrib-months span {{ position:absolute; white-space:nowrap; }}
-.contrib-grid {{ display:flex; gap:2px; }}
-.contrib-week {{ display:flex; flex-direction:column; gap:2px; }}
-.contrib-cell {{ width:10px; height:10px; border-radius:2px; background:rgba(255,255,255,0.05); }}
-.contrib-cell.empty {{ background:transparent; }}
-.contrib-cell.level-0 {{ background:rgba(255,255,255,0.12); }}
-.contrib-cell.level-1 {{ background:rgba(37,211,102,0.25); }}
-.contrib-cell.level-2 {{ background:rgba(37,211,102,0.45); }}
-.contrib-cell.level-3 {{ background:rgba(37,211,102,0.70); }}
-.contrib-cell.level-4 {{ background:var(--whatsapp); }}
-.contrib-cell:not(.empty) {{ cursor:pointer; position:relative; }}
-.contrib-tooltip {{ position:fixed; background:rgba(20,20,30,0.95); color:var(--text); padding:8px 12px; border-radius:6px; font-size:12px; pointer-events:none; z-index:1000; white-space:nowrap; border:1px solid rgba(255,255,255,0.1); box-shadow:0 4px 12px rgba(0,0,0,0.3); }}
-.contrib-tooltip .tooltip-count {{ font-family:var(--font-mono); color:var(--whatsapp); font-weight:600; }}
-.contrib-tooltip .tooltip-date {{ color:var(--muted); font-size:11px; margin-top:2px; }}
-.contrib-legend {{ display:flex; align-items:center; justify-content:center; gap:4px; margin-top:12px; font-size:10px; color:var(--muted); }}
-.contrib-legend .contrib-cell {{ cursor:default; }}
-.contrib-stats {{ display:flex; gap:32px; margin-top:24px; justify-content:center; }}
-.contrib-stat {{ display:flex; flex-direction:column; align-items:center; }}
-.contrib-stat-num {{ font-family:var(--font-mono); font-size:28px; font-weight:600; color:var(--whatsapp); }}
-.contrib-stat-lbl {{ font-size:11px; color:var(--muted); margin-top:4px; text-transform:uppercase; letter-spacing:0.5px; }}
-
-.slide h1 {{ font-family:var(--font-pixel); font-size:36px; font-weight:400; line-height:1.2; margin:20px 0; }}
-.slide-label {{ font-family:var(--font-pixel); font-size:12px; font-weight:400; color:var(--whatsapp); letter-spacing:0.5px; margin-bottom:16px; }}
-.slide-icon {{ font-size:80px; margin-bottom:16px; }}
-.slide-text {{ font-size:18px; color:var(--muted); margin:8px 0; }}
-.subtitle {{ font-size:18px; color:var(--muted); margin-top:8px; }}
-
-.big-number {{ font-family:var(--font-mono); font-size:80px; font-weight:500; line-height:1; letter-spacing:-2px; }}
-.pct {{ font-family:var(--font-body); font-size:48px; }}
-.huge-name {{ font-family:var(--font-body); font-size:32px; font-weight:600; line-height:1.25; word-break:break-word; max-width:90%; margin:16px 0; }}
-.personality-type {{ font-family:var(--font-pixel); font-size:18px; font-weight:400; line-height:1.25; color:var(--purple); margin:24px 0; text-transform:uppercase; letter-spacing:0.5px; }}
-.roast {{ font-style:italic; color:var(--muted); font-size:18px; margin-top:16px; max-width:400px; }}
-
-.green {{ color:var(--green); }}
-.yellow {{ color:var(--yellow); }}
-.red {{ color:var(--red); }}
-.cyan {{ color:var(--cyan); }}
-.pink {{ color:var(--pink); }}
-.orange {{ color:var(--orange); }}
-.purple {{ color:var(--purple); }}
-
-.stat-grid {{ display:flex; gap:40px; margin-top:28px; }}
-.stat-item {{ display:flex; flex-direction:column; align-items:center; }}
-.stat-num {{ font-family:var(--font-mono); font-size:24px; font-weight:600; color:var(--cyan); }}
-.stat-lbl {{ font-size:11px; color:var(--muted); margin-top:6px; text-transform:uppercase; letter-spacing:0.5px; }}
-
-.rank-list {{ width:100%; max-width:420px; margin-top:20px; padding:0 16px 16px; }}
-.rank-item {{ display:flex; align-items:center; padding:14px 0; border-bottom:1px solid rgba(255,255,255,0.1); gap:16px; }}
-.rank-item:last-child {{ border-bottom:none; }}
-.rank-item:first-child {{ background:linear-gradient(90deg, rgba(37,211,102,0.15) 0%, transparent 100%); padding:14px 12px; margin:0 -12px; border-radius:8px; border-bottom:none; }}
-.rank-item:first-child .rank-name {{ font-weight:600; color:var(--whatsapp); }}
-.rank-item:first-child .rank-count {{ font-size:20px; }}
-.rank-num {{ font-family:var(--font-mono); font-size:20px; font-weight:600; color:var(--whatsapp); width:36px; text-align:center; }}
-.rank-name {{ flex:1; font-size:16px; text-align:left; white-space:nowrap; overflow:hidden; text-overflow:ellipsis; }}
-.rank-count {{ font-family:var(--font-mono); font-size:18px; font-weight:600; color:var(--yellow); }}
-
-.badge {{ display:inline-block; padding:8px 18px; border-radius:24px; font-family:var(--font-pixel); font-size:9px; font-weight:400; text-transform:uppercase; letter-spacing:0.3px; margin-top:20px; border:2px solid; }}
-.badge.green {{ border-color:var(--green); color:var(--green); background:rgba(37,211,102,0.1); }}
-.badge.yellow {{ border-color:var(--yellow); color:var(--yellow); background:rgba(251,191,36,0.1); }}
-.badge.red {{ border-color:var(--red); color:var(--red); background:rgba(248,113,113,0.1); }}
-.badge.cyan {{ border-color:var(--cyan); color:var(--cyan); background:rgba(34,211,238,0.1); }}
-
-.emoji-row {{ font-size:64px; letter-spacing:20px; margin:28px 0; }}
-
-.tap-hint {{ position:absolute; bottom:60px; font-size:16px; color:var(--muted); animation:pulse 2s infinite; }}
-@keyframes pulse {{ 0%,100%{{opacity:0.4}} 50%{{opacity:1}} }}
+.contrib-graph { display:flex; flex-direction:column; align-items:center; margin:20px auto; padding:0 8px; }
+.contrib-svg { display:block; max-width:100%; height:auto; }
+.contrib-svg rect { cursor:pointer; }
+.contrib-cell { width:10px; height:10px; border-radius:2px; background:rgba(255,255,255,0.05); }
+.contrib-cell.level-0 { background:rgba(255,255,255,0.12); }
+.contrib-cell.level-1 { background:rgba(37,211,102,0.25); }
+.contrib-cell.level-2 { background:rgba(37,211,102,0.45); }
+.contrib-cell.level-3 { background:rgba(37,211,102,0.70); }
+.contrib-cell.level-4 { background:var(--whatsapp); }
+.contrib-tooltip { position:fixed; background:rgba(20,20,30,0.95); color:var(--text); padding:8px 12px; border-radius:6px; font-size:12px; pointer-events:none; z-index:1000; white-space:nowrap; border:1px solid rgba(255,255,255,0.1); box-shadow:0 4px 12px rgba(0,0,0,0.3); }
+.contrib-tooltip .tooltip-count { font-family:var(--font-mono); color:var(--whatsapp); font-weight:600; }
+.contrib-tooltip .tooltip-date { color:var(--muted); font-size:11px; margin-top:2px; }
+.contrib-legend { display:flex; align-items:center; justify-content:center; gap:4px; margin-top:12px; font-size:10px; color:var(--muted); }
+.contrib-legend .contrib-cell { cursor:default; }
+.contrib-stats { display:flex; gap:32px; margin-top:24px; justify-content:center; }
+.contrib-stat { display:flex; flex-direction:column; align-items:center; }
+.contrib-stat-num { font-family:var(--font-mono); font-size:28px; font-weight:600; color:var(--whatsapp); }
+.contrib-stat-lbl { font-size:11px; color:var(--muted); margin-top:4px; text-transform:uppercase; letter-spacing:0.5px; }
+
+.slide h1 { font-family:var(--font-pixel); font-size:36px; font-weight:400; line-height:1.2; margin:20px 0; }
+.slide-label { font-family:var(--font-pixel); font-size:12px; font-weight:400; color:var(--whatsapp); letter-spacing:0.5px; margin-bottom:16px; }
+.slide-icon { font-size:80px; margin-bottom:16px; }
+.slide-text { font-size:18px; color:var(--muted); margin:8px 0; }
+.subtitle { font-size:18px; color:var(--muted); margin-top:8px; }
+
+.big-number { font-family:var(--font-mono); font-size:80px; font-weight:500; line-height:1; letter-spacing:-2px; }
+.pct { font-family:var(--font-body); font-size:48px; }
+.huge-name { font-family:var(--font-body); font-size:32px; font-weight:600; line-height:1.25; word-break:break-word; max-width:90%; margin:16px 0; }
+.personality-type { font-family:var(--font-pixel); font-size:18px; font-weight:400; line-height:1.25; color:var(--purple); margin:24px 0; text-transform:uppercase; letter-spacing:0.5px; }
+.roast { font-style:italic; color:var(--muted); font-size:18px; margin-top:16px; max-width:400px; }
+
+.green { color:var(--green); }
+.yellow { color:var(--yellow); }
+.red { color:var(--red); }
+.cyan { color:var(--cyan); }
+.pink { color:var(--pink); }
+.orange { color:var(--orange); }
+.purple { color:var(--purple); }
+
+.stat-grid { display:flex; gap:40px; margin-top:28px; }
+.stat-item { display:flex; flex-direction:column; align-items:center; }
+.stat-num { font-family:var(--font-mono); font-size:24px; font-weight:600; color:var(--cyan); }
+.stat-lbl { font-size:11px; color:var(--muted); margin-top:6px; text-transform:uppercase; letter-spacing:0.5px; }
+
+.rank-list { width:100%; max-width:420px; margin-top:20px; padding:0 16px 16px; }
+.rank-item { display:flex; align-items:center; padding:14px 0; border-bottom:1px solid rgba(255,255,255,0.1); gap:16px; }
+.rank-item:last-child { border-bottom:none; }
+.rank-item:first-child { background:linear-gradient(90deg, rgba(37,211,102,0.15) 0%, transparent 100%); padding:14px 12px; margin:0 -12px; border-radius:8px; border-bottom:none; }
+.rank-item:first-child .rank-name { font-weight:600; color:var(--whatsapp); }
+.rank-item:first-child .rank-count { font-size:20px; }
+.rank-num { font-family:var(--font-mono); font-size:20px; font-weight:600; color:var(--whatsapp); width:36px; text-align:center; }
+.rank-name { flex:1; font-size:16px; text-align:left; white-space:nowrap; overflow:hidden; text-overflow:ellipsis; }
+.rank-count { font-family:var(--font-mono); font-size:18px; font-weight:600; color:var(--yellow); }
+
+.badge { display:inline-block; padding:8px 18px; border-radius:24px; font-family:var(--font-pixel); font-size:9px; font-weight:400; text-transform:uppercase; letter-spacing:0.3px; margin-top:20px; border:2px solid; }
+.badge.green { border-color:var(--green); color:var(--green); background:rgba(37,211,102,0.1); }
+.badge.yellow { border-color:var(--yellow); color:var(--yellow); background:rgba(251,191,36,0.1); }
+.badge.red { border-color:var(--red); color:var(--red); background:rgba(248,113,113,0.1); }
+.badge.cyan { border-color:var(--cyan); color:var(--cyan); background:rgba(34,211,238,0.1); }
+
+.emoji-row { font-size:64px; letter-spacing:20px; margin:28px 0; }
+
+.tap-hint { position:absolute; bottom:60px; font-size:16px; color:var(--muted); animation:pulse 2s infinite; }
+@keyframes pulse { 0%,100%{opacity:0.4} 50%{opacity:1} }
 
 /* === SLIDE ANIMATIONS === */
 /* Elements start hidden, animate when slide is active */
@@ -1026,268 +1758,268 @@ body {{ font-family:'Space Grotesk',sans-serif; background:var(--bg); color:var(
 .slide .subtitle,
 .slide .summary-card,
 .slide .contrib-graph,
-.slide .contrib-stats {{
+.slide .contrib-stats {
     opacity: 0;
     transform: translateY(20px);
-}}
+}
 
 /* Gallery transition */
-.gallery {{ transition: transform 0.55s cubic-bezier(0.22, 1, 0.36, 1); }}
+.gallery { transition: transform 0.55s cubic-bezier(0.22, 1, 0.36, 1); }
 
 /* === DEFAULT ANIMATIONS - Varied motion styles === */
-.slide.active .slide-label {{ animation: labelSlide 0.4s ease-out forwards; }}
-.slide.active .slide-text {{ animation: textFade 0.4s ease-out 0.1s forwards; }}
-.slide.active .slide-icon {{ animation: iconPop 0.5s cubic-bezier(0.34, 1.56, 0.64, 1) 0.05s forwards; }}
-.slide.active h1 {{ animation: titleReveal 0.5s ease-out 0.12s forwards; }}
-.slide.active .subtitle {{ animation: textFade 0.4s ease-out 0.25s forwards; }}
-.slide.active .big-number {{ animation: numberFlip 0.6s ease-out 0.18s forwards; }}
-.slide.active .huge-name {{ animation: nameBlur 0.5s ease-out 0.2s forwards; }}
-.slide.active .personality-type {{ animation: glitchReveal 0.8s ease-out 0.15s forwards; }}
-.slide.active .roast {{ animation: roastType 0.6s ease-out 0.4s forwards; }}
-.slide.active .badge {{ animation: badgeStamp 0.4s ease-out 0.5s forwards; }}
-.slide.active .stat-grid {{ animation: none; opacity: 1; transform: none; }}
-.slide.active .stat-item {{ animation: statFade 0.35s ease-out forwards; }}
-.slide.active .stat-item:nth-child(1) {{ animation-delay: 0.3s; }}
-.slide.active .stat-item:nth-child(2) {{ animation-delay: 0.38s; }}
-.slide.active .stat-item:nth-child(3) {{ animation-delay: 0.46s; }}
-.slide.active .rank-list {{ animation: none; opacity: 1; transform: none; }}
-.slide.active .rank-item {{ animation: rankSlide 0.35s ease-out forwards; }}
-.slide.active .rank-item:first-child {{ animation: topRankDrop 0.45s ease-out forwards; }}
-.slide.active .rank-item:nth-child(1) {{ animation-delay: 0.1s; }}
-.slide.active .rank-item:nth-child(2) {{ animation-delay: 0.18s; }}
-.slide.active .rank-item:nth-child(3) {{ animation-delay: 0.26s; }}
-.slide.active .rank-item:nth-child(4) {{ animation-delay: 0.34s; }}
-.slide.active .rank-item:nth-child(5) {{ animation-delay: 0.42s; }}
-.slide.active .emoji-row {{ animation: emojiSpread 0.6s ease-out 0.2s forwards; }}
-.slide.active .summary-card {{ animation: cardRise 0.6s ease-out 0.1s forwards; }}
-.slide.active .screenshot-btn {{ opacity: 0; animation: buttonSlide 0.4s ease-out 0.5s forwards; }}
-.slide.active .share-hint {{ opacity: 0; animation: hintFade 0.4s ease-out 0.7s forwards; }}
+.slide.active .slide-label { animation: labelSlide 0.4s ease-out forwards; }
+.slide.active .slide-text { animation: textFade 0.4s ease-out 0.1s forwards; }
+.slide.active .slide-icon { animation: iconPop 0.5s cubic-bezier(0.34, 1.56, 0.64, 1) 0.05s forwards; }
+.slide.active h1 { animation: titleReveal 0.5s ease-out 0.12s forwards; }
+.slide.active .subtitle { animation: textFade 0.4s ease-out 0.25s forwards; }
+.slide.active .big-number { animation: numberFlip 0.6s ease-out 0.18s forwards; }
+.slide.active .huge-name { animation: nameBlur 0.5s ease-out 0.2s forwards; }
+.slide.active .personality-type { animation: glitchReveal 0.8s ease-out 0.15s forwards; }
+.slide.active .roast { animation: roastType 0.6s ease-out 0.4s forwards; }
+.slide.active .badge { animation: badgeStamp 0.4s ease-out 0.5s forwards; }
+.slide.active .stat-grid { animation: none; opacity: 1; transform: none; }
+.slide.active .stat-item { animation: statFade 0.35s ease-out forwards; }
+.slide.active .stat-item:nth-child(1) { animation-delay: 0.3s; }
+.slide.active .stat-item:nth-child(2) { animation-delay: 0.38s; }
+.slide.active .stat-item:nth-child(3) { animation-delay: 0.46s; }
+.slide.active .rank-list { animation: none; opacity: 1; transform: none; }
+.slide.active .rank-item { animation: rankSlide 0.35s ease-out forwards; }
+.slide.active .rank-item:first-child { animation: topRankDrop 0.45s ease-out forwards; }
+.slide.active .rank-item:nth-child(1) { animation-delay: 0.1s; }
+.slide.active .rank-item:nth-child(2) { animation-delay: 0.18s; }
+.slide.active .rank-item:nth-child(3) { animation-delay: 0.26s; }
+.slide.active .rank-item:nth-child(4) { animation-delay: 0.34s; }
+.slide.active .rank-item:nth-child(5) { animation-delay: 0.42s; }
+.slide.active .emoji-row { animation: emojiSpread 0.6s ease-out 0.2s forwards; }
+.slide.active .summary-card { animation: cardRise 0.6s ease-out 0.1s forwards; }
+.slide.active .screenshot-btn { opacity: 0; animation: buttonSlide 0.4s ease-out 0.5s forwards; }
+.slide.active .share-hint { opacity: 0; animation: hintFade 0.4s ease-out 0.7s forwards; }
 
 /* === INTRO SLIDE - Spin entrance === */
-.slide.intro.active .slide-icon {{ animation: introIconSpin 0.7s ease-out forwards; }}
-.slide.intro.active h1 {{ animation: introTitleGlitch 0.6s ease-out 0.3s forwards; }}
-.slide.intro.active .subtitle {{ animation: textFade 0.4s ease-out 0.5s forwards; }}
+.slide.intro.active .slide-icon { animation: introIconSpin 0.7s ease-out forwards; }
+.slide.intro.active h1 { animation: introTitleGlitch 0.6s ease-out 0.3s forwards; }
+.slide.intro.active .subtitle { animation: textFade 0.4s ease-out 0.5s forwards; }
 
 /* === WHATSAPP SLIDE (#1 person) - Soft glow === */
-.slide.whatsapp-bg.active .slide-label {{ animation: textFade 0.4s ease-out forwards; }}
-.slide.whatsapp-bg.active .huge-name {{ animation: nameGlow 0.6s ease-out 0.15s forwards; }}
-.slide.whatsapp-bg.active .big-number {{ animation: numberFlip 0.5s ease-out 0.35s forwards; }}
+.slide.whatsapp-bg.active .slide-label { animation: textFade 0.4s ease-out forwards; }
+.slide.whatsapp-bg.active .huge-name { animation: nameGlow 0.6s ease-out 0.15s forwards; }
+.slide.whatsapp-bg.active .big-number { animation: numberFlip 0.5s ease-out 0.35s forwards; }
 
 /* === PURPLE SLIDE (Personality) - Glitch === */
-.slide.purple-bg.active .slide-label {{ animation: labelGlitch 0.5s ease-out forwards; }}
-.slide.purple-bg.active .personality-type {{ animation: personalityGlitch 0.8s ease-out 0.12s forwards; }}
-.slide.purple-bg.active .roast {{ animation: flickerReveal 0.6s ease-out 0.45s forwards; }}
+.slide.purple-bg.active .slide-label { animation: labelGlitch 0.5s ease-out forwards; }
+.slide.purple-bg.active .personality-type { animation: personalityGlitch 0.8s ease-out 0.12s forwards; }
+.slide.purple-bg.active .roast { animation: flickerReveal 0.6s ease-out 0.45s forwards; }
 
 /* === RED SLIDE (Down Bad) - Drop from above === */
-.slide.red-bg.active .slide-label {{ animation: textFade 0.4s ease-out forwards; }}
-.slide.red-bg.active .huge-name {{ animation: dramaticDrop 0.5s ease-out 0.12s forwards; }}
-.slide.red-bg.active .big-number {{ animation: shakeReveal 0.5s ease-out 0.35s forwards; }}
+.slide.red-bg.active .slide-label { animation: textFade 0.4s ease-out forwards; }
+.slide.red-bg.active .huge-name { animation: dramaticDrop 0.5s ease-out 0.12s forwards; }
+.slide.red-bg.active .big-number { animation: shakeReveal 0.5s ease-out 0.35s forwards; }
 
 /* === ORANGE SLIDE (Heating Up / Top Groups) - Glow rise === */
-.slide.orange-bg.active .slide-label {{ animation: fireLabel 0.4s ease-out forwards; }}
-.slide.orange-bg.active .rank-item {{ animation: glowRise 0.4s ease-out forwards; }}
-.slide.orange-bg.active .rank-item:first-child {{ animation: glowRise 0.45s ease-out forwards; }}
-.slide.orange-bg.active .rank-item:nth-child(1) {{ animation-delay: 0.06s; }}
-.slide.orange-bg.active .rank-item:nth-child(2) {{ animation-delay: 0.14s; }}
-.slide.orange-bg.active .rank-item:nth-child(3) {{ animation-delay: 0.22s; }}
-.slide.orange-bg.active .rank-item:nth-child(4) {{ animation-delay: 0.30s; }}
-.slide.orange-bg.active .rank-item:nth-child(5) {{ animation-delay: 0.38s; }}
+.slide.orange-bg.active .slide-label { animation: fireLabel 0.4s ease-out forwards; }
+.slide.orange-bg.active .rank-item { animation: glowRise 0.4s ease-out forwards; }
+.slide.orange-bg.active .rank-item:first-child { animation: glowRise 0.45s ease-out forwards; }
+.slide.orange-bg.active .rank-item:nth-child(1) { animation-delay: 0.06s; }
+.slide.orange-bg.active .rank-item:nth-child(2) { animation-delay: 0.14s; }
+.slide.orange-bg.active .rank-item:nth-child(3) { animation-delay: 0.22s; }
+.slide.orange-bg.active .rank-item:nth-child(4) { animation-delay: 0.30s; }
+.slide.orange-bg.active .rank-item:nth-child(5) { animation-delay: 0.38s; }
 
 /* === SUMMARY SLIDE - Clean rise === */
-.slide.summary-slide.active .summary-card {{ animation: cardRise 0.6s ease-out 0.1s forwards; }}
+.slide.summary-slide.active .summary-card { animation: cardRise 0.6s ease-out 0.1s forwards; }
 
 /* === CONTRIBUTION GRAPH SLIDE - Grid reveal === */
-.slide.contrib-slide.active .contrib-graph {{ animation: graphReveal 0.8s ease-out 0.15s forwards; }}
-.slide.contrib-slide.active .contrib-stats {{ animation: none; opacity: 1; transform: none; }}
-.slide.contrib-slide.active .contrib-stat {{ animation: statFade 0.35s ease-out forwards; }}
-.slide.contrib-slide.active .contrib-stat:nth-child(1) {{ animation-delay: 0.5s; }}
-.slide.contrib-slide.active .contrib-stat:nth-child(2) {{ animation-delay: 0.6s; }}
-.slide.contrib-slide.active .contrib-stat:nth-child(3) {{ animation-delay: 0.7s; }}
+.slide.contrib-slide.active .contrib-graph { animation: graphReveal 0.8s ease-out 0.15s forwards; }
+.slide.contrib-slide.active .contrib-stats { animation: none; opacity: 1; transform: none; }
+.slide.contrib-slide.active .contrib-stat { animation: statFade 0.35s ease-out forwards; }
+.slide.contrib-slide.active .contrib-stat:nth-child(1) { animation-delay: 0.5s; }
+.slide.contrib-slide.active .contrib-stat:nth-child(2) { animation-delay: 0.6s; }
+.slide.contrib-slide.active .contrib-stat:nth-child(3) { animation-delay: 0.7s; }
 
 /* ===== KEYFRAMES ===== */
 
 /* Base animations - VARIED STYLES */
 
 /* Slide from diagonal */
-@keyframes labelSlide {{
-    0% {{ opacity: 0; transform: translateY(12px) translateX(-8px); }}
-    100% {{ opacity: 1; transform: translateY(0) translateX(0); }}
-}}
+@keyframes labelSlide {
+    0% { opacity: 0; transform: translateY(12px) translateX(-8px); }
+    100% { opacity: 1; transform: translateY(0) translateX(0); }
+}
 
 /* Simple fade up */
-@keyframes textFade {{
-    0% {{ opacity: 0; transform: translateY(15px); }}
-    100% {{ opacity: 1; transform: translateY(0); }}
-}}
+@keyframes textFade {
+    0% { opacity: 0; transform: translateY(15px); }
+    100% { opacity: 1; transform: translateY(0); }
+}
 
 /* Scale with slight overshoot */
-@keyframes titleReveal {{
-    0% {{ opacity: 0; transform: translateY(25px) scale(0.95); }}
-    70% {{ transform: translateY(-3px) scale(1.01); }}
-    100% {{ opacity: 1; transform: translateY(0) scale(1); }}
-}}
+@keyframes titleReveal {
+    0% { opacity: 0; transform: translateY(25px) scale(0.95); }
+    70% { transform: translateY(-3px) scale(1.01); }
+    100% { opacity: 1; transform: translateY(0) scale(1); }
+}
 
 /* Wobble rotation */
-@keyframes iconPop {{
-    0% {{ opacity: 0; transform: translateY(20px) scale(0.4) rotate(-15deg); }}
-    50% {{ transform: translateY(-8px) scale(1.15) rotate(8deg); }}
-    75% {{ transform: translateY(2px) scale(0.95) rotate(-3deg); }}
-    100% {{ opacity: 1; transform: translateY(0) scale(1) rotate(0); }}
-}}
+@keyframes iconPop {
+    0% { opacity: 0; transform: translateY(20px) scale(0.4) rotate(-15deg); }
+    50% { transform: translateY(-8px) scale(1.15) rotate(8deg); }
+    75% { transform: translateY(2px) scale(0.95) rotate(-3deg); }
+    100% { opacity: 1; transform: translateY(0) scale(1) rotate(0); }
+}
 
 /* 3D flip reveal - for impactful numbers */
-@keyframes numberFlip {{
-    0% {{ opacity: 0; transform: perspective(400px) rotateX(-60deg) translateY(20px); }}
-    60% {{ transform: perspective(400px) rotateX(10deg); }}
-    100% {{ opacity: 1; transform: perspective(400px) rotateX(0) translateY(0); }}
-}}
+@keyframes numberFlip {
+    0% { opacity: 0; transform: perspective(400px) rotateX(-60deg) translateY(20px); }
+    60% { transform: perspective(400px) rotateX(10deg); }
+    100% { opacity: 1; transform: perspective(400px) rotateX(0) translateY(0); }
+}
 
 /* Soft blur fade - for names */
-@keyframes nameBlur {{
-    0% {{ opacity: 0; transform: translateY(20px); filter: blur(8px); }}
-    100% {{ opacity: 1; transform: translateY(0); filter: blur(0); }}
-}}
+@keyframes nameBlur {
+    0% { opacity: 0; transform: translateY(20px); filter: blur(8px); }
+    100% { opacity: 1; transform: translateY(0); filter: blur(0); }
+}
 
 /* Typewriter cursor feel */
-@keyframes roastType {{
-    0% {{ opacity: 0; clip-path: inset(0 100% 0 0); }}
-    100% {{ opacity: 1; clip-path: inset(0 0 0 0); }}
-}}
+@keyframes roastType {
+    0% { opacity: 0; clip-path: inset(0 100% 0 0); }
+    100% { opacity: 1; clip-path: inset(0 0 0 0); }
+}
 
 /* Stagger fade in - for stat items */
-@keyframes statFade {{
-    0% {{ opacity: 0; transform: translateY(12px); }}
-    100% {{ opacity: 1; transform: translateY(0); }}
-}}
+@keyframes statFade {
+    0% { opacity: 0; transform: translateY(12px); }
+    100% { opacity: 1; transform: translateY(0); }
+}
 
 /* Horizontal slide - for rank items */
-@keyframes rankSlide {{
-    0% {{ opacity: 0; transform: translateX(-20px); }}
-    100% {{ opacity: 1; transform: translateX(0); }}
-}}
+@keyframes rankSlide {
+    0% { opacity: 0; transform: translateX(-20px); }
+    100% { opacity: 1; transform: translateX(0); }
+}
 
 /* Crown drop for #1 */
-@keyframes topRankDrop {{
-    0% {{ opacity: 0; transform: translateY(-30px); }}
-    70% {{ transform: translateY(4px); }}
-    100% {{ opacity: 1; transform: translateY(0); }}
-}}
+@keyframes topRankDrop {
+    0% { opacity: 0; transform: translateY(-30px); }
+    70% { transform: translateY(4px); }
+    100% { opacity: 1; transform: translateY(0); }
+}
 
 /* Pill stamp - for badges */
-@keyframes badgeStamp {{
-    0% {{ opacity: 0; transform: scale(1.4); }}
-    60% {{ transform: scale(0.95); }}
-    100% {{ opacity: 1; transform: scale(1); }}
-}}
+@keyframes badgeStamp {
+    0% { opacity: 0; transform: scale(1.4); }
+    60% { transform: scale(0.95); }
+    100% { opacity: 1; transform: scale(1); }
+}
 
 /* Letter spread - for emoji row */
-@keyframes emojiSpread {{
-    0% {{ opacity: 0; letter-spacing: 0px; }}
-    100% {{ opacity: 1; letter-spacing: 20px; }}
-}}
+@keyframes emojiSpread {
+    0% { opacity: 0; letter-spacing: 0px; }
+    100% { opacity: 1; letter-spacing: 20px; }
+}
 
 /* Clean rise - for cards */
-@keyframes cardRise {{
-    0% {{ opacity: 0; transform: translateY(40px); }}
-    100% {{ opacity: 1; transform: translateY(0); }}
-}}
+@keyframes cardRise {
+    0% { opacity: 0; transform: translateY(40px); }
+    100% { opacity: 1; transform: translateY(0); }
+}
 
 /* Graph reveal - for contribution graph */
-@keyframes graphReveal {{
-    0% {{ opacity: 0; transform: translateY(30px) scale(0.95); }}
-    100% {{ opacity: 1; transform: translateY(0) scale(1); }}
-}}
+@keyframes graphReveal {
+    0% { opacity: 0; transform: translateY(30px) scale(0.95); }
+    100% { opacity: 1; transform: translateY(0) scale(1); }
+}
 
 /* Simple slide up */
-@keyframes buttonSlide {{
-    0% {{ opacity: 0; transform: translateY(15px); }}
-    100% {{ opacity: 1; transform: translateY(0); }}
-}}
+@keyframes buttonSlide {
+    0% { opacity: 0; transform: translateY(15px); }
+    100% { opacity: 1; transform: translateY(0); }
+}
 
 /* Fade only */
-@keyframes hintFade {{
-    0% {{ opacity: 0; }}
-    100% {{ opacity: 1; }}
-}}
+@keyframes hintFade {
+    0% { opacity: 0; }
+    100% { opacity: 1; }
+}
 
 /* Intro slide - spin and glitch */
-@keyframes introIconSpin {{
-    0% {{ opacity: 0; transform: rotate(-180deg) scale(0.3); }}
-    100% {{ opacity: 1; transform: rotate(0) scale(1); }}
-}}
-
-@keyframes introTitleGlitch {{
-    0% {{ opacity: 0; transform: translateY(15px); filter: blur(6px); }}
-    40% {{ opacity: 0.8; transform: translateY(3px) skewX(-3deg); filter: blur(2px); }}
-    70% {{ transform: translateY(-2px) skewX(2deg); filter: blur(0); }}
-    100% {{ opacity: 1; transform: translateY(0) skewX(0); }}
-}}
+@keyframes introIconSpin {
+    0% { opacity: 0; transform: rotate(-180deg) scale(0.3); }
+    100% { opacity: 1; transform: rotate(0) scale(1); }
+}
+
+@keyframes introTitleGlitch {
+    0% { opacity: 0; transform: translateY(15px); filter: blur(6px); }
+    40% { opacity: 0.8; transform: translateY(3px) skewX(-3deg); filter: blur(2px); }
+    70% { transform: translateY(-2px) skewX(2deg); filter: blur(0); }
+    100% { opacity: 1; transform: translateY(0) skewX(0); }
+}
 
 /* WhatsApp slide - soft glow */
-@keyframes nameGlow {{
-    0% {{ opacity: 0; transform: translateY(15px); filter: blur(4px) brightness(1.3); }}
-    100% {{ opacity: 1; transform: translateY(0); filter: blur(0) brightness(1); }}
-}}
+@keyframes nameGlow {
+    0% { opacity: 0; transform: translateY(15px); filter: blur(4px) brightness(1.3); }
+    100% { opacity: 1; transform: translateY(0); filter: blur(0) brightness(1); }
+}
 
 /* Purple slide - glitch chaos */
-@keyframes labelGlitch {{
-    0% {{ opacity: 0; transform: skewX(-5deg); }}
-    50% {{ opacity: 0.7; transform: skewX(3deg); }}
-    100% {{ opacity: 1; transform: skewX(0); }}
-}}
-
-@keyframes personalityGlitch {{
-    0% {{ opacity: 0; transform: translateY(20px); filter: blur(8px); }}
-    20% {{ opacity: 0.5; transform: translateY(10px) skewX(-8deg); filter: blur(4px); }}
-    40% {{ opacity: 0.7; transform: translateY(5px) skewX(5deg); filter: blur(2px); }}
-    60% {{ opacity: 0.9; transform: translateY(-2px) skewX(-2deg); filter: blur(1px); }}
-    80% {{ transform: skewX(1deg); }}
-    100% {{ opacity: 1; transform: translateY(0) skewX(0); filter: blur(0); }}
-}}
-
-@keyframes flickerReveal {{
-    0% {{ opacity: 0; }}
-    20% {{ opacity: 0.4; }}
-    35% {{ opacity: 0.1; }}
-    50% {{ opacity: 0.7; }}
-    65% {{ opacity: 0.3; }}
-    80% {{ opacity: 0.9; }}
-    100% {{ opacity: 1; }}
-}}
-
-@keyframes glitchReveal {{
-    0% {{ opacity: 0; transform: translateY(15px); filter: blur(4px); }}
-    50% {{ opacity: 0.8; transform: translateY(3px) skewX(-3deg); filter: blur(1px); }}
-    100% {{ opacity: 1; transform: translateY(0) skewX(0); filter: blur(0); }}
-}}
+@keyframes labelGlitch {
+    0% { opacity: 0; transform: skewX(-5deg); }
+    50% { opacity: 0.7; transform: skewX(3deg); }
+    100% { opacity: 1; transform: skewX(0); }
+}
+
+@keyframes personalityGlitch {
+    0% { opacity: 0; transform: translateY(20px); filter: blur(8px); }
+    20% { opacity: 0.5; transform: translateY(10px) skewX(-8deg); filter: blur(4px); }
+    40% { opacity: 0.7; transform: translateY(5px) skewX(5deg); filter: blur(2px); }
+    60% { opacity: 0.9; transform: translateY(-2px) skewX(-2deg); filter: blur(1px); }
+    80% { transform: skewX(1deg); }
+    100% { opacity: 1; transform: translateY(0) skewX(0); filter: blur(0); }
+}
+
+@keyframes flickerReveal {
+    0% { opacity: 0; }
+    20% { opacity: 0.4; }
+    35% { opacity: 0.1; }
+    50% { opacity: 0.7; }
+    65% { opacity: 0.3; }
+    80% { opacity: 0.9; }
+    100% { opacity: 1; }
+}
+
+@keyframes glitchReveal {
+    0% { opacity: 0; transform: translateY(15px); filter: blur(4px); }
+    50% { opacity: 0.8; transform: translateY(3px) skewX(-3deg); filter: blur(1px); }
+    100% { opacity: 1; transform: translateY(0) skewX(0); filter: blur(0); }
+}
 
 /* Red slide - dramatic drop */
-@keyframes dramaticDrop {{
-    0% {{ opacity: 0; transform: translateY(-50px); }}
-    70% {{ transform: translateY(5px); }}
-    100% {{ opacity: 1; transform: translateY(0); }}
-}}
-
-@keyframes shakeReveal {{
-    0% {{ opacity: 0; transform: translateX(0); }}
-    25% {{ opacity: 0.7; transform: translateX(-6px); }}
-    50% {{ transform: translateX(6px); }}
-    75% {{ transform: translateX(-3px); }}
-    100% {{ opacity: 1; transform: translateX(0); }}
-}}
+@keyframes dramaticDrop {
+    0% { opacity: 0; transform: translateY(-50px); }
+    70% { transform: translateY(5px); }
+    100% { opacity: 1; transform: translateY(0); }
+}
+
+@keyframes shakeReveal {
+    0% { opacity: 0; transform: translateX(0); }
+    25% { opacity: 0.7; transform: translateX(-6px); }
+    50% { transform: translateX(6px); }
+    75% { transform: translateX(-3px); }
+    100% { opacity: 1; transform: translateX(0); }
+}
 
 /* Orange slide - glow rise */
-@keyframes fireLabel {{
-    0% {{ opacity: 0; filter: brightness(1.4); }}
-    100% {{ opacity: 1; filter: brightness(1); }}
-}}
+@keyframes fireLabel {
+    0% { opacity: 0; filter: brightness(1.4); }
+    100% { opacity: 1; filter: brightness(1); }
+}
 
-@keyframes glowRise {{
-    0% {{ opacity: 0; transform: translateY(20px); filter: brightness(1.3); }}
-    100% {{ opacity: 1; transform: translateY(0); filter: brightness(1); }}
-}}
+@keyframes glowRise {
+    0% { opacity: 0; transform: translateY(20px); filter: brightness(1.3); }
+    100% { opacity: 1; transform: translateY(0); filter: brightness(1); }
+}
 
-.summary-card {{
+.summary-card {
     background:linear-gradient(145deg,#1a1a2e 0%,#0d1f0f 100%);
     border:2px solid rgba(255,255,255,0.1);
     border-radius:24px;
@@ -1295,127 +2027,115 @@ body {{ font-family:'Space Grotesk',sans-serif; background:var(--bg); color:var(
     width:100%;
     max-width:420px;
     text-align:center;
-}}
-.summary-header {{ display:flex; align-items:center; justify-content:center; gap:12px; margin-bottom:24px; padding-bottom:16px; border-bottom:1px solid rgba(255,255,255,0.1); }}
-.summary-logo {{ font-size:28px; }}
-.summary-title {{ font-family:var(--font-pixel); font-size:11px; font-weight:400; color:var(--text); }}
-.summary-hero {{ margin:24px 0; }}
-.summary-big-stat {{ display:flex; flex-direction:column; align-items:center; }}
-.summary-big-num {{ font-family:var(--font-mono); font-size:56px; font-weight:600; color:var(--whatsapp); line-height:1; letter-spacing:-1px; }}
-.summary-big-label {{ font-size:13px; color:var(--muted); text-transform:uppercase; letter-spacing:1px; margin-top:8px; }}
-.summary-stats {{ display:grid; grid-template-columns:repeat(4,1fr); gap:12px; margin:24px 0; padding:20px 0; border-top:1px solid rgba(255,255,255,0.1); border-bottom:1px solid rgba(255,255,255,0.1); }}
-.summary-stat {{ display:flex; flex-direction:column; align-items:center; }}
-.summary-stat-val {{ font-family:var(--font-mono); font-size:20px; font-weight:600; color:var(--cyan); }}
-.summary-stat-lbl {{ font-size:9px; color:var(--muted); text-transform:uppercase; margin-top:4px; letter-spacing:0.3px; }}
-.summary-personality {{ margin:20px 0; }}
-.summary-personality-type {{ font-family:var(--font-pixel); font-size:12px; font-weight:400; color:var(--purple); text-transform:uppercase; letter-spacing:0.3px; }}
-.summary-top3 {{ margin:16px 0; display:flex; flex-direction:column; gap:6px; }}
-.summary-top3-label {{ font-size:10px; color:var(--muted); text-transform:uppercase; letter-spacing:0.5px; }}
-.summary-top3-names {{ font-size:13px; color:var(--text); }}
-.summary-footer {{ margin-top:20px; padding-top:16px; border-top:1px solid rgba(255,255,255,0.1); font-size:11px; color:var(--whatsapp); font-family:var(--font-pixel); font-weight:400; }}
-
-.screenshot-btn {{
+}
+.summary-header { display:flex; align-items:center; justify-content:center; gap:12px; margin-bottom:24px; padding-bottom:16px; border-bottom:1px solid rgba(255,255,255,0.1); }
+.summary-logo { font-size:28px; }
+.summary-title { font-family:var(--font-pixel); font-size:11px; font-weight:400; color:var(--text); }
+.summary-hero { margin:24px 0; }
+.summary-big-stat { display:flex; flex-direction:column; align-items:center; }
+.summary-big-num { font-family:var(--font-mono); font-size:56px; font-weight:600; color:var(--whatsapp); line-height:1; letter-spacing:-1px; }
+.summary-big-label { font-size:13px; color:var(--muted); text-transform:uppercase; letter-spacing:1px; margin-top:8px; }
+.summary-stats { display:grid; grid-template-columns:repeat(4,1fr); gap:12px; margin:24px 0; padding:20px 0; border-top:1px solid rgba(255,255,255,0.1); border-bottom:1px solid rgba(255,255,255,0.1); }
+.summary-stat { display:flex; flex-direction:column; align-items:center; }
+.summary-stat-val { font-family:var(--font-mono); font-size:20px; font-weight:600; color:var(--cyan); }
+.summary-stat-lbl { font-size:9px; color:var(--muted); text-transform:uppercase; margin-top:4px; letter-spacing:0.3px; }
+.summary-personality { margin:20px 0; }
+.summary-personality-type { font-family:var(--font-pixel); font-size:12px; font-weight:400; color:var(--purple); text-transform:uppercase; letter-spacing:0.3px; }
+.summary-top3 { margin:16px 0; display:flex; flex-direction:column; gap:6px; }
+.summary-top3-label { font-size:10px; color:var(--muted); text-transform:uppercase; letter-spacing:0.5px; }
+.summary-top3-names { font-size:13px; color:var(--text); }
+.summary-footer { margin-top:20px; padding-top:16px; border-top:1px solid rgba(255,255,255,0.1); font-size:11px; color:var(--whatsapp); font-family:var(--font-pixel); font-weight:400; }
+
+.screenshot-btn {
     display:flex; align-items:center; justify-content:center; gap:10px;
     font-family:var(--font-pixel); font-size:10px; font-weight:400; text-transform:uppercase; letter-spacing:0.3px;
     background:var(--whatsapp); color:#000; border:none;
     padding:16px 32px; border-radius:12px; margin-top:28px;
     cursor:pointer; transition:transform 0.2s,background 0.2s;
-}}
-.screenshot-btn:hover {{ background:#2ee676; transform:scale(1.02); }}
-.screenshot-btn:active {{ transform:scale(0.98); }}
-.btn-icon {{ font-size:20px; }}
-.share-hint {{ font-size:14px; color:var(--muted); margin-top:16px; }}
-
-.slide-save-btn {{
+}
+.screenshot-btn:hover { background:#2ee676; transform:scale(1.02); }
+.screenshot-btn:active { transform:scale(0.98); }
+.screenshot-btn.export-btn { margin-top:12px; background:transparent; color:var(--text); border:1px solid rgba(255,255,255,0.25); }
+.screenshot-btn.export-btn:hover { background:rgba(255,255,255,0.08); }
+.btn-icon { font-size:20px; }
+.share-hint { font-size:14px; color:var(--muted); margin-top:16px; }
+
+.slide-save-btn {
     position:absolute; bottom:100px; left:50%; transform:translateX(-50%);
     display:flex; align-items:center; justify-content:center; gap:8px;
     font-family:var(--font-pixel); font-size:9px; font-weight:400; text-transform:uppercase; letter-spacing:0.3px;
     background:rgba(37,211,102,0.15); color:var(--whatsapp); border:1px solid rgba(37,211,102,0.3);
     padding:10px 20px; border-radius:8px;
     cursor:pointer; transition:all 0.2s; opacity:0;
-}}
-.slide.active .slide-save-btn {{ opacity:1; }}
-.slide-save-btn:hover {{ background:rgba(37,211,102,0.25); border-color:var(--whatsapp); }}
+}
+.slide.active .slide-save-btn { opacity:1; }
+.slide-save-btn:hover { background:rgba(37,211,102,0.25); border-color:var(--whatsapp); }
 
 /* Force all elements visible for screenshot capture */
 .slide.capturing,
-.slide.capturing * {{
+.slide.capturing * {
     animation: none !important;
     opacity: 1 !important;
     transform: none !important;
     filter: none !important;
     clip-path: none !important;
-}}
-.slide-watermark {{
+}
+.slide-watermark {
     position:absolute; bottom:24px; left:50%; transform:translateX(-50%);
     font-family:var(--font-pixel); font-size:10px; color:var(--whatsapp); opacity:0.6;
     display:none;
-}}
-
-.progress {{ position:fixed; bottom:24px; left:50%; transform:translateX(-50%); display:flex; gap:8px; z-index:100; }}
-.dot {{ width:10px; height:10px; border-radius:50%; background:rgba(255,255,255,0.2); transition:all 0.3s; cursor:pointer; }}
-.dot:hover {{ background:rgba(255,255,255,0.4); }}
-.dot.active {{ background:var(--whatsapp); transform:scale(1.3); }}
-
-.nav {{ position:fixed; top:50%; transform:translateY(-50%); font-size:36px; color:rgba(255,255,255,0.2); cursor:pointer; z-index:100; padding:24px; transition:color 0.2s; user-select:none; }}
-.nav:hover {{ color:rgba(255,255,255,0.5); }}
-.nav.prev {{ left:8px; }}
-.nav.next {{ right:8px; }}
-.nav.hidden {{ opacity:0; pointer-events:none; }}
-</style>
-</head>
-<body>
+}
 
-<div class="gallery" id="gallery">{slides_html}</div>
-<div class="progress" id="progress"></div>
-<div class="nav prev" id="prev">‹</div>
-<div class="nav next" id="next">›</div>
+.progress { position:fixed; bottom:24px; left:50%; transform:translateX(-50%); display:flex; gap:8px; z-index:100; }
+.dot { width:10px; height:10px; border-radius:50%; background:rgba(255,255,255,0.2); transition:all 0.3s; cursor:pointer; }
+.dot:hover { background:rgba(255,255,255,0.4); }
+.dot.active { background:var(--whatsapp); transform:scale(1.3); }
 
-<script>
-const gallery = document.getElementById('gallery');
-const progressEl = document.getElementById('progress');
-const prevBtn = document.getElementById('prev');
-const nextBtn = document.getElementById('next');
-const total = {num_slides};
-let current = 0;
+.nav { position:fixed; top:50%; transform:translateY(-50%); font-size:36px; color:rgba(255,255,255,0.2); cursor:pointer; z-index:100; padding:24px; transition:color 0.2s; user-select:none; }
+.nav:hover { color:rgba(255,255,255,0.5); }
+.nav.prev { left:8px; }
+.nav.next { right:8px; }
+.nav.hidden { opacity:0; pointer-events:none; }'''
 
-for (let i = 0; i < total; i++) {{
+REPORT_JS = '''let current = 0;
+
+for (let i = 0; i < total; i++) {
     const dot = document.createElement('div');
     dot.className = 'dot' + (i === 0 ? ' active' : '');
     dot.onclick = () => goTo(i);
     progressEl.appendChild(dot);
-}}
+}
 const dots = progressEl.querySelectorAll('.dot');
 
 const slides = gallery.querySelectorAll('.slide');
 
-function goTo(idx) {{
+function goTo(idx) {
     if (idx < 0 || idx >= total) return;
     slides.forEach(s => s.classList.remove('active'));
     current = idx;
-    gallery.style.transform = `translateX(-${{current * 100}}vw)`;
+    gallery.style.transform = `translateX(-${current * 100}vw)`;
     dots.forEach((d, i) => d.classList.toggle('active', i === current));
     prevBtn.classList.toggle('hidden', current === 0);
     nextBtn.classList.toggle('hidden', current === total - 1);
     setTimeout(() => slides[current].classList.add('active'), 50);
-}}
+}
 
-document.addEventListener('click', (e) => {{
+document.addEventListener('click', (e) => {
     if (e.target.closest('.nav, button, .dot')) return;
     const x = e.clientX / window.innerWidth;
     if (x < 0.3) goTo(current - 1);
     else goTo(current + 1);
-}});
+});
 
-document.addEventListener('keydown', (e) => {{
-    if (e.key === 'ArrowRight' || e.key === ' ') {{ e.preventDefault(); goTo(current + 1); }}
-    if (e.key === 'ArrowLeft') {{ e.preventDefault(); goTo(current - 1); }}
-}});
+document.addEventListener('keydown', (e) => {
+    if (e.key === 'ArrowRight' || e.key === ' ') { e.preventDefault(); goTo(current + 1); }
+    if (e.key === 'ArrowLeft') { e.preventDefault(); goTo(current - 1); }
+});
 
-prevBtn.onclick = (e) => {{ e.stopPropagation(); goTo(current - 1); }};
-nextBtn.onclick = (e) => {{ e.stopPropagation(); goTo(current + 1); }};
+prevBtn.onclick = (e) => { e.stopPropagation(); goTo(current - 1); };
+nextBtn.onclick = (e) => { e.stopPropagation(); goTo(current + 1); };
 
-async function takeScreenshot() {{
+async function takeScreenshot() {
     const card = document.getElementById('summaryCard');
     const btn = document.querySelector('.screenshot-btn');
     btn.innerHTML = '<span>Saving...</span>';
@@ -1424,85 +2144,178 @@ async function takeScreenshot() {{
     card.style.opacity = '1';
     card.style.transform = 'none';
     await new Promise(r => setTimeout(r, 100));
-    try {{
-        const canvas = await html2canvas(card, {{ backgroundColor:'#0d1f0f', scale:2, logging:false, useCORS:true }});
+    try {
+        const canvas = await html2canvas(card, { backgroundColor:'#0d1f0f', scale:2, logging:false, useCORS:true });
         const link = document.createElement('a');
         link.download = 'whatsapp_wrapped_2025_summary.png';
         link.href = canvas.toDataURL('image/png');
         link.click();
         btn.innerHTML = '<span class="btn-icon">✓</span><span>Saved!</span>';
-        setTimeout(() => {{ btn.innerHTML = '<span class="btn-icon">📸</span><span>Save Screenshot</span>'; btn.disabled = false; }}, 2000);
-    }} catch (err) {{
+        setTimeout(() => { btn.innerHTML = '<span class="btn-icon">📸</span><span>Save Screenshot</span>'; btn.disabled = false; }, 2000);
+    } catch (err) {
         btn.innerHTML = '<span class="btn-icon">📸</span><span>Save Screenshot</span>';
         btn.disabled = false;
-    }}
-}}
-
-async function saveSlide(slideEl, filename, btn) {{
-    btn.innerHTML = '⏳';
-    btn.disabled = true;
-
-    // Show watermark for screenshot
+    }
+}
+
+// Rasterized slides, kept because the report never changes: a repeat save or export is instant
+const slidePngs = new Map();
+
+function renderSlide(slideEl) {
+    if (!slidePngs.has(slideEl)) {
+        const png = captureSlide(slideEl);
+        slidePngs.set(slideEl, png);
+        png.catch(() => slidePngs.delete(slideEl));
+    }
+    return slidePngs.get(slideEl);
+}
+
+async function captureSlide(slideEl) {
+    // Show the watermark, hide the save button and force every animation to its final state
     const watermark = slideEl.querySelector('.slide-watermark');
+    const saveBtn = slideEl.querySelector('.slide-save-btn');
     if (watermark) watermark.style.display = 'block';
-
-    // Hide the save button temporarily
-    btn.style.visibility = 'hidden';
-
-    // Add capturing class to force all animations to final state
+    if (saveBtn) saveBtn.style.visibility = 'hidden';
     slideEl.classList.add('capturing');
-
-    // Wait for browser to apply styles
-    await new Promise(r => setTimeout(r, 50));
-
-    // Get computed background color (html2canvas has issues with CSS variables)
-    const computedBg = getComputedStyle(slideEl).backgroundColor;
-    const bgColor = computedBg && computedBg !== 'rgba(0, 0, 0, 0)' ? computedBg : '#0a0a12';
-
-    try {{
-        const canvas = await html2canvas(slideEl, {{
+    try {
+        // Two frames: the first applies the capture styles, the second has painted them
+        await new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)));
+
+        // Get computed background color (html2canvas has issues with CSS variables)
+        const computedBg = getComputedStyle(slideEl).backgroundColor;
+        const bgColor = computedBg && computedBg !== 'rgba(0, 0, 0, 0)' ? computedBg : '#0a0a12';
+        const canvas = await html2canvas(slideEl, {
             backgroundColor: bgColor,
             scale: 2,
             logging: false,
             useCORS: true,
             width: slideEl.offsetWidth,
             height: slideEl.offsetHeight
-        }});
+        });
 
-        // Create a square canvas centered on content
+        // Square crop centered on the content
         const size = Math.min(canvas.width, canvas.height);
         const squareCanvas = document.createElement('canvas');
         squareCanvas.width = size;
         squareCanvas.height = size;
         const ctx = squareCanvas.getContext('2d');
-
-        // Fill with background color
         ctx.fillStyle = bgColor;
         ctx.fillRect(0, 0, size, size);
-
-        // Calculate crop position (center of original)
-        const srcX = (canvas.width - size) / 2;
-        const srcY = (canvas.height - size) / 2;
-
-        // Draw centered portion
-        ctx.drawImage(canvas, srcX, srcY, size, size, 0, 0, size, size);
-
-        const link = document.createElement('a');
-        link.download = filename;
-        link.href = squareCanvas.toDataURL('image/png');
-        link.click();
+        ctx.drawImage(canvas, (canvas.width - size) / 2, (canvas.height - size) / 2, size, size, 0, 0, size, size);
+        return await new Promise((resolve, reject) => squareCanvas.toBlob(b => b ? resolve(b) : reject(new Error('toBlob failed')), 'image/png'));
+    } finally {
+        slideEl.classList.remove('capturing');
+        if (saveBtn) saveBtn.style.visibility = 'visible';
+        if (watermark) watermark.style.display = 'none';
+    }
+}
+
+function download(blob, filename) {
+    const link = document.createElement('a');
+    link.download = filename;
+    link.href = URL.createObjectURL(blob);
+    link.click();
+    setTimeout(() => URL.revokeObjectURL(link.href), 1000);
+}
+
+async function saveSlide(slideEl, filename, btn) {
+    btn.innerHTML = '⏳';
+    btn.disabled = true;
+    try {
+        download(await renderSlide(slideEl), filename);
         btn.innerHTML = '✓';
-        setTimeout(() => {{ btn.innerHTML = '📸 Save'; btn.disabled = false; btn.style.visibility = 'visible'; }}, 2000);
-    }} catch (err) {{
+        setTimeout(() => { btn.innerHTML = '📸 Save'; btn.disabled = false; }, 2000);
+    } catch (err) {
         btn.innerHTML = '📸 Save';
         btn.disabled = false;
-        btn.style.visibility = 'visible';
-    }}
+    }
+}
+
+function zipStore(files) {
+    // Minimal ZIP writer for [{name, data: Uint8Array}]: stored entries (PNGs are already deflated), UTF-8 names, fixed 1980-01-01 timestamps
+    const crcTable = new Uint32Array(256);
+    for (let n = 0; n < 256; n++) {
+        let c = n;
+        for (let k = 0; k < 8; k++) c = c & 1 ? 0xEDB88320 ^ (c >>> 1) : c >>> 1;
+        crcTable[n] = c;
+    }
+    const parts = [], central = [];
+    let offset = 0;
+    for (const file of files) {
+        const name = new TextEncoder().encode(file.name);
+        const size = file.data.length;
+        let crc = 0xFFFFFFFF;
+        for (let i = 0; i < size; i++) crc = crcTable[(crc ^ file.data[i]) & 0xFF] ^ (crc >>> 8);
+        crc = (crc ^ 0xFFFFFFFF) >>> 0;
+        const local = new DataView(new ArrayBuffer(30));
+        local.setUint32(0, 0x04034b50, true);
+        local.setUint16(4, 20, true);
+        local.setUint16(6, 0x0800, true);
+        local.setUint16(12, 0x21, true);
+        local.setUint32(14, crc, true);
+        local.setUint32(18, size, true);
+        local.setUint32(22, size, true);
+        local.setUint16(26, name.length, true);
+        parts.push(local, name, file.data);
+        const entry = new DataView(new ArrayBuffer(46));
+        entry.setUint32(0, 0x02014b50, true);
+        entry.setUint16(4, 20, true);
+        entry.setUint16(6, 20, true);
+        entry.setUint16(8, 0x0800, true);
+        entry.setUint16(14, 0x21, true);
+        entry.setUint32(16, crc, true);
+        entry.setUint32(20, size, true);
+        entry.setUint32(24, size, true);
+        entry.setUint16(28, name.length, true);
+        entry.setUint32(42, offset, true);
+        central.push(entry, name);
+        offset += 30 + name.length + size;
+    }
+    const end = new DataView(new ArrayBuffer(22));
+    end.setUint32(0, 0x06054b50, true);
+    end.setUint16(8, files.length, true);
+    end.setUint16(10, files.length, true);
+    end.setUint32(12, central.reduce((n, part) => n + part.byteLength, 0), true);
+    end.setUint32(16, offset, true);
+    return new Blob([...parts, ...central, end], { type: 'application/zip' });
+}
+
+function packZip(files) {
+    // CRC32 over every PNG runs in a worker so the page stays responsive; this thread is the fallback
+    return new Promise(resolve => {
+        try {
+            const src = new Blob([zipStore.toString(), ';onmessage = e => postMessage(zipStore(e.data));'], { type: 'text/javascript' });
+            const worker = new Worker(URL.createObjectURL(src));
+            worker.onmessage = e => { worker.terminate(); resolve(e.data); };
+            worker.onerror = e => { e.preventDefault(); worker.terminate(); resolve(zipStore(files)); };
+            worker.postMessage(files);
+        } catch (err) {
+            resolve(zipStore(files));
+        }
+    });
+}
 
-    // Remove capturing class and hide watermark
-    slideEl.classList.remove('capturing');
-    if (watermark) watermark.style.display = 'none';
-}}
+async function exportAll(btn) {
+    const label = btn.innerHTML;
+    btn.disabled = true;
+    try {
+        const targets = Array.from(slides).filter(s => s.querySelector('.slide-save-btn'));
+        const files = [];
+        for (const [i, slideEl] of targets.entries()) {
+            btn.innerHTML = `<span>${i + 1}/${targets.length}</span>`;
+            const png = await renderSlide(slideEl);
+            const name = (slideEl.querySelector('.slide-save-btn').getAttribute('onclick').match(/'([^']+[.]png)'/) || [])[1] || `slide.png`;
+            files.push({ name: `${String(i + 1).padStart(2, '0')}_${name}`, data: new Uint8Array(await png.arrayBuffer()) });
+            // Yield between slides so input and animation frames get a turn
+            await new Promise(r => setTimeout(r));
+        }
+        download(await packZip(files), `whatsapp_wrapped_2025_slides.zip`);
+        btn.innerHTML = '<span class="btn-icon">✓</span><span>Exported!</span>';
+    } catch (err) {
+        btn.innerHTML = label;
+    }
+    setTimeout(() => { btn.innerHTML = label; btn.disabled = false; }, 2000);
+}
 
 // Contribution graph tooltip
 const tooltip = document.createElement('div');
@@ -1510,52 +2323,119 @@ tooltip.className = 'contrib-tooltip';
 tooltip.style.display = 'none';
 document.body.appendChild(tooltip);
 
-document.querySelectorAll('.contrib-cell[data-date]').forEach(cell => {{
-    cell.addEventListener('mouseenter', (e) => {{
-        const count = cell.dataset.count;
-        const date = cell.dataset.date;
-        const msgText = cell.dataset.msgText;
-        tooltip.innerHTML = `<div class="tooltip-count">${{count}} ${{msgText}}</div><div class="tooltip-date">${{date}}</div>`;
+document.querySelectorAll('.contrib-svg').forEach(svg => {
+    // One delegated handler per graph: a cell's day follows from its position and the grid geometry on the <svg>
+    const counts = svg.dataset.counts.split(',').map(Number);
+    const [y, m, d] = svg.dataset.start.split('-').map(Number);
+    const lead = Number(svg.dataset.lead);
+    const [x0, y0, pitch] = [svg.dataset.x, svg.dataset.y, svg.dataset.pitch].map(Number);
+    svg.addEventListener('pointermove', (e) => {
+        if (e.target.tagName !== 'rect') { tooltip.style.display = 'none'; return; }
+        const i = (e.target.x.baseVal.value - x0) / pitch * 7 + (e.target.y.baseVal.value - y0) / pitch - lead;
+        const date = new Date(y, m - 1, d + i).toLocaleDateString('en-US', { month: 'short', day: '2-digit', year: 'numeric' });
+        tooltip.innerHTML = `<div class="tooltip-count">${counts[i]} ${counts[i] === 1 ? 'message' : 'messages'}</div><div class="tooltip-date">${date}</div>`;
         tooltip.style.display = 'block';
-    }});
-    cell.addEventListener('mousemove', (e) => {{
         tooltip.style.left = (e.clientX + 12) + 'px';
         tooltip.style.top = (e.clientY - 10) + 'px';
-    }});
-    cell.addEventListener('mouseleave', () => {{
+    });
+    svg.addEventListener('pointerleave', () => {
         tooltip.style.display = 'none';
-    }});
-}});
+    });
+});
 
 goTo(0);
-</script>
-</body></html>'''
+'''
 
-    with open(path, 'w') as f: f.write(html)
-    return path
+def iso_day(value):
+    """argparse type for --since/--until: 'YYYY-MM-DD' -> date."""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--output', '-o', default='whatsapp_wrapped_2025.html')
     parser.add_argument('--use-2024', action='store_true')
+    parser.add_argument('--snapshot', nargs='?', const='file', choices=['file', 'memory'], help='analyze a point-in-time copy of the database (temp file or in memory)')
+    parser.add_argument('--jobs', '-j', type=int, help='run the metric queries on N threads and report how long each took')
+    parser.add_argument('--offline', nargs='?', const='', metavar='DIR', help='make the report fully self-contained: no CDN script or web fonts; inlines html2canvas.min.js and Silkscreen/AzeretMono/SpaceGrotesk font files found in DIR')
+    parser.add_argument('--whatsapp-db', metavar='PATH', help='read this ChatStorage.sqlite instead of searching the WhatsApp containers (or set WRAP2025_WHATSAPP_DB)')
+    parser.add_argument('--since', type=iso_day, metavar='YYYY-MM-DD', help='analyze messages from this local date on (default: January 1 of the --until year)')
+    parser.add_argument('--until', type=iso_day, metavar='YYYY-MM-DD', help='analyze messages up to and including this local date (default: today)')
+    parser.add_argument('--json', nargs='?', const='whatsapp_wrapped_2025.json', metavar='PATH', help='also save every computed stat, with contact names, as versioned JSON')
+    parser.add_argument('--ndjson', nargs='?', const='whatsapp_wrapped_2025.ndjson', metavar='PATH', help='like --json, but one record per line (a line per contact/day row)')
+    parser.add_argument('--from-json', metavar='PATH', help='render the report from a --json/--ndjson file without reading the database')
+    parser.add_argument('--profile', nargs='?', const='whatsapp_profile.json', metavar='PATH', help='time every stage and metric query (rows, SQLite VM steps, query plan), print the slowest and save them as JSON (default whatsapp_profile.json)')
     args = parser.parse_args()
+    dated = args.since or args.until
+    if dated and args.use_2024:
+        parser.error('--since/--until cannot be combined with --use-2024')
+    global SNAPSHOT, JOBS, OFFLINE, WHATSAPP_DB, PROFILE
+    WHATSAPP_DB = args.whatsapp_db or WHATSAPP_DB
+    SNAPSHOT = args.snapshot
+    OFFLINE = args.offline
+    JOBS = max(args.jobs or 1, 1)
+    PROFILE = {'queries': {}, 'stages': {}} if args.profile else None
 
     print("\n" + "="*50)
     print("  WhatsApp WRAPPED 2025 | wrap2025.com")
     print("="*50 + "\n")
 
+    if args.from_json:
+        print(f"[*] Loading {args.from_json}...")
+        try:
+            _, names, data = load_stats(args.from_json)
+        except (OSError, ValueError) as e:
+            print(f"\n[FATAL] Can't render {args.from_json}: {e}")
+            sys.exit(1)
+        # Names were resolved when the file was written, so they stand in for the contacts
+        print(f"    ✓ {data['stats'][0]:,} messages from {data['year']}")
+        spinner = Spinner()
+        print("[*] Generating report...")
+        spinner.start("Building your wrapped...")
+        with stage('render'):
+            gen_html(data, names, args.output)
+        spinner.stop(f"Saved to {args.output}")
+        if args.profile:
+            print(f"[*] Profile saved to {args.profile}")
+            write_profile(args.profile)
+        open_in_macos(args.output)
+        print("\n  Done! Click through your wrapped.\n")
+        return
+
     print("[*] Checking access...")
     check_access()
     print(f"    ✓ Found database: {WHATSAPP_DB}")
 
+    if args.snapshot:
+        print("[*] Taking snapshot...")
+        db = get_db(WHATSAPP_DB)
+        print(f"    ✓ Snapshot in {'memory' if db.keeper else db.path}")
+
     print("[*] Loading contacts...")
-    contacts = extract_contacts()
+    with stage('contacts'):
+        contacts = extract_contacts()
     print(f"    ✓ {len(contacts)} indexed")
 
     ts_start, ts_jun = (TS_2024, TS_JUN_2024) if args.use_2024 else (TS_2025, TS_JUN_2025)
     year = "2024" if args.use_2024 else "2025"
 
-    test = q(f"SELECT COUNT(*) FROM ZWAMESSAGE WHERE ZMESSAGEDATE>{TS_2025}")[0][0]
+    ts_end = None
+    if dated:
+        until = args.until or date.today()
+        since = args.since or date(until.year, 1, 1)
+        if since > until:
+            parser.error('--since is after --until')
+        # Half-open [since, until + 1 day) in local time, as Cocoa seconds; ghosted/heating split it at the midnight halfway through
+        split = since + timedelta(days=((until - since).days + 1) // 2)
+        ts_start = local_ts(since.year, since.month, since.day) - COCOA_OFFSET
+        ts_end = local_ts(*(until + timedelta(days=1)).timetuple()[:3]) - COCOA_OFFSET
+        ts_jun = local_ts(split.year, split.month, split.day) - COCOA_OFFSET
+        year = str(until.year)
+
+    # A date range is explicit, so there is nothing to fall back to
+    test = 100 if dated else q(f"SELECT COUNT(*) FROM ZWAMESSAGE WHERE ZMESSAGEDATE>{TS_2025}")[0][0]
     if test < 100 and not args.use_2024:
         print(f"    ⚠️  {test} msgs in 2025, using 2024")
         ts_start, ts_jun = TS_2024, TS_JUN_2024
@@ -1565,17 +2445,41 @@ def main():
 
     print(f"[*] Analyzing {year}...")
     spinner.start("Reading message database...")
-    data = analyze(ts_start, ts_jun)
+    with stage('analyze'):
+        data = analyze(ts_start, ts_jun, ts_end)
     data['year'] = int(year)  # Pass the year to gen_html
+    if dated:
+        data['range'] = (since.isoformat(), until.isoformat())
+        data['split'] = split.isoformat()
     spinner.stop(f"{data['stats'][0]:,} messages analyzed")
+    if args.jobs:
+        for name, secs in sorted(METRIC_TIMES.items(), key=lambda x: -x[1]):
+            print(f"      {name:<18} {secs * 1000:8.1f} ms")
+
+    for path, ndjson in ((args.json, False), (args.ndjson, True)):
+        if path:
+            with stage('export'):
+                export_stats(data, contacts, path, ndjson)
+            print(f"[*] Stats saved to {path}")
 
-    print(f"[*] Generating report...")
+    print("[*] Generating report...")
     spinner.start("Building your wrapped...")
-    gen_html(data, contacts, args.output)
+    with stage('render'):
+        gen_html(data, contacts, args.output)
     spinner.stop(f"Saved to {args.output}")
 
-    subprocess.run(['open', args.output])
+    if args.profile:
+        print(f"[*] Profile saved to {args.profile}")
+        write_profile(args.profile)
+
+    close_dbs()
+
+    open_in_macos(args.output)
     print("\n  Done! Click through your wrapped.\n")
 
 if __name__ == '__main__':
-    main()
+    try:
+        main()
+    finally:
+        # Deletes a --snapshot copy even when main() fails or is interrupted before its own close_dbs()
+        close_dbs()